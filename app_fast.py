@@ -2,24 +2,35 @@ import streamlit as st
 import cv2
 import numpy as np
 import sys
-import tempfile
 import time
 import os
 import winsound
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
-from collections import deque
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 from src.models.pose_estimator import PoseEstimator
 from src.models.multi_person_detector import MultiPersonDetector
-from src.core.fall_detector import FallDetector
+from src.core.pipeline import StreamPipeline
+from src.core.learned_scorer import LogisticWindowModel
 from src.utils.error_handler import error_handler
 from src.utils.video_processor import VideoProcessor, CameraManager
+from src.utils.camera_sessions import CameraSessionManager, is_live_source
+from src.utils.event_store import FallEventStore
+from src.utils.screenshot_manager import ScreenshotManager
+from src.utils.media_cache import MediaCache
+from src.utils.upload_store import UploadStore
+from src.utils.metrics import metrics, MetricsServer
+from src.utils.profiler import FrameProfiler
+from src.ui.display import DetectionThread, DisplayThrottler
 try:
     from video_url_handler import VideoURLHandler
 except ImportError:
     VideoURLHandler = None
+try:
+    import yaml
+except ImportError:
+    yaml = None
 st.set_page_config(
     page_title="Dusme Tespit Sistemi",
     page_icon="🚨",
@@ -127,8 +138,8 @@ st.markdown("""
 
 if 'fall_count' not in st.session_state:
     st.session_state.fall_count = 0
-if 'fall_events' not in st.session_state:
-    st.session_state.fall_events = []
+if 'events_since' not in st.session_state:
+    st.session_state.events_since = None
 if 'people_count' not in st.session_state:
     st.session_state.people_count = 0
 if 'confidence_score' not in st.session_state:
@@ -143,17 +154,103 @@ if 'enable_screenshot' not in st.session_state:
     st.session_state.enable_screenshot = True
 if 'screenshot_taken' not in st.session_state:
     st.session_state.screenshot_taken = set()
-
-screenshots_dir = Path("fall_screenshots")
-screenshots_dir.mkdir(exist_ok=True)
+if 'upload_paths' not in st.session_state:
+    st.session_state.upload_paths = {}
 
 @st.cache_resource
 def load_yolo_model():
-    return MultiPersonDetector()
+    return MultiPersonDetector.from_config(config)
 
 @st.cache_resource
 def load_mediapipe_model():
-    return PoseEstimator()
+    return PoseEstimator.from_config(config)
+
+CONFIG_PATH = Path(os.environ.get('FALL_DETECTION_CONFIG',
+                                  Path(__file__).parent / 'configs' / 'default_config.yaml'))
+
+@st.cache_resource
+def load_config():
+    if yaml is None:
+        error_handler.log_warning("PyYAML is not installed; using built-in defaults")
+        return {}
+    try:
+        with open(CONFIG_PATH, encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        error_handler.log_warning(f"Config {CONFIG_PATH} could not be loaded: {e}")
+        return {}
+    error_handler.apply_config(config)
+    return config
+
+config = load_config()
+detection_config = config.get('detection', {})
+ui_config = config.get('ui', {})
+smoothing_config = config.get('smoothing', {})
+metrics_config = config.get('metrics', {})
+
+# Frames wider than this are downscaled before JPEG encoding for the browser
+DISPLAY_WIDTH = ui_config.get('display_width', 640)
+
+SCORER_MODEL_PATH = Path(__file__).parent / 'models' / 'fall_scorer.npz'
+
+@st.cache_resource
+def load_scorer_model():
+    try:
+        return LogisticWindowModel.load(str(SCORER_MODEL_PATH))
+    except (OSError, ValueError, KeyError) as e:
+        error_handler.log_warning(f"Scorer model could not be loaded: {e}")
+        return None
+
+@st.cache_resource
+def get_event_store():
+    return FallEventStore.from_config(config)
+
+event_store = get_event_store()
+
+@st.cache_resource
+def get_url_handler():
+    # One cache so background downloads are shared across reruns
+    ingest = config.get('ingest', {})
+    cache = MediaCache(ingest.get('cache_directory'),
+                       max_bytes=ingest.get('cache_max_bytes', 2 * 1024 ** 3))
+    return VideoURLHandler(cache, streaming=ingest.get('streaming', True))
+
+@st.cache_resource
+def get_camera_sessions():
+    # Cameras and network streams reconnect with backoff in the background
+    manager = CameraSessionManager.from_config(config)
+    manager.start()
+    return manager
+
+@st.cache_resource
+def get_upload_store():
+    return UploadStore.from_config(config)
+
+upload_store = get_upload_store()
+upload_store.maybe_clean()
+
+@st.cache_resource
+def get_screenshot_manager():
+    return ScreenshotManager.from_config(config)
+
+screenshot_manager = get_screenshot_manager()
+
+@st.cache_resource
+def start_metrics_server():
+    server = MetricsServer(metrics, host=metrics_config.get('host', '127.0.0.1'),
+                           port=metrics_config.get('port', 9108))
+    try:
+        server.start()
+    except OSError as e:
+        error_handler.log_warning(f"Metrics endpoint could not start: {e}")
+    return server
+
+if metrics_config.get('enabled', True):
+    start_metrics_server()
+
+def format_event(event):
+    event_time = datetime.fromtimestamp(event['timestamp']).strftime('%H:%M:%S')
+    return f"{event_time} - Kisi {event['track_id']+1} ({event['confidence']:.0f}%)"
 
 def play_alert_sound():
     try:
@@ -161,16 +258,9 @@ def play_alert_sound():
     except:
         pass
 
-def save_fall_screenshot(frame, person_id=None):
+def save_fall_screenshot(frame, camera_id, person_id=None):
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        if person_id is not None:
-            filename = f"fall_person{person_id}_{timestamp}.jpg"
-        else:
-            filename = f"fall_{timestamp}.jpg"
-        filepath = screenshots_dir / filename
-        cv2.imwrite(str(filepath), frame)
-        return str(filepath)
+        return screenshot_manager.save(frame, camera_id, person_id)
     except Exception as e:
         print(f"Screenshot error: {e}")
         return None
@@ -197,22 +287,34 @@ with st.sidebar:
             type=['mp4', 'avi', 'mov', 'mkv']
         )
         if uploaded_file:
-            tfile = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-            tfile.write(uploaded_file.read())
-            tfile.close()
-            st.session_state.video_source = tfile.name
+            # Streamed to a content-addressed file once per upload; reruns
+            # and re-uploads of the same video reuse it
+            upload_path = st.session_state.upload_paths.get(uploaded_file.file_id)
+            if upload_path is None or not os.path.exists(upload_path):
+                upload_path, reused = upload_store.save(uploaded_file, uploaded_file.name)
+                st.session_state.upload_paths[uploaded_file.file_id] = upload_path
+                if reused:
+                    st.info("♻ Ayni video daha once yuklenmis, mevcut dosya kullaniliyor")
+            if st.session_state.video_source != upload_path:
+                if st.session_state.video_source in st.session_state.upload_paths.values():
+                    upload_store.release(st.session_state.video_source)
+                st.session_state.video_source = upload_path
             st.success(f"Video yuklendi: {uploaded_file.name}")
     elif "URL" in input_mode:
         url_input = st.text_input("URL:", placeholder="https://youtube.com/... or rtsp://...")
         if st.button("Yukle", disabled=not url_input):
             with st.spinner("Yukleniyor..."):
                 try:
-                    url_handler = VideoURLHandler()
+                    url_handler = get_url_handler()
                     processed_url, url_type = url_handler.process_url(url_input)
                     if processed_url:
                         st.session_state.video_source = processed_url
                         if url_type == 'youtube':
                             st.success(f"✅ YouTube yuklendi!")
+                        elif url_type == 'youtube_stream':
+                            st.success(f"✅ YouTube akisi hazir! (arka planda onbellege aliniyor)")
+                        elif url_type == 'youtube_cached':
+                            st.success(f"✅ YouTube onbellekten yuklendi!")
                         elif url_type == 'ip_camera':
                             st.success(f"✅ IP kamera baglandi!")
                         else:
@@ -229,7 +331,19 @@ with st.sidebar:
                     st.info("💡 YouTube videolari icin gecerli bir link girin veya IP kamera URL (rtsp://...)")
     st.markdown("---")
     st.subheader("🎯 Tespit Ayarlari")
-    angle_threshold = st.slider("Aci Esigi:", 30, 90, 60, help="Vucut egim acisi esigi (derece)")
+    angle_threshold = st.slider("Aci Esigi:", 30, 90, int(detection_config.get('angle_threshold', 60)),
+                                help="Vucut egim acisi esigi (derece)")
+    smooth_keypoints = st.checkbox(
+        "Keypoint Yumusatma",
+        value=smoothing_config.get('enabled', True),
+        help="Titreyen keypoint'leri One-Euro filtresiyle yumusatir; dusme sayaci daha kararli olur"
+    )
+    use_learned_scorer = st.checkbox(
+        "Ogrenilmis Skorlayici",
+        value=False,
+        disabled=not SCORER_MODEL_PATH.exists(),
+        help="models/fall_scorer.npz ile puan sistemi yerine egitilmis model kullanir (python -m src.models.train_scorer)"
+    )
     st.markdown("---")
     st.subheader("🔔 Uyari Ayarlari")
     st.session_state.enable_sound = st.checkbox("Ses Uyarisi", value=True, help="Dusme tespit edildiginde ses calar")
@@ -239,17 +353,30 @@ with st.sidebar:
         "Video Genisligi:",
         options=[480, 640, 960],
         value=640,
-        help="640 = Dengeli kalite ve hiz | 960 = Yuksek kalite"
+        help="480 = En hizli | 640 = Dengeli kalite ve hiz | 960 = Yuksek kalite (esikler govde boyuna gore olceklenir)"
     )
     skip_frames = st.slider(
         "Kare Atlama (Her X kare):",
         1, 5, 3,
         help="3 = Cok hizli! (Yuklu videolar icin onerilen)"
     )
+    interpolate_skipped = st.checkbox(
+        "Ara Kare Tahmini",
+        value=smoothing_config.get('interpolate_skipped', True),
+        help="Atlanan karelerde keypoint'leri hareketten tahmin eder; tespit ve cizim her karede devam eder"
+    )
+    display_fps = st.slider(
+        "Ekran FPS:",
+        5, 30, ui_config.get('display_fps', 10),
+        help="Goruntu bu hizda yenilenir; tespit hizindan bagimsizdir"
+    )
     st.markdown("---")
     show_skeleton = st.checkbox("Iskelet Goster", True)
     show_bbox = st.checkbox("Cerceve Goster", True)
     st.markdown("---")
+    enable_profiling = st.checkbox("Profil Kaydi", False, help="Ilk N kareyi profiller (profiles/ klasorune yazar)")
+    profile_frames = st.number_input("Profil Kare Sayisi:", 30, 3000, 300, step=30, disabled=not enable_profiling)
+    st.markdown("---")
     col1, col2 = st.columns(2)
     with col1:
         start_btn = st.button("▶ START", use_container_width=True, type="primary")
@@ -257,7 +384,7 @@ with st.sidebar:
         if st.button("⏹ STOP", use_container_width=True):
             st.session_state.stop_processing = True
     if st.button("🔄 Reset", use_container_width=True):
-        st.session_state.fall_events.clear()
+        st.session_state.events_since = time.time()
         st.session_state.fall_count = 0
         st.session_state.people_count = 0
         st.rerun()
@@ -286,169 +413,130 @@ with col3:
     st.progress(st.session_state.confidence_score / 100)
     st.markdown(f"**<span style='color:{confidence_color}; font-size:20px;'>{st.session_state.confidence_score:.1f}%</span>**", unsafe_allow_html=True)
 
-screenshot_count = len(list(screenshots_dir.glob("*.jpg")))
+screenshot_count = screenshot_manager.get_count()
 if screenshot_count > 0:
-    st.info(f"📸 {screenshot_count} adet ekran goruntusu kaydedildi (fall_screenshots klasorunde)")
+    st.info(f"📸 {screenshot_count} adet ekran goruntusu kaydedildi ({screenshot_manager.root_dir} klasorunde)")
 st.markdown("---")
 video_placeholder = st.empty()
 fps_placeholder = st.empty()
 with st.expander("📋 Olay Kayitlari", expanded=False):
     event_log_placeholder = st.empty()
+def render_event_log():
+    recent_events = event_store.query_events(since=st.session_state.events_since, limit=10)
+    if recent_events:
+        events_html = "<br>".join([f'<div class="event-log">{format_event(event)}</div>'
+                                  for event in reversed(recent_events)])
+        event_log_placeholder.markdown(events_html, unsafe_allow_html=True)
+render_event_log()
+def handle_fall_event(frame, camera_id, person):
+    person_key = f"{'yolo' if use_yolo else 'mediapipe'}_{person['person_id']}"
+    if not person['is_fallen']:
+        st.session_state.screenshot_taken.discard(person_key)
+        return
+    # Screenshot first (once per fallen person), so the event row links to it
+    saved_path = None
+    if st.session_state.enable_screenshot and person_key not in st.session_state.screenshot_taken:
+        saved_path = save_fall_screenshot(frame, camera_id,
+                                          person['person_id']+1 if use_yolo else None)
+        if saved_path:
+            st.session_state.screenshot_taken.add(person_key)
+            print(f"Ekran goruntusu kaydedildi: {saved_path}")
+    if event_store.add_event(camera_id, person['person_id'], person['confidence'],
+                             episode_start=person['fall_start_time'],
+                             screenshot_path=saved_path):
+        st.session_state.fall_count += 1
+        if st.session_state.enable_sound:
+            play_alert_sound()
 def process_video_optimized():
     if st.session_state.video_source is None:
         st.warning("⚠ Video kaynagi secin!")
         return
     try:
-        cap = cv2.VideoCapture(st.session_state.video_source)
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
-        if not cap.isOpened():
-            st.error("❌ Video acilamadi! Lutfen baska bir dosya deneyin.")
-            return
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        video_fps = int(cap.get(cv2.CAP_PROP_FPS))
-        st.info(f"📹 Video: {total_frames} kare, {video_fps} FPS")
         with st.spinner("Model yukleniyor..."):
             if use_yolo:
                 detector = load_yolo_model()
             else:
                 detector = load_mediapipe_model()
         st.success("✅ Model yuklendi!")
-        fall_detectors = {}
-        frame_count = 0
-        fps_start = time.time()
-        fps = 0
-        prev_processed_frame = None
-        frame_buffer = deque(maxlen=2)
+        camera_id = str(st.session_state.video_source)
+        pipeline = StreamPipeline.from_config(
+            detector,
+            config,
+            stream_id=camera_id,
+            angle_threshold=angle_threshold,
+            resize_width=resize_width,
+            skip_frames=skip_frames,
+            show_skeleton=show_skeleton,
+            show_bbox=show_bbox,
+            metrics=metrics,
+            scorer_model=load_scorer_model() if use_learned_scorer else None,
+            smooth_keypoints=smooth_keypoints,
+            interpolate_skipped=interpolate_skipped
+        )
+        profiler = FrameProfiler.from_env()
+        if enable_profiling:
+            profiler.arm(int(profile_frames))
+        source = st.session_state.video_source
+        if is_live_source(source):
+            # Reads wait while the camera reconnects instead of ending the stream
+            cap = get_camera_sessions().open(camera_id, source)
+        else:
+            cap = cv2.VideoCapture(source)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
+        if not cap.isOpened():
+            st.error("❌ Video acilamadi! Lutfen baska bir dosya deneyin.")
+            return
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        video_fps = int(cap.get(cv2.CAP_PROP_FPS))
+        st.info(f"📹 Video: {total_frames} kare, {video_fps} FPS")
+        # Detection runs on its own thread; the UI renders the latest
+        # result at display_fps, so browser updates never slow detection
+        worker = DetectionThread(cap, pipeline, metrics=metrics, profiler=profiler)
+        display = DisplayThrottler(fps=display_fps, width=DISPLAY_WIDTH)
+        last_event_log = time.monotonic()
         st.session_state.stop_processing = False
-        while not st.session_state.stop_processing:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            frame_count += 1
-            h, w = frame.shape[:2]
-            new_height = int(h * (resize_width / w))
-            frame = cv2.resize(frame, (resize_width, new_height))
-            if frame_count % skip_frames != 0:
-                if prev_processed_frame is not None:
-                    video_placeholder.image(prev_processed_frame, channels="RGB", use_column_width=True)
-                continue
-            fall_detected = False
-            if use_yolo:
-                people = detector.detect_people(frame)
-                st.session_state.people_count = len(people)
-                for person_id, person in enumerate(people):
-                    if person_id not in fall_detectors:
-                        fall_detectors[person_id] = FallDetector(
-                            angle_threshold=angle_threshold
-                        )
-                    keypoints = person['keypoints']
-                    is_fallen = fall_detectors[person_id].detect_fall(keypoints)
-                    confidence = fall_detectors[person_id].get_confidence_score()
-                    if confidence > st.session_state.confidence_score:
-                        st.session_state.confidence_score = confidence
-                    if is_fallen:
-                        fall_detected = True
-                        event = f"{datetime.now().strftime('%H:%M:%S')} - Kisi {person_id+1} ({confidence:.0f}%)"
-                        if event not in st.session_state.fall_events:
-                            st.session_state.fall_events.append(event)
-                            st.session_state.fall_count += 1
-                            if st.session_state.enable_sound:
-                                play_alert_sound()
-                            person_key = f"yolo_{person_id}"
-                            if st.session_state.enable_screenshot and person_key not in st.session_state.screenshot_taken:
-                                saved_path = save_fall_screenshot(frame, person_id+1)
-                                if saved_path:
-                                    st.session_state.screenshot_taken.add(person_key)
-                                    print(f"Ekran goruntusu kaydedildi: {saved_path}")
-                    else:
-                        person_key = f"yolo_{person_id}"
-                        if person_key in st.session_state.screenshot_taken:
-                            st.session_state.screenshot_taken.discard(person_key)
-                    if show_bbox and person['bbox']:
-                        x1, y1, x2, y2 = person['bbox']
-                        color = (0, 0, 255) if is_fallen else (0, 255, 0)
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                        status = f"DUSME! {confidence:.0f}%" if is_fallen else f"Normal {confidence:.0f}%"
-                        cv2.putText(frame, f"Kisi {person_id+1}: {status}",
-                                   (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX,
-                                   0.5, color, 2)
-                    if show_skeleton:
-                        important_points = ['nose', 'left_shoulder', 'right_shoulder', 
-                                          'left_hip', 'right_hip', 'left_ankle', 'right_ankle']
-                        color = (0, 0, 255) if is_fallen else (0, 255, 0)
-                        for name in important_points:
-                            if name in keypoints:
-                                x, y = keypoints[name]
-                                cv2.circle(frame, (x, y), 4, color, -1)
-                        connections = [
-                            ('left_shoulder', 'right_shoulder'),
-                            ('left_shoulder', 'left_hip'),
-                            ('right_shoulder', 'right_hip'),
-                            ('left_hip', 'right_hip'),
-                            ('left_hip', 'left_ankle'),
-                            ('right_hip', 'right_ankle')
-                        ]
-                        for p1, p2 in connections:
-                            if p1 in keypoints and p2 in keypoints:
-                                cv2.line(frame, keypoints[p1], keypoints[p2], color, 2)
-            else:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                person_detected = detector.process_frame(rgb_frame)
-                if person_detected:
-                    st.session_state.people_count = 1
-                    h, w = frame.shape[:2]
-                    keypoints = detector.get_all_keypoints(w, h)
-                    if 0 not in fall_detectors:
-                        fall_detectors[0] = FallDetector(
-                            angle_threshold=angle_threshold
-                        )
-                    is_fallen = fall_detectors[0].detect_fall(keypoints)
-                    confidence = fall_detectors[0].get_confidence_score()
-                    st.session_state.confidence_score = confidence
-                    if is_fallen:
-                        fall_detected = True
-                        event = f"{datetime.now().strftime('%H:%M:%S')} - Dusme! ({confidence:.0f}%)"
-                        if event not in st.session_state.fall_events:
-                            st.session_state.fall_events.append(event)
-                            st.session_state.fall_count += 1
-                            if st.session_state.enable_sound:
-                                play_alert_sound()
-                            person_key = "mediapipe_0"
-                            if st.session_state.enable_screenshot and person_key not in st.session_state.screenshot_taken:
-                                saved_path = save_fall_screenshot(frame)
-                                if saved_path:
-                                    st.session_state.screenshot_taken.add(person_key)
-                                    print(f"Ekran goruntusu kaydedildi: {saved_path}")
-                    else:
-                        person_key = "mediapipe_0"
-                        if person_key in st.session_state.screenshot_taken:
-                            st.session_state.screenshot_taken.discard(person_key)
-                    if show_skeleton:
-                        frame = detector.draw_skeleton(frame)
-                else:
-                    st.session_state.people_count = 0
-            st.session_state.current_status = 'danger' if fall_detected else 'safe'
-            if fall_detected:
-                cv2.rectangle(frame, (0, 0), (frame.shape[1], frame.shape[0]),
-                             (0, 0, 255), 10)
-            if frame_count % 30 == 0:
-                fps = 30 / (time.time() - fps_start)
-                fps_start = time.time()
-            cv2.putText(frame, f"FPS: {int(fps)}", (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            prev_processed_frame = frame_rgb
-            frame_buffer.append(frame_rgb)
-            if len(frame_buffer) > 0:
-                display_frame = frame_buffer[0]
-                video_placeholder.image(display_frame, channels="RGB", use_column_width=True)
-            if frame_count % 30 == 0:
-                fps_placeholder.text(f"⚡ {int(fps)} FPS | Speed: {skip_frames}x")
-            if frame_count % 20 == 0 and st.session_state.fall_events:
-                events_html = "<br>".join([f'<div class="event-log">{event}</div>' 
-                                          for event in list(st.session_state.fall_events)[-10:]])
-                event_log_placeholder.markdown(events_html, unsafe_allow_html=True)
-        cap.release()
+        try:
+            worker.start()
+            while worker.is_alive() and not st.session_state.stop_processing:
+                for fall_result in worker.drain():
+                    for person in fall_result['people']:
+                        handle_fall_event(fall_result['frame'], camera_id, person)
+                version, result = worker.snapshot()
+                if result is not None and display.due():
+                    if result['processed'] or result['predicted']:
+                        people = result['people']
+                        if use_yolo:
+                            st.session_state.people_count = len(people)
+                            if result['max_confidence'] > st.session_state.confidence_score:
+                                st.session_state.confidence_score = result['max_confidence']
+                        else:
+                            st.session_state.people_count = 1 if people else 0
+                            if people:
+                                st.session_state.confidence_score = result['max_confidence']
+                        st.session_state.current_status = 'danger' if result['fall_detected'] else 'safe'
+                    with metrics.timer('stage_seconds', stream=camera_id, stage='display'):
+                        jpeg = display.render(result['frame'], version, f"FPS: {int(worker.fps)}")
+                        if jpeg is not None:
+                            video_placeholder.image(jpeg, use_column_width=True)
+                    if jpeg is not None and display.rendered % 10 == 0:
+                        fps_placeholder.text(f"⚡ {int(worker.fps)} FPS | Ekran: {display_fps} FPS | Speed: {skip_frames}x")
+                metrics.maybe_log_summary(interval=metrics_config.get('summary_interval', 60))
+                if time.monotonic() - last_event_log >= 2.0:
+                    render_event_log()
+                    last_event_log = time.monotonic()
+                time.sleep(max(display.wait_time(), 0.005))
+            for fall_result in worker.drain():
+                for person in fall_result['people']:
+                    handle_fall_event(fall_result['frame'], camera_id, person)
+        finally:
+            worker.stop()
+            worker.join()
+            cap.release()
+        if worker.error is not None:
+            raise worker.error
+        profile_report = profiler.last_report
+        if profile_report:
+            st.info(f"🔬 Profil kaydedildi: {profile_report['folded']}")
         st.success("✅ Video isleme tamamlandi")
     except Exception as e:
         st.error(f"❌ Hata: {str(e)}")
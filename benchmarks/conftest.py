@@ -0,0 +1,102 @@
+"""
+Benchmark configuration: stored baselines and regression threshold.
+
+Each benchmark's fastest round is divided by the fastest run of a fixed
+calibration workload measured right after it, so baselines stored
+in ``baselines.json`` are comparable across machines. A benchmark fails
+when its normalized cost exceeds the baseline by more than the threshold.
+
+    python -m pytest benchmarks/                          # check
+    python -m pytest benchmarks/ --update-baselines       # re-record
+    python -m pytest benchmarks/ --regression-threshold=0.2
+"""
+
+import json
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    collect_ignore_glob = ["test_*.py"]
+
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("fall-detection benchmarks")
+    group.addoption("--update-baselines", action="store_true", default=False,
+                    help="Record current results as the new baselines")
+    group.addoption("--regression-threshold", type=float, default=0.5,
+                    help="Allowed slowdown relative to baseline (0.5 = 50%%)")
+
+
+def _calibration_workload():
+    values = np.arange(256, dtype=np.float64)
+    total = 0.0
+    for i in range(200):
+        total += float(values[i]) * 0.5
+    return np.sqrt(values).sum() + total
+
+
+def calibrate() -> float:
+    """Fastest seconds per call of the reference workload right now"""
+    timer = timeit.Timer(_calibration_workload)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+class BaselineStore:
+    """Load, compare and (optionally) rewrite normalized baselines"""
+
+    def __init__(self, path: Path, threshold: float, update: bool):
+        self.path = path
+        self.threshold = threshold
+        self.update = update
+        self.baselines = json.loads(path.read_text()) if path.exists() else {}
+        self.recorded = {}
+
+    def check(self, name: str, normalized: float):
+        self.recorded[name] = normalized
+        if self.update or name not in self.baselines:
+            return
+        limit = self.baselines[name] * (1 + self.threshold)
+        if normalized > limit:
+            pytest.fail(
+                f"{name}: {normalized:.2f}x calibration, baseline "
+                f"{self.baselines[name]:.2f}x (+{self.threshold:.0%} allowed)"
+            )
+
+    def save(self):
+        merged = dict(self.baselines)
+        merged.update({k: round(v, 3) for k, v in self.recorded.items()})
+        self.path.write_text(json.dumps(dict(sorted(merged.items())), indent=2) + "\n")
+
+
+@pytest.fixture(scope="session")
+def baseline_store(request):
+    store = BaselineStore(BASELINE_FILE,
+                          request.config.getoption("--regression-threshold"),
+                          request.config.getoption("--update-baselines"))
+    yield store
+    if store.update:
+        store.save()
+
+
+@pytest.fixture
+def bench(benchmark, request, baseline_store):
+    """Run ``benchmark`` and compare the fastest round against the stored baseline"""
+
+    def run(func, *args, **kwargs):
+        result = benchmark(func, *args, **kwargs)
+        stats = getattr(benchmark, "stats", None)
+        if stats is not None:
+            # Calibrate next to the measurement so both see the same machine load
+            baseline_store.check(request.node.name, stats.stats.min / calibrate())
+        return result
+
+    return run
@@ -0,0 +1,245 @@
+"""
+End-to-End Throughput Benchmark
+===============================
+
+Replays the bundled videos (or synthetic frames) through StreamPipeline at
+maximum speed with a scripted fake pose backend, so the numbers measure our
+own pipeline overhead (decode, resize, fall detection, drawing) rather than
+model cost. Runs on CPU-only machines without model downloads.
+
+Usage:
+    python -m benchmarks.e2e_throughput --synthetic --frames 2000
+    python -m benchmarks.e2e_throughput --source Fall/Raw_Video --backend mediapipe
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tests.fake_backends import ScriptedMultiPersonDetector, ScriptedPoseEstimator
+from src.core.pipeline import StreamPipeline
+from src.utils.metrics import MetricsRegistry
+
+
+DEFAULT_SOURCES = ['Fall/Raw_Video', 'No_Fall/Raw_Video']
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+
+def find_videos(sources: List[str]) -> List[Path]:
+    """Video files under the given files/directories (relative to the project root)"""
+    videos = []
+    for source in sources:
+        path = Path(source)
+        if not path.is_absolute() and not path.exists():
+            path = PROJECT_ROOT / path
+        if path.is_dir():
+            videos.extend(sorted(p for p in path.iterdir()
+                                 if p.suffix.lower() in VIDEO_EXTENSIONS))
+        elif path.is_file():
+            videos.append(path)
+    return videos
+
+
+def synthetic_frames(width: int = 1280, height: int = 720,
+                     variants: int = 8) -> Iterator[np.ndarray]:
+    """Endless stream of pre-generated noise frames (no decode cost)"""
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+              for _ in range(variants)]
+    i = 0
+    while True:
+        # Pipeline draws in place; hand out copies like a decoder would
+        yield frames[i % variants].copy()
+        i += 1
+
+
+def video_frames(videos: List[Path]) -> Iterator[np.ndarray]:
+    """Decode the videos in a loop forever"""
+    if not videos:
+        raise ValueError("No videos found")
+    while True:
+        for video in videos:
+            cap = cv2.VideoCapture(str(video))
+            try:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    yield frame
+            finally:
+                cap.release()
+
+
+def make_backend(backend: str, people: int = 1):
+    """Fake pose backend: 'yolo' (multi-person) or 'mediapipe' (single person)"""
+    if backend == 'yolo':
+        return ScriptedMultiPersonDetector(people=people)
+    if backend == 'mediapipe':
+        return ScriptedPoseEstimator()
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux only)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def run_benchmark(frames: Iterator[np.ndarray],
+                  frame_count: int = 1000,
+                  backend: str = 'yolo',
+                  people: int = 1,
+                  resize_width: Optional[int] = 640,
+                  skip_frames: int = 1,
+                  interpolate: bool = False,
+                  warmup: int = 20,
+                  trace_memory: bool = True) -> Dict:
+    """Push ``frame_count`` frames through the pipeline and collect statistics.
+
+    Per-frame latency covers decode + resize + pipeline; memory growth is
+    measured after warm-up with tracemalloc (Python heap) and RSS.
+    """
+    registry = MetricsRegistry()
+    pipeline = StreamPipeline(make_backend(backend, people),
+                              stream_id='benchmark',
+                              resize_width=resize_width,
+                              skip_frames=skip_frames,
+                              interpolate_skipped=interpolate,
+                              metrics=registry)
+
+    # Nominal 30 fps clock so the motion criteria see realistic frame gaps
+    for i in range(warmup):
+        pipeline.process(pipeline.resize(next(frames)), timestamp=i / 30.0)
+
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    heap_start = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+    rss_start = _rss_bytes()
+
+    latencies = np.empty(frame_count, dtype=np.float64)
+    falls = 0
+    started = time.perf_counter()
+    for i in range(frame_count):
+        t0 = time.perf_counter()
+        frame = next(frames)
+        result = pipeline.process(pipeline.resize(frame), timestamp=(warmup + i) / 30.0)
+        latencies[i] = time.perf_counter() - t0
+        falls += result['fall_detected']
+    elapsed = time.perf_counter() - started
+    # Drop the last frame so it does not count as growth
+    del frame, result
+
+    heap_peak = 0
+    heap_growth = 0
+    if trace_memory:
+        gc.collect()
+        heap_end, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        heap_growth = heap_end - heap_start
+    rss_end = _rss_bytes()
+
+    stages = {}
+    for stage in ('resize', 'inference', 'detect_fall', 'predict', 'draw'):
+        histogram = registry.get_histogram('stage_seconds', stream='benchmark', stage=stage)
+        if histogram is not None and histogram.count:
+            stages[stage] = histogram.sum / histogram.count * 1000
+
+    return {
+        'backend': backend,
+        'people': people if backend == 'yolo' else 1,
+        'frames': frame_count,
+        'elapsed_s': elapsed,
+        'fps': frame_count / elapsed if elapsed > 0 else float('inf'),
+        'latency_ms': {
+            'mean': float(latencies.mean() * 1000),
+            'p50': float(np.percentile(latencies, 50) * 1000),
+            'p99': float(np.percentile(latencies, 99) * 1000),
+            'max': float(latencies.max() * 1000),
+        },
+        'stages_mean_ms': stages,
+        'fall_frames': int(falls),
+        'memory': {
+            'heap_growth_bytes': heap_growth,
+            'heap_peak_bytes': heap_peak,
+            'rss_growth_bytes': (rss_end - rss_start
+                                 if rss_start is not None and rss_end is not None else None),
+        },
+    }
+
+
+def format_report(report: Dict) -> str:
+    """Human readable benchmark report"""
+    latency = report['latency_ms']
+    memory = report['memory']
+    rss = memory['rss_growth_bytes']
+    lines = [
+        f"Backend: {report['backend']} (people={report['people']})",
+        f"Frames:  {report['frames']} in {report['elapsed_s']:.2f}s -> {report['fps']:.1f} fps",
+        f"Latency: p50 {latency['p50']:.2f} ms, p99 {latency['p99']:.2f} ms, "
+        f"max {latency['max']:.2f} ms",
+        f"Memory:  heap growth {memory['heap_growth_bytes'] / 1024:.1f} KiB, "
+        f"peak {memory['heap_peak_bytes'] / 1024:.1f} KiB"
+        + (f", RSS growth {rss / 1024:.1f} KiB" if rss is not None else ""),
+    ]
+    for stage, mean_ms in report['stages_mean_ms'].items():
+        lines.append(f"  {stage:<12} mean {mean_ms:.3f} ms")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end pipeline throughput benchmark")
+    parser.add_argument('--source', nargs='*', default=None,
+                        help="Video files/directories (default: bundled Fall/No_Fall videos)")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="Use generated frames instead of decoding videos")
+    parser.add_argument('--frames', type=int, default=1000)
+    parser.add_argument('--backend', choices=['yolo', 'mediapipe'], default='yolo')
+    parser.add_argument('--people', type=int, default=1)
+    parser.add_argument('--resize-width', type=int, default=640)
+    parser.add_argument('--skip-frames', type=int, default=1)
+    parser.add_argument('--interpolate', action='store_true',
+                        help="Predict keypoints for skipped frames")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="Disable heap tracing (it slows the loop down)")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        frames = synthetic_frames()
+    else:
+        videos = find_videos(args.source or DEFAULT_SOURCES)
+        if not videos:
+            parser.error("no videos found; pass --source or --synthetic")
+        frames = video_frames(videos)
+
+    report = run_benchmark(frames,
+                           frame_count=args.frames,
+                           backend=args.backend,
+                           people=args.people,
+                           resize_width=args.resize_width or None,
+                           skip_frames=args.skip_frames,
+                           interpolate=args.interpolate,
+                           trace_memory=not args.no_tracemalloc)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""FallDetector sıcak yol benchmark'ları."""
+
+from tests.synthetic import (fall_sequence, fallen_keypoints,
+                                  random_people, standing_keypoints)
+from src.core.fall_detector import FallDetector
+
+
+def test_detect_fall_single_call(bench):
+    detector = FallDetector()
+    standing = standing_keypoints()
+    for _ in range(15):
+        detector.detect_fall(standing)
+    fallen = fallen_keypoints()
+
+    bench(detector.detect_fall, fallen)
+
+
+def test_detect_fall_sequence(bench):
+    sequence = fall_sequence(60)
+
+    def run():
+        detector = FallDetector()
+        for keypoints in sequence:
+            detector.detect_fall(keypoints)
+
+    bench(run)
+
+
+def test_detect_fall_100_people(bench):
+    people = random_people(100)
+    detectors = [FallDetector() for _ in people]
+
+    def run():
+        for detector, keypoints in zip(detectors, people):
+            detector.detect_fall(keypoints)
+
+    bench(run)
+
+
+def test_calculate_aspect_ratio(bench):
+    detector = FallDetector()
+    bench(detector.calculate_aspect_ratio, fallen_keypoints())
+
+
+def test_calculate_body_angle(bench):
+    detector = FallDetector()
+    bench(detector.calculate_body_angle, fallen_keypoints())
@@ -0,0 +1,49 @@
+"""Kare başına işlemler: keypoint dönüşümü, kare doğrulama, çizim."""
+
+import numpy as np
+import pytest
+
+from tests.synthetic import keypoint_arrays, random_people
+from src.core.pose_schema import COCO_SCHEMA
+from src.core.pose_types import Pose
+from src.models.multi_person_detector import MultiPersonDetector
+from src.utils.video_processor import VideoProcessor
+
+
+@pytest.fixture(scope="module")
+def yolo_detector():
+    # Model yüklemeden sadece son işleme yollarını ölçmek için
+    return MultiPersonDetector.__new__(MultiPersonDetector)
+
+
+def test_schema_to_poses_10_people(bench):
+    arrays = keypoint_arrays(10)
+    confidence = np.random.default_rng(0).uniform(0.0, 1.0, arrays.shape[:2]).astype(np.float32)
+
+    bench(COCO_SCHEMA.to_poses, arrays, confidence, 0.5)
+
+
+def test_pose_construction_10_people(bench):
+    arrays = keypoint_arrays(10)
+
+    def run():
+        return [Pose.from_array(kpts) for kpts in arrays]
+
+    bench(run)
+
+
+@pytest.mark.parametrize("width", [640, 1280])
+def test_validate_frame(bench, width):
+    height = width * 9 // 16
+    frame = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    processor = VideoProcessor()
+
+    bench(processor.validate_frame, frame)
+
+
+def test_draw_people_overlay(bench, yolo_detector):
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    people = [{'keypoints': keypoints, 'confidence': 0.9, 'bbox': (10, 10, 200, 400)}
+              for keypoints in random_people(5)]
+
+    bench(yolo_detector.draw_people, frame, people)
@@ -0,0 +1,48 @@
+"""Öğrenilmiş skorlayıcı benchmark'ları (izlenen kişi başına pencere skoru)."""
+
+import numpy as np
+
+from tests.synthetic import fall_sequence
+from src.core.fall_detector import FallDetector
+from src.core.learned_scorer import (LogisticWindowModel, WindowScorer, keypoints_to_points,
+                                     score_tracks)
+
+WINDOW = 8
+
+
+def make_model():
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(256, 5 * WINDOW))
+    labels = (features[:, 0] > 0).astype(float)
+    return LogisticWindowModel.fit(features, labels, WINDOW, epochs=50)
+
+
+def test_score_windows_2000_tracks(bench):
+    model = make_model()
+    points = np.stack([keypoints_to_points(k) for k in fall_sequence(40)])
+    rng = np.random.default_rng(1)
+    starts = rng.integers(0, len(points) - WINDOW, 2000)
+    windows = np.stack([points[s:s + WINDOW] for s in starts]).astype(np.float32)
+    windows += rng.normal(0, 2, windows.shape).astype(np.float32)
+
+    bench(model.score_windows, windows)
+
+
+def test_detect_fall_with_window_scorer(bench):
+    detector = FallDetector(scorer=WindowScorer(make_model()))
+    sequence = fall_sequence(60)
+    for keypoints in sequence[:WINDOW]:
+        detector.detect_fall(keypoints)
+
+    bench(detector.detect_fall, sequence[30])
+
+
+def test_score_tracks_1000_people(bench):
+    model = make_model()
+    sequence = fall_sequence(60)
+    scorers = [WindowScorer(model) for _ in range(1000)]
+    keypoints = [sequence[i % 60] for i in range(1000)]
+    for _ in range(WINDOW):
+        score_tracks(scorers, keypoints)
+
+    bench(score_tracks, scorers, keypoints)
@@ -0,0 +1,14 @@
+"""
+Test session setup: the global error handler logs to a temporary
+directory instead of ./logs, so test runs leave nothing in the tree.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+if 'FALL_DETECTION_LOG_DIR' not in os.environ:
+    _log_dir = tempfile.mkdtemp(prefix='fall-detection-logs-')
+    os.environ['FALL_DETECTION_LOG_DIR'] = _log_dir
+    atexit.register(shutil.rmtree, _log_dir, True)
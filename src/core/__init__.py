@@ -6,5 +6,8 @@ This module contains the main fall detection algorithms.
 """
 
 from .fall_detector import FallDetector
+from .pose_types import Keypoint, Person, Pose
+from .streaming import StreamingFallDetector, confidences_to_array, keypoints_to_array
 
-__all__ = ['FallDetector']
+__all__ = ['FallDetector', 'Keypoint', 'Person', 'Pose',
+           'StreamingFallDetector', 'confidences_to_array', 'keypoints_to_array']
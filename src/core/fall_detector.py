@@ -2,20 +2,93 @@
 Fall Detection Logic Module
 ==========================="""
 
+import math
+import time
+
 import numpy as np
 from typing import Dict, Tuple, Optional, List
 from collections import deque
 
+from .pose_types import KEYPOINT_INDEX
+
+
+TRUNK_POINTS = ['left_shoulder', 'right_shoulder', 'left_hip', 'right_hip']
+
+# Joints behind each weighted criterion (COCO-17 indices)
+TRUNK_INDEX = [KEYPOINT_INDEX[p] for p in TRUNK_POINTS]
+HEAD_ANKLE_INDEX = [KEYPOINT_INDEX[p] for p in ('nose', 'left_ankle', 'right_ankle')]
+HEAD_HIP_INDEX = [KEYPOINT_INDEX[p] for p in ('nose', 'left_hip', 'right_hip')]
+FULL_WEIGHTS = (1.0, 1.0, 1.0, 1.0)
+
+# 'detection' config keys that are FallDetector arguments
+CONFIG_KEYS = ('angle_threshold', 'history_size', 'velocity_threshold', 'acceleration_threshold',
+               'min_fall_frames', 'fast_confirm_frames', 'scale_reference',
+               'head_ankle_thresholds', 'full_weight_confidence')
+
+# Frames further apart than this (seconds) restart the motion estimate
+MAX_MOTION_GAP = 0.5
+
+# Head-to-ankle distance thresholds (very low, low) per scale reference:
+# pixels, torso lengths or person extent (longer side of the keypoint box)
+HEAD_ANKLE_THRESHOLDS = {
+    None: (150.0, 250.0),
+    'torso': (1.5, 2.5),
+    'bbox': (0.5, 0.8),
+}
+
+
+# Runtime state carried by get_state()/set_state(), besides the histories
+STATE_FIELDS = ('is_fallen', 'fall_start_time', 'fall_frames_count', 'confidence_score',
+                'initial_check_frames', 'max_initial_angle', 'reference_length')
+MOTION_FIELDS = ('last_timestamp', 'trunk_y', 'torso_length', 'vertical_velocity',
+                 'vertical_acceleration', 'last_descent_time', 'last_impact_time')
+
+
+def _plain(value):
+    """numpy scalars to Python numbers (JSON-serializable)"""
+    return value.item() if isinstance(value, np.generic) else value
+
 
 class FallDetector:
     """Fall Detector - Enhanced fall detection using multi-criteria analysis"""
     
     def __init__(self, 
                  angle_threshold: float = 60.0,
-                 history_size: int = 10):
-        """Initialize fall detector"""
+                 history_size: int = 10,
+                 velocity_threshold: float = 1.5,
+                 acceleration_threshold: float = 8.0,
+                 motion_window: float = 1.0,
+                 min_fall_frames: int = 3,
+                 fast_confirm_frames: int = 2,
+                 motion_time_constant: float = 0.05,
+                 scale_reference: Optional[str] = None,
+                 head_ankle_thresholds: Optional[Tuple[float, float]] = None,
+                 scorer=None,
+                 full_weight_confidence: Optional[float] = 0.8):
+        """Initialize fall detector
+        
+        ``scorer`` replaces the point system: any object with
+        ``update(keypoints) -> confidence (0-100)`` and ``reset()``, e.g.
+        :class:`src.core.learned_scorer.WindowScorer`.
+        ``full_weight_confidence`` is the joint confidence at which a
+        criterion counts fully (see :meth:`criterion_weights`); None
+        disables the weighting.
+        """
+        if scale_reference not in HEAD_ANKLE_THRESHOLDS:
+            raise ValueError(f"Unknown scale_reference: {scale_reference}")
         self.angle_threshold = angle_threshold
         self.history_size = history_size
+        self.velocity_threshold = velocity_threshold
+        self.acceleration_threshold = acceleration_threshold
+        self.motion_window = motion_window
+        self.min_fall_frames = min_fall_frames
+        self.fast_confirm_frames = fast_confirm_frames
+        self.motion_time_constant = motion_time_constant
+        self.scale_reference = scale_reference
+        self.head_ankle_thresholds = head_ankle_thresholds or HEAD_ANKLE_THRESHOLDS[scale_reference]
+        self.reference_length = None
+        self.scorer = scorer
+        self.full_weight_confidence = full_weight_confidence
         
         self.angle_history = deque(maxlen=5)
         self.aspect_ratio_history = deque(maxlen=5)
@@ -28,6 +101,32 @@ class FallDetector:
         self.initial_check_frames = 0
         self.max_initial_angle = 0
         
+        self._reset_motion()
+    
+    @staticmethod
+    def config_options(config: dict) -> Dict:
+        """FallDetector arguments found in the 'detection' section of a YAML config"""
+        section = config.get('detection', config)
+        options = {key: section[key] for key in CONFIG_KEYS if key in section}
+        if options.get('head_ankle_thresholds') is not None:
+            options['head_ankle_thresholds'] = tuple(options['head_ankle_thresholds'])
+        return options
+    
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'FallDetector':
+        """Create detector from the 'detection' section of a YAML config"""
+        return cls(**{**cls.config_options(config), **overrides})
+        
+    def _reset_motion(self):
+        # Trunk motion in torso lengths per second (+y = downwards)
+        self.last_timestamp = None
+        self.trunk_y = None
+        self.torso_length = None
+        self.vertical_velocity = 0.0
+        self.vertical_acceleration = 0.0
+        self.last_descent_time = None
+        self.last_impact_time = None
+        
     def calculate_angle(self, point1: Tuple[int, int], 
                        point2: Tuple[int, int]) -> float:
         """Calculate angle between two points"""
@@ -76,73 +175,206 @@ class FallDetector:
         
         return width / height
     
-    def detect_fall(self, keypoints: Dict[str, Tuple[int, int]]) -> bool:
-        """Detect fall using multi-criteria analysis"""
-        if not keypoints:
-            self.fall_frames_count = 0
-            self.confidence_score = 0.0
-            return False
+    def calculate_trunk_center(self, keypoints: Dict[str, Tuple[int, int]]) -> Optional[Tuple[float, float]]:
+        """Calculate mean position of the visible trunk points"""
+        points = [keypoints[p] for p in TRUNK_POINTS if p in keypoints]
+        if not points:
+            return None
+        return (sum(p[0] for p in points) / len(points),
+                sum(p[1] for p in points) / len(points))
+    
+    def calculate_torso_length(self, keypoints: Dict[str, Tuple[int, int]]) -> Optional[float]:
+        """Calculate shoulder center to hip center distance"""
+        if not all(p in keypoints for p in TRUNK_POINTS):
+            return None
+        dx = (keypoints['left_shoulder'][0] + keypoints['right_shoulder'][0]
+              - keypoints['left_hip'][0] - keypoints['right_hip'][0]) / 2
+        dy = (keypoints['left_shoulder'][1] + keypoints['right_shoulder'][1]
+              - keypoints['left_hip'][1] - keypoints['right_hip'][1]) / 2
+        length = math.hypot(dx, dy)
+        return length if length > 0 else None
+    
+    def criterion_weights(self, keypoints) -> Tuple[float, float, float, float]:
+        """Weights (0-1) of the trunk, body extent, head-ankle and head-hip criteria.
+        
+        Each weight is the confidence of the criterion's least confident
+        joint (mean over all joints for the extent) relative to
+        ``full_weight_confidence``. Keypoints without confidences, e.g.
+        plain dicts, always weigh 1.0.
+        """
+        confidence = getattr(keypoints, 'confidence', None)
+        if confidence is None or not self.full_weight_confidence:
+            return FULL_WEIGHTS
+        full = self.full_weight_confidence
+        values = confidence.tolist()
+        present = [c for c, ok in zip(values, keypoints.present.tolist()) if ok]
+        extent = sum(present) / len(present) if present else 0.0
+        return (min(1.0, min(values[i] for i in TRUNK_INDEX) / full),
+                min(1.0, extent / full),
+                min(1.0, min(values[i] for i in HEAD_ANKLE_INDEX) / full),
+                min(1.0, min(values[i] for i in HEAD_HIP_INDEX) / full))
+    
+    def calculate_reference_length(self, keypoints: Dict[str, Tuple[int, int]]) -> Optional[float]:
+        """Length that distance thresholds are expressed in (1.0 for pixels).
         
+        Falls back to the last known length when the current frame lacks
+        the required points.
+        """
+        if self.scale_reference is None:
+            return 1.0
+        if self.scale_reference == 'torso':
+            length = self.calculate_torso_length(keypoints)
+        else:
+            x_coords = [p[0] for p in keypoints.values()]
+            y_coords = [p[1] for p in keypoints.values()]
+            length = max(max(x_coords) - min(x_coords), max(y_coords) - min(y_coords))
+        if length:
+            self.reference_length = length
+        return self.reference_length
+    
+    def update_motion(self, keypoints: Dict[str, Tuple[int, int]], timestamp: float):
+        """Update trunk vertical velocity/acceleration from one timestamped frame.
+        
+        O(1) exponential smoothing with a time-based gain, so skipped frames
+        and variable frame rates only change ``dt``. Units are torso lengths
+        per second, which keeps thresholds independent of image scale.
+        """
+        center = self.calculate_trunk_center(keypoints)
+        if center is None:
+            return
+        torso = self.calculate_torso_length(keypoints)
+        
+        dt = None if self.last_timestamp is None else timestamp - self.last_timestamp
+        if dt == 0:
+            return
+        # A gap or a clock going backwards (seek, restart) starts over
+        if dt is None or dt < 0 or dt > MAX_MOTION_GAP or self.torso_length is None:
+            self.vertical_velocity = 0.0
+            self.vertical_acceleration = 0.0
+            if torso is not None:
+                self.torso_length = torso
+        else:
+            gain = 1.0 - math.exp(-dt / self.motion_time_constant)
+            raw_velocity = (center[1] - self.trunk_y) / dt / self.torso_length
+            velocity = self.vertical_velocity + gain * (raw_velocity - self.vertical_velocity)
+            raw_acceleration = (velocity - self.vertical_velocity) / dt
+            self.vertical_acceleration += gain * (raw_acceleration - self.vertical_acceleration)
+            self.vertical_velocity = velocity
+            if torso is not None:
+                # Slow scale update: foreshortening during a fall must not shrink it
+                self.torso_length += (1.0 - math.exp(-dt)) * (torso - self.torso_length)
+            
+            if self.vertical_velocity >= self.velocity_threshold:
+                self.last_descent_time = timestamp
+            elif (self.vertical_acceleration <= -self.acceleration_threshold
+                  and self._recent(self.last_descent_time, timestamp)):
+                self.last_impact_time = timestamp
+        
+        self.trunk_y = center[1]
+        self.last_timestamp = timestamp
+    
+    def _recent(self, event_time: Optional[float], timestamp: Optional[float]) -> bool:
+        return (event_time is not None and timestamp is not None
+                and timestamp - event_time <= self.motion_window)
+    
+    def point_score(self, keypoints: Dict[str, Tuple[int, int]], body_angle: Optional[float],
+                    rapid_descent: bool, timestamp: Optional[float]) -> float:
+        """Rule-based fall confidence (0-100) of one frame"""
         fall_score = 0.0
         max_score = 100.0
+        trunk_weight, extent_weight, head_ankle_weight, head_hip_weight = \
+            self.criterion_weights(keypoints)
+        
+        if rapid_descent:
+            fall_score += 15 * trunk_weight
+            if self._recent(self.last_impact_time, timestamp):
+                fall_score += 10 * trunk_weight
         
-        body_angle = self.calculate_body_angle(keypoints)
         if body_angle is not None:
-            self.angle_history.append(body_angle)
-            
-            if self.initial_check_frames < 15:
-                self.initial_check_frames += 1
-                if body_angle > self.max_initial_angle:
-                    self.max_initial_angle = body_angle
-            
             if body_angle < 30:
-                fall_score += 40
+                fall_score += 40 * trunk_weight
             elif body_angle < 45:
-                fall_score += 35
+                fall_score += 35 * trunk_weight
             elif body_angle < self.angle_threshold:
-                fall_score += 25
+                fall_score += 25 * trunk_weight
         
         if len(self.angle_history) >= 3:
             angles = list(self.angle_history)
             if angles[-1] < angles[-2] < angles[-3]:
-                fall_score += 15
+                fall_score += 15 * trunk_weight
             elif angles[-1] < angles[0]:
-                fall_score += 10
+                fall_score += 10 * trunk_weight
         
         aspect_ratio = self.calculate_aspect_ratio(keypoints)
         if aspect_ratio is not None:
             self.aspect_ratio_history.append(aspect_ratio)
             
             if aspect_ratio > 2.0:
-                fall_score += 25
+                fall_score += 25 * extent_weight
             elif aspect_ratio > 1.5:
-                fall_score += 20
+                fall_score += 20 * extent_weight
             elif aspect_ratio > 1.2:
-                fall_score += 10
+                fall_score += 10 * extent_weight
         
-        head_low = False
-        head_very_low = False
+        reference_length = self.calculate_reference_length(keypoints)
         if 'nose' in keypoints:
             nose_y = keypoints['nose'][1]
             
-            if 'left_ankle' in keypoints and 'right_ankle' in keypoints:
+            if ('left_ankle' in keypoints and 'right_ankle' in keypoints
+                    and reference_length is not None):
                 avg_ankle_y = (keypoints['left_ankle'][1] + keypoints['right_ankle'][1]) / 2
-                head_ankle_dist = abs(nose_y - avg_ankle_y)
+                head_ankle_dist = abs(nose_y - avg_ankle_y) / reference_length
+                very_low_threshold, low_threshold = self.head_ankle_thresholds
                 
-                if head_ankle_dist < 150:
-                    fall_score += 20
-                    head_very_low = True
-                elif head_ankle_dist < 250:
-                    fall_score += 15
-                    head_low = True
+                if head_ankle_dist < very_low_threshold:
+                    fall_score += 20 * head_ankle_weight
+                elif head_ankle_dist < low_threshold:
+                    fall_score += 15 * head_ankle_weight
             
             if 'left_hip' in keypoints and 'right_hip' in keypoints:
                 avg_hip_y = (keypoints['left_hip'][1] + keypoints['right_hip'][1]) / 2
                 if nose_y > avg_hip_y:
-                    fall_score += 20
-                    head_very_low = True
+                    fall_score += 20 * head_hip_weight
         
-        self.confidence_score = min(fall_score / max_score * 100, 100)
+        return min(fall_score / max_score * 100, 100)
+    
+    def detect_fall(self, keypoints: Dict[str, Tuple[int, int]],
+                    timestamp: Optional[float] = None,
+                    confidence: Optional[float] = None) -> bool:
+        """Detect fall using multi-criteria analysis
+        
+        ``timestamp`` (seconds, e.g. video position or time.monotonic()) enables
+        the trunk velocity/acceleration criteria; without it only posture is used.
+        ``confidence`` (0-100) is this frame's score when the caller already
+        computed it, e.g. batched over many tracks with
+        :func:`src.core.learned_scorer.score_tracks`; the scorer and the
+        point system are skipped then.
+        """
+        if not keypoints:
+            self.fall_frames_count = 0
+            self.confidence_score = 0.0
+            return False
+        
+        rapid_descent = False
+        if timestamp is not None:
+            self.update_motion(keypoints, timestamp)
+            rapid_descent = self._recent(self.last_descent_time, timestamp)
+        
+        body_angle = self.calculate_body_angle(keypoints)
+        if body_angle is not None:
+            self.angle_history.append(body_angle)
+            
+            if self.initial_check_frames < 15:
+                self.initial_check_frames += 1
+                if body_angle > self.max_initial_angle:
+                    self.max_initial_angle = body_angle
+        
+        if confidence is not None:
+            self.confidence_score = confidence
+        elif self.scorer is not None:
+            self.confidence_score = self.scorer.update(keypoints)
+        else:
+            self.confidence_score = self.point_score(keypoints, body_angle, rapid_descent, timestamp)
         
         fall_detected = self.confidence_score >= 60
         
@@ -157,11 +389,11 @@ class FallDetector:
         else:
             self.fall_frames_count = max(0, self.fall_frames_count - 1)
         
-        confirmed_fall = self.fall_frames_count >= 3
+        confirm_frames = self.fast_confirm_frames if rapid_descent else self.min_fall_frames
+        confirmed_fall = self.fall_frames_count >= confirm_frames
         
         if confirmed_fall and not self.is_fallen:
             self.is_fallen = True
-            import time
             self.fall_start_time = time.time()
         elif not fall_detected and self.fall_frames_count == 0:
             self.is_fallen = False
@@ -177,19 +409,63 @@ class FallDetector:
         }
         
         if self.is_fallen and self.fall_start_time:
-            import time
             info['duration'] = time.time() - self.fall_start_time
         
         return info
     
+    def get_motion_info(self) -> Dict:
+        """Get trunk motion estimate (torso lengths per second)"""
+        return {
+            'vertical_velocity': self.vertical_velocity,
+            'vertical_acceleration': self.vertical_acceleration,
+            'rapid_descent': self._recent(self.last_descent_time, self.last_timestamp),
+            'impact': self._recent(self.last_impact_time, self.last_timestamp),
+        }
+    
     def get_confidence_score(self) -> float:
         """Get confidence score (0-100)"""
         return self.confidence_score
     
     def reset(self):
         """Reset state"""
-        self.position_history.clear()
+        self.angle_history.clear()
+        self.aspect_ratio_history.clear()
         self.is_fallen = False
         self.fall_start_time = None
         self.fall_frames_count = 0
+        self.confidence_score = 0.0
+        self.initial_check_frames = 0
+        self.max_initial_angle = 0
+        self.reference_length = None
+        if self.scorer is not None:
+            self.scorer.reset()
+        self._reset_motion()
+
+    def get_state(self, motion: bool = True) -> Dict:
+        """JSON-serializable runtime state (not the configuration)
+
+        ``motion`` includes the trunk motion estimate; its timestamps only
+        make sense on the same clock, so leave it out when the state moves
+        to a process whose frame timestamps come from another clock.
+        """
+        state = {field: _plain(getattr(self, field)) for field in STATE_FIELDS}
+        state['angle_history'] = [float(v) for v in self.angle_history]
+        state['aspect_ratio_history'] = [float(v) for v in self.aspect_ratio_history]
+        if motion:
+            state['motion'] = {field: _plain(getattr(self, field)) for field in MOTION_FIELDS}
+        if self.scorer is not None and hasattr(self.scorer, 'get_state'):
+            state['scorer'] = self.scorer.get_state()
+        return state
 
+    def set_state(self, state: Dict):
+        """Restore state from :meth:`get_state` (missing motion starts fresh)"""
+        for field in STATE_FIELDS:
+            setattr(self, field, state[field])
+        self.angle_history = deque(state['angle_history'], maxlen=self.angle_history.maxlen)
+        self.aspect_ratio_history = deque(state['aspect_ratio_history'],
+                                          maxlen=self.aspect_ratio_history.maxlen)
+        self._reset_motion()
+        for field, value in state.get('motion', {}).items():
+            setattr(self, field, value)
+        if 'scorer' in state and self.scorer is not None and hasattr(self.scorer, 'set_state'):
+            self.scorer.set_state(state['scorer'])
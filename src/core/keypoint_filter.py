@@ -0,0 +1,162 @@
+"""
+Keypoint Temporal Filter
+========================
+
+One-Euro filter applied to all keypoints of a track at once (NumPy arrays of
+shape ``(K, 2)``). Slow movement is smoothed strongly to remove detector
+jitter while fast movement (a fall) passes with little lag. The filtered
+velocity also lets the filter predict keypoints for frames without
+inference (``skip_frames``).
+
+Reference: Casiez et al., "1 Euro Filter", CHI 2012.
+"""
+
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .pose_types import KEYPOINT_NAMES, Pose
+
+
+def smoothing_factor(dt: float, cutoff):
+    """Exponential smoothing factor for a cutoff frequency (Hz)"""
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class KeypointFilter:
+    """Vectorized One-Euro filter for one tracked person"""
+
+    def __init__(self,
+                 min_cutoff: float = 1.5,
+                 beta: float = 8.0,
+                 d_cutoff: float = 1.0,
+                 keypoint_names: Sequence[str] = KEYPOINT_NAMES,
+                 default_rate: float = 30.0,
+                 reset_gap: float = 0.5,
+                 max_prediction: float = 0.5,
+                 prediction_cutoff: float = 5.0):
+        """Initialize filter.
+
+        ``beta`` scales the cutoff with keypoint speed measured in person
+        extents per second, so the behaviour does not depend on resolution.
+        Predictions use a separate, faster velocity estimate
+        (``prediction_cutoff`` Hz) that keeps up with sudden motion.
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.keypoint_names = list(keypoint_names)
+        self._index = {name: i for i, name in enumerate(self.keypoint_names)}
+        self._coco = tuple(self.keypoint_names) == KEYPOINT_NAMES
+        self.default_rate = default_rate
+        self.reset_gap = reset_gap
+        self.max_prediction = max_prediction
+        self.prediction_cutoff = prediction_cutoff
+        self.reset()
+
+    def reset(self):
+        """Forget all keypoint state"""
+        k = len(self.keypoint_names)
+        self.position = np.full((k, 2), np.nan)
+        self.velocity = np.zeros((k, 2))
+        self.trend = np.zeros((k, 2))
+        self.last_seen = np.full(k, -np.inf)
+        self.last_timestamp = None
+        self.confidence = None
+
+    def _clock(self, timestamp: Optional[float]) -> float:
+        if timestamp is not None:
+            return timestamp
+        if self.last_timestamp is None:
+            return 0.0
+        return self.last_timestamp + 1.0 / self.default_rate
+
+    def filter_array(self, points: np.ndarray, timestamp: Optional[float] = None) -> np.ndarray:
+        """Filter a ``(K, 2)`` observation (NaN = missing); returns filtered points"""
+        timestamp = self._clock(timestamp)
+        observed = ~np.isnan(points).any(axis=1)
+        fresh = observed & ((timestamp - self.last_seen) > self.reset_gap)
+        tracked = observed & ~fresh
+
+        # Points seen for the first time (or after a gap) start unfiltered
+        self.position[fresh] = points[fresh]
+        self.velocity[fresh] = 0.0
+        self.trend[fresh] = 0.0
+
+        if tracked.any():
+            dt = timestamp - self.last_seen[tracked]
+            dt = np.where(dt > 0, dt, 1.0 / self.default_rate)[:, None]
+            previous = self.position[tracked]
+            raw_velocity = (points[tracked] - previous) / dt
+            alpha_d = smoothing_factor(dt, self.d_cutoff)
+            velocity = self.velocity[tracked] + alpha_d * (raw_velocity - self.velocity[tracked])
+
+            extent = self._extent(points, observed)
+            speed = np.hypot(velocity[:, 0], velocity[:, 1])[:, None] / extent
+            alpha = smoothing_factor(dt, self.min_cutoff + self.beta * speed)
+            self.position[tracked] = previous + alpha * (points[tracked] - previous)
+            self.velocity[tracked] = velocity
+            alpha_p = smoothing_factor(dt, self.prediction_cutoff)
+            self.trend[tracked] += alpha_p * (raw_velocity - self.trend[tracked])
+
+        self.last_seen[observed] = timestamp
+        self.last_timestamp = timestamp
+        out = np.full_like(self.position, np.nan)
+        out[observed] = self.position[observed]
+        return out
+
+    @staticmethod
+    def _extent(points: np.ndarray, observed: np.ndarray) -> float:
+        """Longer side of the observed keypoint box (at least 1 px)"""
+        visible = points[observed]
+        size = visible.max(axis=0) - visible.min(axis=0)
+        return max(float(size.max()), 1.0)
+
+    def predict_array(self, timestamp: Optional[float] = None) -> np.ndarray:
+        """Extrapolate ``(K, 2)`` keypoints to ``timestamp`` with the velocity trend.
+
+        Points not seen within ``max_prediction`` seconds are NaN.
+        """
+        timestamp = self._clock(timestamp)
+        age = timestamp - self.last_seen
+        usable = (age >= 0) & (age <= self.max_prediction)
+        out = np.full_like(self.position, np.nan)
+        out[usable] = self.position[usable] + self.trend[usable] * age[usable, None]
+        return out
+
+    def to_array(self, keypoints: Dict[str, Tuple[int, int]]) -> np.ndarray:
+        if self._coco and isinstance(keypoints, Pose):
+            return keypoints.to_array()
+        points = np.full((len(self.keypoint_names), 2), np.nan)
+        for name, point in keypoints.items():
+            i = self._index.get(name)
+            if i is not None:
+                points[i] = point
+        return points
+
+    def to_keypoints(self, points: np.ndarray):
+        """Named keypoints of a ``(K, 2)`` array: a Pose (keeping the last
+        keypoint confidences) for the COCO layout, otherwise a dict"""
+        if self._coco:
+            return Pose.from_array(points, ~np.isnan(points[:, 0]), self.confidence)
+        return self.to_dict(points)
+
+    def to_dict(self, points: np.ndarray) -> Dict[str, Tuple[int, int]]:
+        rounded = np.rint(points)
+        return {name: (int(rounded[i, 0]), int(rounded[i, 1]))
+                for i, name in enumerate(self.keypoint_names)
+                if not np.isnan(points[i, 0])}
+
+    def update(self, keypoints: Dict[str, Tuple[int, int]],
+               timestamp: Optional[float] = None) -> Dict[str, Tuple[int, int]]:
+        """Filter one frame of named keypoints"""
+        if not keypoints:
+            return {}
+        self.confidence = getattr(keypoints, 'confidence', None)
+        return self.to_keypoints(self.filter_array(self.to_array(keypoints), timestamp))
+
+    def predict(self, timestamp: Optional[float] = None) -> Dict[str, Tuple[int, int]]:
+        """Predicted named keypoints for a frame without inference"""
+        return self.to_keypoints(self.predict_array(timestamp))
@@ -0,0 +1,204 @@
+"""
+Learned Window Scorer
+=====================
+
+NumPy-only logistic regression over a sliding window of scale-normalized
+keypoint features, usable as an alternative to the hand-tuned point system
+of :class:`FallDetector`. Scoring is fully vectorized over tracks, so one
+call can score thousands of windows in about a millisecond.
+
+Models are trained with ``python -m src.models.train_scorer`` and stored as
+``.npz`` arrays.
+"""
+
+from collections import deque
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .pose_types import KEYPOINT_INDEX, Pose
+
+# Keypoints used by the features, in window array order
+FEATURE_POINTS = ['nose', 'left_shoulder', 'right_shoulder',
+                  'left_hip', 'right_hip', 'left_ankle', 'right_ankle']
+FEATURE_INDEX = [KEYPOINT_INDEX[name] for name in FEATURE_POINTS]
+FEATURES_PER_FRAME = 5
+MODEL_VERSION = 1
+
+
+def keypoints_to_points(keypoints: Dict[str, Tuple[int, int]]) -> np.ndarray:
+    """(P, 2) array of FEATURE_POINTS from a keypoint dict (NaN = missing)"""
+    if isinstance(keypoints, Pose):
+        return keypoints.to_array()[FEATURE_INDEX]
+    points = np.full((len(FEATURE_POINTS), 2), np.nan)
+    for i, name in enumerate(FEATURE_POINTS):
+        point = keypoints.get(name)
+        if point is not None:
+            points[i] = point
+    return points
+
+
+def window_features(windows: np.ndarray) -> np.ndarray:
+    """Features of keypoint windows ``(N, W, P, 2)`` -> ``(N, 5 * W)``"""
+    # (P, 2, N, W) float32: every keypoint coordinate becomes one contiguous plane
+    planes = np.ascontiguousarray(np.moveaxis(np.asarray(windows), (2, 3), (0, 1)), dtype=np.float32)
+    return planar_features(planes)
+
+
+def planar_features(planes: np.ndarray) -> np.ndarray:
+    """Features of windows stored as coordinate planes ``(P, 2, N, W)``.
+
+    Per frame: trunk verticality, head-below-hips and head-to-ankle
+    distances in torso lengths, keypoint box width share, and the vertical
+    offset of the trunk center from the newest frame. Missing values are 0.
+    """
+    n, w = planes.shape[2:]
+    features = np.empty((n, FEATURES_PER_FRAME, w), dtype=planes.dtype)
+    nose_y = planes[0, 1]
+    shoulder = (planes[1] + planes[2]) / 2
+    hip = (planes[3] + planes[4]) / 2
+    ankle_y = (planes[5, 1] + planes[6, 1]) / 2
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        torso_x = shoulder[0] - hip[0]
+        torso_y = shoulder[1] - hip[1]
+        torso_length = np.sqrt(torso_x * torso_x + torso_y * torso_y)
+        # Window scale: mean torso length (robust to foreshortening in single frames)
+        known = np.fmax(torso_length, 0)
+        scale = known.sum(axis=1, keepdims=True) / np.maximum(np.count_nonzero(known, axis=1), 1)[:, None]
+        scale[scale == 0] = np.nan
+
+        np.divide(np.abs(torso_y), torso_length, out=features[:, 0])
+        np.divide(nose_y - hip[1], scale, out=features[:, 1])
+        np.divide(np.abs(nose_y - ankle_y), scale, out=features[:, 2])
+
+        # fmax/fmin skip missing (NaN) keypoints
+        width = np.fmax.reduce(planes[:, 0], axis=0) - np.fmin.reduce(planes[:, 0], axis=0)
+        height = np.fmax.reduce(planes[:, 1], axis=0) - np.fmin.reduce(planes[:, 1], axis=0)
+        np.divide(width, width + height, out=features[:, 3])
+
+        center_y = shoulder[1] + hip[1]
+        np.divide((center_y - center_y[:, -1:]) / 2, scale, out=features[:, 4])
+
+    features = features.reshape(n, -1)
+    np.nan_to_num(features, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return features
+
+
+class LogisticWindowModel:
+    """Standardized logistic regression on window features"""
+
+    def __init__(self, weights: np.ndarray, bias: float,
+                 mean: np.ndarray, std: np.ndarray, window: int):
+        """Initialize model from arrays"""
+        self.window = int(window)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        # Fold standardization into the weights: w.(x - m)/s + b
+        self.weights = np.asarray(weights, dtype=np.float64) / self.std
+        self.bias = float(bias) - float(self.weights @ self.mean)
+        self._raw_weights = np.asarray(weights, dtype=np.float64)
+        self._raw_bias = float(bias)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Fall probability for each feature row"""
+        logits = features @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-np.clip(logits, -50, 50)))
+
+    def score_windows(self, windows: np.ndarray) -> np.ndarray:
+        """Fall probability for each keypoint window ``(N, W, P, 2)``"""
+        return self.predict_proba(window_features(windows))
+
+    @classmethod
+    def fit(cls, features: np.ndarray, labels: np.ndarray, window: int,
+            l2: float = 1e-3, epochs: int = 500, learning_rate: float = 0.5) -> 'LogisticWindowModel':
+        """Train with full-batch gradient descent and balanced class weights"""
+        features = np.asarray(features, dtype=np.float64)
+        labels = np.asarray(labels, dtype=np.float64)
+        mean = features.mean(axis=0)
+        std = features.std(axis=0)
+        std[std < 1e-8] = 1.0
+        x = (features - mean) / std
+
+        positives = max(labels.sum(), 1.0)
+        negatives = max(len(labels) - labels.sum(), 1.0)
+        sample_weight = np.where(labels > 0, len(labels) / (2 * positives),
+                                 len(labels) / (2 * negatives))
+        sample_weight /= sample_weight.sum()
+
+        weights = np.zeros(x.shape[1])
+        bias = 0.0
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-np.clip(x @ weights + bias, -50, 50)))
+            error = (p - labels) * sample_weight
+            weights -= learning_rate * (x.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum()
+        return cls(weights, bias, mean, std, window)
+
+    def save(self, path: str):
+        """Store model arrays as .npz"""
+        np.savez(path, weights=self._raw_weights, bias=self._raw_bias,
+                 mean=self.mean, std=self.std, window=self.window,
+                 version=MODEL_VERSION)
+
+    @classmethod
+    def load(cls, path: str) -> 'LogisticWindowModel':
+        """Load a model stored with :meth:`save`"""
+        with np.load(path) as data:
+            if int(data['version']) != MODEL_VERSION:
+                raise ValueError(f"Unsupported scorer model version: {int(data['version'])}")
+            return cls(data['weights'], float(data['bias']), data['mean'],
+                       data['std'], int(data['window']))
+
+
+class WindowScorer:
+    """Per-track sliding window feeding a shared LogisticWindowModel.
+
+    Plugs into ``FallDetector(scorer=...)``: :meth:`update` takes the
+    current keypoints and returns a 0-100 confidence. Until the window is
+    full the oldest frame is repeated. With many tracks, :func:`score_tracks`
+    scores all of their windows in one model call.
+    """
+
+    def __init__(self, model: LogisticWindowModel):
+        """Initialize scorer with an empty window"""
+        self.model = model
+        self.frames = deque(maxlen=model.window)
+
+    def append(self, keypoints: Dict[str, Tuple[int, int]]) -> np.ndarray:
+        """Add one frame and return the ``(W, P, 2)`` window to score"""
+        self.frames.append(keypoints_to_points(keypoints))
+        frames = list(self.frames)
+        if len(frames) < self.model.window:
+            frames = [frames[0]] * (self.model.window - len(frames)) + frames
+        return np.stack(frames)
+
+    def update(self, keypoints: Dict[str, Tuple[int, int]]) -> float:
+        """Add one frame and return the fall confidence (0-100)"""
+        probability = self.model.score_windows(self.append(keypoints)[None])[0]
+        return float(probability * 100)
+
+    def reset(self):
+        """Forget the window"""
+        self.frames.clear()
+
+    def get_state(self) -> Dict:
+        """JSON-serializable window contents"""
+        return {'frames': [frame.tolist() for frame in self.frames]}
+
+    def set_state(self, state: Dict):
+        self.frames = deque((np.asarray(frame, dtype=np.float64) for frame in state['frames']),
+                            maxlen=self.model.window)
+
+
+def score_tracks(scorers: Sequence[WindowScorer], keypoints: Sequence) -> List[float]:
+    """Add one frame to each track's window and score all windows at once.
+
+    Equivalent to ``[s.update(k) for s, k in zip(scorers, keypoints)]``
+    with one batched model call instead of one per track; the scorers must
+    share a model.
+    """
+    if not scorers:
+        return []
+    windows = np.stack([scorer.append(k) for scorer, k in zip(scorers, keypoints)])
+    return (scorers[0].model.score_windows(windows) * 100).tolist()
@@ -0,0 +1,449 @@
+"""
+Stream Processing Pipeline
+==========================
+
+Per-stream frame pipeline: resize, pose inference, fall detection and
+overlay drawing. Works with any backend exposing either the
+MultiPersonDetector (``detect_people``) or the PoseEstimator
+(``process_frame``/``get_all_keypoints``/``draw_skeleton``) interface.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .fall_detector import FallDetector
+from .keypoint_filter import KeypointFilter
+from .learned_scorer import WindowScorer, score_tracks
+
+
+FALL_COLOR = (0, 0, 255)
+NORMAL_COLOR = (0, 255, 0)
+
+SKELETON_POINTS = ['nose', 'left_shoulder', 'right_shoulder',
+                   'left_hip', 'right_hip', 'left_ankle', 'right_ankle']
+
+SKELETON_CONNECTIONS = [
+    ('left_shoulder', 'right_shoulder'),
+    ('left_shoulder', 'left_hip'),
+    ('right_shoulder', 'right_hip'),
+    ('left_hip', 'right_hip'),
+    ('left_hip', 'left_ankle'),
+    ('right_hip', 'right_ankle')
+]
+
+
+def shift_bbox(bbox, old_keypoints, new_keypoints):
+    """Move a bounding box by the mean displacement of shared keypoints"""
+    if not bbox:
+        return bbox
+    shared = [name for name in new_keypoints if name in old_keypoints]
+    if not shared:
+        return bbox
+    dx = round(sum(new_keypoints[n][0] - old_keypoints[n][0] for n in shared) / len(shared))
+    dy = round(sum(new_keypoints[n][1] - old_keypoints[n][1] for n in shared) / len(shared))
+    x1, y1, x2, y2 = bbox
+    return (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+
+
+def box_iou(boxes: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """IoU matrix of ``(N, 4)`` and ``(M, 4)`` (x1, y1, x2, y2) boxes"""
+    x1 = np.maximum(boxes[:, None, 0], others[None, :, 0])
+    y1 = np.maximum(boxes[:, None, 1], others[None, :, 1])
+    x2 = np.minimum(boxes[:, None, 2], others[None, :, 2])
+    y2 = np.minimum(boxes[:, None, 3], others[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    other_area = (others[:, 2] - others[:, 0]) * (others[:, 3] - others[:, 1])
+    union = area[:, None] + other_area[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+class StreamClock:
+    """Frame timestamps (seconds) of one stream, on a clock chosen at open
+
+    Files use the video position, including the 0 of their first frame;
+    live sources (cameras, network streams) report no frame count and use
+    the monotonic clock. One stream never mixes the two, so timestamp
+    differences stay meaningful for motion features and pacing.
+    """
+
+    def __init__(self, capture, live: Optional[bool] = None):
+        """``live`` overrides the detection from the capture's frame count"""
+        get = getattr(capture, 'get', None)
+        if live is None:
+            live = get is None or not get(cv2.CAP_PROP_FRAME_COUNT) > 0
+        self.live = live
+        self._get = get
+
+    def __call__(self) -> float:
+        """Timestamp of the frame just read"""
+        if self.live:
+            return time.monotonic()
+        return max(self._get(cv2.CAP_PROP_POS_MSEC), 0.0) / 1000.0
+
+
+class StreamPipeline:
+    """Frame pipeline for one video stream"""
+
+    def __init__(self, detector,
+                 stream_id: str = '0',
+                 angle_threshold: float = 60.0,
+                 resize_width: Optional[int] = 640,
+                 skip_frames: int = 1,
+                 show_skeleton: bool = True,
+                 show_bbox: bool = True,
+                 metrics=None,
+                 scale_reference: Optional[str] = 'torso',
+                 scorer_model=None,
+                 smooth_keypoints: bool = False,
+                 interpolate_skipped: bool = False,
+                 detector_options: Optional[Dict] = None,
+                 filter_options: Optional[Dict] = None,
+                 match_iou: float = 0.3,
+                 max_track_age: int = 90):
+        """Initialize pipeline
+
+        ``scorer_model`` (a LogisticWindowModel) replaces the rule-based
+        point system with the learned window scorer for every person; the
+        windows of all people in a frame are scored in one batched call.
+        ``smooth_keypoints`` runs a One-Euro filter per person ahead of
+        fall detection. ``interpolate_skipped`` extrapolates the keypoints
+        of frames skipped by ``skip_frames`` from the filtered motion, so
+        the overlay still runs at the full frame rate; predicted frames
+        carry the verdict of the last inferred frame and never count toward
+        fall confirmation. ``detector_options`` are further FallDetector
+        and ``filter_options`` further KeypointFilter keyword arguments
+        (see :meth:`from_config`).
+
+        People of a multi-person backend are tracked by bounding box (see
+        :meth:`match_tracks`); ``match_iou`` is the least IoU for a match and
+        ``max_track_age`` the number of frames an unseen track is kept.
+        """
+        self.detector = detector
+        self.multi_person = hasattr(detector, 'detect_people')
+        self.stream_id = str(stream_id)
+        self.angle_threshold = angle_threshold
+        self.resize_width = resize_width
+        self.skip_frames = max(1, int(skip_frames))
+        self.show_skeleton = show_skeleton
+        self.show_bbox = show_bbox
+        self.metrics = metrics
+        # Torso-normalized thresholds keep verdicts stable across resize_width
+        self.scale_reference = scale_reference
+        self.scorer_model = scorer_model
+        self.smooth_keypoints = smooth_keypoints
+        self.interpolate_skipped = interpolate_skipped
+        self.detector_options = dict(detector_options or {})
+        self.filter_options = dict(filter_options or {})
+        self.match_iou = match_iou
+        self.max_track_age = max_track_age
+
+        self.fall_detectors: Dict[int, FallDetector] = {}
+        self.keypoint_filters: Dict[int, KeypointFilter] = {}
+        # People of the last inferred frame: person_id -> person result
+        self.last_people: Dict[int, Dict] = {}
+        # Tracked people: person_id -> (bbox, frame_index last seen)
+        self.tracks: Dict[int, tuple] = {}
+        self.next_track_id = 0
+        self.frame_index = 0
+
+    @classmethod
+    def from_config(cls, detector, config: dict, **overrides) -> 'StreamPipeline':
+        """Create pipeline with the fall detector settings of a YAML config's
+        'detection' section and the keypoint filter settings of its
+        'smoothing' section; ``overrides`` are StreamPipeline arguments"""
+        options = FallDetector.config_options(config)
+        kwargs = {key: options.pop(key) for key in ('angle_threshold', 'scale_reference')
+                  if key in options}
+        kwargs['detector_options'] = options
+
+        smoothing = config.get('smoothing', {})
+        if 'enabled' in smoothing:
+            kwargs['smooth_keypoints'] = smoothing['enabled']
+        if 'interpolate_skipped' in smoothing:
+            kwargs['interpolate_skipped'] = smoothing['interpolate_skipped']
+        kwargs['filter_options'] = {key: smoothing[key] for key in ('min_cutoff', 'beta', 'd_cutoff')
+                                    if key in smoothing}
+        kwargs.update(overrides)
+        return cls(detector, **kwargs)
+
+    def _observe(self, stage: str, seconds: float):
+        if self.metrics is not None:
+            self.metrics.observe('stage_seconds', seconds, stream=self.stream_id, stage=stage)
+
+    def get_fall_detector(self, person_id: int) -> FallDetector:
+        """Fall detector of one tracked person (created on first use)"""
+        detector = self.fall_detectors.get(person_id)
+        if detector is None:
+            detector = self.fall_detectors[person_id] = FallDetector(
+                angle_threshold=self.angle_threshold,
+                scale_reference=self.scale_reference,
+                scorer=WindowScorer(self.scorer_model) if self.scorer_model is not None else None,
+                **self.detector_options
+            )
+        return detector
+
+    def get_keypoint_filter(self, person_id: int) -> KeypointFilter:
+        """Keypoint filter of one tracked person (created on first use)"""
+        keypoint_filter = self.keypoint_filters.get(person_id)
+        if keypoint_filter is None:
+            keypoint_filter = self.keypoint_filters[person_id] = KeypointFilter(**self.filter_options)
+        return keypoint_filter
+
+    def resize(self, frame: np.ndarray) -> np.ndarray:
+        """Scale frame to ``resize_width`` keeping the aspect ratio"""
+        if not self.resize_width:
+            return frame
+        start = time.perf_counter()
+        h, w = frame.shape[:2]
+        new_height = int(h * (self.resize_width / w))
+        frame = cv2.resize(frame, (self.resize_width, new_height))
+        self._observe('resize', time.perf_counter() - start)
+        return frame
+
+    def process(self, frame: np.ndarray, timestamp: Optional[float] = None) -> Dict:
+        """Run one (already resized) frame through the pipeline.
+
+        Frames skipped by ``skip_frames`` have ``processed`` set to False.
+        They are returned untouched, or with predicted keypoints and
+        ``predicted`` set to True when ``interpolate_skipped`` is on.
+        ``timestamp`` (seconds) enables the trunk velocity criteria of the
+        fall detectors.
+        """
+        self.frame_index += 1
+        result = {
+            'frame_index': self.frame_index,
+            'frame': frame,
+            'processed': False,
+            'predicted': False,
+            'people': [],
+            'fall_detected': False,
+            'max_confidence': 0.0,
+        }
+        if self.frame_index % self.skip_frames != 0:
+            if self.metrics is not None:
+                self.metrics.inc('frames_skipped_total', stream=self.stream_id, reason='skip_frames')
+            if self.interpolate_skipped and self.last_people:
+                self._predict(result, timestamp)
+            return result
+
+        start = time.perf_counter()
+        detections = self._infer(frame)
+        self._observe('inference', time.perf_counter() - start)
+
+        start = time.perf_counter()
+        track = self.smooth_keypoints or (self.interpolate_skipped and self.skip_frames > 1)
+        if track:
+            tracked = []
+            for person_id, keypoints, bbox in detections:
+                filtered = self.get_keypoint_filter(person_id).update(keypoints, timestamp)
+                if self.smooth_keypoints:
+                    keypoints = filtered
+                tracked.append((person_id, keypoints, bbox))
+            detections = tracked
+        people = self._detect_all(detections, timestamp)
+        if track:
+            self.last_people = {person['person_id']: person for person in people}
+        self._observe('detect_fall', time.perf_counter() - start)
+
+        result['processed'] = True
+        self._finish(result, people)
+        return result
+
+    def _detect_all(self, detections: List, timestamp: Optional[float]) -> List[Dict]:
+        """Run the fall detectors of (person_id, keypoints, bbox) detections"""
+        confidences = [None] * len(detections)
+        if self.scorer_model is not None:
+            # One model call for every person's window instead of one each
+            scored = [i for i, (_, keypoints, _) in enumerate(detections) if keypoints]
+            scores = score_tracks([self.get_fall_detector(detections[i][0]).scorer for i in scored],
+                                  [detections[i][1] for i in scored])
+            for i, score in zip(scored, scores):
+                confidences[i] = score
+        return [self._detect(person_id, keypoints, bbox, timestamp, confidence)
+                for (person_id, keypoints, bbox), confidence in zip(detections, confidences)]
+
+    def _detect(self, person_id: int, keypoints, bbox, timestamp: Optional[float],
+                confidence: Optional[float] = None) -> Dict:
+        """Run the person's fall detector on one set of keypoints"""
+        fall_detector = self.get_fall_detector(person_id)
+        is_fallen = fall_detector.detect_fall(keypoints, timestamp, confidence)
+        return {
+            'person_id': person_id,
+            'keypoints': keypoints,
+            'bbox': bbox,
+            'is_fallen': is_fallen,
+            'confidence': fall_detector.get_confidence_score(),
+            'fall_start_time': fall_detector.fall_start_time if is_fallen else None,
+        }
+
+    def _predict(self, result: Dict, timestamp: Optional[float]):
+        """Fill a skipped frame's result with extrapolated keypoints
+
+        The fall detectors only see inferred keypoints: each person keeps
+        the verdict of the last inferred frame, so extrapolated motion can
+        neither confirm nor clear a fall.
+        """
+        start = time.perf_counter()
+        people = []
+        for person_id, person in self.last_people.items():
+            keypoints = self.keypoint_filters[person_id].predict(timestamp)
+            if keypoints:
+                people.append({**person, 'keypoints': keypoints,
+                               'bbox': shift_bbox(person['bbox'], person['keypoints'], keypoints)})
+        self._observe('predict', time.perf_counter() - start)
+
+        if people:
+            result['predicted'] = True
+            self._finish(result, people)
+
+    def _finish(self, result: Dict, people: List[Dict]):
+        """Summarize people into the result and draw the overlay"""
+        result['people'] = people
+        result['fall_detected'] = any(p['is_fallen'] for p in people)
+        result['max_confidence'] = max((p['confidence'] for p in people), default=0.0)
+
+        start = time.perf_counter()
+        result['frame'] = self.draw(result['frame'], people,
+                                    predicted=not result['processed'])
+        self._observe('draw', time.perf_counter() - start)
+
+    def _infer(self, frame: np.ndarray) -> List:
+        """Run the pose backend; returns (person_id, keypoints, bbox) tuples"""
+        if self.multi_person:
+            people = self.detector.detect_people(frame)
+            track_ids = self.match_tracks([p['bbox'] for p in people])
+            return [(track_id, p['keypoints'], p['bbox']) for track_id, p in zip(track_ids, people)]
+
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if not self.detector.process_frame(rgb_frame):
+            return []
+        h, w = frame.shape[:2]
+        return [(0, self.detector.get_all_keypoints(w, h), None)]
+
+    def match_tracks(self, boxes: List) -> List[int]:
+        """Person ids for the bounding boxes of one inferred frame
+
+        The detector's output order is not stable, so boxes are matched
+        greedily to the last box of each known track: first by IoU (at
+        least ``match_iou``), then by centre distance within the track box's
+        larger side, which keeps a person whose box changes shape while
+        falling. Unmatched boxes start new tracks; tracks unseen for more
+        than ``max_track_age`` frames are forgotten with their state.
+        """
+        track_ids = [None] * len(boxes)
+        known = [i for i, box in enumerate(boxes) if box]
+        if known and self.tracks:
+            candidates = list(self.tracks)
+            current = np.array([boxes[i] for i in known], dtype=float)
+            previous = np.array([self.tracks[t][0] for t in candidates], dtype=float)
+
+            iou = box_iou(current, previous)
+            self._claim(track_ids, known, candidates, -iou, iou >= self.match_iou)
+
+            centers = (current[:, :2] + current[:, 2:]) / 2
+            previous_centers = (previous[:, :2] + previous[:, 2:]) / 2
+            distance = np.linalg.norm(centers[:, None] - previous_centers[None], axis=2)
+            reach = (previous[:, 2:] - previous[:, :2]).max(axis=1)
+            self._claim(track_ids, known, candidates, distance, distance <= reach[None])
+
+        for i, box in enumerate(boxes):
+            if track_ids[i] is None:
+                track_ids[i] = self.next_track_id
+                self.next_track_id += 1
+            if box:
+                self.tracks[track_ids[i]] = (tuple(box), self.frame_index)
+
+        for track_id, (_, seen) in list(self.tracks.items()):
+            if self.frame_index - seen > self.max_track_age:
+                self.forget(track_id)
+        return track_ids
+
+    @staticmethod
+    def _claim(track_ids: List, known: List[int], candidates: List[int],
+               cost: np.ndarray, allowed: np.ndarray):
+        """Assign the cheapest allowed (box, track) pairs, each at most once"""
+        taken = set(t for t in track_ids if t is not None)
+        rows, cols = np.nonzero(allowed)
+        for k in np.argsort(cost[rows, cols], kind='stable'):
+            i, track_id = known[rows[k]], candidates[cols[k]]
+            if track_ids[i] is None and track_id not in taken:
+                track_ids[i] = track_id
+                taken.add(track_id)
+
+    def forget(self, person_id: int):
+        """Drop the track and all per-person state of one person"""
+        self.tracks.pop(person_id, None)
+        self.fall_detectors.pop(person_id, None)
+        self.keypoint_filters.pop(person_id, None)
+        self.last_people.pop(person_id, None)
+
+    def draw(self, frame: np.ndarray, people: List[Dict], predicted: bool = False) -> np.ndarray:
+        """Draw boxes, skeletons and the fall border onto the frame"""
+        for person in people:
+            color = FALL_COLOR if person['is_fallen'] else NORMAL_COLOR
+            if self.show_bbox and person['bbox']:
+                x1, y1, x2, y2 = person['bbox']
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+                confidence = person['confidence']
+                status = f"DUSME! {confidence:.0f}%" if person['is_fallen'] else f"Normal {confidence:.0f}%"
+                cv2.putText(frame, f"Kisi {person['person_id']+1}: {status}",
+                            (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX,
+                            0.5, color, 2)
+            if self.show_skeleton:
+                # The backend's own skeleton belongs to the last inferred frame
+                if self.multi_person or predicted:
+                    self.draw_keypoints(frame, person['keypoints'], color)
+                else:
+                    frame = self.detector.draw_skeleton(frame)
+
+        if any(p['is_fallen'] for p in people):
+            cv2.rectangle(frame, (0, 0), (frame.shape[1], frame.shape[0]),
+                          FALL_COLOR, 10)
+        return frame
+
+    @staticmethod
+    def draw_keypoints(frame: np.ndarray, keypoints, color):
+        """Draw the trunk/leg skeleton used for fall detection"""
+        for name in SKELETON_POINTS:
+            if name in keypoints:
+                x, y = keypoints[name]
+                cv2.circle(frame, (x, y), 4, color, -1)
+        for p1, p2 in SKELETON_CONNECTIONS:
+            if p1 in keypoints and p2 in keypoints:
+                cv2.line(frame, keypoints[p1], keypoints[p2], color, 2)
+
+    def reset(self):
+        """Forget all tracked people"""
+        self.fall_detectors.clear()
+        self.keypoint_filters.clear()
+        self.last_people.clear()
+        self.tracks.clear()
+        self.next_track_id = 0
+        self.frame_index = 0
+
+    def get_state(self, motion: bool = True) -> Dict:
+        """JSON-serializable per-person fall detector state, for handing a
+        stream over to another process (keypoint filters restart there)"""
+        return {
+            'stream_id': self.stream_id,
+            'frame_index': self.frame_index,
+            'fall_detectors': {str(person_id): detector.get_state(motion)
+                               for person_id, detector in self.fall_detectors.items()},
+            'tracks': {str(person_id): [int(v) for v in bbox]
+                       for person_id, (bbox, _) in self.tracks.items()},
+            'next_track_id': self.next_track_id,
+        }
+
+    def set_state(self, state: Dict):
+        """Continue from :meth:`get_state` of another pipeline"""
+        self.reset()
+        self.frame_index = state['frame_index']
+        for person_id, detector_state in state['fall_detectors'].items():
+            self.get_fall_detector(int(person_id)).set_state(detector_state)
+        for person_id, bbox in state.get('tracks', {}).items():
+            self.tracks[int(person_id)] = (tuple(bbox), self.frame_index)
+        self.next_track_id = state.get('next_track_id', len(self.fall_detectors))
@@ -0,0 +1,90 @@
+"""
+Keypoint Schemas
+================
+
+Index maps from backend keypoint layouts to the shared COCO-17 layout of
+:class:`Pose`. MediaPipe's 33 landmarks and YOLO's 17 COCO keypoints go
+through the same vectorized gather and get a presence mask from the
+backend's visibility/confidence, so ``FallDetector`` sees the same
+keypoint set whichever backend produced it.
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .pose_types import NUM_KEYPOINTS, Pose
+
+
+class KeypointSchema:
+    """Gather of a backend layout into COCO-17 slots"""
+
+    __slots__ = ('name', 'size', 'source_index')
+
+    def __init__(self, name: str, size: int, source_index: Sequence[int]):
+        """``source_index[k]`` is the backend index of COCO keypoint ``k``"""
+        if len(source_index) != NUM_KEYPOINTS:
+            raise ValueError(f"{name}: expected {NUM_KEYPOINTS} indices, got {len(source_index)}")
+        self.name = name
+        self.size = size
+        self.source_index = np.asarray(source_index, dtype=np.intp)
+
+    def gather(self, points: np.ndarray, visibility: Optional[np.ndarray] = None,
+               min_visibility: float = 0.5, scale: Optional[Sequence[float]] = None):
+        """COCO-17 ``(..., 17, 2)`` points and ``(..., 17)`` presence mask.
+
+        ``points`` is ``(..., size, 2)`` in backend order, optionally scaled
+        (normalized coordinates times frame size). Without ``visibility``
+        a keypoint is present when x and y are positive (YOLO marks
+        undetected keypoints with zeros). Returns ``(xy, present,
+        confidence)``; ``confidence`` is the gathered visibility or None.
+        """
+        xy = np.take(points, self.source_index, axis=-2)
+        if scale is not None:
+            xy = xy * np.asarray(scale, dtype=np.float64)
+        if visibility is None:
+            return xy, (xy > 0).all(axis=-1), None
+        confidence = np.take(visibility, self.source_index, axis=-1).astype(np.float32)
+        return xy, confidence >= min_visibility, confidence
+
+    def to_pose(self, points: np.ndarray, visibility: Optional[np.ndarray] = None,
+                min_visibility: float = 0.5, scale: Optional[Sequence[float]] = None) -> Pose:
+        """Pose of one person from ``(size, 2)`` backend keypoints"""
+        xy, present, confidence = self.gather(points, visibility, min_visibility, scale)
+        return Pose.from_array(xy, present, confidence)
+
+    def to_poses(self, points: np.ndarray, visibility: Optional[np.ndarray] = None,
+                 min_visibility: float = 0.5, scale: Optional[Sequence[float]] = None) -> List[Pose]:
+        """Poses of all people from ``(P, size, 2)`` backend keypoints in one pass"""
+        xy, present, confidence = self.gather(points, visibility, min_visibility, scale)
+        coords = np.zeros(xy.shape, dtype=np.int32)
+        np.copyto(coords, xy, casting='unsafe', where=present[..., None])
+        if confidence is None:
+            return [Pose(coords[i], present[i]) for i in range(len(coords))]
+        return [Pose(coords[i], present[i], confidence[i]) for i in range(len(coords))]
+
+
+COCO_SCHEMA = KeypointSchema('coco17', NUM_KEYPOINTS, range(NUM_KEYPOINTS))
+
+# MediaPipe Pose landmark index of each COCO keypoint
+MEDIAPIPE_SCHEMA = KeypointSchema('mediapipe33', 33, [
+    0,   # nose
+    2,   # left_eye
+    5,   # right_eye
+    7,   # left_ear
+    8,   # right_ear
+    11,  # left_shoulder
+    12,  # right_shoulder
+    13,  # left_elbow
+    14,  # right_elbow
+    15,  # left_wrist
+    16,  # right_wrist
+    23,  # left_hip
+    24,  # right_hip
+    25,  # left_knee
+    26,  # right_knee
+    27,  # left_ankle
+    28,  # right_ankle
+])
+
+SCHEMAS = {schema.name: schema for schema in (COCO_SCHEMA, MEDIAPIPE_SCHEMA)}
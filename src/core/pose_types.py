@@ -0,0 +1,161 @@
+"""
+Pose Result Types
+=================
+
+Compact per-frame results shared by the pose backends. ``Pose`` keeps the
+keypoints of one person in a fixed COCO-17 ``(17, 2)`` array plus a
+presence mask instead of a freshly built dict of tuples; ``Person`` is a
+slotted record for one detection. Both keep the dict interface the rest of
+the code uses (``keypoints['nose']``, ``'nose' in keypoints``,
+``person['bbox']``), so :class:`FallDetector` works on them unchanged.
+"""
+
+from collections.abc import Mapping
+from enum import IntEnum
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class Keypoint(IntEnum):
+    """COCO-17 keypoint indices, the layout shared by all backends"""
+    NOSE = 0
+    LEFT_EYE = 1
+    RIGHT_EYE = 2
+    LEFT_EAR = 3
+    RIGHT_EAR = 4
+    LEFT_SHOULDER = 5
+    RIGHT_SHOULDER = 6
+    LEFT_ELBOW = 7
+    RIGHT_ELBOW = 8
+    LEFT_WRIST = 9
+    RIGHT_WRIST = 10
+    LEFT_HIP = 11
+    RIGHT_HIP = 12
+    LEFT_KNEE = 13
+    RIGHT_KNEE = 14
+    LEFT_ANKLE = 15
+    RIGHT_ANKLE = 16
+
+
+KEYPOINT_NAMES = tuple(k.name.lower() for k in Keypoint)
+KEYPOINT_INDEX = {name: int(k) for name, k in zip(KEYPOINT_NAMES, Keypoint)}
+NUM_KEYPOINTS = len(KEYPOINT_NAMES)
+
+
+class Pose(Mapping):
+    """Keypoints of one person as a read-only ``name -> (x, y)`` mapping.
+
+    ``xy`` is an int32 ``(17, 2)`` array in :class:`Keypoint` order and
+    ``present`` a boolean mask of detected keypoints; missing keypoints
+    are not part of the mapping. ``confidence`` optionally holds the
+    backend's per-keypoint confidence/visibility (0-1).
+    """
+
+    __slots__ = ('xy', 'present', 'confidence', '_points')
+
+    def __init__(self, xy: np.ndarray, present: np.ndarray,
+                 confidence: Optional[np.ndarray] = None):
+        """Wrap keypoint arrays without copying"""
+        self.xy = xy
+        self.present = present
+        self.confidence = confidence
+        self._points = None
+
+    @classmethod
+    def from_array(cls, points: np.ndarray, present: Optional[np.ndarray] = None,
+                   confidence: Optional[np.ndarray] = None) -> 'Pose':
+        """Pose from a float ``(17, 2)`` array; by default points at x or y <= 0 are missing"""
+        points = np.asarray(points)
+        if present is None:
+            present = (points > 0).all(axis=1)
+        xy = np.zeros((NUM_KEYPOINTS, 2), dtype=np.int32)
+        np.copyto(xy, points, casting='unsafe', where=present[:, None])
+        return cls(xy, present, confidence)
+
+    @classmethod
+    def from_dict(cls, keypoints: Dict[str, Tuple[int, int]]) -> 'Pose':
+        """Pose from a keypoint dict (unknown names are ignored)"""
+        xy = np.zeros((NUM_KEYPOINTS, 2), dtype=np.int32)
+        present = np.zeros(NUM_KEYPOINTS, dtype=bool)
+        for name, point in keypoints.items():
+            i = KEYPOINT_INDEX.get(name)
+            if i is not None:
+                xy[i] = point
+                present[i] = True
+        return cls(xy, present)
+
+    @classmethod
+    def empty(cls) -> 'Pose':
+        return cls(np.zeros((NUM_KEYPOINTS, 2), dtype=np.int32),
+                   np.zeros(NUM_KEYPOINTS, dtype=bool))
+
+    def _table(self) -> list:
+        # One tolist() per pose instead of a NumPy scalar access per lookup
+        if self._points is None:
+            present = self.present.tolist()
+            self._points = [tuple(p) if ok else None
+                            for p, ok in zip(self.xy.tolist(), present)]
+        return self._points
+
+    def __getitem__(self, name: str) -> Tuple[int, int]:
+        point = self._table()[KEYPOINT_INDEX[name]]
+        if point is None:
+            raise KeyError(name)
+        return point
+
+    def __contains__(self, name) -> bool:
+        i = KEYPOINT_INDEX.get(name)
+        return i is not None and self._table()[i] is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, point in zip(KEYPOINT_NAMES, self._table()) if point is not None)
+
+    # Plain lists are much faster than the generic Mapping views
+    def keys(self) -> list:
+        return [name for name, point in zip(KEYPOINT_NAMES, self._table()) if point is not None]
+
+    def values(self) -> list:
+        return [point for point in self._table() if point is not None]
+
+    def items(self) -> list:
+        return [(name, point) for name, point in zip(KEYPOINT_NAMES, self._table())
+                if point is not None]
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.present))
+
+    def __bool__(self) -> bool:
+        return bool(self.present.any())
+
+    def __repr__(self) -> str:
+        return f"Pose({dict(self.items())})"
+
+    def to_array(self) -> np.ndarray:
+        """Float ``(17, 2)`` copy with NaN for missing keypoints"""
+        out = self.xy.astype(np.float64)
+        out[~self.present] = np.nan
+        return out
+
+
+class Person:
+    """One detected person; ``person['keypoints']`` style access still works"""
+
+    __slots__ = ('keypoints', 'confidence', 'bbox')
+
+    def __init__(self, keypoints: Pose, confidence: float = 0.0,
+                 bbox: Optional[Tuple[int, int, int, int]] = None):
+        self.keypoints = keypoints
+        self.confidence = confidence
+        self.bbox = bbox
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def __repr__(self) -> str:
+        return f"Person(confidence={self.confidence:.2f}, bbox={self.bbox}, keypoints={len(self.keypoints)})"
@@ -0,0 +1,325 @@
+"""
+Streaming Fall Detection Kernel
+===============================
+
+Vectorized version of :class:`FallDetector` for offline analysis of
+recorded keypoint time series. Sequences are processed in chunks of shape
+``(T, K, 2)`` (missing keypoints as NaN); all per-frame criteria, the angle
+trend, the initial-posture gate, the confirmation counter and the fallen
+latch are computed with NumPy array operations while the detector state is
+carried from one chunk to the next. Results are frame-for-frame identical
+to calling ``FallDetector.detect_fall`` on the same keypoints without
+timestamps (posture criteria only), with the same ``min_fall_frames`` and
+the same per-criterion confidence weighting when joint confidences are
+passed. The velocity criteria and ``fast_confirm_frames`` need timestamps
+and have no equivalent here.
+"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .fall_detector import HEAD_ANKLE_THRESHOLDS, TRUNK_POINTS, FallDetector
+from .pose_types import KEYPOINT_INDEX, KEYPOINT_NAMES
+
+
+COCO_KEYPOINT_NAMES = list(KEYPOINT_NAMES)
+
+HISTORY_SIZE = 5
+INITIAL_CHECK_FRAMES = 15
+INITIAL_MIN_ANGLE = 50
+FALL_SCORE = 60
+
+# Joints behind the weighted criteria, as in FallDetector.criterion_weights
+HEAD_ANKLE_POINTS = ['nose', 'left_ankle', 'right_ankle']
+HEAD_HIP_POINTS = ['nose', 'left_hip', 'right_hip']
+
+# 'detection' config keys that are StreamingFallDetector arguments
+CONFIG_KEYS = ('angle_threshold', 'scale_reference', 'head_ankle_thresholds',
+               'min_fall_frames', 'full_weight_confidence')
+
+
+def keypoints_to_array(frames: Iterable[Dict[str, Tuple[int, int]]],
+                       keypoint_names: Sequence[str] = COCO_KEYPOINT_NAMES) -> np.ndarray:
+    """Stack per-frame keypoint dicts into a ``(T, K, 2)`` array (NaN = missing)"""
+    index = {name: i for i, name in enumerate(keypoint_names)}
+    frames = list(frames)
+    out = np.full((len(frames), len(keypoint_names), 2), np.nan)
+    for t, keypoints in enumerate(frames):
+        for name, point in keypoints.items():
+            i = index.get(name)
+            if i is not None:
+                out[t, i] = point
+    return out
+
+
+def confidences_to_array(frames: Iterable,
+                         keypoint_names: Sequence[str] = COCO_KEYPOINT_NAMES) -> np.ndarray:
+    """Stack the joint confidences of per-frame Poses into a ``(T, K)`` array
+
+    Frames without confidences (plain dicts) get a NaN row and are scored
+    with full weights, like ``FallDetector.criterion_weights`` does.
+    """
+    frames = list(frames)
+    index = [KEYPOINT_INDEX.get(name) for name in keypoint_names]
+    out = np.full((len(frames), len(keypoint_names)), np.nan)
+    for t, keypoints in enumerate(frames):
+        confidence = getattr(keypoints, 'confidence', None)
+        if confidence is None:
+            continue
+        out[t] = [confidence[i] if i is not None else 0.0 for i in index]
+    return out
+
+
+class StreamingFallDetector:
+    """Chunked, vectorized equivalent of FallDetector for one person"""
+
+    def __init__(self,
+                 angle_threshold: float = 60.0,
+                 keypoint_names: Sequence[str] = COCO_KEYPOINT_NAMES,
+                 scale_reference: Optional[str] = None,
+                 head_ankle_thresholds: Optional[Tuple[float, float]] = None,
+                 min_fall_frames: int = 3,
+                 full_weight_confidence: Optional[float] = 0.8):
+        """Initialize kernel state
+
+        ``min_fall_frames`` and ``full_weight_confidence`` mean the same as
+        for :class:`FallDetector`.
+        """
+        if scale_reference not in HEAD_ANKLE_THRESHOLDS:
+            raise ValueError(f"Unknown scale_reference: {scale_reference}")
+        self.angle_threshold = angle_threshold
+        self.min_fall_frames = min_fall_frames
+        self.full_weight_confidence = full_weight_confidence
+        self.scale_reference = scale_reference
+        self.head_ankle_thresholds = head_ankle_thresholds or HEAD_ANKLE_THRESHOLDS[scale_reference]
+        self.keypoint_names = list(keypoint_names)
+        self._index = {name: i for i, name in enumerate(self.keypoint_names)}
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'StreamingFallDetector':
+        """Create kernel from the 'detection' section of a YAML config"""
+        options = FallDetector.config_options(config)
+        return cls(**{**{key: options[key] for key in CONFIG_KEYS if key in options}, **overrides})
+
+    def reset(self):
+        """Reset carried state"""
+        self.angle_history = np.empty(0)
+        self.initial_check_frames = 0
+        self.max_initial_angle = 0.0
+        self.fall_frames_count = 0
+        self.is_fallen = False
+        self.reference_length = None
+        self.frames_processed = 0
+
+    def _column(self, keypoints: np.ndarray, name: str) -> np.ndarray:
+        """(T, 2) coordinates of one keypoint (all NaN when not in the layout)"""
+        i = self._index.get(name)
+        if i is None:
+            return np.full((keypoints.shape[0], 2), np.nan)
+        return keypoints[:, i, :]
+
+    def _weights(self, confidence: Optional[np.ndarray], present: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Per-frame trunk, extent, head-ankle and head-hip criterion weights"""
+        T = present.shape[0]
+        full = self.full_weight_confidence
+        if confidence is None or not full:
+            return (np.ones(T),) * 4
+        confidence = np.asarray(confidence, dtype=np.float64)
+        if confidence.shape != present.shape:
+            raise ValueError(f"Expected confidences of shape {present.shape}, got {confidence.shape}")
+        unweighted = np.isnan(confidence).all(axis=1)
+        confidence = np.nan_to_num(confidence)
+
+        def joints(names):
+            columns = [self._index[name] for name in names if name in self._index]
+            if len(columns) < len(names):
+                return np.zeros(T)
+            return np.minimum(1.0, confidence[:, columns].min(axis=1) / full)
+
+        # Sequential sum, like the Python sum() of the dict path
+        counts = present.sum(axis=1)
+        total = np.cumsum(np.where(present, confidence, 0.0), axis=1)[:, -1] if present.shape[1] \
+            else np.zeros(T)
+        extent = np.where(counts > 0, total / np.maximum(counts, 1), 0.0)
+        weights = (joints(TRUNK_POINTS), np.minimum(1.0, extent / full),
+                   joints(HEAD_ANKLE_POINTS), joints(HEAD_HIP_POINTS))
+        return tuple(np.where(unweighted, 1.0, w) for w in weights)
+
+    def process(self, keypoints: np.ndarray,
+                confidence: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Run one chunk of shape ``(T, K, 2)``; state carries to the next call.
+
+        ``confidence`` holds the ``(T, K)`` joint confidences (see
+        :func:`confidences_to_array`) that weight the criteria; without it
+        every criterion counts fully.
+
+        Returns per-frame arrays: ``fall`` (the detect_fall return value),
+        ``is_fallen``, ``fall_started`` (latch rising edges), ``confidence``,
+        ``fall_detected`` (unconfirmed), ``body_angle``, ``aspect_ratio`` and
+        ``fall_frames_count``.
+        """
+        keypoints = np.asarray(keypoints, dtype=np.float64)
+        if keypoints.ndim != 3 or keypoints.shape[2] != 2:
+            raise ValueError(f"Expected keypoints of shape (T, K, 2), got {keypoints.shape}")
+        T = keypoints.shape[0]
+
+        present = ~np.isnan(keypoints).any(axis=2)
+        has_points = present.any(axis=1)
+        trunk_weight, extent_weight, head_ankle_weight, head_hip_weight = \
+            self._weights(confidence, present)
+
+        # Body angle between shoulder and hip centers (integer-floored like the dict path)
+        ls, rs = self._column(keypoints, 'left_shoulder'), self._column(keypoints, 'right_shoulder')
+        lh, rh = self._column(keypoints, 'left_hip'), self._column(keypoints, 'right_hip')
+        shoulder = np.floor((ls + rs) / 2)
+        hip = np.floor((lh + rh) / 2)
+        with np.errstate(invalid='ignore'):
+            body_angle = np.degrees(np.arctan2(np.abs(hip[:, 1] - shoulder[:, 1]),
+                                               np.abs(hip[:, 0] - shoulder[:, 0])))
+        has_angle = ~np.isnan(body_angle)
+
+        score = np.zeros(T)
+        score += np.select([body_angle < 30, body_angle < 45, body_angle < self.angle_threshold],
+                           [40, 35, 25], 0) * trunk_weight
+        score += self._trend_scores(body_angle, has_angle, has_points) * trunk_weight
+
+        # Aspect ratio over all present keypoints
+        x, y = keypoints[:, :, 0], keypoints[:, :, 1]
+        with np.errstate(invalid='ignore'):
+            width = np.where(present, x, -np.inf).max(axis=1) - np.where(present, x, np.inf).min(axis=1)
+            height = np.where(present, y, -np.inf).max(axis=1) - np.where(present, y, np.inf).min(axis=1)
+        valid_height = has_points & (height > 0)
+        aspect_ratio = np.full(T, np.nan)
+        aspect_ratio[valid_height] = width[valid_height] / height[valid_height]
+        score += np.select([aspect_ratio > 2.0, aspect_ratio > 1.5, aspect_ratio > 1.2],
+                           [25, 20, 10], 0) * extent_weight
+
+        # Head height relative to ankles and hips
+        nose_y = self._column(keypoints, 'nose')[:, 1]
+        ankle_y = (self._column(keypoints, 'left_ankle')[:, 1]
+                   + self._column(keypoints, 'right_ankle')[:, 1]) / 2
+        hip_y = (lh[:, 1] + rh[:, 1]) / 2
+        reference_length = self._reference_lengths(ls, rs, lh, rh, width, height)
+        very_low, low = self.head_ankle_thresholds
+        with np.errstate(invalid='ignore'):
+            head_ankle = np.abs(nose_y - ankle_y) / reference_length
+            score += np.select([head_ankle < very_low, head_ankle < low],
+                               [20, 15], 0) * head_ankle_weight
+            score += np.where(nose_y > hip_y, 20, 0) * head_hip_weight
+
+        confidence = np.minimum(score / 100.0 * 100, 100)
+        confidence[~has_points] = 0.0
+        fall_detected = (confidence >= FALL_SCORE) & has_points
+
+        # Initial posture gate: max angle of the first angle frames must look upright
+        angle_frames = self.initial_check_frames + np.cumsum(has_angle)
+        in_initial = has_angle & (angle_frames <= INITIAL_CHECK_FRAMES)
+        initial_angles = np.where(in_initial, body_angle, -np.inf)
+        max_initial = np.maximum(self.max_initial_angle, np.maximum.accumulate(initial_angles)) \
+            if T else np.empty(0)
+        initial_frames = np.minimum(angle_frames, INITIAL_CHECK_FRAMES)
+        low_initial = max_initial < INITIAL_MIN_ANGLE
+        gated = has_points & low_initial & ((initial_frames < INITIAL_CHECK_FRAMES) | fall_detected)
+        counted = has_points & ~gated
+
+        # Confirmation counter c_t = max(0, c_{t-1} + d_t) solved with the
+        # Lindley recursion; empty frames reset it via a large negative step
+        c0 = self.fall_frames_count
+        delta = np.where(fall_detected, 1, -1).astype(np.int64)
+        delta[~counted] = 0
+        delta[~has_points] = -(c0 + T + 1)
+        cumulative = np.cumsum(delta)
+        floor = np.minimum(-c0, np.minimum.accumulate(cumulative)) if T else cumulative
+        count = cumulative - floor
+
+        fall = counted & (count >= self.min_fall_frames)
+
+        # Fallen latch: set on confirmation, cleared when the counter drains
+        set_events = fall
+        clear_events = counted & ~fall_detected & (count == 0)
+        events = set_events | clear_events
+        last_event = np.maximum.accumulate(np.where(events, np.arange(T), -1)) if T else np.empty(0, int)
+        is_fallen = np.where(last_event >= 0, set_events[np.maximum(last_event, 0)], self.is_fallen)
+        previous = np.concatenate(([self.is_fallen], is_fallen[:-1])) if T else is_fallen
+        fall_started = is_fallen & ~previous
+
+        # Carry state into the next chunk
+        if T:
+            self.initial_check_frames = int(initial_frames[-1])
+            self.max_initial_angle = float(max_initial[-1])
+            self.fall_frames_count = int(count[-1])
+            self.is_fallen = bool(is_fallen[-1])
+        self.angle_history = np.concatenate((self.angle_history,
+                                             body_angle[has_angle]))[-HISTORY_SIZE:]
+        self.frames_processed += T
+
+        return {
+            'fall': fall,
+            'is_fallen': is_fallen.astype(bool),
+            'fall_started': fall_started.astype(bool),
+            'confidence': confidence,
+            'fall_detected': fall_detected,
+            'body_angle': body_angle,
+            'aspect_ratio': aspect_ratio,
+            'fall_frames_count': count,
+        }
+
+    def _reference_lengths(self, ls, rs, lh, rh, width, height) -> np.ndarray:
+        """Per-frame distance unit, forward-filled like FallDetector.reference_length"""
+        T = len(width)
+        if self.scale_reference is None:
+            return np.ones(T)
+        if self.scale_reference == 'torso':
+            dx = (ls[:, 0] + rs[:, 0] - lh[:, 0] - rh[:, 0]) / 2
+            dy = (ls[:, 1] + rs[:, 1] - lh[:, 1] - rh[:, 1]) / 2
+            length = np.hypot(dx, dy)
+        else:
+            length = np.maximum(width, height)
+        with np.errstate(invalid='ignore'):
+            valid = np.isfinite(length) & (length > 0)
+        last_valid = np.maximum.accumulate(np.where(valid, np.arange(T), -1)) if T else np.empty(0, int)
+        carried = np.nan if self.reference_length is None else self.reference_length
+        filled = np.where(last_valid >= 0, length[np.maximum(last_valid, 0)], carried)
+        if T and last_valid[-1] >= 0:
+            self.reference_length = float(filled[-1])
+        return filled
+
+    def _trend_scores(self, body_angle: np.ndarray, has_angle: np.ndarray,
+                      has_points: np.ndarray) -> np.ndarray:
+        """Angle trend bonus evaluated against the rolling 5-angle history"""
+        history = np.concatenate((self.angle_history, body_angle[has_angle]))
+        h = len(self.angle_history)
+        # Position of the newest history entry as seen by each frame
+        j = h - 1 + np.cumsum(has_angle)
+        length = np.minimum(j + 1, HISTORY_SIZE)
+
+        scores = np.zeros(len(body_angle))
+        valid = has_points & (length >= 3)
+        if not valid.any():
+            return scores
+        jv = j[valid]
+        newest = history[jv]
+        decreasing = (newest < history[jv - 1]) & (history[jv - 1] < history[jv - 2])
+        below_oldest = newest < history[jv - length[valid] + 1]
+        scores[valid] = np.where(decreasing, 15, np.where(below_oldest, 10, 0))
+        return scores
+
+    def process_stream(self, chunks: Iterable) -> Iterable[Dict[str, np.ndarray]]:
+        """Process an iterable of chunks, yielding per-chunk results
+
+        A chunk is a keypoint array or a ``(keypoints, confidence)`` pair.
+        """
+        for chunk in chunks:
+            if isinstance(chunk, tuple):
+                yield self.process(*chunk)
+            else:
+                yield self.process(chunk)
+
+
+def fall_onsets(results: List[Dict[str, np.ndarray]], fps: Optional[float] = None) -> np.ndarray:
+    """Frame indices (or seconds when ``fps`` is given) where falls start"""
+    if not results:
+        return np.empty(0)
+    onsets = np.flatnonzero(np.concatenate([r['fall_started'] for r in results]))
+    return onsets / fps if fps else onsets
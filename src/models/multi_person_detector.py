@@ -2,71 +2,80 @@
 Multi-Person Pose Detector using YOLOv8
 ======================================="""
 
-from ultralytics import YOLO
-import numpy as np
 from typing import List, Dict, Tuple, Optional
 
+from src.core.pose_schema import COCO_SCHEMA
+from src.core.pose_types import KEYPOINT_NAMES, Person
+
 
 class MultiPersonDetector:
     """Multi-person pose detector using YOLOv8-Pose"""
     
    
-    KEYPOINT_NAMES = [
-        'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
-        'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
-        'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
-        'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
-    ]
+    KEYPOINT_NAMES = list(KEYPOINT_NAMES)
     
-    def __init__(self, model_name: str = 'yolov8n-pose.pt', confidence: float = 0.5):
-        """Initialize detector"""
+    def __init__(self, model_name: str = 'yolov8n-pose.pt', confidence: float = 0.5,
+                 keypoint_confidence: float = 0.5,
+                 iou_threshold: float = 0.7,
+                 max_det: int = 300):
+        """Initialize detector
+
+        Keypoints whose confidence is below ``keypoint_confidence`` are
+        treated as missing (occluded joints get arbitrary coordinates).
+        ``iou_threshold`` and ``max_det`` are passed to YOLO's NMS.
+        """
+        from ultralytics import YOLO
+        
         print(f"Model yukleniyor {model_name}...")
         self.model = YOLO(model_name)
         self.confidence = confidence
+        self.keypoint_confidence = keypoint_confidence
+        self.iou_threshold = iou_threshold
+        self.max_det = max_det
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'MultiPersonDetector':
+        """Create detector from the 'models: yolov8' section of a YAML config"""
+        section = config.get('models', config).get('yolov8', {})
+        kwargs = {key: section[key] for key in ('model_name', 'confidence', 'keypoint_confidence',
+                                                'iou_threshold', 'max_det')
+                  if section.get(key) is not None}
+        kwargs.update(overrides)
+        return cls(**kwargs)
         
-    def detect_people(self, frame) -> List[Dict]:
+    def detect_people(self, frame) -> List[Person]:
         """Detect all people in frame"""
-        results = self.model(frame, conf=self.confidence, verbose=False)
+        results = self.model(frame, conf=self.confidence, iou=self.iou_threshold,
+                             max_det=self.max_det, verbose=False)
         
         people = []
         
         for result in results:
             if result.keypoints is None:
                 continue
-                
-            for person_idx in range(len(result.keypoints)):
-                keypoints_data = result.keypoints[person_idx]
-                
-                if hasattr(keypoints_data, 'xy'):
-                    kpts = keypoints_data.xy.cpu().numpy()[0]
-                else:
-                    continue
-                
-                keypoints = {}
-                for i, name in enumerate(self.KEYPOINT_NAMES):
-                    if i < len(kpts):
-                        x, y = kpts[i]
-                        if x > 0 and y > 0:
-                            keypoints[name] = (int(x), int(y))
-                
-                bbox = None
-                if result.boxes is not None and person_idx < len(result.boxes):
-                    box = result.boxes[person_idx].xyxy.cpu().numpy()[0]
-                    bbox = tuple(map(int, box))
-                
-                conf = 0.0
-                if result.boxes is not None and person_idx < len(result.boxes):
-                    conf = float(result.boxes[person_idx].conf.cpu().numpy()[0])
-                
-                people.append({
-                    'keypoints': keypoints,
-                    'confidence': conf,
-                    'bbox': bbox
-                })
+            
+            # One device-to-host copy per result instead of one per person
+            kpts = result.keypoints.xy.cpu().numpy()
+            if kpts.ndim != 3 or kpts.shape[1] != COCO_SCHEMA.size:
+                continue
+            kpt_conf = getattr(result.keypoints, 'conf', None)
+            if kpt_conf is not None:
+                kpt_conf = kpt_conf.cpu().numpy()
+            poses = COCO_SCHEMA.to_poses(kpts, kpt_conf, self.keypoint_confidence)
+            
+            boxes = confs = []
+            if result.boxes is not None:
+                boxes = result.boxes.xyxy.cpu().numpy().astype(int).tolist()
+                confs = result.boxes.conf.cpu().numpy().tolist()
+            
+            for person_idx, keypoints in enumerate(poses):
+                bbox = tuple(boxes[person_idx]) if person_idx < len(boxes) else None
+                conf = float(confs[person_idx]) if person_idx < len(confs) else 0.0
+                people.append(Person(keypoints, conf, bbox))
         
         return people
     
-    def draw_people(self, frame, people: List[Dict], draw_bbox: bool = True):
+    def draw_people(self, frame, people: List[Person], draw_bbox: bool = True):
         """Draw all people on frame"""
         import cv2
         
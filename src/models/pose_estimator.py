@@ -7,6 +7,9 @@ import mediapipe as mp
 import numpy as np
 from typing import Optional, Dict, Tuple, List
 
+from src.core.pose_schema import MEDIAPIPE_SCHEMA
+from src.core.pose_types import Pose
+
 
 class PoseEstimator:
     """Pose Estimator using MediaPipe"""
@@ -25,8 +28,14 @@ class PoseEstimator:
     RIGHT_ANKLE = 28
     
     def __init__(self, min_detection_confidence: float = 0.5,
-                 min_tracking_confidence: float = 0.5):
-        """Initialize pose estimator"""
+                 min_tracking_confidence: float = 0.5,
+                 min_visibility: float = 0.5,
+                 model_complexity: int = 1):
+        """Initialize pose estimator
+
+        Landmarks with visibility below ``min_visibility`` are left out of
+        get_all_keypoints().
+        """
         self.mp_pose = mp.solutions.pose
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
@@ -34,10 +43,21 @@ class PoseEstimator:
         self.pose = self.mp_pose.Pose(
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence,
-            model_complexity=1
+            model_complexity=model_complexity
         )
         
+        self.min_visibility = min_visibility
         self.results = None
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'PoseEstimator':
+        """Create estimator from the 'models: mediapipe' section of a YAML config"""
+        section = config.get('models', config).get('mediapipe', {})
+        kwargs = {key: section[key] for key in ('min_detection_confidence', 'min_tracking_confidence',
+                                                'min_visibility', 'model_complexity')
+                  if section.get(key) is not None}
+        kwargs.update(overrides)
+        return cls(**kwargs)
     
     def process_frame(self, frame: np.ndarray) -> bool:
         """Process frame and extract keypoints"""
@@ -51,6 +71,13 @@ class PoseEstimator:
             return self.results.pose_landmarks.landmark
         return None
     
+    def get_landmark_array(self) -> Optional[np.ndarray]:
+        """(33, 3) array of normalized x, y and visibility"""
+        landmarks = self.get_landmarks()
+        if landmarks is None:
+            return None
+        return np.array([(lm.x, lm.y, lm.visibility) for lm in landmarks])
+    
     def get_landmark_coordinates(self, landmark_id: int, 
                                  frame_width: int, 
                                  frame_height: int) -> Optional[Tuple[int, int]]:
@@ -66,32 +93,15 @@ class PoseEstimator:
         return (x, y)
     
     def get_all_keypoints(self, frame_width: int, 
-                         frame_height: int) -> Dict[str, Tuple[int, int]]:
-        """Get all important keypoints for fall detection"""
-        keypoints = {}
-        
-        landmarks = self.get_landmarks()
+                         frame_height: int) -> Pose:
+        """Get all keypoints for fall detection in the COCO-17 layout"""
+        landmarks = self.get_landmark_array()
         if landmarks is None:
-            return keypoints
-        
-        important_points = {
-            'nose': self.NOSE,
-            'left_shoulder': self.LEFT_SHOULDER,
-            'right_shoulder': self.RIGHT_SHOULDER,
-            'left_hip': self.LEFT_HIP,
-            'right_hip': self.RIGHT_HIP,
-            'left_knee': self.LEFT_KNEE,
-            'right_knee': self.RIGHT_KNEE,
-            'left_ankle': self.LEFT_ANKLE,
-            'right_ankle': self.RIGHT_ANKLE
-        }
-        
-        for name, idx in important_points.items():
-            coords = self.get_landmark_coordinates(idx, frame_width, frame_height)
-            if coords is not None:
-                keypoints[name] = coords
+            return Pose.empty()
         
-        return keypoints
+        return MEDIAPIPE_SCHEMA.to_pose(landmarks[:, :2], landmarks[:, 2],
+                                        self.min_visibility,
+                                        scale=(frame_width, frame_height))
     
     def draw_skeleton(self, frame: np.ndarray) -> np.ndarray:
         """Draw skeleton on frame"""
@@ -0,0 +1,281 @@
+"""
+Learned Scorer Training
+=======================
+
+Trains the NumPy window scorer (src/core/learned_scorer.py) on keypoints
+extracted from the Fall/No_Fall videos. Keypoints are cached per video, so
+only the first run pays for pose estimation.
+
+Usage:
+    python -m src.models.train_scorer --output models/fall_scorer.npz
+    python -m src.models.train_scorer --backend yolo --labels labels.csv
+
+Without ``--labels`` the windows of Fall videos are labelled positive once
+the trunk is below ``--label-angle`` degrees; all No_Fall windows are
+negative. A labels CSV (``video,start_frame,end_frame`` per fall) gives
+exact labels instead.
+"""
+
+import argparse
+import csv
+import hashlib
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.learned_scorer import LogisticWindowModel, keypoints_to_points, window_features
+
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+
+def person_area(person: Dict) -> float:
+    """Bounding box area of a detected person, or of its keypoints without a box"""
+    bbox = person['bbox']
+    if bbox is None:
+        xs = [x for x, _ in person['keypoints'].values()]
+        ys = [y for _, y in person['keypoints'].values()]
+        bbox = (min(xs), min(ys), max(xs), max(ys))
+    return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+
+
+def create_backend(backend: str):
+    """Pose backend returning one keypoint dict per frame"""
+    if backend == 'yolo':
+        from src.models.multi_person_detector import MultiPersonDetector
+        detector = MultiPersonDetector()
+
+        def extract(frame):
+            people = [p for p in detector.detect_people(frame) if p['keypoints']]
+            if not people:
+                return {}
+            # Largest person is the subject of these clips
+            return max(people, key=person_area)['keypoints']
+        return extract
+
+    from src.models.pose_estimator import PoseEstimator
+    estimator = PoseEstimator()
+
+    def extract(frame):
+        if not estimator.process_frame(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)):
+            return {}
+        h, w = frame.shape[:2]
+        return estimator.get_all_keypoints(w, h)
+    return extract
+
+
+def extract_keypoints(video_path: Path, extract, resize_width: int = 640) -> np.ndarray:
+    """(T, P, 2) feature keypoints of every frame of a video"""
+    cap = cv2.VideoCapture(str(video_path))
+    frames = []
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            h, w = frame.shape[:2]
+            if resize_width and w != resize_width:
+                frame = cv2.resize(frame, (resize_width, int(h * resize_width / w)))
+            frames.append(keypoints_to_points(extract(frame)))
+    finally:
+        cap.release()
+    if not frames:
+        raise ValueError(f"No frames decoded from {video_path}")
+    return np.stack(frames)
+
+
+def cache_path(video_path: Path, cache_dir: Path, backend: str, resize_width: int) -> Path:
+    """Cache file keyed by video identity (path, size, mtime) and extraction settings"""
+    stat = video_path.stat()
+    key = f"{video_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{backend}|{resize_width}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return cache_dir / f"{video_path.stem}-{backend}-{digest}.npz"
+
+
+def cached_keypoints(video_path: Path, cache_dir: Path, backend: str,
+                     resize_width: int = 640, extract=None) -> np.ndarray:
+    """Keypoints of a video from the cache, extracting them on a miss"""
+    path = cache_path(video_path, cache_dir, backend, resize_width)
+    if path.exists():
+        with np.load(path) as data:
+            return data['keypoints']
+    if extract is None:
+        extract = create_backend(backend)
+    keypoints = extract_keypoints(video_path, extract, resize_width)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, keypoints=keypoints)
+    return keypoints
+
+
+def make_windows(sequence: np.ndarray, window: int, stride: int = 1) -> np.ndarray:
+    """Sliding windows ``(N, W, P, 2)`` over a ``(T, P, 2)`` sequence"""
+    if len(sequence) < window:
+        return np.empty((0, window) + sequence.shape[1:])
+    windows = sliding_window_view(sequence, window, axis=0)[::stride]
+    return np.moveaxis(windows, -1, 1)
+
+
+def trunk_angles(sequence: np.ndarray) -> np.ndarray:
+    """Body angle (degrees from horizontal) of each frame; NaN when unknown"""
+    shoulder = (sequence[:, 1] + sequence[:, 2]) / 2
+    hip = (sequence[:, 3] + sequence[:, 4]) / 2
+    return np.degrees(np.arctan2(np.abs(hip[:, 1] - shoulder[:, 1]),
+                                 np.abs(hip[:, 0] - shoulder[:, 0])))
+
+
+def heuristic_labels(sequence: np.ndarray, window: int, is_fall_video: bool,
+                     label_angle: float = 45.0) -> np.ndarray:
+    """Per-window labels: in fall videos, windows ending after the trunk went low"""
+    count = max(len(sequence) - window + 1, 0)
+    if not is_fall_video:
+        return np.zeros(count)
+    with np.errstate(invalid='ignore'):
+        low = trunk_angles(sequence) < label_angle
+    # Once down, stay positive (the subject is lying on the floor)
+    down = np.maximum.accumulate(low)
+    return down[window - 1:].astype(np.float64)
+
+
+def load_label_ranges(path: Optional[str]) -> Dict[str, List[Tuple[int, int]]]:
+    """Fall frame ranges per video file name from a ``video,start_frame,end_frame`` CSV"""
+    ranges: Dict[str, List[Tuple[int, int]]] = {}
+    if not path:
+        return ranges
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            ranges.setdefault(row['video'], []).append((int(row['start_frame']), int(row['end_frame'])))
+    return ranges
+
+
+def range_labels(length: int, window: int, ranges: List[Tuple[int, int]]) -> np.ndarray:
+    """Per-window labels from annotated fall ranges (window end inside a range)"""
+    ends = np.arange(window - 1, length)
+    labels = np.zeros(len(ends))
+    for start, end in ranges:
+        labels[(ends >= start) & (ends <= end)] = 1.0
+    return labels
+
+
+def find_videos(directory: Path) -> List[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS)
+
+
+def build_dataset(sequences: List[Tuple[str, np.ndarray, bool]], window: int,
+                  stride: int = 1, label_angle: float = 45.0,
+                  label_ranges: Optional[Dict[str, List[Tuple[int, int]]]] = None):
+    """Feature matrix and labels from (name, keypoints, is_fall_video) sequences"""
+    features, labels = [], []
+    for name, sequence, is_fall in sequences:
+        windows = make_windows(sequence, window)
+        if not len(windows):
+            continue
+        if label_ranges and name in label_ranges:
+            y = range_labels(len(sequence), window, label_ranges[name])
+        else:
+            y = heuristic_labels(sequence, window, is_fall, label_angle)
+        features.append(window_features(windows[::stride]))
+        labels.append(y[::stride])
+    if not features:
+        raise ValueError("No training windows")
+    return np.concatenate(features), np.concatenate(labels)
+
+
+def split_videos(sequences: List[Tuple[str, np.ndarray, bool]], validation: float,
+                 seed: int = 0) -> Tuple[List, List]:
+    """(train, validation) sequences, holding out whole videos of each class
+
+    Sliding windows of one video overlap almost entirely, so splitting
+    windows would leak near-duplicates of training windows into
+    validation. At least one video per class is held out when the class
+    has two or more.
+    """
+    rng = np.random.default_rng(seed)
+    train, held_out = [], []
+    for is_fall in (True, False):
+        group = [s for s in sequences if s[2] == is_fall]
+        count = int(round(len(group) * validation))
+        if validation > 0 and len(group) > 1:
+            count = min(max(count, 1), len(group) - 1)
+        order = rng.permutation(len(group))
+        held_out.extend(group[i] for i in order[:count])
+        train.extend(group[i] for i in order[count:])
+    return train, held_out
+
+
+def evaluate(model: LogisticWindowModel, features: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    """Accuracy, precision and recall at probability 0.6 (confidence 60)"""
+    predicted = model.predict_proba(features) >= 0.6
+    actual = labels > 0
+    tp = float(np.sum(predicted & actual))
+    return {
+        'accuracy': float(np.mean(predicted == actual)) if len(actual) else 0.0,
+        'precision': tp / max(float(predicted.sum()), 1.0),
+        'recall': tp / max(float(actual.sum()), 1.0),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train the learned fall scorer")
+    parser.add_argument('--fall-dir', default='Fall/Raw_Video')
+    parser.add_argument('--no-fall-dir', default='No_Fall/Raw_Video')
+    parser.add_argument('--cache-dir', default='keypoint_cache')
+    parser.add_argument('--backend', choices=['mediapipe', 'yolo'], default='mediapipe')
+    parser.add_argument('--resize-width', type=int, default=640)
+    parser.add_argument('--window', type=int, default=8)
+    parser.add_argument('--stride', type=int, default=1)
+    parser.add_argument('--label-angle', type=float, default=45.0)
+    parser.add_argument('--labels', help="CSV with video,start_frame,end_frame fall ranges")
+    parser.add_argument('--validation', type=float, default=0.2,
+                        help="Share of videos held out for evaluation")
+    parser.add_argument('--output', default='models/fall_scorer.npz')
+    args = parser.parse_args(argv)
+
+    cache_dir = Path(args.cache_dir)
+    extract = None
+    sequences = []
+    for directory, is_fall in ((args.fall_dir, True), (args.no_fall_dir, False)):
+        path = Path(directory)
+        if not path.exists():
+            path = PROJECT_ROOT / directory
+        for video in find_videos(path):
+            if extract is None and not cache_path(video, cache_dir, args.backend, args.resize_width).exists():
+                extract = create_backend(args.backend)
+            print(f"Keypoints: {video.name}")
+            sequences.append((video.name,
+                              cached_keypoints(video, cache_dir, args.backend, args.resize_width, extract),
+                              is_fall))
+    if not sequences:
+        parser.error("no videos found")
+
+    label_ranges = load_label_ranges(args.labels)
+    train, held_out = split_videos(sequences, args.validation)
+    features, labels = build_dataset(train, args.window, args.stride, args.label_angle,
+                                     label_ranges)
+
+    model = LogisticWindowModel.fit(features, labels, args.window)
+    print(f"Windows: {len(labels)} ({int(labels.sum())} fall)")
+    print(f"Train: {evaluate(model, features, labels)}")
+    if held_out:
+        val_features, val_labels = build_dataset(held_out, args.window, args.stride,
+                                                 args.label_angle, label_ranges)
+        print(f"Validation ({', '.join(s[0] for s in held_out)}): "
+              f"{evaluate(model, val_features, val_labels)}")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    model.save(args.output)
+    print(f"Saved: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
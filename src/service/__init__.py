@@ -0,0 +1,21 @@
+"""
+Service Module
+==============
+
+asyncio API for consuming fall detection results outside the Streamlit app.
+"""
+
+from .broadcast import (DISCONNECT, DROP_NEWEST, DROP_OLDEST, Broadcaster,
+                        SlowConsumerError, Subscription)
+from .cluster import (ClusterWorker, Coordinator, HashRing, InProcessTransport,
+                      MessageBroker, ResultAggregator, SocketTransport, Transport)
+from .detection_service import DetectionService, result_to_json
+from .preview_server import PreviewServer
+from .scheduler import InferenceScheduler
+
+__all__ = ['Broadcaster', 'Subscription', 'SlowConsumerError',
+           'DROP_OLDEST', 'DROP_NEWEST', 'DISCONNECT',
+           'DetectionService', 'result_to_json', 'PreviewServer',
+           'InferenceScheduler', 'Coordinator', 'ClusterWorker',
+           'ResultAggregator', 'HashRing', 'Transport', 'InProcessTransport',
+           'SocketTransport', 'MessageBroker']
@@ -0,0 +1,197 @@
+"""
+Async Fan-out
+=============
+
+One producer, many asyncio consumers. Every subscriber gets its own
+bounded queue and a policy for when it falls behind, so a slow consumer
+never blocks the producer or the other subscribers:
+
+- ``drop_oldest``: keep the newest items (live previews, status feeds)
+- ``drop_newest``: keep the backlog, ignore new items until drained
+- ``disconnect``: close the subscription with :class:`SlowConsumerError`
+  (event feeds that must not silently lose items; the consumer can
+  resubscribe and backfill from the event store)
+
+All methods must be called from the event loop thread; producers on other
+threads use :meth:`Broadcaster.publish_threadsafe`.
+"""
+
+import asyncio
+from typing import Any, Callable, List, Optional
+
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+DISCONNECT = 'disconnect'
+POLICIES = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+
+_CLOSED = object()
+
+
+class SlowConsumerError(Exception):
+    """A ``disconnect`` subscriber fell more than ``maxsize`` items behind"""
+
+
+class Subscription:
+    """Bounded queue of one consumer; use with ``async for``"""
+
+    def __init__(self, broadcaster: 'Broadcaster', maxsize: int = 16,
+                 policy: str = DROP_OLDEST,
+                 predicate: Optional[Callable[[Any], bool]] = None):
+        """Create a subscription (use :meth:`Broadcaster.subscribe`)"""
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.predicate = predicate
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self.error: Optional[Exception] = None
+        self._broadcaster = broadcaster
+        # Unbounded internally; the bound is enforced by offer() so the
+        # close marker always fits
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Items waiting to be consumed"""
+        return self._pending
+
+    def offer(self, item) -> bool:
+        """Queue an item according to the policy; returns False if it was not queued"""
+        if self.closed:
+            return False
+        if self.predicate is not None and not self.predicate(item):
+            return False
+        if self._pending >= self.maxsize:
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                self._broadcaster._dropped(item)
+                return False
+            if self.policy == DISCONNECT:
+                self._broadcaster._dropped(item)
+                self._close(SlowConsumerError(
+                    f"Subscriber fell {self.maxsize} items behind"))
+                return False
+            self._broadcaster._dropped(self._queue.get_nowait())
+            self._pending -= 1
+        self._queue.put_nowait(item)
+        self._pending += 1
+        return True
+
+    def _close(self, error: Optional[Exception] = None):
+        if self.closed:
+            return
+        self.closed = True
+        self.error = error
+        if error is not None:
+            # Report the disconnect right away instead of after the backlog
+            while not self._queue.empty():
+                self._broadcaster._dropped(self._queue.get_nowait())
+            self._pending = 0
+        self._queue.put_nowait(_CLOSED)
+        self._broadcaster._remove(self)
+
+    def close(self):
+        """Unsubscribe; queued items can still be consumed"""
+        self._close()
+
+    async def get(self):
+        """Next item; raises StopAsyncIteration when closed (or the disconnect error)"""
+        item = await self._queue.get()
+        if item is _CLOSED:
+            self._queue.put_nowait(_CLOSED)
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration
+        self._pending -= 1
+        self.delivered += 1
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def stats(self) -> dict:
+        return {
+            'policy': self.policy,
+            'maxsize': self.maxsize,
+            'pending': self._pending,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'closed': self.closed,
+        }
+
+
+class Broadcaster:
+    """Publishes items to all current subscriptions"""
+
+    def __init__(self, on_drop: Optional[Callable[[Any], None]] = None):
+        """Initialize with no subscribers
+
+        ``on_drop(item)`` is called for every item a subscriber lost
+        because its queue was full (e.g. to count drops in metrics).
+        """
+        self._subscribers: List[Subscription] = []
+        self.closed = False
+        self.published = 0
+        self.on_drop = on_drop
+
+    def subscribe(self, maxsize: int = 16, policy: str = DROP_OLDEST,
+                  predicate: Optional[Callable[[Any], bool]] = None) -> Subscription:
+        """New subscription receiving items published from now on"""
+        subscription = Subscription(self, maxsize, policy, predicate)
+        if self.closed:
+            subscription._close()
+        else:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def _remove(self, subscription: Subscription):
+        if subscription in self._subscribers:
+            # Copy on write: publish() may be iterating the old list
+            self._subscribers = [s for s in self._subscribers if s is not subscription]
+
+    def _dropped(self, item):
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def subscriptions(self) -> List[Subscription]:
+        return list(self._subscribers)
+
+    @property
+    def pending(self) -> int:
+        """Items waiting in all subscriber queues"""
+        return sum(s.pending for s in self._subscribers)
+
+    def publish(self, item) -> int:
+        """Offer an item to every subscriber; returns how many queued it"""
+        self.published += 1
+        return sum(s.offer(item) for s in self._subscribers)
+
+    def publish_threadsafe(self, loop: asyncio.AbstractEventLoop, item):
+        """Publish from a thread other than the loop's"""
+        loop.call_soon_threadsafe(self.publish, item)
+
+    def close(self):
+        """End all subscriptions (consumers finish their queued items)"""
+        self.closed = True
+        for subscription in list(self._subscribers):
+            subscription._close()
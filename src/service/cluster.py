@@ -0,0 +1,861 @@
+"""
+Cluster Mode
+============
+
+Spreads cameras over several worker processes or hosts. Three roles talk
+over a pub/sub :class:`Transport`:
+
+- :class:`Coordinator` tracks live workers by heartbeat and shards the
+  cameras over them with a :class:`HashRing` (consistent hashing: a worker
+  joining or leaving only moves the cameras of its ring segments)
+- :class:`ClusterWorker` runs a :class:`DetectionService` for its share,
+  hands a moving camera's fall detector state over to the new owner and
+  publishes its results and events
+- :class:`ResultAggregator` merges every worker's results and events into
+  one feed (and optionally the central event store)
+
+Topics: ``heartbeat``, ``assignment``, ``handoff``, ``results``, ``events``.
+Messages are JSON objects. :class:`InProcessTransport` runs everything in
+one event loop; it still JSON-encodes every message so state that would not
+survive the wire fails here too. Across processes and hosts every role
+connects a :class:`SocketTransport` to one :class:`MessageBroker`, which
+relays newline-delimited JSON over TCP.
+
+Run one process per role, all reading the 'cluster' config section:
+
+    python -m src.service.cluster broker
+    python -m src.service.cluster coordinator --camera room-1=rtsp://cam-1/stream
+    python -m src.service.cluster worker --node-id worker-1
+    python -m src.service.cluster aggregator
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import signal
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.core.pipeline import StreamPipeline
+from src.utils.error_handler import error_handler
+
+from .broadcast import DISCONNECT, DROP_OLDEST, Broadcaster, Subscription
+from .detection_service import DetectionService, result_to_json
+from .preview_server import DEFAULT_CONFIG, load_config, make_detector, parse_camera
+
+
+HEARTBEAT = 'heartbeat'
+ASSIGNMENT = 'assignment'
+HANDOFF = 'handoff'
+RESULTS = 'results'
+EVENTS = 'events'
+
+# Longest line (one JSON message) a broker connection accepts
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+def cluster_section(config: dict) -> Dict:
+    return config.get('cluster', config)
+
+
+class HashRing:
+    """Consistent hash ring with ``replicas`` virtual points per node"""
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 100):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+    def add(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.replicas):
+            point = self._hash(f"{node}#{i}")
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove(self, node: str):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        for i in range(self.replicas):
+            point = self._hash(f"{node}#{i}")
+            if self._owners.get(point) == node:
+                del self._owners[point]
+                self._points.remove(point)
+
+    def node_for(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, self._hash(str(key))) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, str]:
+        return {str(key): self.node_for(key) for key in keys}
+
+
+class Transport:
+    """Pub/sub message bus between coordinator, workers and aggregator"""
+
+    def publish(self, topic: str, message: Dict):
+        raise NotImplementedError
+
+    def subscribe(self, topic: str, maxsize: int = 256,
+                  policy: str = DISCONNECT) -> Subscription:
+        """Async-iterable subscription to messages published from now on"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InProcessTransport(Transport):
+    """Transport within one event loop (tests, single-host clusters)"""
+
+    def __init__(self):
+        self.topics: Dict[str, Broadcaster] = {}
+        self.published: Dict[str, int] = {}
+
+    def _topic(self, topic: str) -> Broadcaster:
+        broadcaster = self.topics.get(topic)
+        if broadcaster is None:
+            broadcaster = self.topics[topic] = Broadcaster()
+        return broadcaster
+
+    def publish(self, topic: str, message: Dict):
+        # Round-trip through JSON like a real broker would
+        self.published[topic] = self.published.get(topic, 0) + 1
+        self._topic(topic).publish(json.loads(json.dumps(message)))
+
+    def subscribe(self, topic: str, maxsize: int = 256,
+                  policy: str = DISCONNECT) -> Subscription:
+        return self._topic(topic).subscribe(maxsize, policy)
+
+    def close(self):
+        for broadcaster in self.topics.values():
+            broadcaster.close()
+
+
+def encode_message(message: Dict) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class MessageBroker:
+    """TCP relay between the SocketTransports of a cluster
+
+    Clients send ``{"op": "subscribe", "topic": ...}`` and ``{"op":
+    "publish", "topic": ..., "message": ...}`` lines; every published
+    message goes to all connections subscribed to its topic, the sender
+    included. A connection whose unsent output exceeds ``max_buffer_bytes``
+    loses messages instead of holding up the others.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8790,
+                 max_buffer_bytes: int = 8 * 1024 * 1024):
+        self.host = host
+        self.port = port
+        self.max_buffer_bytes = max_buffer_bytes
+        # writer -> subscribed topics
+        self.clients: Dict[asyncio.StreamWriter, set] = {}
+        self.relayed = 0
+        self.dropped = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'MessageBroker':
+        """Create broker listening on the 'cluster' section's broker address"""
+        section = cluster_section(config)
+        kwargs = {'host': section.get('broker_host', '127.0.0.1'),
+                  'port': section.get('broker_port', 8790)}
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    async def start(self) -> int:
+        """Start listening; returns the bound port"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=MAX_MESSAGE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        error_handler.log_info(f"Cluster broker listening on {self.host}:{self.port}")
+        return self.port
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        connections = list(self._connections)
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        self.clients[writer] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                if request['op'] == 'subscribe':
+                    self.clients[writer].add(request['topic'])
+                elif request['op'] == 'publish':
+                    self._relay(request['topic'], encode_message(
+                        {'topic': request['topic'], 'message': request['message']}))
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        except (ValueError, KeyError) as e:
+            error_handler.log_error(f"Cluster broker dropped a client: {str(e)}", e)
+        finally:
+            self.clients.pop(writer, None)
+            self._connections.discard(task)
+            writer.close()
+
+    def _relay(self, topic: str, line: bytes):
+        for writer, topics in list(self.clients.items()):
+            if topic not in topics:
+                continue
+            if writer.transport.get_write_buffer_size() > self.max_buffer_bytes:
+                self.dropped += 1
+                continue
+            writer.write(line)
+            self.relayed += 1
+
+
+class SocketTransport(Transport):
+    """Transport through a :class:`MessageBroker` (other processes or hosts)
+
+    Subscriptions fan out locally, so the roles of one process share a
+    single connection. A lost connection is re-established every
+    ``reconnect_delay`` seconds and resubscribes; messages published while
+    disconnected are dropped and counted.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8790,
+                 reconnect_delay: float = 1.0):
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self.topics: Dict[str, Broadcaster] = {}
+        self.published: Dict[str, int] = {}
+        self.dropped = 0
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connected: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'SocketTransport':
+        """Create transport to the 'cluster' section's broker address"""
+        section = cluster_section(config)
+        kwargs = {'host': section.get('broker_host', '127.0.0.1'),
+                  'port': section.get('broker_port', 8790)}
+        if 'reconnect_delay' in section:
+            kwargs['reconnect_delay'] = section['reconnect_delay']
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    async def connect(self, timeout: float = 10.0):
+        """Connect to the broker (and keep reconnecting until close())"""
+        if self._task is None:
+            self._connected = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name='cluster-transport')
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"No cluster broker at {self.host}:{self.port}") from None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port,
+                                                               limit=MAX_MESSAGE_BYTES)
+            except OSError as e:
+                error_handler.log_warning(
+                    f"Cluster broker {self.host}:{self.port} unreachable: {str(e)}")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            for topic in self.topics:
+                writer.write(encode_message({'op': 'subscribe', 'topic': topic}))
+            self._writer = writer
+            self._connected.set()
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    envelope = json.loads(line)
+                    broadcaster = self.topics.get(envelope['topic'])
+                    if broadcaster is not None:
+                        broadcaster.publish(envelope['message'])
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                self._writer = None
+                self._connected.clear()
+                writer.close()
+            error_handler.log_warning(f"Lost cluster broker {self.host}:{self.port}; reconnecting")
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _send(self, request: Dict) -> bool:
+        if self._writer is None:
+            return False
+        self._writer.write(encode_message(request))
+        return True
+
+    def publish(self, topic: str, message: Dict):
+        self.published[topic] = self.published.get(topic, 0) + 1
+        if not self._send({'op': 'publish', 'topic': topic, 'message': message}):
+            self.dropped += 1
+
+    def subscribe(self, topic: str, maxsize: int = 256,
+                  policy: str = DISCONNECT) -> Subscription:
+        broadcaster = self.topics.get(topic)
+        if broadcaster is None:
+            broadcaster = self.topics[topic] = Broadcaster()
+            self._send({'op': 'subscribe', 'topic': topic})
+        return broadcaster.subscribe(maxsize, policy)
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for broadcaster in self.topics.values():
+            broadcaster.close()
+
+
+class Coordinator:
+    """Shards cameras over live workers and reassigns them on membership changes"""
+
+    def __init__(self, transport: Transport,
+                 heartbeat_timeout: float = 5.0,
+                 check_interval: float = 1.0,
+                 replicas: int = 100):
+        self.transport = transport
+        self.heartbeat_timeout = heartbeat_timeout
+        self.check_interval = check_interval
+        self.ring = HashRing(replicas=replicas)
+        # camera_id -> source (path, URL or device index; must be JSON)
+        self.cameras: Dict[str, object] = {}
+        self.assignments: Dict[str, str] = {}
+        self.epoch = 0
+        self.last_seen: Dict[str, float] = {}
+        self.node_status: Dict[str, Dict] = {}
+        # Workers that announced they are leaving: off the ring, but still
+        # alive to hand their cameras over
+        self.leaving = set()
+        self._tasks: List[asyncio.Task] = []
+        self._published_at = 0.0
+
+    @classmethod
+    def from_config(cls, transport: Transport, config: dict, **overrides) -> 'Coordinator':
+        """Create coordinator with the 'cluster' section of a YAML config;
+        its 'cameras' (camera_id: source) are added"""
+        section = cluster_section(config)
+        kwargs = {key: section[key] for key in ('heartbeat_timeout', 'check_interval', 'replicas')
+                  if key in section}
+        kwargs.update(overrides)
+        coordinator = cls(transport, **kwargs)
+        for camera_id, source in (section.get('cameras') or {}).items():
+            coordinator.add_camera(camera_id, source)
+        return coordinator
+
+    # -- cameras ---------------------------------------------------------
+
+    def add_camera(self, camera_id, source):
+        self.cameras[str(camera_id)] = source
+        self.rebalance()
+
+    def remove_camera(self, camera_id):
+        if self.cameras.pop(str(camera_id), None) is not None:
+            self.rebalance()
+
+    # -- membership ------------------------------------------------------
+
+    def on_heartbeat(self, message: Dict, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        node_id = message['node_id']
+        if message.get('leaving'):
+            if node_id in self.ring.nodes:
+                self.leaving.add(node_id)
+                self.ring.remove(node_id)
+                self.rebalance()
+            self.last_seen[node_id] = now
+            return
+        self.last_seen[node_id] = now
+        self.node_status[node_id] = message
+        if node_id not in self.ring.nodes and node_id not in self.leaving:
+            error_handler.log_info(f"Cluster worker joined: {node_id}")
+            self.ring.add(node_id)
+            self.rebalance()
+
+    def check(self, now: Optional[float] = None):
+        """Drop workers whose heartbeat is overdue; republish the assignment"""
+        now = time.monotonic() if now is None else now
+        expired = [node for node, seen in self.last_seen.items()
+                   if now - seen > self.heartbeat_timeout]
+        for node in expired:
+            error_handler.log_warning(f"Cluster worker lost: {node}")
+            del self.last_seen[node]
+            self.node_status.pop(node, None)
+            self.leaving.discard(node)
+            self.ring.remove(node)
+        if expired:
+            self.rebalance()
+        elif now - self._published_at >= self.heartbeat_timeout:
+            # Late subscribers catch up with the current epoch
+            self._publish_assignment({})
+
+    def rebalance(self):
+        """Assign every camera to a ring node and publish a new epoch"""
+        assignments = self.ring.assign(self.cameras)
+        # Owners still alive (including leaving ones) hand their state over
+        previous = {camera_id: owner for camera_id, owner in self.assignments.items()
+                    if owner in self.last_seen and assignments.get(camera_id) not in (None, owner)}
+        self.assignments = {camera_id: node for camera_id, node in assignments.items()
+                            if node is not None}
+        self.epoch += 1
+        self._publish_assignment(previous)
+
+    def _publish_assignment(self, previous: Dict[str, str]):
+        self._published_at = time.monotonic()
+        self.transport.publish(ASSIGNMENT, {
+            'epoch': self.epoch,
+            'assignments': self.assignments,
+            'sources': {camera_id: self.cameras[camera_id] for camera_id in self.assignments},
+            'previous': previous,
+        })
+
+    # -- lifecycle -------------------------------------------------------
+
+    async def start(self):
+        heartbeats = self.transport.subscribe(HEARTBEAT, policy=DROP_OLDEST)
+        self._tasks = [
+            asyncio.create_task(self._consume(heartbeats), name='coordinator-heartbeats'),
+            asyncio.create_task(self._check_loop(), name='coordinator-check'),
+        ]
+
+    async def _consume(self, heartbeats: Subscription):
+        async for message in heartbeats:
+            self.on_heartbeat(message)
+
+    async def _check_loop(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            self.check()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def status(self) -> Dict:
+        return {
+            'epoch': self.epoch,
+            'nodes': sorted(self.ring.nodes),
+            'leaving': sorted(self.leaving),
+            'assignments': dict(self.assignments),
+        }
+
+
+class ClusterWorker:
+    """Runs the cameras a coordinator assigns to ``node_id``"""
+
+    def __init__(self, node_id: str, transport: Transport,
+                 detector_factory: Callable[[str], object],
+                 capture_factory: Optional[Callable[[object], object]] = None,
+                 heartbeat_interval: float = 1.0,
+                 handoff_timeout: float = 5.0,
+                 publish_results: bool = True,
+                 realtime: bool = False,
+                 service: Optional[DetectionService] = None,
+                 **pipeline_kwargs):
+        """Initialize worker
+
+        ``detector_factory(camera_id)`` returns the pose backend of a camera;
+        ``capture_factory(source)`` turns an assignment's JSON source into
+        what ``DetectionService.add_camera`` accepts (default: as is).
+        """
+        self.node_id = node_id
+        self.transport = transport
+        self.detector_factory = detector_factory
+        self.capture_factory = capture_factory or (lambda source: source)
+        self.heartbeat_interval = heartbeat_interval
+        self.handoff_timeout = handoff_timeout
+        self.publish_results = publish_results
+        self.realtime = realtime
+        self.pipeline_kwargs = pipeline_kwargs
+        self.service = service or DetectionService()
+        self.epoch = 0
+        # Cameras this worker should run as of the latest assignment
+        self.owned = set()
+        self.handoffs_sent = 0
+        self.handoffs_received = 0
+        # (camera_id, epoch) -> handed over state
+        self._handoffs: Dict[tuple, asyncio.Future] = {}
+        # camera_id -> latest start/stop task; tasks of one camera run in order
+        self._moves: Dict[str, asyncio.Task] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._forwarders: List[asyncio.Task] = []
+
+    @classmethod
+    def from_config(cls, transport: Transport, config: dict,
+                    detector_factory: Callable[[str], object], **overrides) -> 'ClusterWorker':
+        """Create worker with the 'cluster' section of a YAML config; its
+        service and camera pipelines use the rest of the config"""
+        section = cluster_section(config)
+        kwargs = {key: section[key] for key in ('node_id', 'heartbeat_interval',
+                                                'handoff_timeout', 'publish_results')
+                  if key in section}
+        kwargs.update(overrides)
+        kwargs.setdefault('service', DetectionService.from_config(config))
+        return cls(kwargs.pop('node_id'), transport, detector_factory, **kwargs)
+
+    # -- lifecycle -------------------------------------------------------
+
+    async def start(self):
+        await self.service.start()
+        # Subscribe before the first heartbeat so no assignment is missed
+        assignments = self.transport.subscribe(ASSIGNMENT, maxsize=16, policy=DROP_OLDEST)
+        handoffs = self.transport.subscribe(HANDOFF)
+        self._tasks = [
+            asyncio.create_task(self._consume_assignments(assignments)),
+            asyncio.create_task(self._consume_handoffs(handoffs)),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+        self._forwarders = [asyncio.create_task(
+            self._forward(self.service.subscribe_events(), EVENTS))]
+        if self.publish_results:
+            self._forwarders.append(asyncio.create_task(
+                self._forward(self.service.subscribe_results(maxsize=64), RESULTS)))
+
+    async def leave(self, timeout: float = 10.0):
+        """Hand every camera over to the remaining workers, then stop"""
+        self.transport.publish(HEARTBEAT, {'node_id': self.node_id, 'leaving': True})
+        deadline = time.monotonic() + timeout
+        while (self.owned or self._moves) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await self.stop()
+
+    async def stop(self):
+        moves = list(self._moves.values())
+        for task in moves:
+            task.cancel()
+        await asyncio.gather(*moves, return_exceptions=True)
+        self._moves.clear()
+        self.owned = set()
+        # Stopping the service closes its feeds, so the forwarders publish
+        # the final camera_stopped events and end on their own
+        await self.service.stop()
+        await asyncio.gather(*self._forwarders, return_exceptions=True)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._forwarders = [], []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    # -- messages --------------------------------------------------------
+
+    async def _heartbeat_loop(self):
+        while True:
+            self.transport.publish(HEARTBEAT, {
+                'node_id': self.node_id,
+                'timestamp': time.time(),
+                'epoch': self.epoch,
+                'cameras': self.service.status(),
+            })
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _forward(self, subscription: Subscription, topic: str):
+        async for item in subscription:
+            message = result_to_json(item) if topic == RESULTS else dict(item)
+            message['node_id'] = self.node_id
+            self.transport.publish(topic, message)
+
+    async def _consume_assignments(self, subscription: Subscription):
+        async for message in subscription:
+            if message['epoch'] <= self.epoch:
+                continue
+            self.epoch = message['epoch']
+            self.apply(message)
+
+    async def _consume_handoffs(self, subscription: Subscription):
+        async for message in subscription:
+            if message['to'] != self.node_id:
+                continue
+            future = self._handoff_future(message['camera_id'], message['epoch'])
+            if not future.done():
+                future.set_result(message['state'])
+
+    def _handoff_future(self, camera_id: str, epoch: int) -> asyncio.Future:
+        key = (camera_id, epoch)
+        future = self._handoffs.get(key)
+        if future is None:
+            future = self._handoffs[key] = asyncio.get_running_loop().create_future()
+        return future
+
+    def apply(self, message: Dict):
+        """Start and stop cameras to match an assignment"""
+        epoch = message['epoch']
+        assignments = message['assignments']
+        mine = {camera_id for camera_id, node in assignments.items() if node == self.node_id}
+        for key in [key for key in self._handoffs if key[1] < epoch]:
+            del self._handoffs[key]
+        for camera_id in self.owned - mine:
+            self._move(camera_id, lambda c=camera_id: self._release(c, assignments.get(c), epoch))
+        for camera_id in mine - self.owned:
+            self._move(camera_id, lambda c=camera_id: self._adopt(
+                c, message['sources'][c], message['previous'].get(c), epoch))
+        self.owned = mine
+
+    def _move(self, camera_id: str, start: Callable):
+        previous = self._moves.get(camera_id)
+
+        async def run():
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            try:
+                await start()
+            except Exception as e:
+                error_handler.log_error(f"Camera {camera_id} move failed on {self.node_id}: {str(e)}", e)
+
+        task = asyncio.create_task(run(), name=f"move-{camera_id}")
+        self._moves[camera_id] = task
+        task.add_done_callback(lambda _: self._moves.pop(camera_id, None)
+                               if self._moves.get(camera_id) is task else None)
+
+    async def _release(self, camera_id: str, new_owner: Optional[str], epoch: int):
+        camera = self.service.cameras.get(camera_id)
+        if camera is None:
+            return
+        await self.service.remove_camera(camera_id)
+        if new_owner is not None:
+            # Frame timestamps of live sources are this host's clock: no motion state
+            state = {'pipeline': camera.pipeline.get_state(motion=False),
+                     'fallen': {str(k): v for k, v in camera.fallen.items()}}
+            self.transport.publish(HANDOFF, {'camera_id': camera_id, 'epoch': epoch,
+                                             'from': self.node_id, 'to': new_owner,
+                                             'state': state})
+            self.handoffs_sent += 1
+        error_handler.log_info(f"Camera {camera_id} released by {self.node_id}")
+
+    async def _adopt(self, camera_id: str, source, previous_owner: Optional[str], epoch: int):
+        state = None
+        if previous_owner is not None:
+            try:
+                state = await asyncio.wait_for(self._handoff_future(camera_id, epoch),
+                                               self.handoff_timeout)
+                self.handoffs_received += 1
+            except asyncio.TimeoutError:
+                error_handler.log_warning(
+                    f"No handoff for camera {camera_id} from {previous_owner}; starting fresh")
+            finally:
+                self._handoffs.pop((camera_id, epoch), None)
+
+        pipeline_kwargs = {'metrics': self.service.metrics, **self.pipeline_kwargs}
+        pipeline = StreamPipeline.from_config(self.detector_factory(camera_id), self.service.config,
+                                              stream_id=camera_id, **pipeline_kwargs)
+        if state is not None:
+            pipeline.set_state(state['pipeline'])
+        camera = self.service.add_camera(camera_id, self.capture_factory(source),
+                                         pipeline=pipeline, realtime=self.realtime)
+        if state is not None:
+            # Already reported falls are not reported again
+            camera.fallen = {int(k): v for k, v in state['fallen'].items()}
+        error_handler.log_info(f"Camera {camera_id} started on {self.node_id}")
+
+
+class ResultAggregator:
+    """Central merge of every worker's results and fall events"""
+
+    def __init__(self, transport: Transport, event_store=None):
+        """``event_store`` (a FallEventStore) records fall_started events centrally"""
+        self.transport = transport
+        self.event_store = event_store
+        self.result_feed = Broadcaster()
+        self.event_feed = Broadcaster()
+        self.latest: Dict[str, Dict] = {}
+        self.owners: Dict[str, str] = {}
+        self.nodes: Dict[str, Dict] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self._tasks = [
+            asyncio.create_task(self._consume(self.transport.subscribe(RESULTS, policy=DROP_OLDEST),
+                                              self._on_result)),
+            asyncio.create_task(self._consume(self.transport.subscribe(EVENTS), self._on_event)),
+            asyncio.create_task(self._consume(self.transport.subscribe(ASSIGNMENT, policy=DROP_OLDEST),
+                                              self._on_assignment)),
+            asyncio.create_task(self._consume(self.transport.subscribe(HEARTBEAT, policy=DROP_OLDEST),
+                                              self._on_heartbeat)),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.result_feed.close()
+        self.event_feed.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    @staticmethod
+    async def _consume(subscription: Subscription, handler):
+        async for message in subscription:
+            handler(message)
+
+    def _on_result(self, result: Dict):
+        self.latest[result['camera_id']] = result
+        self.result_feed.publish(result)
+
+    def _on_event(self, event: Dict):
+        owner = self.owners.get(event['camera_id'])
+        if event['type'] == 'camera_stopped' and owner is not None and owner != event['node_id']:
+            # The camera moved to another worker; not an outage
+            return
+        if event['type'] == 'fall_started' and self.event_store is not None:
+            self.event_store.add_event(event['camera_id'], event['person_id'], event['confidence'],
+                                       episode_start=event['episode_start'])
+        self.event_feed.publish(event)
+
+    def _on_assignment(self, message: Dict):
+        self.owners = dict(message['assignments'])
+
+    def _on_heartbeat(self, message: Dict):
+        if message.get('leaving'):
+            return
+        self.nodes[message['node_id']] = message
+
+    def status(self) -> Dict[str, Dict]:
+        """Latest per-camera summary across the cluster"""
+        return {camera_id: {
+            'node_id': result['node_id'],
+            'frame_index': result['frame_index'],
+            'people': len(result['people']),
+            'fall_detected': result['fall_detected'],
+            'max_confidence': result['max_confidence'],
+        } for camera_id, result in self.latest.items()}
+
+
+async def _until_cancelled():
+    await asyncio.Event().wait()
+
+
+async def run_role(args: argparse.Namespace, config: Dict):
+    """Run one cluster role until cancelled"""
+    section = cluster_section(config)
+    if args.role == 'broker':
+        async with MessageBroker.from_config(config, **({'port': args.port} if args.port else {})):
+            await _until_cancelled()
+        return
+
+    transport = SocketTransport.from_config(config, **({'port': args.port} if args.port else {}))
+    await transport.connect()
+    try:
+        if args.role == 'coordinator':
+            async with Coordinator.from_config(transport, config) as coordinator:
+                for index, spec in enumerate(args.camera or []):
+                    coordinator.add_camera(*parse_camera(spec, index))
+                await _until_cancelled()
+        elif args.role == 'worker':
+            overrides = {'node_id': args.node_id} if args.node_id else {}
+            worker = ClusterWorker.from_config(
+                transport, config, lambda camera_id: make_detector(args.backend, config),
+                realtime=True, **overrides)
+            await worker.start()
+            try:
+                await _until_cancelled()
+            finally:
+                # Hand the cameras over instead of letting them time out
+                await worker.leave(timeout=section.get('handoff_timeout', 5.0))
+        else:
+            from src.utils.event_store import FallEventStore
+            store = FallEventStore.from_config(config)
+            async with ResultAggregator(transport, event_store=store) as aggregator:
+                async for event in aggregator.event_feed.subscribe(maxsize=256, policy=DROP_OLDEST):
+                    error_handler.log_info(f"Cluster event {event['type']}: camera "
+                                           f"{event['camera_id']} on {event['node_id']}")
+    finally:
+        transport.close()
+
+
+async def _serve(args: argparse.Namespace, config: Dict):
+    task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+    try:
+        await run_role(args, config)
+    except asyncio.CancelledError:
+        pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fall detection cluster node")
+    parser.add_argument('role', choices=['broker', 'coordinator', 'worker', 'aggregator'])
+    parser.add_argument('--config', default=DEFAULT_CONFIG,
+                        help="YAML config; its 'cluster' section configures every role")
+    parser.add_argument('--port', type=int, default=None,
+                        help="Broker port (overrides cluster.broker_port)")
+    parser.add_argument('--node-id', default=None, help="Worker name (overrides cluster.node_id)")
+    parser.add_argument('--camera', action='append',
+                        help="Coordinator camera as id=source, besides cluster.cameras; repeatable")
+    parser.add_argument('--backend', choices=['yolo', 'mediapipe'], default='yolo')
+    args = parser.parse_args(argv)
+    config = load_config(args.config)
+    error_handler.apply_config(config)
+    try:
+        asyncio.run(_serve(args, config))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,413 @@
+"""
+Detection Service
+=================
+
+asyncio API over one :class:`StreamPipeline` per camera. Frames are read
+and processed on a shared thread pool (one step at a time per camera), and
+results are fanned out from the event loop, so any number of consumers
+(nurse-call bridges, dashboards, the preview server) can follow many
+cameras from a single loop without a thread per consumer:
+
+    async with DetectionService() as service:
+        service.add_camera('room-12', 'rtsp://...', detector)
+        async for event in service.events():
+            notify(event)
+
+Two feeds are published:
+
+- per-frame results (``type: 'frame'``), by default bounded to a few items
+  and dropping the oldest, so slow viewers see the latest state
+- fall events (``fall_started``/``fall_ended``/``camera_stopped``), by
+  default disconnecting a consumer that falls far behind instead of
+  losing events silently
+
+With an :class:`InferenceScheduler`, frames of cameras that are over
+their allocated rate are grabbed and dropped before inference. With a
+:class:`CameraSessionManager`, live cameras (device indices, RTSP and
+similar stream URLs) reconnect with backoff instead of ending their stream.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import cv2
+
+from src.core.pipeline import StreamClock, StreamPipeline
+from src.utils.camera_sessions import CameraSessionManager, is_live_source
+from src.utils.error_handler import error_handler
+
+from .broadcast import DISCONNECT, DROP_OLDEST, Broadcaster, Subscription
+from .scheduler import InferenceScheduler
+
+
+def result_to_json(result: Dict) -> Dict:
+    """JSON-serializable copy of a published result (without the frame)"""
+    out = {key: value for key, value in result.items() if key not in ('frame', 'people')}
+    out['max_confidence'] = float(out.get('max_confidence', 0.0))
+    out['people'] = [{
+        'person_id': person['person_id'],
+        'bbox': list(person['bbox']) if person['bbox'] else None,
+        'is_fallen': bool(person['is_fallen']),
+        'confidence': float(person['confidence']),
+        'fall_start_time': person['fall_start_time'],
+        'keypoints': {name: [int(v) for v in point] for name, point in person['keypoints'].items()},
+    } for person in result.get('people', [])]
+    return out
+
+
+class CameraWorker:
+    """Capture and pipeline of one camera; step() runs on the thread pool"""
+
+    def __init__(self, camera_id: str, source, pipeline: StreamPipeline,
+                 realtime: bool = False,
+                 sessions: Optional[CameraSessionManager] = None):
+        """``source`` is a path/URL/device index or an opened capture-like object;
+        live sources are opened through ``sessions`` when given"""
+        self.camera_id = camera_id
+        self.source = source
+        self.pipeline = pipeline
+        self.realtime = realtime
+        self.sessions = sessions
+        self.capture = None
+        self.clock: Optional[StreamClock] = None
+        self.frames = 0
+        self.running = False
+        self.stopping = False
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.last_result: Optional[Dict] = None
+        self.process_seconds: Optional[float] = None
+        # person_id -> is_fallen, for fall_started/fall_ended transitions
+        self.fallen: Dict[int, bool] = {}
+
+    def open(self):
+        if hasattr(self.source, 'read'):
+            self.capture = self.source
+        elif self.sessions is not None and is_live_source(self.source):
+            self.capture = self.sessions.open(self.camera_id, self.source)
+        else:
+            self.capture = cv2.VideoCapture(self.source)
+            if not self.capture.isOpened():
+                raise IOError(f"Cannot open video source: {self.source}")
+        self.clock = StreamClock(self.capture)
+
+    def step(self) -> Optional[Dict]:
+        """Read and process one frame; None at the end of the stream"""
+        ok, frame = self.capture.read()
+        if not ok or frame is None:
+            return None
+        timestamp = self.clock()
+        start = time.perf_counter()
+        result = self.pipeline.process(self.pipeline.resize(frame), timestamp)
+        self.process_seconds = time.perf_counter() - start
+        result['type'] = 'frame'
+        result['camera_id'] = self.camera_id
+        result['timestamp'] = timestamp
+        self.frames += 1
+        return result
+
+    def skip(self) -> Optional[float]:
+        """Drop one frame without decoding it if possible; its timestamp,
+        or None at the end of the stream"""
+        grab = getattr(self.capture, 'grab', None)
+        if grab is not None:
+            ok = grab()
+        else:
+            ok, frame = self.capture.read()
+            ok = ok and frame is not None
+        return self.clock() if ok else None
+
+    def interrupt(self):
+        """Wake a read waiting for a reconnecting camera (session captures)"""
+        interrupt = getattr(self.capture, 'interrupt', None)
+        if interrupt is not None:
+            interrupt()
+
+    def release(self):
+        release = getattr(self.capture, 'release', None)
+        if release is not None:
+            release()
+
+    def status(self) -> Dict:
+        last = self.last_result or {}
+        session = getattr(self.capture, 'session', None)
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            'camera_id': self.camera_id,
+            'running': self.running,
+            'error': self.error,
+            'frames': self.frames,
+            'fps': self.frames / elapsed if elapsed > 0 else 0.0,
+            'people': len(last.get('people', [])),
+            'fall_detected': last.get('fall_detected', False),
+            'max_confidence': float(last.get('max_confidence', 0.0)),
+            # Connection health of cameras opened through camera sessions
+            'connection': session.health if session is not None else None,
+        }
+
+
+class DetectionService:
+    """Runs camera pipelines and publishes results and fall events"""
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 event_store=None, metrics=None,
+                 scheduler: Optional[InferenceScheduler] = None,
+                 camera_sessions: Optional[CameraSessionManager] = None):
+        """Initialize service
+
+        ``event_store`` (a FallEventStore) records every fall_started event
+        with the same de-duplication as the app. ``scheduler`` limits each
+        camera's inference rate (register camera weights on it with
+        ``scheduler.add`` before or after ``add_camera``).
+        ``camera_sessions`` connects the live cameras; the service starts
+        and stops it.
+        """
+        self.max_workers = max_workers
+        self.event_store = event_store
+        self.metrics = metrics
+        self.scheduler = scheduler
+        self.camera_sessions = camera_sessions
+        # Pipelines built by add_camera take their detection settings from here
+        self.config: Dict = {}
+        self.cameras: Dict[str, CameraWorker] = {}
+        self.result_feed = Broadcaster(on_drop=lambda item: self._dropped('frames', 'results', item))
+        self.event_feed = Broadcaster(on_drop=lambda item: self._dropped('events', 'events', item))
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._running = False
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'DetectionService':
+        """Create service with the camera sessions of a YAML config's 'camera'
+        section and, when enabled there, the scheduler of its 'scheduler'
+        section; pipelines of ``add_camera`` use its 'detection' section"""
+        overrides.setdefault('camera_sessions', CameraSessionManager.from_config(config))
+        if 'scheduler' not in overrides and config.get('scheduler', {}).get('enabled'):
+            overrides['scheduler'] = InferenceScheduler.from_config(config)
+        service = cls(**overrides)
+        service.config = config
+        return service
+
+    # -- lifecycle -------------------------------------------------------
+
+    async def start(self):
+        """Start processing all added cameras"""
+        if self._running:
+            return
+        self._running = True
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='pipeline')
+        if self.camera_sessions is not None:
+            self.camera_sessions.start()
+        for camera in self.cameras.values():
+            self._start_camera(camera)
+
+    async def stop(self):
+        """Stop all cameras and end every subscription"""
+        for camera in self.cameras.values():
+            camera.stopping = True
+            camera.interrupt()
+        await self.join()
+        self._running = False
+        if self.camera_sessions is not None:
+            self.camera_sessions.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.result_feed.close()
+        self.event_feed.close()
+
+    async def join(self):
+        """Wait until every camera stream has ended"""
+        tasks = list(self._tasks.values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    # -- cameras ---------------------------------------------------------
+
+    def add_camera(self, camera_id: str, source, detector=None,
+                   pipeline: Optional[StreamPipeline] = None,
+                   realtime: bool = False, **pipeline_kwargs) -> CameraWorker:
+        """Add a camera; it starts right away when the service is running.
+
+        Either pass a ready ``pipeline`` or a pose ``detector`` plus
+        StreamPipeline keyword arguments. ``realtime`` paces file sources
+        to their timestamps instead of processing as fast as possible.
+        """
+        camera_id = str(camera_id)
+        if camera_id in self.cameras:
+            raise ValueError(f"Camera already added: {camera_id}")
+        if pipeline is None:
+            if detector is None:
+                raise ValueError("Either detector or pipeline is required")
+            pipeline_kwargs.setdefault('metrics', self.metrics)
+            pipeline = StreamPipeline.from_config(detector, self.config, stream_id=camera_id,
+                                                  **pipeline_kwargs)
+        camera = self.cameras[camera_id] = CameraWorker(camera_id, source, pipeline, realtime,
+                                                          self.camera_sessions)
+        if self.scheduler is not None:
+            self.scheduler.add(camera_id)
+        if self._running:
+            self._start_camera(camera)
+        return camera
+
+    async def remove_camera(self, camera_id: str):
+        """Stop a camera and forget it"""
+        camera = self.cameras.get(camera_id)
+        if camera is None:
+            return
+        camera.stopping = True
+        camera.interrupt()
+        task = self._tasks.get(camera_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        self.cameras.pop(camera_id, None)
+        if self.scheduler is not None:
+            self.scheduler.remove(camera_id)
+
+    def _start_camera(self, camera: CameraWorker):
+        camera.stopping = False
+        self._tasks[camera.camera_id] = asyncio.get_running_loop().create_task(
+            self._run_camera(camera), name=f"camera-{camera.camera_id}")
+
+    async def _run_camera(self, camera: CameraWorker):
+        loop = asyncio.get_running_loop()
+        camera.running = True
+        camera.error = None
+        camera.started_at = time.monotonic()
+        # (first frame timestamp, monotonic time it was reached) for pacing
+        paced_from = None
+        try:
+            await loop.run_in_executor(self._executor, camera.open)
+            while not camera.stopping:
+                if self.scheduler is not None and not self.scheduler.acquire(camera.camera_id):
+                    timestamp = await loop.run_in_executor(self._executor, camera.skip)
+                    if timestamp is None:
+                        break
+                    if self.metrics is not None:
+                        self.metrics.inc('frames_skipped_total', stream=camera.camera_id,
+                                         reason='scheduler')
+                else:
+                    result = await loop.run_in_executor(self._executor, camera.step)
+                    if result is None:
+                        break
+                    if self.scheduler is not None:
+                        self.scheduler.observe(camera.camera_id, result, camera.process_seconds)
+                    self._publish(camera, result)
+                    timestamp = result['timestamp']
+                if camera.realtime:
+                    if paced_from is None:
+                        paced_from = (timestamp, time.monotonic())
+                    delay = (timestamp - paced_from[0]) - (time.monotonic() - paced_from[1])
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                else:
+                    # Let consumers run between frames
+                    await asyncio.sleep(0)
+        except Exception as e:
+            camera.error = str(e)
+            error_handler.log_error(f"Camera {camera.camera_id} failed: {str(e)}", e)
+        finally:
+            camera.running = False
+            if camera.capture is not None:
+                await loop.run_in_executor(self._executor, camera.release)
+            self.event_feed.publish({
+                'type': 'camera_stopped',
+                'camera_id': camera.camera_id,
+                'timestamp': time.time(),
+                'error': camera.error,
+            })
+
+    def _dropped(self, kind: str, queue: str, item: Dict):
+        if self.metrics is not None:
+            self.metrics.inc(f'{kind}_dropped_total', stream=item.get('camera_id', ''), queue=queue)
+
+    def _observe_queues(self):
+        if self.metrics is not None:
+            self.metrics.set_gauge('queue_depth', self.result_feed.pending, queue='results')
+            self.metrics.set_gauge('queue_depth', self.event_feed.pending, queue='events')
+
+    def _publish(self, camera: CameraWorker, result: Dict):
+        camera.last_result = result
+        self.result_feed.publish(result)
+        self._observe_queues()
+        if not (result['processed'] or result.get('predicted')):
+            return
+        for person in result['people']:
+            person_id = person['person_id']
+            was_fallen = camera.fallen.get(person_id, False)
+            if person['is_fallen'] == was_fallen:
+                continue
+            camera.fallen[person_id] = person['is_fallen']
+            event = {
+                'type': 'fall_started' if person['is_fallen'] else 'fall_ended',
+                'camera_id': camera.camera_id,
+                'person_id': person_id,
+                'timestamp': result['timestamp'],
+                'frame_index': result['frame_index'],
+                'confidence': float(person['confidence']),
+                'episode_start': person['fall_start_time'],
+            }
+            if person['is_fallen'] and self.event_store is not None:
+                self.event_store.add_event(camera.camera_id, person_id, person['confidence'],
+                                           episode_start=person['fall_start_time'])
+            self.event_feed.publish(event)
+
+    # -- consumers -------------------------------------------------------
+
+    @staticmethod
+    def _camera_filter(camera_id: Optional[str]) -> Optional[Callable[[Any], bool]]:
+        if camera_id is None:
+            return None
+        camera_id = str(camera_id)
+        return lambda item: item.get('camera_id') == camera_id
+
+    def subscribe_results(self, camera_id: Optional[str] = None, maxsize: int = 4,
+                          policy: str = DROP_OLDEST) -> Subscription:
+        """Subscription to per-frame results (all cameras or one)"""
+        return self.result_feed.subscribe(maxsize, policy, self._camera_filter(camera_id))
+
+    def subscribe_events(self, camera_id: Optional[str] = None, maxsize: int = 256,
+                         policy: str = DISCONNECT) -> Subscription:
+        """Subscription to fall and camera events (all cameras or one)"""
+        return self.event_feed.subscribe(maxsize, policy, self._camera_filter(camera_id))
+
+    async def results(self, camera_id: Optional[str] = None, maxsize: int = 4,
+                      policy: str = DROP_OLDEST) -> AsyncIterator[Dict]:
+        """Async generator of per-frame results"""
+        subscription = self.subscribe_results(camera_id, maxsize, policy)
+        try:
+            async for result in subscription:
+                yield result
+        finally:
+            subscription.close()
+
+    async def events(self, camera_id: Optional[str] = None, maxsize: int = 256,
+                     policy: str = DISCONNECT) -> AsyncIterator[Dict]:
+        """Async generator of fall and camera events"""
+        subscription = self.subscribe_events(camera_id, maxsize, policy)
+        try:
+            async for event in subscription:
+                yield event
+        finally:
+            subscription.close()
+
+    def status(self) -> Dict[str, Dict]:
+        """Per-camera state for dashboards"""
+        self._observe_queues()
+        status = {camera_id: camera.status() for camera_id, camera in self.cameras.items()}
+        if self.scheduler is not None:
+            for camera_id, schedule in self.scheduler.status().items():
+                if camera_id in status:
+                    status[camera_id]['inference_fps'] = schedule['rate']
+                    status[camera_id]['priority'] = schedule['priority']
+        return status
@@ -0,0 +1,516 @@
+"""
+Preview Server
+==============
+
+Local HTTP server for remote viewing of a :class:`DetectionService`, built
+on asyncio streams only (no web framework dependency):
+
+- ``GET /``: page with the preview of every camera
+- ``GET /status``: JSON camera status and viewer counts
+- ``GET /cameras/<id>/mjpeg?fps=N``: annotated MJPEG preview
+- ``GET /cameras/<id>/snapshot.jpg``: latest annotated frame
+- ``GET /events[?camera=<id>]``: WebSocket channel of fall events (JSON text)
+
+Each camera's frames are JPEG-encoded once, at most ``max_fps`` times a
+second and only while somebody is watching; all viewers share the encoded
+bytes. Every viewer is throttled to its own frame rate and always gets the
+newest frame, so a slow connection skips frames instead of delaying other
+viewers or inference.
+
+Run standalone (settings from the 'preview_server', 'scheduler' and
+'camera' config sections; command line options override them):
+
+    python -m src.service.preview_server --camera room-1=video.mp4 --backend mediapipe
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import html
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import cv2
+import numpy as np
+
+from src.utils.error_handler import error_handler
+
+from .broadcast import SlowConsumerError
+from .detection_service import DetectionService
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+MAX_HEADER_BYTES = 16 * 1024
+MAX_CLIENT_MESSAGE = 64 * 1024
+BOUNDARY = b'frame'
+
+# 'preview_server' config keys that are PreviewServer arguments
+SERVER_OPTIONS = ('host', 'port', 'jpeg_quality', 'max_fps', 'viewer_fps')
+
+STATUS_TEXT = {
+    101: 'Switching Protocols',
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    503: 'Service Unavailable',
+}
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 80) -> Optional[bytes]:
+    """JPEG bytes of a BGR frame, None if encoding fails"""
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    return buffer.tobytes() if ok else None
+
+
+def websocket_accept(key: str) -> str:
+    """Sec-WebSocket-Accept value for a client key (RFC 6455)"""
+    digest = hashlib.sha1((key + WEBSOCKET_GUID).encode('ascii')).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def websocket_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """Unmasked, unfragmented server frame"""
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 1 << 16:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, 'big')
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, 'big')
+    return header + payload
+
+
+def websocket_close_frame(code: int = 1000, reason: str = '') -> bytes:
+    return websocket_frame(code.to_bytes(2, 'big') + reason.encode('utf-8')[:120], opcode=0x8)
+
+
+async def read_websocket_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """(opcode, payload) of the next client frame"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), 'big')
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), 'big')
+    if length > MAX_CLIENT_MESSAGE:
+        raise ConnectionError(f"WebSocket message too large: {length} bytes")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None:
+        payload = bytes(b ^ mask[i & 3] for i, b in enumerate(payload))
+    return first & 0x0F, payload
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Dict]:
+    """Method, path, query and headers of an HTTP request; None if malformed"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split()
+    if len(parts) != 3:
+        return None
+    url = urlsplit(parts[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    return {
+        'method': parts[0].upper(),
+        'path': unquote(url.path),
+        'query': dict(parse_qsl(url.query)),
+        'headers': headers,
+    }
+
+
+class CameraFeed:
+    """JPEG frames of one camera, encoded once and shared by all viewers"""
+
+    def __init__(self, service: DetectionService, camera_id: str,
+                 jpeg_quality: int = 80, max_fps: float = 15.0):
+        """Initialize feed (encoding starts with :meth:`start`)"""
+        self.service = service
+        self.camera_id = camera_id
+        self.jpeg_quality = jpeg_quality
+        self.max_fps = max_fps
+        self.jpeg: Optional[bytes] = None
+        self.sequence = 0
+        self.viewers = 0
+        self.closed = False
+        self._condition = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), name=f"feed-{self.camera_id}")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        next_encode = 0.0
+        # Latest result only: frames arriving while encoding are skipped
+        subscription = self.service.subscribe_results(self.camera_id, maxsize=1)
+        try:
+            async for result in subscription:
+                now = time.monotonic()
+                if self.viewers == 0 or now < next_encode:
+                    continue
+                next_encode = now + interval
+                jpeg = await loop.run_in_executor(None, encode_jpeg, result['frame'],
+                                                  self.jpeg_quality)
+                if jpeg is None:
+                    continue
+                async with self._condition:
+                    self.jpeg = jpeg
+                    self.sequence += 1
+                    self._condition.notify_all()
+        finally:
+            subscription.close()
+            self.closed = True
+            async with self._condition:
+                self._condition.notify_all()
+
+    async def wait_frame(self, after: int) -> Optional[Tuple[int, bytes]]:
+        """Newest (sequence, jpeg) encoded after sequence ``after``; None once closed"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.sequence > after or self.closed)
+            if self.sequence > after:
+                return self.sequence, self.jpeg
+            return None
+
+
+class PreviewServer:
+    """HTTP/WebSocket front end of a DetectionService"""
+
+    def __init__(self, service: DetectionService, host: str = '127.0.0.1',
+                 port: int = 8765, jpeg_quality: int = 80,
+                 max_fps: float = 15.0, viewer_fps: float = 5.0,
+                 event_queue_size: int = 256):
+        """Initialize server (not started)
+
+        ``max_fps`` caps how often a camera's frame is encoded; viewers ask
+        for any rate up to it with ``?fps=`` and get ``viewer_fps``
+        otherwise.
+        """
+        self.service = service
+        self.host = host
+        self.port = port
+        self.jpeg_quality = jpeg_quality
+        self.max_fps = max_fps
+        self.viewer_fps = min(viewer_fps, max_fps)
+        self.event_queue_size = event_queue_size
+        self.feeds: Dict[str, CameraFeed] = {}
+        self.frames_sent = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+
+    @classmethod
+    def from_config(cls, service: DetectionService, config: dict, **overrides) -> 'PreviewServer':
+        """Create server from the 'preview_server' section of a YAML config"""
+        section = config.get('preview_server', config)
+        kwargs = {key: section[key] for key in SERVER_OPTIONS if key in section}
+        kwargs.update(overrides)
+        return cls(service, **kwargs)
+
+    async def start(self) -> int:
+        """Start listening; returns the bound port"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        error_handler.log_info(f"Preview server: http://{self.host}:{self.port}/")
+        return self.port
+
+    async def stop(self):
+        """Stop listening and drop all viewers"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for feed in self.feeds.values():
+            feed.stop()
+        connections = list(self._connections)
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def feed(self, camera_id: str) -> CameraFeed:
+        """Shared JPEG feed of a camera, started on first use"""
+        feed = self.feeds.get(camera_id)
+        if feed is None or feed.closed:
+            feed = self.feeds[camera_id] = CameraFeed(self.service, camera_id,
+                                                      self.jpeg_quality, self.max_fps)
+            feed.start()
+        return feed
+
+    def status(self) -> Dict:
+        cameras = self.service.status()
+        for camera_id, status in cameras.items():
+            feed = self.feeds.get(camera_id)
+            status['viewers'] = feed.viewers if feed is not None else 0
+        return {
+            'cameras': cameras,
+            'event_subscribers': self.service.event_feed.subscriber_count,
+            'frames_sent': self.frames_sent,
+        }
+
+    # -- connections -----------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            request = await read_request(reader)
+            if request is None:
+                await self._respond(writer, 400, b'Bad request\n')
+            else:
+                await self._route(request, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # stop() drops viewers; end the connection task normally
+            pass
+        except Exception as e:
+            error_handler.log_error(f"Preview server request failed: {str(e)}", e)
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _route(self, request: Dict, reader, writer):
+        if request['method'] != 'GET':
+            await self._respond(writer, 405, b'Method not allowed\n')
+            return
+        path = request['path'].rstrip('/') or '/'
+        if path == '/':
+            await self._respond(writer, 200, self._index_page(), 'text/html; charset=utf-8')
+        elif path == '/status':
+            body = json.dumps(self.status()).encode('utf-8')
+            await self._respond(writer, 200, body, 'application/json')
+        elif path == '/events':
+            await self._events(request, reader, writer)
+        elif path.startswith('/cameras/'):
+            camera_id, _, view = path[len('/cameras/'):].rpartition('/')
+            if camera_id not in self.service.cameras:
+                await self._respond(writer, 404, b'Unknown camera\n')
+            elif view == 'mjpeg':
+                await self._mjpeg(request, writer, camera_id)
+            elif view == 'snapshot.jpg':
+                await self._snapshot(writer, camera_id)
+            else:
+                await self._respond(writer, 404, b'Not found\n')
+        else:
+            await self._respond(writer, 404, b'Not found\n')
+
+    @staticmethod
+    async def _respond(writer, status: int, body: bytes,
+                       content_type: str = 'text/plain; charset=utf-8'):
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Cache-Control: no-store\r\n"
+            "Connection: close\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+
+    def _index_page(self) -> bytes:
+        cameras = ''.join(
+            f'<figure><img src="/cameras/{html.escape(c)}/mjpeg" width="640">'
+            f'<figcaption>{html.escape(c)}</figcaption></figure>'
+            for c in self.service.cameras)
+        return ('<!DOCTYPE html><html><head><meta charset="utf-8">'
+                '<title>Düşme Tespit Önizleme</title></head><body>'
+                f'<h1>Düşme Tespit Önizleme</h1>{cameras or "<p>Kamera yok</p>"}'
+                '</body></html>').encode('utf-8')
+
+    async def _mjpeg(self, request: Dict, writer, camera_id: str):
+        try:
+            fps = float(request['query'].get('fps', self.viewer_fps))
+        except ValueError:
+            fps = self.viewer_fps
+        interval = 1.0 / min(max(fps, 0.1), self.max_fps)
+
+        feed = self.feed(camera_id)
+        feed.viewers += 1
+        try:
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: multipart/x-mixed-replace; boundary=' + BOUNDARY + b'\r\n'
+                b'Cache-Control: no-store\r\n'
+                b'Connection: close\r\n\r\n')
+            sequence = 0
+            while True:
+                frame = await feed.wait_frame(sequence)
+                if frame is None:
+                    break
+                sequence, jpeg = frame
+                sent = time.monotonic()
+                writer.write(b'--' + BOUNDARY + b'\r\nContent-Type: image/jpeg\r\n'
+                             b'Content-Length: %d\r\n\r\n' % len(jpeg) + jpeg + b'\r\n')
+                # A slow connection only delays this viewer; it then skips
+                # to the newest frame
+                await writer.drain()
+                self.frames_sent += 1
+                delay = interval - (time.monotonic() - sent)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        finally:
+            feed.viewers -= 1
+
+    async def _snapshot(self, writer, camera_id: str):
+        feed = self.feeds.get(camera_id)
+        jpeg = feed.jpeg if feed is not None else None
+        if jpeg is None:
+            last = self.service.cameras[camera_id].last_result
+            if last is not None:
+                jpeg = await asyncio.get_running_loop().run_in_executor(
+                    None, encode_jpeg, last['frame'], self.jpeg_quality)
+        if jpeg is None:
+            await self._respond(writer, 503, b'No frame yet\n')
+        else:
+            await self._respond(writer, 200, jpeg, 'image/jpeg')
+
+    async def _events(self, request: Dict, reader, writer):
+        headers = request['headers']
+        key = headers.get('sec-websocket-key')
+        if headers.get('upgrade', '').lower() != 'websocket' or not key:
+            await self._respond(writer, 400, b'WebSocket upgrade required\n')
+            return
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n".encode('latin-1'))
+        await writer.drain()
+
+        subscription = self.service.subscribe_events(request['query'].get('camera'),
+                                                     maxsize=self.event_queue_size)
+        client = asyncio.get_running_loop().create_task(self._read_client(reader, writer))
+        try:
+            while True:
+                next_event = asyncio.ensure_future(subscription.get())
+                await asyncio.wait((next_event, client), return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    # Client closed the connection
+                    next_event.cancel()
+                    break
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    writer.write(websocket_close_frame(1001, 'service stopped'))
+                    break
+                except SlowConsumerError:
+                    writer.write(websocket_close_frame(1008, 'too slow'))
+                    break
+                writer.write(websocket_frame(json.dumps(event).encode('utf-8')))
+                await writer.drain()
+            await writer.drain()
+        finally:
+            subscription.close()
+            client.cancel()
+
+    @staticmethod
+    async def _read_client(reader, writer):
+        """Answer pings until the client closes"""
+        try:
+            while True:
+                opcode, payload = await read_websocket_frame(reader)
+                if opcode == 0x8:
+                    writer.write(websocket_frame(payload[:2], opcode=0x8))
+                    return
+                if opcode == 0x9:
+                    writer.write(websocket_frame(payload, opcode=0xA))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+
+
+def parse_camera(spec: str, index: int) -> Tuple[str, object]:
+    """``id=source`` or ``source``; numeric sources are device indices"""
+    camera_id, sep, source = spec.partition('=')
+    if not sep:
+        camera_id, source = str(index), spec
+    return camera_id, int(source) if source.isdigit() else source
+
+
+DEFAULT_CONFIG = os.environ.get(
+    'FALL_DETECTION_CONFIG',
+    str(Path(__file__).resolve().parents[2] / 'configs' / 'default_config.yaml'))
+
+
+def load_config(path: Optional[str]) -> Dict:
+    """YAML config of the command line tools ({} without a path)"""
+    if not path:
+        return {}
+    import yaml
+    with open(path, encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def make_detector(backend: str, config: Optional[Dict] = None):
+    """Pose backend with the 'models' settings of a YAML config"""
+    if backend == 'yolo':
+        from src.models.multi_person_detector import MultiPersonDetector
+        return MultiPersonDetector.from_config(config or {})
+    from src.models.pose_estimator import PoseEstimator
+    return PoseEstimator.from_config(config or {})
+
+
+async def serve(args: argparse.Namespace, config: Optional[Dict] = None):
+    config = config or {}
+    service = DetectionService.from_config(config)
+    skip_frames = args.skip_frames or config.get('performance', {}).get('frame_skip', 1)
+    for index, spec in enumerate(args.camera):
+        camera_id, source = parse_camera(spec, index)
+        service.add_camera(camera_id, source, make_detector(args.backend, config),
+                           realtime=not isinstance(source, int),
+                           skip_frames=skip_frames)
+    server = PreviewServer.from_config(service, config, **{
+        key: getattr(args, key) for key in SERVER_OPTIONS if getattr(args, key) is not None})
+    async with server, service:
+        await service.join()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fall detection preview server")
+    parser.add_argument('--camera', action='append', required=True,
+                        help="Camera as id=source (file, URL or device index); repeatable")
+    parser.add_argument('--backend', choices=['yolo', 'mediapipe'], default='yolo')
+    parser.add_argument('--config', default=DEFAULT_CONFIG,
+                        help="YAML config; options below override its preview_server section")
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--jpeg-quality', type=int, default=None)
+    parser.add_argument('--max-fps', type=float, default=None,
+                        help="Max encoded preview frames per second per camera")
+    parser.add_argument('--viewer-fps', type=float, default=None,
+                        help="Default frames per second per viewer")
+    parser.add_argument('--skip-frames', type=int, default=None,
+                        help="Analyse every Nth frame (default: performance.frame_skip)")
+    args = parser.parse_args(argv)
+    config = load_config(args.config)
+    error_handler.apply_config(config)
+    try:
+        asyncio.run(serve(args, config))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+"""
+Inference Scheduler
+===================
+
+Shares one node's inference capacity between its cameras. Every camera
+is guaranteed ``min_fps`` inferences per second; the rest of the budget
+goes to cameras by priority, so occupied rooms and rooms with a recent
+high fall confidence are analysed at up to ``max_fps`` while empty rooms
+idle at the minimum:
+
+    priority = weight * (1 + occupied_boost * occupied)
+                      * (1 + suspicion_boost * suspicion)
+
+``suspicion`` is the highest recent fall confidence (0-1), decaying with
+``suspicion_half_life``. The budget is either fixed (``budget_fps``) or
+derived from a CPU share and the measured inference time:
+``cpu_cores * cpu_budget / mean inference seconds``.
+
+Cameras spend their rate through a token bucket (:meth:`acquire`); a frame
+without a token is dropped before inference. Not thread-safe: the
+DetectionService calls it from its event loop.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+
+# 'scheduler' config keys that are InferenceScheduler arguments
+CONFIG_KEYS = ('budget_fps', 'cpu_budget', 'min_fps', 'max_fps', 'occupied_boost',
+               'suspicion_boost', 'suspicion_half_life', 'reallocate_interval')
+
+
+class CameraSchedule:
+    """Scheduling state of one camera"""
+
+    def __init__(self, camera_id: str, weight: float = 1.0,
+                 min_fps: Optional[float] = None, max_fps: Optional[float] = None):
+        self.camera_id = camera_id
+        self.weight = weight
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.people = 0
+        self.fall_detected = False
+        self.suspicion = 0.0
+        self.suspicion_at = 0.0
+        self.rate = 0.0
+        # Start with one token: the first frame is analysed right away
+        self.tokens = 1.0
+        self.refilled_at: Optional[float] = None
+        self.inferences = 0
+        self.skipped = 0
+
+
+class InferenceScheduler:
+    """Priority-based allocation of a global inference budget across cameras"""
+
+    def __init__(self, budget_fps: Optional[float] = None,
+                 cpu_budget: float = 0.8,
+                 cpu_cores: Optional[int] = None,
+                 min_fps: float = 1.0,
+                 max_fps: float = 15.0,
+                 occupied_boost: float = 2.0,
+                 suspicion_boost: float = 8.0,
+                 suspicion_half_life: float = 10.0,
+                 reallocate_interval: float = 1.0,
+                 smoothing: float = 0.1):
+        """Initialize scheduler
+
+        Without ``budget_fps`` and before any inference time was measured,
+        every camera runs at ``max_fps``.
+        """
+        self.budget_fps = budget_fps
+        self.cpu_budget = cpu_budget
+        self.cpu_cores = cpu_cores or os.cpu_count() or 1
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.occupied_boost = occupied_boost
+        self.suspicion_boost = suspicion_boost
+        self.suspicion_half_life = suspicion_half_life
+        self.reallocate_interval = reallocate_interval
+        self.smoothing = smoothing
+        self.cameras: Dict[str, CameraSchedule] = {}
+        # Exponential moving average of seconds per inference
+        self.inference_seconds: Optional[float] = None
+        self.overcommitted = False
+        self._allocated_at: Optional[float] = None
+        self._dirty = True
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'InferenceScheduler':
+        """Create scheduler from the 'scheduler' section of a YAML config"""
+        section = config.get('scheduler', config)
+        kwargs = {key: section[key] for key in CONFIG_KEYS if key in section}
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    # -- cameras ---------------------------------------------------------
+
+    def add(self, camera_id, weight: float = 1.0, min_fps: Optional[float] = None,
+            max_fps: Optional[float] = None) -> CameraSchedule:
+        """Register a camera (``weight`` scales its priority, e.g. for ICU rooms)"""
+        camera_id = str(camera_id)
+        schedule = self.cameras.get(camera_id)
+        if schedule is None:
+            schedule = self.cameras[camera_id] = CameraSchedule(camera_id, weight, min_fps, max_fps)
+            self._dirty = True
+        return schedule
+
+    def remove(self, camera_id):
+        if self.cameras.pop(str(camera_id), None) is not None:
+            self._dirty = True
+
+    def _limits(self, schedule: CameraSchedule):
+        low = self.min_fps if schedule.min_fps is None else schedule.min_fps
+        high = self.max_fps if schedule.max_fps is None else schedule.max_fps
+        return low, max(low, high)
+
+    # -- signals ---------------------------------------------------------
+
+    def observe(self, camera_id, result: Dict, inference_seconds: Optional[float] = None,
+                now: Optional[float] = None):
+        """Update a camera's priority signals from a pipeline result"""
+        now = time.monotonic() if now is None else now
+        schedule = self.add(camera_id)
+        if inference_seconds is not None and result.get('processed'):
+            if self.inference_seconds is None:
+                self.inference_seconds = inference_seconds
+            else:
+                self.inference_seconds += self.smoothing * (inference_seconds - self.inference_seconds)
+        if not (result.get('processed') or result.get('predicted')):
+            return
+
+        people = len(result.get('people', []))
+        fall_detected = bool(result.get('fall_detected'))
+        confidence = 1.0 if fall_detected else float(result.get('max_confidence', 0.0)) / 100.0
+        suspicion = self.suspicion(schedule, now)
+        # A camera turning risky is reallocated right away, not at the next interval
+        if ((people > 0) != (schedule.people > 0) or fall_detected != schedule.fall_detected
+                or confidence > suspicion + 0.25):
+            self._dirty = True
+        schedule.people = people
+        schedule.fall_detected = fall_detected
+        if confidence >= suspicion:
+            schedule.suspicion, schedule.suspicion_at = confidence, now
+
+    def suspicion(self, schedule: CameraSchedule, now: float) -> float:
+        """Recent fall confidence (0-1), halved every ``suspicion_half_life`` seconds"""
+        if schedule.fall_detected:
+            return 1.0
+        if not schedule.suspicion:
+            return 0.0
+        return schedule.suspicion * 0.5 ** ((now - schedule.suspicion_at) / self.suspicion_half_life)
+
+    def priority(self, camera_id, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        schedule = self.cameras[str(camera_id)]
+        occupied = 1.0 if schedule.people > 0 else 0.0
+        return (schedule.weight
+                * (1.0 + self.occupied_boost * occupied)
+                * (1.0 + self.suspicion_boost * self.suspicion(schedule, now)))
+
+    # -- allocation ------------------------------------------------------
+
+    def budget(self) -> Optional[float]:
+        """Inferences per second the node can afford (None: unknown yet)"""
+        if self.budget_fps is not None:
+            return self.budget_fps
+        if not self.inference_seconds:
+            return None
+        return self.cpu_cores * self.cpu_budget / self.inference_seconds
+
+    def allocate(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Recompute every camera's rate (inferences/s)"""
+        now = time.monotonic() if now is None else now
+        self._allocated_at = now
+        self._dirty = False
+        if not self.cameras:
+            return {}
+        budget = self.budget()
+        limits = {camera_id: self._limits(s) for camera_id, s in self.cameras.items()}
+        if budget is None:
+            rates = {camera_id: high for camera_id, (_, high) in limits.items()}
+            self.overcommitted = False
+        else:
+            # Minimums are guaranteed even when they exceed the budget
+            rates = {camera_id: low for camera_id, (low, _) in limits.items()}
+            remaining = budget - sum(rates.values())
+            self.overcommitted = remaining < 0
+            # Water-filling: share by priority, re-share what capped cameras leave
+            open_ids = [c for c in rates if rates[c] < limits[c][1]]
+            while remaining > 1e-9 and open_ids:
+                priorities = {c: self.priority(c, now) for c in open_ids}
+                total = sum(priorities.values())
+                capped = []
+                for camera_id in open_ids:
+                    share = remaining * priorities[camera_id] / total
+                    room = limits[camera_id][1] - rates[camera_id]
+                    if share >= room:
+                        share = room
+                        capped.append(camera_id)
+                    rates[camera_id] += share
+                remaining = budget - sum(rates.values())
+                if not capped:
+                    break
+                open_ids = [c for c in open_ids if c not in capped]
+        for camera_id, rate in rates.items():
+            self.cameras[camera_id].rate = rate
+        return rates
+
+    def acquire(self, camera_id, now: Optional[float] = None) -> bool:
+        """Take an inference slot for the camera's current frame.
+
+        False means the frame should be dropped before inference.
+        """
+        now = time.monotonic() if now is None else now
+        schedule = self.add(camera_id)
+        if (self._dirty or self._allocated_at is None
+                or now - self._allocated_at >= self.reallocate_interval):
+            self.allocate(now)
+        if schedule.refilled_at is not None:
+            schedule.tokens = min(1.0, schedule.tokens + schedule.rate * (now - schedule.refilled_at))
+        schedule.refilled_at = now
+        if schedule.tokens >= 1.0:
+            schedule.tokens -= 1.0
+            schedule.inferences += 1
+            return True
+        schedule.skipped += 1
+        return False
+
+    def status(self, now: Optional[float] = None) -> Dict[str, Dict]:
+        now = time.monotonic() if now is None else now
+        return {camera_id: {
+            'rate': schedule.rate,
+            'priority': self.priority(camera_id, now),
+            'people': schedule.people,
+            'suspicion': self.suspicion(schedule, now),
+            'inferences': schedule.inferences,
+            'skipped': schedule.skipped,
+        } for camera_id, schedule in self.cameras.items()}
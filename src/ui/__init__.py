@@ -5,4 +5,6 @@ UI Module
 This module contains user interface components.
 """
 
-__all__ = []
+from .display import DetectionThread, DisplayThrottler
+
+__all__ = ['DetectionThread', 'DisplayThrottler']
@@ -0,0 +1,192 @@
+"""
+Display Decoupling
+==================
+
+Keeps browser rendering from throttling detection:
+
+- :class:`DetectionThread` runs a :class:`StreamPipeline` over a capture
+  on a background thread and keeps only the latest result for display,
+  plus the results the UI must act on (falls and recoveries).
+- :class:`DisplayThrottler` renders at a fixed UI frame rate: a new
+  result is downscaled and JPEG-encoded once, and nothing is pushed when
+  the frame has not changed since the last render.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.core.pipeline import StreamClock, StreamPipeline
+from src.utils.error_handler import error_handler
+
+
+class DisplayThrottler:
+    """Rate-limited, change-only JPEG rendering of annotated frames"""
+
+    def __init__(self, fps: float = 10.0, width: Optional[int] = 640,
+                 jpeg_quality: int = 80):
+        """``width`` downscales frames wider than it (None keeps the size)"""
+        self.fps = fps
+        self.width = width
+        self.jpeg_quality = jpeg_quality
+        self.rendered = 0
+        self.unchanged = 0
+        self._interval = 1.0 / fps if fps > 0 else 0.0
+        self._next_render = 0.0
+        self._last_version = None
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True when the next UI frame may be rendered"""
+        now = time.monotonic() if now is None else now
+        return now >= self._next_render
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until the next UI frame"""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._next_render - now)
+
+    def render(self, frame: np.ndarray, version: int, text: Optional[str] = None,
+               now: Optional[float] = None) -> Optional[bytes]:
+        """JPEG of ``frame`` if a render is due and ``version`` is new, else None.
+
+        ``text`` (e.g. an FPS counter) is drawn on the display copy only.
+        """
+        now = time.monotonic() if now is None else now
+        if now < self._next_render:
+            return None
+        if version == self._last_version:
+            self.unchanged += 1
+            return None
+        self._next_render = now + self._interval
+        self._last_version = version
+
+        height, width = frame.shape[:2]
+        if self.width and width > self.width:
+            frame = cv2.resize(frame, (self.width, int(height * self.width / width)),
+                               interpolation=cv2.INTER_AREA)
+        elif text:
+            frame = frame.copy()
+        if text:
+            cv2.putText(frame, text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return None
+        self.rendered += 1
+        return buffer.tobytes()
+
+
+class DetectionThread(threading.Thread):
+    """Reads and processes a capture in the background"""
+
+    def __init__(self, capture, pipeline: StreamPipeline, metrics=None,
+                 profiler=None, max_pending: int = 64, live: Optional[bool] = None):
+        """Initialize thread (not started)
+
+        Processed results in which someone is fallen or has just recovered
+        are queued for :meth:`drain` (at most ``max_pending``, oldest
+        dropped); every other result only replaces the latest one.
+        ``live`` picks the timestamp clock (see :class:`StreamClock`); by
+        default it is detected from the capture.
+        """
+        super().__init__(name=f"Detection-{pipeline.stream_id}", daemon=True)
+        self.capture = capture
+        self.clock = StreamClock(capture, live)
+        self.pipeline = pipeline
+        self.metrics = metrics
+        self.profiler = profiler
+        self.frames = 0
+        self.fps = 0.0
+        self.error: Optional[Exception] = None
+        self._pending = deque(maxlen=max_pending)
+        self._latest: Optional[Dict] = None
+        self._version = 0
+        self._fallen = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Ask the thread to stop after the current frame"""
+        self._stop_event.set()
+        # Session captures wait out camera reconnects; wake a waiting read
+        interrupt = getattr(self.capture, 'interrupt', None)
+        if interrupt is not None:
+            interrupt()
+
+    def snapshot(self) -> Tuple[int, Optional[Dict]]:
+        """(version, latest result); the version changes with every frame"""
+        with self._lock:
+            return self._version, self._latest
+
+    def drain(self) -> List[Dict]:
+        """Queued fall/recovery results, oldest first"""
+        with self._lock:
+            results = list(self._pending)
+            self._pending.clear()
+        self._observe_pending(0)
+        return results
+
+    def _observe_pending(self, depth: int):
+        if self.metrics is not None:
+            self.metrics.set_gauge('queue_depth', depth,
+                                   stream=self.pipeline.stream_id, queue='pending_falls')
+
+    def run(self):
+        stream = self.pipeline.stream_id
+        fps_start = time.monotonic()
+        fps_frames = 0
+        try:
+            while not self._stop_event.is_set():
+                if self.profiler is not None:
+                    self.profiler.tick()
+                start = time.perf_counter()
+                ok, frame = self.capture.read()
+                if not ok:
+                    break
+                timestamp = self.clock()
+                if self.metrics is not None:
+                    self.metrics.observe('stage_seconds', time.perf_counter() - start,
+                                         stream=stream, stage='decode')
+                    self.metrics.inc('frames_total', stream=stream)
+
+                result = self.pipeline.process(self.pipeline.resize(frame), timestamp)
+                self._publish(result)
+
+                self.frames += 1
+                fps_frames += 1
+                elapsed = time.monotonic() - fps_start
+                if elapsed >= 1.0:
+                    self.fps = fps_frames / elapsed
+                    fps_start = time.monotonic()
+                    fps_frames = 0
+        except Exception as e:
+            self.error = e
+            error_handler.log_error(f"Detection thread failed: {str(e)}", e)
+        finally:
+            # cProfile is per thread; stop it where it was started
+            if self.profiler is not None:
+                self.profiler.stop()
+
+    def _publish(self, result: Dict):
+        act = False
+        if result['processed'] or result['predicted']:
+            fallen = {p['person_id'] for p in result['people'] if p['is_fallen']}
+            act = bool(fallen) or bool(self._fallen - fallen)
+            self._fallen = fallen
+        dropped = False
+        with self._lock:
+            self._latest = result
+            self._version += 1
+            if act:
+                # A full deque drops its oldest result on append
+                dropped = len(self._pending) == self._pending.maxlen
+                self._pending.append(result)
+                depth = len(self._pending)
+        if act:
+            self._observe_pending(depth)
+            if dropped and self.metrics is not None:
+                self.metrics.inc('frames_dropped_total', stream=self.pipeline.stream_id,
+                                 queue='pending_falls')
@@ -8,10 +8,22 @@ video processing, and other helper functions.
 
 from .error_handler import ErrorHandler, error_handler
 from .video_processor import VideoProcessor, CameraManager
+from .camera_sessions import CameraSessionManager, CameraSession, open_capture
+from .event_store import FallEventStore
+from .screenshot_manager import ScreenshotManager
+from .metrics import MetricsRegistry, MetricsServer, metrics
 
 __all__ = [
     'ErrorHandler',
     'error_handler',
     'VideoProcessor',
-    'CameraManager'
+    'CameraManager',
+    'CameraSessionManager',
+    'CameraSession',
+    'open_capture',
+    'FallEventStore',
+    'ScreenshotManager',
+    'MetricsRegistry',
+    'MetricsServer',
+    'metrics'
 ]
@@ -0,0 +1,467 @@
+"""
+Camera Session Module
+Connection manager for many network cameras: pooled non-blocking opens with
+timeouts, exponential backoff, per-camera health state and stall detection
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import cv2
+import numpy as np
+
+from .error_handler import error_handler
+
+
+# Session states
+IDLE = 'idle'               # Added, first connection not attempted yet
+CONNECTING = 'connecting'   # Open running on the worker pool
+STREAMING = 'streaming'     # Frames arriving
+STALLED = 'stalled'         # Connected but no frame within stall_timeout
+BACKOFF = 'backoff'         # Waiting before the next connection attempt
+FAILED = 'failed'           # Gave up after max_attempts
+STOPPED = 'stopped'         # Removed or manager stopped
+
+# Health reported to the UI/metrics
+HEALTHY = 'healthy'
+DEGRADED = 'degraded'
+DOWN = 'down'
+
+# URL schemes of live network streams (http(s) may just as well be a file)
+LIVE_SCHEMES = ('rtsp', 'rtsps', 'rtmp', 'rtmps', 'udp', 'tcp', 'srt')
+
+
+def is_live_source(source) -> bool:
+    """True for camera device indices and live network stream URLs"""
+    if isinstance(source, int):
+        return True
+    source = str(source)
+    return source.isdigit() or urlparse(source).scheme.lower() in LIVE_SCHEMES
+
+
+def open_capture(source, open_timeout: float = 10.0, read_timeout: float = 5.0):
+    """Open a capture with FFmpeg open/read timeouts (network sources)"""
+    if isinstance(source, int):
+        capture = cv2.VideoCapture(source)
+    else:
+        capture = cv2.VideoCapture(source, cv2.CAP_FFMPEG, [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(open_timeout * 1000),
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(read_timeout * 1000),
+        ])
+    if not capture.isOpened():
+        capture.release()
+        raise IOError(f"Cannot open video source: {source}")
+    # Keep latency low: only the newest frame matters
+    capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return capture
+
+
+def backoff_delay(attempt: int, base: float, max_delay: float,
+                  jitter: float = 0.0, rng: Optional[random.Random] = None) -> float:
+    """Delay before retry ``attempt`` (0-based): base * 2^attempt, capped and jittered"""
+    delay = min(max_delay, base * (2 ** attempt))
+    if jitter:
+        delay *= 1.0 + (rng or random).uniform(-jitter, jitter)
+    return max(0.0, delay)
+
+
+class CameraSession:
+    """State, capture and latest frame of one camera"""
+
+    def __init__(self, camera_id: str, source,
+                 reconnect_delay: float = 2.0,
+                 max_delay: float = 60.0,
+                 open_timeout: float = 10.0,
+                 stall_timeout: float = 5.0,
+                 max_attempts: Optional[int] = None,
+                 down_after: int = 3,
+                 jitter: float = 0.1,
+                 healthy_after: float = 30.0):
+        """Initialize session
+
+        ``max_attempts`` consecutive failed connections end in FAILED
+        (None retries forever); after ``down_after`` the camera reports
+        DOWN health while retrying. A stream that breaks before delivering
+        frames for ``healthy_after`` seconds counts as another failure, so
+        a flapping camera keeps backing off instead of retrying at once.
+        """
+        self.camera_id = camera_id
+        self.source = source
+        self.reconnect_delay = reconnect_delay
+        self.max_delay = max_delay
+        self.open_timeout = open_timeout
+        self.stall_timeout = stall_timeout
+        self.max_attempts = max_attempts
+        self.down_after = down_after
+        self.jitter = jitter
+        self.healthy_after = healthy_after
+
+        self.state = IDLE
+        self.failures = 0
+        self.reconnects = 0
+        self.frames = 0
+        self.last_error: Optional[str] = None
+        self.next_attempt_at = 0.0
+        self.connected_at: Optional[float] = None
+        self.last_frame_at: Optional[float] = None
+        self.state_changed_at = time.monotonic()
+
+        self.capture = None
+        self._open_future: Optional[Future] = None
+        self._open_started = 0.0
+        self._reader: Optional[threading.Thread] = None
+        # Capture the read loop is using; it releases it itself on exit
+        self._reader_capture = None
+        self._reading = threading.Event()
+        self._read_failed: Optional[str] = None
+        self._frame: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        # Notified on every new frame and when the session ends
+        self._changed = threading.Condition(self._lock)
+
+    @property
+    def health(self) -> str:
+        if self.state == STREAMING:
+            return HEALTHY
+        if self.state == FAILED or self.failures >= self.down_after:
+            return DOWN
+        return DEGRADED
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """(frame count, newest frame) without blocking"""
+        with self._lock:
+            return self.frames, self._frame
+
+    def status(self, now: Optional[float] = None) -> Dict:
+        now = time.monotonic() if now is None else now
+        return {
+            'camera_id': self.camera_id,
+            'state': self.state,
+            'health': self.health,
+            'frames': self.frames,
+            'failures': self.failures,
+            'reconnects': self.reconnects,
+            'last_error': self.last_error,
+            'seconds_since_frame': now - self.last_frame_at if self.last_frame_at else None,
+            'retry_in': max(0.0, self.next_attempt_at - now) if self.state == BACKOFF else None,
+        }
+
+
+class CameraSessionManager:
+    """Keeps many camera sessions connected without blocking each other.
+
+    Opens and releases run on a bounded worker pool and every streaming
+    camera reads on its own thread, so streaming cameras never take the
+    pool from cameras still connecting. :meth:`poll` only looks at
+    finished work and timestamps, so a camera whose open or read hangs
+    never delays the others. Call :meth:`poll` from your loop or let
+    :meth:`start` run it on a background thread.
+    """
+
+    def __init__(self, max_workers: int = 32,
+                 opener: Optional[Callable] = None,
+                 read_timeout: float = 5.0,
+                 **session_defaults):
+        """Initialize manager
+
+        ``opener(source, open_timeout)`` returns an opened capture or
+        raises (by default :func:`open_capture` with ``read_timeout``);
+        ``session_defaults`` are CameraSession keyword arguments.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='camera')
+        self.opener = opener or (lambda source, timeout: open_capture(source, timeout, read_timeout))
+        self.session_defaults = session_defaults
+        self.sessions: Dict[str, CameraSession] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._rng = random.Random()
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'CameraSessionManager':
+        """Create manager from the 'camera' section of a YAML config (times in ms)"""
+        section = config.get('camera', config)
+        seconds = {'reconnect_delay': 'reconnect_delay', 'max_reconnect_delay': 'max_delay',
+                   'open_timeout': 'open_timeout', 'read_timeout': 'read_timeout',
+                   'stall_timeout': 'stall_timeout', 'healthy_after': 'healthy_after'}
+        kwargs = {name: section[key] / 1000.0 for key, name in seconds.items()
+                  if section.get(key) is not None}
+        if section.get('max_workers'):
+            kwargs['max_workers'] = section['max_workers']
+        if 'reconnect_attempts' in section:
+            kwargs['max_attempts'] = section['reconnect_attempts']
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    # -- sessions --------------------------------------------------------
+
+    def add(self, camera_id, source, **overrides) -> CameraSession:
+        camera_id = str(camera_id)
+        with self._lock:
+            if camera_id in self.sessions:
+                raise ValueError(f"Camera already added: {camera_id}")
+            session = CameraSession(camera_id, source, **{**self.session_defaults, **overrides})
+            self.sessions[camera_id] = session
+        return session
+
+    def open(self, camera_id, source, **overrides) -> 'SessionCapture':
+        """Add a camera and return a capture-like reader of its frames"""
+        return SessionCapture(self, self.add(camera_id, source, **overrides))
+
+    def remove(self, camera_id):
+        with self._lock:
+            session = self.sessions.pop(str(camera_id), None)
+        if session is not None:
+            self._disconnect(session, STOPPED)
+
+    def latest(self, camera_id) -> Tuple[int, Optional[np.ndarray]]:
+        """(frame count, newest frame) of a camera; never blocks on the network"""
+        session = self.sessions.get(str(camera_id))
+        if session is None:
+            return 0, None
+        return session.latest()
+
+    def status(self) -> Dict[str, Dict]:
+        now = time.monotonic()
+        return {camera_id: session.status(now) for camera_id, session in list(self.sessions.items())}
+
+    # -- state machine ---------------------------------------------------
+
+    def poll(self, now: Optional[float] = None):
+        """Advance every session's state machine once (non-blocking)"""
+        now = time.monotonic() if now is None else now
+        for session in list(self.sessions.values()):
+            try:
+                self._step(session, now)
+            except Exception as e:
+                error_handler.log_error(f"Camera {session.camera_id} state error: {str(e)}", e)
+
+    def _set_state(self, session: CameraSession, state: str, now: float):
+        if session.state != state:
+            error_handler.log_info(f"Camera {session.camera_id}: {session.state} -> {state}")
+            session.state = state
+            session.state_changed_at = now
+            if state in (FAILED, STOPPED):
+                with session._lock:
+                    session._changed.notify_all()
+
+    def _step(self, session: CameraSession, now: float):
+        if session.state in (IDLE, BACKOFF) and now >= session.next_attempt_at:
+            session._open_started = now
+            session._open_future = self.executor.submit(
+                self.opener, session.source, session.open_timeout)
+            self._set_state(session, CONNECTING, now)
+
+        elif session.state == CONNECTING:
+            future = session._open_future
+            if future.done():
+                session._open_future = None
+                error = future.exception()
+                if error is not None:
+                    self._failed(session, str(error), now)
+                else:
+                    self._connected(session, future.result(), now)
+            elif now - session._open_started > session.open_timeout:
+                # Abandon the hung open; release the capture if it ever returns
+                future.add_done_callback(self._release_late)
+                session._open_future = None
+                self._failed(session, f"Open timed out after {session.open_timeout:.1f}s", now)
+
+        elif session.state == STREAMING:
+            if (session.failures and session.last_frame_at
+                    and session.last_frame_at - session.connected_at >= session.healthy_after):
+                # Healthy long enough: the next break starts the backoff over
+                session.failures = 0
+            if session._read_failed is not None:
+                self._disconnect(session, BACKOFF)
+                self._failed(session, session._read_failed, now)
+            elif now - (session.last_frame_at or session.connected_at) > session.stall_timeout:
+                self._set_state(session, STALLED, now)
+
+        elif session.state == STALLED:
+            if session.last_frame_at and now - session.last_frame_at <= session.stall_timeout:
+                self._set_state(session, STREAMING, now)
+            else:
+                self._disconnect(session, BACKOFF)
+                self._failed(session, f"No frame for {session.stall_timeout:.1f}s", now)
+
+    def _connected(self, session: CameraSession, capture, now: float):
+        if session.state == STOPPED:
+            self._release_capture(capture)
+            return
+        if session.connected_at is not None:
+            session.reconnects += 1
+        session.capture = capture
+        session.connected_at = now
+        session.last_frame_at = None
+        session.last_error = None
+        session._read_failed = None
+        session._reading.set()
+        session._reader_capture = capture
+        # A blocking read would hold a pool worker for as long as the stream runs
+        session._reader = threading.Thread(target=self._read_loop, args=(session, capture),
+                                           name=f"camera-read-{session.camera_id}",
+                                           daemon=True)
+        session._reader.start()
+        self._set_state(session, STREAMING, now)
+
+    def _failed(self, session: CameraSession, error: str, now: float):
+        session.last_error = error
+        attempt = session.failures
+        session.failures += 1
+        if session.max_attempts is not None and session.failures >= session.max_attempts:
+            error_handler.log_error(f"Camera {session.camera_id} failed: {error}")
+            self._set_state(session, FAILED, now)
+            return
+        delay = backoff_delay(attempt, session.reconnect_delay, session.max_delay,
+                              session.jitter, self._rng)
+        session.next_attempt_at = now + delay
+        # Delay stays out of the message so repeats collapse into one summary
+        error_handler.log_rate_limited(f"Camera {session.camera_id} unavailable: {error}",
+                                       source=f"camera_{session.camera_id}")
+        self._set_state(session, BACKOFF, now)
+
+    def _read_loop(self, session: CameraSession, capture):
+        """Reader thread: read frames until stopped or the stream breaks"""
+        try:
+            self._read_frames(session, capture)
+        finally:
+            with session._lock:
+                # After a reconnect the marker belongs to the new read loop
+                if session._reader_capture is capture:
+                    session._reader_capture = None
+                orphaned = session.capture is not capture
+            if orphaned:
+                self._release_capture(capture)
+
+    @staticmethod
+    def _read_frames(session: CameraSession, capture):
+        while session._reading.is_set() and session.capture is capture:
+            try:
+                ok, frame = capture.read()
+            except Exception as e:
+                session._read_failed = f"Read error: {e}"
+                return
+            if not session._reading.is_set() or session.capture is not capture:
+                return
+            if not ok or frame is None:
+                session._read_failed = "Stream ended"
+                return
+            with session._lock:
+                session._frame = frame
+                session.frames += 1
+                session.last_frame_at = time.monotonic()
+                session._changed.notify_all()
+
+    def _disconnect(self, session: CameraSession, state: str):
+        session._reading.clear()
+        with session._lock:
+            capture, session.capture = session.capture, None
+            # Releasing during a read crashes FFmpeg: a running read loop
+            # releases the capture itself once its read returns
+            reading = capture is not None and session._reader_capture is capture
+        if capture is not None and not reading:
+            # release() of a hung network capture can block too
+            self.executor.submit(self._release_capture, capture)
+        if session._open_future is not None:
+            session._open_future.add_done_callback(self._release_late)
+            session._open_future = None
+        self._set_state(session, state, time.monotonic())
+
+    @staticmethod
+    def _release_capture(capture):
+        try:
+            capture.release()
+        except Exception as e:
+            error_handler.log_warning(f"Capture release failed: {e}")
+
+    @classmethod
+    def _release_late(cls, future: Future):
+        if not future.cancelled() and future.exception() is None:
+            cls._release_capture(future.result())
+
+    # -- background polling ----------------------------------------------
+
+    def start(self, poll_interval: float = 0.1):
+        """Run :meth:`poll` on a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.wait(poll_interval):
+                self.poll()
+
+        self._stop.clear()
+        self.poll()
+        self._thread = threading.Thread(target=run, name="CameraSessions", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Disconnect every camera and stop the worker pool"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for session in list(self.sessions.values()):
+            self._disconnect(session, STOPPED)
+        self.executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class SessionCapture:
+    """``cv2.VideoCapture``-like reader of one managed camera.
+
+    :meth:`read` waits for the next frame while the manager reconnects in
+    the background and ends the stream only once the session FAILED or was
+    removed. :meth:`interrupt` wakes a waiting read; :meth:`release` removes
+    the camera from the manager.
+    """
+
+    def __init__(self, manager: CameraSessionManager, session: CameraSession):
+        self.manager = manager
+        self.session = session
+        self._frames = 0
+        self._interrupted = False
+
+    def _ended(self) -> bool:
+        return self._interrupted or self.session.state in (FAILED, STOPPED)
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        session = self.session
+        with session._lock:
+            session._changed.wait_for(lambda: session.frames > self._frames or self._ended())
+            if session.frames <= self._frames:
+                return False, None
+            self._frames = session.frames
+            return True, session._frame
+
+    def isOpened(self) -> bool:
+        return not self._ended()
+
+    def get(self, prop) -> float:
+        # Live stream: no frame count or position
+        return 0.0
+
+    def set(self, prop, value) -> bool:
+        return False
+
+    def interrupt(self):
+        """Make a waiting (and every later) read return the end of stream"""
+        with self.session._lock:
+            self._interrupted = True
+            self.session._changed.notify_all()
+
+    def release(self):
+        self.interrupt()
+        if self.manager.sessions.get(self.session.camera_id) is self.session:
+            self.manager.remove(self.session.camera_id)
@@ -3,57 +3,313 @@ Enhanced Error Handling Module
 Provides comprehensive logging and error management
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
 import traceback
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import sys
 
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FORMAT_DETAILED = '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+
+# Log directory of the global handler; tests point it at a temporary directory
+DEFAULT_LOG_DIR = os.environ.get('FALL_DETECTION_LOG_DIR', 'logs')
+
+# Live handlers, flushed by one atexit hook instead of one per instance
+_handlers = weakref.WeakSet()
+
+
+def _shutdown_handlers():
+    for handler in list(_handlers):
+        handler.shutdown()
+
+
+atexit.register(_shutdown_handlers)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format log records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+        }
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped_records = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_records += 1
+
+
+class BlockingSentinelQueueListener(logging.handlers.QueueListener):
+    """QueueListener that waits for room in a bounded queue to enqueue its stop sentinel"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LogRateLimiter:
+    """Collapse repeated messages per source into periodic summaries.
+
+    The first occurrence of a (source, message) pair is emitted right away.
+    Repeats inside ``interval`` seconds only bump a counter; the next
+    occurrence after the interval (or a sweep) emits one summary with the
+    number of suppressed repeats. Cost per call is a dict lookup.
+    """
+
+    def __init__(self, interval: float = 10.0):
+        self.interval = interval
+        self._windows: Dict[Tuple[str, str], List] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = float('-inf')
+
+    def hit(self, source: str, message: str, level: int,
+            now: Optional[float] = None) -> Optional[int]:
+        """Register one occurrence.
+
+        Returns None if the message must be suppressed, otherwise the number
+        of repeats suppressed since it was last emitted.
+        """
+        now = time.monotonic() if now is None else now
+        key = (source, message)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                self._windows[key] = [now, 0, level]
+                return 0
+            if now - window[0] < self.interval:
+                window[1] += 1
+                return None
+            suppressed = window[1]
+            window[0] = now
+            window[1] = 0
+            return suppressed
+
+    def collect_stale(self, now: Optional[float] = None,
+                      force: bool = False) -> List[Tuple[str, str, int, int]]:
+        """Pop windows whose interval expired with suppressed repeats pending.
+
+        Returns (source, message, level, suppressed) tuples. Runs at most once
+        per interval unless ``force`` is set.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not force and now - self._last_sweep < self.interval:
+                return []
+            self._last_sweep = now
+            stale = []
+            for key, window in list(self._windows.items()):
+                if force or now - window[0] >= self.interval:
+                    if window[1] > 0:
+                        stale.append((key[0], key[1], window[2], window[1]))
+                    del self._windows[key]
+            return stale
+
+
 class ErrorHandler:
     """Centralized error handling and logging"""
     
-    def __init__(self, log_dir: str = "logs"):
-        """Initialize error handler with logging"""
+    def __init__(self, log_dir: str = "logs",
+                 level: str = "INFO",
+                 max_file_size: int = 10485760,
+                 max_files: int = 30,
+                 console_output: bool = True,
+                 json_format: bool = False,
+                 queue_size: int = 10000,
+                 detailed: bool = False,
+                 rate_limit_interval: float = 10.0,
+                 logger_name: str = 'FallDetectionSystem'):
+        """Initialize error handler with non-blocking logging"""
+        self.logger = logging.getLogger(logger_name)
+        self.rate_limiter = LogRateLimiter(rate_limit_interval)
+        self.listener = None
+        self.queue_handler = None
+        _handlers.add(self)
+        
+        self.configure(log_dir=log_dir, level=level,
+                       max_file_size=max_file_size, max_files=max_files,
+                       console_output=console_output, json_format=json_format,
+                       queue_size=queue_size, detailed=detailed)
+    
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'ErrorHandler':
+        """Create error handler from the 'logging' section of a YAML config"""
+        kwargs = cls._config_kwargs(config)
+        kwargs.update(overrides)
+        return cls(**kwargs)
+    
+    def apply_config(self, config: dict):
+        """Reconfigure from the 'logging' section of a YAML config"""
+        kwargs = self._config_kwargs(config)
+        if 'rate_limit_interval' in kwargs:
+            self.rate_limiter.interval = kwargs.pop('rate_limit_interval')
+        self.configure(**kwargs)
+    
+    @staticmethod
+    def _config_kwargs(config: dict) -> dict:
+        """Map 'logging' config keys to constructor arguments"""
+        section = config.get('logging', config)
+        mapping = {
+            'directory': 'log_dir',
+            'level': 'level',
+            'max_file_size': 'max_file_size',
+            'max_files': 'max_files',
+            'console_output': 'console_output',
+            'json_format': 'json_format',
+            'queue_size': 'queue_size',
+            'rate_limit_interval': 'rate_limit_interval',
+        }
+        kwargs = {arg: section[key] for key, arg in mapping.items() if key in section}
+        kwargs['detailed'] = bool(section.get('include_function_name') or
+                                  section.get('include_line_number'))
+        return kwargs
+    
+    def configure(self, log_dir: str = "logs",
+                  level: str = "INFO",
+                  max_file_size: int = 10485760,
+                  max_files: int = 30,
+                  console_output: bool = True,
+                  json_format: bool = False,
+                  queue_size: int = 10000,
+                  detailed: bool = False):
+        """(Re)build the logging pipeline.
+
+        Records are put on a bounded queue by the calling thread and written
+        to disk by a QueueListener thread, so the video loop never waits on
+        file I/O. The log file is rotated by size and at most ``max_files``
+        backups are kept.
+        """
+        self.shutdown()
+        
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.log_file = self.log_dir / "fall_detection.log"
+        self.json_format = json_format
         
-        # Setup logging
-        log_file = self.log_dir / f"fall_detection_{datetime.now().strftime('%Y%m%d')}.log"
+        if json_format:
+            formatter = JsonLinesFormatter()
+        else:
+            formatter = logging.Formatter(LOG_FORMAT_DETAILED if detailed else LOG_FORMAT)
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.log_file,
+            maxBytes=max_file_size,
+            backupCount=max_files,
+            encoding='utf-8',
+            delay=True
         )
+        file_handler.setFormatter(formatter)
+        handlers = [file_handler]
         
-        self.logger = logging.getLogger('FallDetectionSystem')
+        if console_output:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            handlers.append(console_handler)
+        
+        self.queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.listener = BlockingSentinelQueueListener(
+            self.queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        
+        self.logger.addHandler(self.queue_handler)
+        self.logger.setLevel(level.upper() if isinstance(level, str) else level)
+        self.logger.propagate = False
+        
+        self.listener.start()
+    
+    def shutdown(self):
+        """Flush queued records and stop the writer thread"""
+        if self.listener is not None:
+            self._flush_stale(True)
+        if self.queue_handler is not None:
+            self.logger.removeHandler(self.queue_handler)
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+    
+    def get_dropped_count(self) -> int:
+        """Number of records dropped because the log queue was full"""
+        return self.queue_handler.dropped_records if self.queue_handler else 0
     
     def log_info(self, message: str):
         """Log informational message"""
-        self.logger.info(message)
+        self.logger.info(message, stacklevel=2)
     
     def log_warning(self, message: str):
         """Log warning message"""
-        self.logger.warning(message)
+        self.logger.warning(message, stacklevel=2)
     
     def log_error(self, message: str, exception: Optional[Exception] = None):
         """Log error with optional exception details"""
-        self.logger.error(message)
+        self.logger.error(message, stacklevel=2)
         if exception:
-            self.logger.error(f"Exception: {str(exception)}")
-            self.logger.error(f"Traceback: {traceback.format_exc()}")
+            self.logger.error(f"Exception: {str(exception)}", stacklevel=2)
+            self.logger.error(f"Traceback: {traceback.format_exc()}", stacklevel=2)
     
     def log_critical(self, message: str, exception: Optional[Exception] = None):
         """Log critical error"""
-        self.logger.critical(message)
+        self.logger.critical(message, stacklevel=2)
         if exception:
-            self.logger.critical(f"Exception: {str(exception)}")
-            self.logger.critical(f"Traceback: {traceback.format_exc()}")
+            self.logger.critical(f"Exception: {str(exception)}", stacklevel=2)
+            self.logger.critical(f"Traceback: {traceback.format_exc()}", stacklevel=2)
+    
+    def log_rate_limited(self, message: str, source: str = 'default',
+                         level: int = logging.WARNING):
+        """Log a per-frame condition at most once per interval per source"""
+        suppressed = self.rate_limiter.hit(source, message, level)
+        if suppressed is not None:
+            self._emit_summary(source, message, level, suppressed, stacklevel=3)
+        self._flush_stale(False)
+    
+    def flush_rate_limited(self, force: bool = False):
+        """Emit summaries for repeated messages whose interval has expired"""
+        self._flush_stale(force)
+    
+    def _flush_stale(self, force: bool):
+        # Always two frames below the public entry point, whose caller is logged
+        for source, message, level, suppressed in self.rate_limiter.collect_stale(force=force):
+            self._emit_summary(source, message, level, suppressed, stacklevel=4)
+    
+    def _emit_summary(self, source: str, message: str, level: int, suppressed: int,
+                      stacklevel: int):
+        """Write one (possibly aggregated) rate-limited record
+
+        ``stacklevel`` counts from this method, like ``logging`` does.
+        """
+        if suppressed:
+            message = (f"{message} (repeated {suppressed} more times "
+                       f"in the last {self.rate_limiter.interval:g}s)")
+        self.logger.log(level, f"[{source}] {message}", stacklevel=stacklevel)
     
     @staticmethod
     def handle_camera_error() -> str:
@@ -113,4 +369,4 @@ class ErrorHandler:
 
 
 # Global error handler instance
-error_handler = ErrorHandler()
+error_handler = ErrorHandler(log_dir=DEFAULT_LOG_DIR)
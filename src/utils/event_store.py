@@ -0,0 +1,231 @@
+"""
+Fall Event Store Module
+Persists fall events in SQLite with a background batch writer
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .error_handler import error_handler
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fall_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_key TEXT NOT NULL UNIQUE,
+    camera_id TEXT NOT NULL,
+    track_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    confidence REAL NOT NULL,
+    screenshot_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fall_events_camera_time ON fall_events (camera_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_fall_events_track ON fall_events (camera_id, track_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_fall_events_time ON fall_events (timestamp);
+"""
+
+INSERT_SQL = """
+INSERT OR IGNORE INTO fall_events
+    (event_key, camera_id, track_id, timestamp, confidence, screenshot_path)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+
+class FallEventStore:
+    """Persistent fall event store with O(1) de-duplication"""
+
+    def __init__(self, db_path: str = "fall_events.db",
+                 batch_size: int = 50,
+                 flush_interval: float = 0.5,
+                 max_recent_keys: int = 4096):
+        """Open (or create) the database and start the writer thread
+
+        The keys of the ``max_recent_keys`` most recently reported episodes
+        are kept in memory to answer repeats without a query; older repeats
+        are still ignored by the UNIQUE key of the table.
+        """
+        self.db_path = Path(db_path)
+        if self.db_path.parent != Path('.'):
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.max_recent_keys = max_recent_keys
+        # Episode keys, least recently reported first
+        self._seen = OrderedDict()
+        self._seen_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+        self._writer = threading.Thread(target=self._writer_loop,
+                                        name="FallEventWriter", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'FallEventStore':
+        """Create store from the 'events' section of a YAML config"""
+        section = config.get('events', config)
+        kwargs = {'db_path': section['database']} if section.get('database') else {}
+        kwargs.update({key: section[key] for key in ('batch_size', 'flush_interval')
+                       if key in section})
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (SQLite connections are thread-bound)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_event_key(camera_id: str, track_id: int,
+                       episode_start: Optional[float]) -> str:
+        """Build the de-duplication key for one fall episode of one person"""
+        episode = f"{episode_start:.3f}" if episode_start is not None else "-"
+        return f"{camera_id}:{track_id}:{episode}"
+
+    def add_event(self, camera_id: str, track_id: int, confidence: float,
+                  episode_start: Optional[float] = None,
+                  timestamp: Optional[float] = None,
+                  screenshot_path: Optional[str] = None) -> bool:
+        """Record a fall event.
+
+        Returns False if this fall episode (camera, track, episode start) was
+        already recorded. The row is written asynchronously in a batch.
+        """
+        camera_id = str(camera_id)
+        key = self.make_event_key(camera_id, track_id, episode_start)
+        with self._seen_lock:
+            if key in self._seen:
+                # An ongoing episode stays recent while it is being reported
+                self._seen.move_to_end(key)
+                return False
+            self._seen[key] = None
+            if len(self._seen) > self.max_recent_keys:
+                self._seen.popitem(last=False)
+
+        if timestamp is None:
+            timestamp = episode_start if episode_start is not None else time.time()
+        self._queue.put((key, camera_id, int(track_id), float(timestamp),
+                         float(confidence), screenshot_path))
+        return True
+
+    def _writer_loop(self):
+        """Drain the queue and insert rows in batches"""
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = []
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+
+            deadline = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                try:
+                    conn.executemany(INSERT_SQL, batch)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    error_handler.log_error(f"Fall event write failed: {str(e)}", e)
+
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """Block until all queued events are written"""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending events and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def query_events(self, camera_id: Optional[str] = None,
+                     track_id: Optional[int] = None,
+                     since: Optional[float] = None,
+                     until: Optional[float] = None,
+                     limit: int = 100) -> List[Dict]:
+        """Query events, newest first"""
+        clauses, params = self._filters(camera_id, track_id, since, until)
+        sql = "SELECT camera_id, track_id, timestamp, confidence, screenshot_path FROM fall_events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(int(limit))
+        rows = self._connect().execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_events(self, camera_id: Optional[str] = None,
+                     since: Optional[float] = None,
+                     until: Optional[float] = None) -> int:
+        """Count events matching the filters"""
+        clauses, params = self._filters(camera_id, None, since, until)
+        sql = "SELECT COUNT(*) FROM fall_events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self._connect().execute(sql, params).fetchone()[0]
+
+    def counts_by_camera(self, since: Optional[float] = None) -> Dict[str, int]:
+        """Number of events per camera, for reports"""
+        sql = "SELECT camera_id, COUNT(*) FROM fall_events"
+        params = []
+        if since is not None:
+            sql += " WHERE timestamp >= ?"
+            params.append(since)
+        sql += " GROUP BY camera_id"
+        return {row[0]: row[1] for row in self._connect().execute(sql, params)}
+
+    @staticmethod
+    def _filters(camera_id, track_id, since, until):
+        """Build WHERE clauses for the indexed columns"""
+        clauses, params = [], []
+        if camera_id is not None:
+            clauses.append("camera_id = ?")
+            params.append(str(camera_id))
+        if track_id is not None:
+            clauses.append("track_id = ?")
+            params.append(int(track_id))
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return clauses, params
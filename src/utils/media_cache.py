@@ -0,0 +1,333 @@
+"""
+Media Cache Module
+Resumable, size-bounded on-disk cache of downloaded videos keyed by video id.
+A local HTTP server streams downloads in progress, so a video can be decoded
+while it is fetched once.
+"""
+
+import http.client
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .error_handler import error_handler
+
+
+# Prefix of every cached/temporary video file; eviction only touches these
+TEMP_PREFIX = 'fall_detection_'
+PART_SUFFIX = '.part'
+
+
+class MediaCache:
+    """Video files ``<prefix><video id>.<ext>`` in one directory"""
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_bytes: int = 2 * 1024 ** 3,
+                 prefix: str = TEMP_PREFIX,
+                 chunk_size: int = 1024 * 1024,
+                 timeout: float = 30.0):
+        """Initialize cache
+
+        Files beyond ``max_bytes`` in total are removed oldest-used first,
+        including partial downloads nobody is resuming.
+        """
+        self.directory = Path(directory or tempfile.gettempdir())
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._downloads: Dict[str, threading.Thread] = {}
+        # Final file name -> total bytes of a running download (None = unknown)
+        self._sizes: Dict[str, Optional[int]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @staticmethod
+    def safe_id(video_id) -> str:
+        """Video id usable as a file name"""
+        return re.sub(r'[^A-Za-z0-9_-]', '_', str(video_id))[:128]
+
+    def path_for(self, video_id, ext: str = 'mp4') -> Path:
+        return self.directory / f"{self.prefix}{self.safe_id(video_id)}.{ext}"
+
+    def lookup(self, video_id) -> Optional[str]:
+        """Path of a complete cached video, marked as recently used"""
+        for path in self.directory.glob(f"{self.prefix}{self.safe_id(video_id)}.*"):
+            if path.suffix != PART_SUFFIX and path.is_file():
+                os.utime(path)
+                return str(path)
+        return None
+
+    def is_downloading(self, video_id) -> bool:
+        thread = self._downloads.get(self.safe_id(video_id))
+        return thread is not None and thread.is_alive()
+
+    def _active_stems(self) -> set:
+        """File names (without extension) of running downloads"""
+        return {self.path_for(video_id).with_suffix('').name
+                for video_id, thread in list(self._downloads.items()) if thread.is_alive()}
+
+    def entries(self) -> List[Tuple[Path, int, float]]:
+        """(path, bytes, mtime) of all cache files, oldest first"""
+        entries = []
+        for path in self.directory.glob(f"{self.prefix}*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                entries.append((path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep: Iterable = ()) -> List[str]:
+        """Remove oldest files until the cache fits ``max_bytes``"""
+        keep = {Path(path) for path in keep}
+        removed = []
+        with self._lock:
+            # Partial files of running downloads are still being written
+            active = self._active_stems()
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if path in keep or path.name.split('.')[0] in active:
+                    continue
+                try:
+                    path.unlink()
+                except OSError as e:
+                    error_handler.log_warning(f"Cache eviction failed for {path}: {e}")
+                    continue
+                total -= size
+                removed.append(str(path))
+        if removed:
+            error_handler.log_info(f"Evicted {len(removed)} cached videos")
+        return removed
+
+    def download(self, url: str, video_id, ext: str = 'mp4',
+                 headers: Optional[Dict[str, str]] = None,
+                 max_attempts: int = 3) -> str:
+        """Download ``url`` into the cache, resuming partial files.
+
+        A dropped connection continues from the bytes already on disk with
+        an HTTP Range request (restarting if the server ignores it).
+        Returns the path of the complete file.
+        """
+        final = self.path_for(video_id, ext)
+        if final.exists():
+            os.utime(final)
+            return str(final)
+        part = final.with_name(final.name + PART_SUFFIX)
+        last_error = None
+        for _ in range(max_attempts):
+            try:
+                self._fetch(url, part, headers or {})
+                os.replace(part, final)
+                self.evict(keep=(final,))
+                return str(final)
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                last_error = e
+                error_handler.log_warning(f"Download of {video_id} interrupted: {e}")
+        raise IOError(f"Download of {video_id} failed after {max_attempts} attempts: {last_error}")
+
+    def _fetch(self, url: str, part: Path, headers: Dict[str, str]):
+        offset = part.stat().st_size if part.exists() else 0
+        request_headers = dict(headers)
+        if offset:
+            request_headers['Range'] = f"bytes={offset}-"
+        request = urllib.request.Request(url, headers=request_headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            # Nothing left to fetch: the partial file is already complete
+            content_range = e.headers.get('Content-Range', '')
+            if e.code == 416 and content_range.endswith(f"/{offset}"):
+                return
+            raise
+        with response:
+            if offset and response.status != 206:
+                offset = 0
+            expected = None
+            content_range = response.headers.get('Content-Range')
+            if content_range and '/' in content_range and not content_range.endswith('/*'):
+                expected = int(content_range.rsplit('/', 1)[1])
+            elif response.headers.get('Content-Length') is not None:
+                expected = offset + int(response.headers['Content-Length'])
+            self._sizes[part.name[:-len(PART_SUFFIX)]] = expected
+            with open(part, 'ab' if offset else 'wb') as f:
+                while True:
+                    chunk = response.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+        size = part.stat().st_size
+        if expected is not None and size < expected:
+            raise IOError(f"Incomplete download: {size} of {expected} bytes")
+
+    def download_async(self, url: str, video_id, ext: str = 'mp4',
+                       headers: Optional[Dict[str, str]] = None) -> threading.Thread:
+        """Fill the cache in a daemon thread (one per video id)"""
+        key = self.safe_id(video_id)
+        with self._lock:
+            thread = self._downloads.get(key)
+            if thread is not None and thread.is_alive():
+                return thread
+
+            def run():
+                try:
+                    self.download(url, video_id, ext, headers)
+                except Exception as e:
+                    error_handler.log_error(f"Background download of {video_id} failed: {str(e)}", e)
+
+            thread = threading.Thread(target=run, name=f"Download-{key}", daemon=True)
+            self._downloads[key] = thread
+        thread.start()
+        return thread
+
+    def stream_url(self, url: str, video_id, ext: str = 'mp4',
+                   headers: Optional[Dict[str, str]] = None) -> str:
+        """Local URL that plays ``url`` while it downloads into the cache
+
+        The one background download fills the cache; the decoder reads the
+        bytes already on disk through a local HTTP server, which waits for
+        the rest. The video is fetched once, and only the download needs
+        the source's ``headers`` (e.g. yt-dlp's ``http_headers``).
+        """
+        self.download_async(url, video_id, ext, headers)
+        with self._lock:
+            if self._server is None:
+                self._server = self._start_server()
+            port = self._server.server_address[1]
+        name = urllib.parse.quote(self.path_for(video_id, ext).name)
+        return f"http://127.0.0.1:{port}/{name}"
+
+    def close(self):
+        """Stop the local stream server"""
+        with self._lock:
+            server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    def _start_server(self) -> ThreadingHTTPServer:
+        cache = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Idle keep-alive connections are dropped after this
+            timeout = cache.timeout
+
+            def do_GET(self):
+                # FFmpeg sends "Connection: close" but still reuses the
+                # connection when it seeks, so keep it open
+                self.close_connection = False
+                try:
+                    cache._serve(self)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Decoders drop the connection to seek
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, args=(0.1,),
+                         name="MediaCacheStream", daemon=True).start()
+        return server
+
+    def _total_size(self, final: Path):
+        """Size of a cached or downloading file; waits until it is known.
+
+        Returns None when the source did not report a size and raises
+        FileNotFoundError when the file is neither cached nor downloading.
+        """
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if final.exists():
+                return final.stat().st_size
+            if final.name in self._sizes:
+                return self._sizes[final.name]
+            if final.with_suffix('').name not in self._active_stems():
+                break
+            time.sleep(0.02)
+        raise FileNotFoundError(final.name)
+
+    def _read_at(self, final: Path, offset: int, size: int) -> bytes:
+        # Opened per read: the partial file is renamed when complete
+        for path in (final, final.with_name(final.name + PART_SUFFIX)):
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    return f.read(size)
+            except FileNotFoundError:
+                continue
+        return b''
+
+    def _serve(self, request: BaseHTTPRequestHandler):
+        name = urllib.parse.unquote(request.path.lstrip('/').split('?')[0])
+        final = self.directory / name
+        if '/' in name or not name.startswith(self.prefix) or name.endswith(PART_SUFFIX):
+            request.send_error(404)
+            return
+        try:
+            total = self._total_size(final)
+        except FileNotFoundError:
+            request.send_error(404)
+            return
+
+        start, end = 0, None if total is None else total - 1
+        match = re.match(r'bytes=(\d+)-(\d*)$', request.headers.get('Range') or '')
+        if match and total is not None:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(int(match.group(2)), end)
+            if start >= total:
+                request.send_response(416)
+                request.send_header('Content-Range', f"bytes */{total}")
+                request.send_header('Content-Length', '0')
+                request.end_headers()
+                return
+            request.send_response(206)
+            request.send_header('Content-Range', f"bytes {start}-{end}/{total}")
+        else:
+            request.send_response(200)
+        request.send_header('Content-Type', 'application/octet-stream')
+        if total is None:
+            # Unknown length: the body ends when the connection closes
+            request.close_connection = True
+        else:
+            request.send_header('Accept-Ranges', 'bytes')
+            request.send_header('Content-Length', str(end - start + 1))
+        request.end_headers()
+
+        offset = start
+        idle_since = time.monotonic()
+        while end is None or offset <= end:
+            size = self.chunk_size if end is None else min(self.chunk_size, end - offset + 1)
+            complete = final.exists()
+            data = self._read_at(final, offset, size)
+            if data:
+                request.wfile.write(data)
+                offset += len(data)
+                idle_since = time.monotonic()
+                continue
+            # Nothing new on disk: done, failed, stalled or still coming
+            if complete or final.with_suffix('').name not in self._active_stems() \
+                    or time.monotonic() - idle_since > self.timeout:
+                request.close_connection = True
+                break
+            time.sleep(0.02)
@@ -0,0 +1,266 @@
+"""
+Metrics Module
+Per-stage latency histograms, counters and gauges with a Prometheus endpoint
+"""
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from .error_handler import error_handler
+
+
+# Latency buckets in seconds (upper bounds, +Inf is implicit)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+METRIC_PREFIX = "fall_detection_"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, like Prometheus)"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            if cumulative + n >= rank and n > 0:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.buckets[-1]
+
+
+class _Timer:
+    """Context manager that records elapsed time into a histogram"""
+
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: LabelKey):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry._observe(self.name, self.labels, time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Thread-safe store for histograms, counters and gauges"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """Initialize empty registry"""
+        self.buckets = buckets
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._last_summary = time.monotonic()
+
+    @staticmethod
+    def _labels(labels: dict) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name: str, help_text: str):
+        """Set the HELP text shown on the /metrics endpoint"""
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one histogram sample (seconds for latencies)"""
+        self._observe(name, self._labels(labels), value)
+
+    def _observe(self, name: str, labels: LabelKey, value: float):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def timer(self, name: str, **labels) -> _Timer:
+        """Time a block: ``with metrics.timer('stage_seconds', stage='decode'):``"""
+        return _Timer(self, name, self._labels(labels))
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Increase a counter"""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to its current value"""
+        key = self._labels(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def get_histogram(self, name: str, **labels) -> Optional[Histogram]:
+        """Histogram for one label set, if recorded"""
+        with self._lock:
+            return self._histograms.get(name, {}).get(self._labels(labels))
+
+    def get_counter(self, name: str, **labels) -> float:
+        """Current counter value"""
+        with self._lock:
+            return self._counters.get(name, {}).get(self._labels(labels), 0)
+
+    def get_gauge(self, name: str, **labels) -> Optional[float]:
+        """Current gauge value, if set"""
+        with self._lock:
+            return self._gauges.get(name, {}).get(self._labels(labels))
+
+    def reset(self):
+        """Drop all recorded series"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    @staticmethod
+    def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        items = list(labels) + ([extra] if extra else [])
+        if not items:
+            return ""
+        escaped = []
+        for key, value in items:
+            value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{key}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self) -> str:
+        """Export all series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                full = METRIC_PREFIX + name
+                lines.append(f"# HELP {full} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {full} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip(histogram.buckets, histogram.counts):
+                        cumulative += n
+                        lines.append(f"{full}_bucket{self._format_labels(labels, ('le', repr(bound)))} {cumulative}")
+                    lines.append(f"{full}_bucket{self._format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{full}_sum{self._format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{full}_count{self._format_labels(labels)} {histogram.count}")
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(store.items()):
+                    full = METRIC_PREFIX + name
+                    lines.append(f"# HELP {full} {self._help.get(name, name)}")
+                    lines.append(f"# TYPE {full} {kind}")
+                    for labels, value in sorted(series.items()):
+                        lines.append(f"{full}{self._format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Mean/p50/p99 in milliseconds and sample count for every histogram series"""
+        result = {}
+        with self._lock:
+            for name, series in self._histograms.items():
+                for labels, histogram in series.items():
+                    label_text = ",".join(f"{k}={v}" for k, v in labels)
+                    result[f"{name}{{{label_text}}}"] = {
+                        'count': histogram.count,
+                        'mean_ms': histogram.sum / max(histogram.count, 1) * 1000,
+                        'p50_ms': histogram.quantile(0.5) * 1000,
+                        'p99_ms': histogram.quantile(0.99) * 1000,
+                    }
+        return result
+
+    def maybe_log_summary(self, interval: float = 60.0) -> bool:
+        """Log a latency summary if ``interval`` seconds passed since the last one"""
+        now = time.monotonic()
+        if now - self._last_summary < interval:
+            return False
+        self._last_summary = now
+        for series, stats in sorted(self.summary().items()):
+            error_handler.log_info(
+                f"[metrics] {series} n={stats['count']} mean={stats['mean_ms']:.1f}ms "
+                f"p50={stats['p50_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms"
+            )
+        return True
+
+
+class MetricsServer:
+    """Serve ``/metrics`` from a registry on a local HTTP port"""
+
+    def __init__(self, registry: MetricsRegistry,
+                 host: str = "127.0.0.1", port: int = 9108):
+        """Initialize server (not started)"""
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self._thread = None
+
+    def start(self) -> int:
+        """Start serving in a daemon thread; returns the bound port"""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name="MetricsServer", daemon=True)
+        self._thread.start()
+        error_handler.log_info(f"Metrics endpoint: http://{self.host}:{self.port}/metrics")
+        return self.port
+
+    def stop(self):
+        """Stop serving"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
+metrics.describe('stage_seconds', 'Per-frame processing latency by stream and pipeline stage')
+metrics.describe('frames_total', 'Frames read from the video source')
+metrics.describe('frames_skipped_total', 'Frames intentionally not sent to pose inference (skip_frames, inference budget)')
+metrics.describe('frames_dropped_total', 'Frame results lost because a bounded queue was full')
+metrics.describe('events_dropped_total', 'Fall events lost because a subscriber fell behind')
+metrics.describe('queue_depth', 'Current number of items waiting in a queue')
@@ -0,0 +1,186 @@
+"""
+Frame Loop Profiler Module
+Opt-in cProfile + stack sampling over a window of frames
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .error_handler import error_handler
+
+
+# Functions reported separately in the text summary
+HOT_FUNCTIONS = ('detect_fall', 'detect_people', 'get_all_keypoints', 'process_frame')
+
+PROFILE_ENV_VAR = 'FALL_DETECTION_PROFILE_FRAMES'
+
+
+class StackSampler:
+    """Sample the call stack of one thread at a fixed interval"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="StackSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def folded(self) -> str:
+        """Collapsed stacks, one ``frame;frame;frame count`` line per stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class FrameProfiler:
+    """Profile the processing loop for a fixed number of frames.
+
+    Call :meth:`tick` once per loop iteration. After :meth:`arm` the next
+    ``window_frames`` iterations run under cProfile while a sampler thread
+    records call stacks. When the window closes three files are written:
+    ``.prof`` (pstats, e.g. for snakeviz), ``.folded`` (collapsed stacks for
+    flamegraph.pl / speedscope) and ``.txt`` (per-function timings).
+    """
+
+    def __init__(self, output_dir: str = "profiles",
+                 window_frames: int = 300,
+                 sample_interval: float = 0.005):
+        """Initialize profiler (disarmed)"""
+        self.output_dir = Path(output_dir)
+        self.window_frames = window_frames
+        self.sample_interval = sample_interval
+
+        self.armed = False
+        self.active = False
+        self.frames_profiled = 0
+        self.last_report: Optional[Dict[str, str]] = None
+        self._profile = None
+        self._sampler = None
+        self._started_at = 0.0
+
+    @classmethod
+    def from_env(cls, **kwargs) -> 'FrameProfiler':
+        """Create a profiler armed when FALL_DETECTION_PROFILE_FRAMES is set"""
+        profiler = cls(**kwargs)
+        frames = os.environ.get(PROFILE_ENV_VAR)
+        if frames:
+            profiler.arm(int(frames))
+        return profiler
+
+    def arm(self, window_frames: Optional[int] = None):
+        """Start profiling at the next tick"""
+        if window_frames is not None:
+            self.window_frames = window_frames
+        self.armed = True
+
+    def tick(self):
+        """Mark a frame boundary"""
+        if self.active:
+            self.frames_profiled += 1
+            if self.frames_profiled >= self.window_frames:
+                self.stop()
+        elif self.armed:
+            self._start()
+
+    def _start(self):
+        self.armed = False
+        self.active = True
+        self.frames_profiled = 0
+        self._started_at = time.perf_counter()
+        self._sampler = StackSampler(threading.get_ident(), self.sample_interval)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> Optional[Dict[str, str]]:
+        """Stop an active window early and write the report files"""
+        if not self.active:
+            return None
+        self._profile.disable()
+        self._sampler.stop()
+        self.active = False
+        elapsed = time.perf_counter() - self._started_at
+        self.last_report = self._dump(elapsed)
+        error_handler.log_info(
+            f"Profile of {self.frames_profiled} frames written: {self.last_report['folded']}"
+        )
+        return self.last_report
+
+    def _dump(self, elapsed: float) -> Dict[str, str]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        base = self.output_dir / f"frame_loop_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        paths = {
+            'pstats': f"{base}.prof",
+            'folded': f"{base}.folded",
+            'summary': f"{base}.txt",
+        }
+        self._profile.dump_stats(paths['pstats'])
+        Path(paths['folded']).write_text(self._sampler.folded(), encoding='utf-8')
+        Path(paths['summary']).write_text(self.summary(elapsed), encoding='utf-8')
+        return paths
+
+    def function_timings(self) -> List[Dict]:
+        """Per-function timings of hot paths and OpenCV calls in the last window"""
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (filename, _, name), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            is_opencv = 'cv2.' in name
+            if name in HOT_FUNCTIONS or is_opencv:
+                rows.append({
+                    'function': name if is_opencv else f"{os.path.basename(filename)}:{name}",
+                    'calls': ncalls,
+                    'total_ms': tottime * 1000,
+                    'cumulative_ms': cumtime * 1000,
+                    'per_call_ms': cumtime * 1000 / max(ncalls, 1),
+                })
+        rows.sort(key=lambda r: r['cumulative_ms'], reverse=True)
+        return rows
+
+    def summary(self, elapsed: float) -> str:
+        """Readable report of the profiled window"""
+        frames = max(self.frames_profiled, 1)
+        lines = [
+            f"Frames: {self.frames_profiled}",
+            f"Wall time: {elapsed:.2f}s ({elapsed * 1000 / frames:.2f} ms/frame)",
+            "",
+            f"{'function':<48}{'calls':>8}{'cum ms':>12}{'ms/call':>10}{'ms/frame':>10}",
+        ]
+        for row in self.function_timings():
+            lines.append(
+                f"{row['function']:<48}{row['calls']:>8}{row['cumulative_ms']:>12.1f}"
+                f"{row['per_call_ms']:>10.3f}{row['cumulative_ms'] / frames:>10.3f}"
+            )
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(25)
+        lines += ["", out.getvalue()]
+        return "\n".join(lines)
@@ -0,0 +1,296 @@
+"""
+Screenshot Manager Module
+Stores fall screenshots in per-camera/per-day shards with an in-memory index
+"""
+
+import hashlib
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .error_handler import error_handler
+
+
+THUMBNAIL_DIR = "thumbs"
+DAY_FORMAT = "%Y%m%d"
+
+_STOP = object()
+_PRUNE = object()
+
+# Directory names of camera shards; longer slugs are cut and hashed
+MAX_SLUG_LENGTH = 48
+
+
+class ScreenshotManager:
+    """Fall screenshot storage with index, retention and thumbnails.
+
+    Layout: ``<root>/<camera>/<YYYYMMDD>/<file>.jpg`` with thumbnails in a
+    ``thumbs/`` sub-directory of each day. The directory tree is scanned once
+    at start-up; afterwards counts and sizes come from the index, so reruns
+    of the UI never glob the directory.
+    """
+
+    def __init__(self, root_dir: str = "fall_screenshots",
+                 max_age_days: Optional[float] = 30,
+                 max_total_bytes: Optional[int] = None,
+                 thumbnail_width: int = 160,
+                 jpeg_quality: int = 90,
+                 prune_interval: float = 300.0):
+        """Initialize manager, build index and start the background worker"""
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self.thumbnail_width = thumbnail_width
+        self.jpeg_quality = jpeg_quality
+        self.prune_interval = prune_interval
+
+        # (camera, day) -> [count, bytes]; legacy flat files use ('', '')
+        self._shards: Dict[Tuple[str, str], List[int]] = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+        self._last_stamp = None
+        self._stamp_repeats = 0
+        self._rebuild_index()
+
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._worker_loop,
+                                        name="ScreenshotWorker", daemon=True)
+        self._worker.start()
+        # Retention also applies when nothing is saved (idle or just restarted)
+        self._queue.put(_PRUNE)
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'ScreenshotManager':
+        """Create manager from the 'screenshots' section of a YAML config"""
+        section = config.get('screenshots', config)
+        kwargs = {'root_dir': section['directory']} if section.get('directory') else {}
+        kwargs.update({key: section[key] for key in ('max_age_days', 'max_total_bytes',
+                                                     'thumbnail_width', 'prune_interval')
+                       if key in section})
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    @staticmethod
+    def camera_slug(camera_id) -> str:
+        """Make a camera id (index, file path, URL) safe for a directory name"""
+        slug = re.sub(r'[^A-Za-z0-9_-]+', '_', str(camera_id)).strip('_')
+        if len(slug) > MAX_SLUG_LENGTH:
+            # Long URLs/paths often share their tail; keep them apart
+            digest = hashlib.sha1(str(camera_id).encode('utf-8')).hexdigest()[:8]
+            slug = f"{slug[-(MAX_SLUG_LENGTH - 9):]}_{digest}"
+        return slug or 'default'
+
+    def _rebuild_index(self):
+        """Scan the directory tree once and build shard statistics"""
+        shards = {}
+        with os.scandir(self.root_dir) as cameras:
+            for camera in cameras:
+                if camera.is_file() and camera.name.endswith('.jpg'):
+                    stats = shards.setdefault(('', ''), [0, 0])
+                    stats[0] += 1
+                    stats[1] += camera.stat().st_size
+                elif camera.is_dir():
+                    with os.scandir(camera.path) as days:
+                        for day in days:
+                            if day.is_dir():
+                                shards[(camera.name, day.name)] = self._scan_shard(day.path)
+        with self._lock:
+            self._shards = shards
+
+    @staticmethod
+    def _scan_shard(path: str) -> List[int]:
+        """Count the screenshots of one day directory and size them with their thumbnails"""
+        count, size = 0, 0
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.jpg'):
+                    count += 1
+                    size += entry.stat().st_size
+                elif entry.is_dir() and entry.name == THUMBNAIL_DIR:
+                    with os.scandir(entry.path) as thumbs:
+                        size += sum(t.stat().st_size for t in thumbs
+                                    if t.is_file() and t.name.endswith('.jpg'))
+        return [count, size]
+
+    def save(self, frame: np.ndarray, camera_id='default',
+             person_id: Optional[int] = None) -> str:
+        """Queue a screenshot for writing and return its future path"""
+        now = datetime.now()
+        camera = self.camera_slug(camera_id)
+        day = now.strftime(DAY_FORMAT)
+        stamp = now.strftime("%H%M%S_%f")[:-3]
+        with self._lock:
+            if stamp == self._last_stamp:
+                self._stamp_repeats += 1
+                stamp = f"{stamp}_{self._stamp_repeats}"
+            else:
+                self._last_stamp = stamp
+                self._stamp_repeats = 0
+        if person_id is not None:
+            filename = f"fall_person{person_id}_{stamp}.jpg"
+        else:
+            filename = f"fall_{stamp}.jpg"
+        filepath = self.root_dir / camera / day / filename
+        self._queue.put((frame.copy(), filepath, camera, day))
+        return str(filepath)
+
+    def _worker_loop(self):
+        """Write screenshots and thumbnails, prune old shards every prune_interval"""
+        while True:
+            wait = self._last_prune + self.prune_interval - time.monotonic()
+            try:
+                item = self._queue.get(timeout=max(wait, 0.0))
+            except queue.Empty:
+                item = None
+            try:
+                if item is _STOP:
+                    return
+                if item is not None and item is not _PRUNE:
+                    self._write(*item)
+                if item is _PRUNE or time.monotonic() - self._last_prune >= self.prune_interval:
+                    self.prune()
+            except Exception as e:
+                error_handler.log_error(f"Screenshot error: {str(e)}", e)
+            finally:
+                if item is not None:
+                    self._queue.task_done()
+
+    def _write(self, frame: np.ndarray, filepath: Path, camera: str, day: str):
+        """Encode one screenshot and its thumbnail"""
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        if not cv2.imwrite(str(filepath), frame,
+                           [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]):
+            error_handler.log_error(f"Screenshot could not be written: {filepath}")
+            return
+        size = filepath.stat().st_size
+
+        if self.thumbnail_width:
+            h, w = frame.shape[:2]
+            thumb_h = max(1, int(h * self.thumbnail_width / w))
+            thumb = cv2.resize(frame, (self.thumbnail_width, thumb_h),
+                               interpolation=cv2.INTER_AREA)
+            thumb_path = self.thumbnail_path(filepath)
+            thumb_path.parent.mkdir(exist_ok=True)
+            if cv2.imwrite(str(thumb_path), thumb):
+                size += thumb_path.stat().st_size
+
+        with self._lock:
+            stats = self._shards.setdefault((camera, day), [0, 0])
+            stats[0] += 1
+            stats[1] += size
+
+    @staticmethod
+    def thumbnail_path(filepath) -> Path:
+        """Thumbnail location for a screenshot path"""
+        filepath = Path(filepath)
+        return filepath.parent / THUMBNAIL_DIR / filepath.name
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Apply retention rules; returns the number of screenshots removed"""
+        now = time.time() if now is None else now
+        self._last_prune = time.monotonic()
+        removed = 0
+
+        if self.max_age_days is not None:
+            cutoff = now - self.max_age_days * 86400
+            cutoff_day = datetime.fromtimestamp(cutoff).strftime(DAY_FORMAT)
+            for camera, day in self._shard_keys():
+                if camera == '':
+                    removed += self._prune_legacy(cutoff)
+                elif day < cutoff_day:
+                    removed += self._remove_shard(camera, day)
+
+        if self.max_total_bytes is not None:
+            for camera, day in sorted(self._shard_keys(), key=lambda k: k[1]):
+                if self.get_total_bytes() <= self.max_total_bytes:
+                    break
+                if camera == '':
+                    removed += self._prune_legacy(max_total_bytes=self.max_total_bytes)
+                elif day != datetime.fromtimestamp(now).strftime(DAY_FORMAT):
+                    removed += self._remove_shard(camera, day)
+
+        if removed:
+            error_handler.log_info(f"Pruned {removed} old screenshots")
+        return removed
+
+    def _shard_keys(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._shards)
+
+    def _remove_shard(self, camera: str, day: str) -> int:
+        """Delete one camera/day directory and drop it from the index"""
+        with self._lock:
+            count = self._shards.pop((camera, day), [0, 0])[0]
+        shutil.rmtree(self.root_dir / camera / day, ignore_errors=True)
+        camera_dir = self.root_dir / camera
+        if camera_dir.is_dir() and not any(camera_dir.iterdir()):
+            camera_dir.rmdir()
+        return count
+
+    def _prune_legacy(self, cutoff: Optional[float] = None,
+                      max_total_bytes: Optional[int] = None) -> int:
+        """Delete flat (pre-sharding) screenshots, oldest first, that are
+        older than ``cutoff`` or while the total exceeds ``max_total_bytes``"""
+        with os.scandir(self.root_dir) as entries:
+            files = [(entry.stat(), entry.path) for entry in entries
+                     if entry.is_file() and entry.name.endswith('.jpg')]
+        removed = 0
+        for stat, path in sorted(files, key=lambda f: f[0].st_mtime):
+            if cutoff is not None and stat.st_mtime >= cutoff:
+                break
+            if max_total_bytes is not None and self.get_total_bytes() <= max_total_bytes:
+                break
+            os.remove(path)
+            removed += 1
+            with self._lock:
+                stats = self._shards[('', '')]
+                stats[0] -= 1
+                stats[1] -= stat.st_size
+        return removed
+
+    def get_count(self, camera_id=None) -> int:
+        """Number of stored screenshots (optionally for one camera)"""
+        return self.get_stats(camera_id)['count']
+
+    def get_total_bytes(self) -> int:
+        """Total size of stored screenshots and thumbnails in bytes"""
+        return self.get_stats()['bytes']
+
+    def get_stats(self, camera_id=None) -> dict:
+        """Index statistics: screenshot count, bytes and number of shards"""
+        camera = self.camera_slug(camera_id) if camera_id is not None else None
+        with self._lock:
+            shards = [v for k, v in self._shards.items() if camera is None or k[0] == camera]
+        return {
+            'count': sum(s[0] for s in shards),
+            'bytes': sum(s[1] for s in shards),
+            'shards': len(shards),
+        }
+
+    def list_screenshots(self, camera_id, day: Optional[str] = None) -> List[str]:
+        """Screenshot paths of one camera for one day (default: today)"""
+        day = day or datetime.now().strftime(DAY_FORMAT)
+        shard_dir = self.root_dir / self.camera_slug(camera_id) / day
+        if not shard_dir.is_dir():
+            return []
+        return sorted(str(p) for p in shard_dir.glob('*.jpg'))
+
+    def flush(self):
+        """Block until queued screenshots are written"""
+        self._queue.join()
+
+    def close(self):
+        """Write pending screenshots and stop the worker"""
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join()
@@ -0,0 +1,197 @@
+"""
+Upload Store Module
+Streams uploaded videos to content-addressed files with deduplication and a janitor
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .error_handler import error_handler
+
+
+PART_SUFFIX = '.part'
+
+
+class UploadStore:
+    """Uploaded videos stored as ``<sha256><suffix>`` in one directory.
+
+    Re-uploading the same content returns the existing file untouched (same
+    path, size and mtime), so caches keyed by file identity, like the
+    keypoint cache of ``train_scorer``, keep hitting.
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 chunk_size: int = 8 * 1024 * 1024,
+                 max_age_hours: Optional[float] = 24.0,
+                 max_total_bytes: Optional[int] = 4 * 1024 ** 3,
+                 clean_interval: float = 300.0):
+        """Initialize store (default: ``fall_detection_uploads`` in the temp dir)"""
+        self.directory = Path(directory or Path(tempfile.gettempdir()) / 'fall_detection_uploads')
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.max_age_hours = max_age_hours
+        self.max_total_bytes = max_total_bytes
+        self.clean_interval = clean_interval
+        # Files handed out and possibly being decoded; never removed
+        self.active = set()
+        self._lock = threading.Lock()
+        self._last_clean = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict, **overrides) -> 'UploadStore':
+        """Create store from the 'uploads' section of a YAML config"""
+        section = config.get('uploads', config)
+        kwargs = {key: section[key] for key in ('directory', 'max_age_hours',
+                                                'max_total_bytes', 'clean_interval')
+                  if key in section}
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    def _chunks(self, fileobj) -> Iterator:
+        getbuffer = getattr(fileobj, 'getbuffer', None)
+        if getbuffer is not None:
+            # In-memory uploads (Streamlit UploadedFile/BytesIO): slice
+            # the buffer instead of copying it with read()
+            with getbuffer() as view:
+                for start in range(0, len(view), self.chunk_size):
+                    yield view[start:start + self.chunk_size]
+            return
+        while True:
+            chunk = fileobj.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def path_for(self, digest: str, suffix: str = '.mp4') -> Path:
+        return self.directory / f"{digest}{suffix}"
+
+    def save(self, fileobj, name: str = '', suffix: Optional[str] = None) -> Tuple[str, bool]:
+        """Store an upload in chunks; returns (path, reused).
+
+        ``reused`` is True when identical content was already stored, in
+        which case nothing is written.
+        """
+        suffix = suffix or Path(name).suffix.lower() or '.mp4'
+        getbuffer = getattr(fileobj, 'getbuffer', None)
+        if getbuffer is not None:
+            # Hash first: duplicates cost no disk write at all
+            with getbuffer() as view:
+                digest = hashlib.sha256(view).hexdigest()
+            path = self.path_for(digest, suffix)
+            reused = self._reuse(path)
+            if not reused:
+                self._write(fileobj, suffix, expected=path)
+        else:
+            path, reused = self._write(fileobj, suffix)
+        self.maybe_clean()
+        return str(path), reused
+
+    def _write(self, fileobj, suffix: str, expected: Optional[Path] = None) -> Tuple[Path, bool]:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=PART_SUFFIX)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in self._chunks(fileobj):
+                    digest.update(chunk)
+                    out.write(chunk)
+            path = expected or self.path_for(digest.hexdigest(), suffix)
+            if self._reuse(path):
+                os.unlink(tmp)
+                return path, True
+            with self._lock:
+                os.replace(tmp, path)
+                self.active.add(str(path))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return path, False
+
+    def _reuse(self, path: Path) -> bool:
+        with self._lock:
+            if not path.exists():
+                return False
+            # Record the use in atime only; mtime stays the content's identity
+            os.utime(path, ns=(time.time_ns(), path.stat().st_mtime_ns))
+            self.active.add(str(path))
+        return True
+
+    def release(self, path: str):
+        """The file is no longer in use and may be cleaned up later"""
+        with self._lock:
+            self.active.discard(str(path))
+
+    def entries(self) -> List[Tuple[Path, int, float]]:
+        """(path, bytes, last use) of stored uploads, least recently used first"""
+        entries = []
+        for path in self.directory.iterdir():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file() and path.suffix != PART_SUFFIX:
+                entries.append((path, stat.st_size, max(stat.st_atime, stat.st_mtime)))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def maybe_clean(self) -> int:
+        """Run :meth:`clean` if ``clean_interval`` seconds passed since the last run"""
+        if time.monotonic() - self._last_clean < self.clean_interval:
+            return 0
+        return self.clean()
+
+    def clean(self, now: Optional[float] = None, keep: Iterable = ()) -> int:
+        """Remove abandoned partial files, expired uploads and the oldest
+        uploads beyond ``max_total_bytes``; returns the number removed"""
+        now = time.time() if now is None else now
+        self._last_clean = time.monotonic()
+        with self._lock:
+            protected = self.active | {str(path) for path in keep}
+        removed: List[Path] = []
+
+        for path in self.directory.glob(f"*{PART_SUFFIX}"):
+            try:
+                if now - path.stat().st_mtime > 3600:
+                    path.unlink()
+                    removed.append(path)
+            except OSError:
+                continue
+
+        entries = [e for e in self.entries() if str(e[0]) not in protected]
+        if self.max_age_hours is not None:
+            cutoff = now - self.max_age_hours * 3600
+            expired = [e for e in entries if e[2] < cutoff]
+            removed += self._remove(expired)
+            entries = [e for e in entries if e not in expired]
+        if self.max_total_bytes is not None:
+            total = self.total_bytes()
+            excess = []
+            for entry in entries:
+                if total <= self.max_total_bytes:
+                    break
+                excess.append(entry)
+                total -= entry[1]
+            removed += self._remove(excess)
+
+        if removed:
+            error_handler.log_info(f"Removed {len(removed)} old upload files")
+        return len(removed)
+
+    @staticmethod
+    def _remove(entries) -> List[Path]:
+        removed = []
+        for path, _, _ in entries:
+            try:
+                path.unlink()
+                removed.append(path)
+            except OSError as e:
+                error_handler.log_warning(f"Upload cleanup failed for {path}: {e}")
+        return removed
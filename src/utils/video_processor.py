@@ -3,17 +3,22 @@ Enhanced Video Processing Module with Error Handling
 Handles camera issues, lighting problems, and frame processing errors
 """
 
+import logging
+import time
+
 import cv2
 import numpy as np
 from typing import Optional, Tuple
 from src.utils.error_handler import error_handler
+from src.utils.camera_sessions import backoff_delay
 
 
 class VideoProcessor:
     """Enhanced video processing with robust error handling"""
     
-    def __init__(self):
+    def __init__(self, source: str = 'default'):
         """Initialize video processor"""
+        self.source = source
         self.frame_count = 0
         self.error_count = 0
         self.max_consecutive_errors = 10
@@ -55,7 +60,7 @@ class VideoProcessor:
         # Check for very dark frames (low light)
         mean_brightness = np.mean(frame)
         if mean_brightness < 30:
-            error_handler.log_warning("Low light detected")
+            error_handler.log_rate_limited("Low light detected", source=self.source)
             return True, error_handler.handle_low_light_warning()
         
         # Check for blank/corrupted frames
@@ -119,13 +124,18 @@ class VideoProcessor:
 class CameraManager:
     """Manages camera connections with error recovery"""
     
-    def __init__(self, camera_id: int = 0):
-        """Initialize camera manager"""
+    def __init__(self, camera_id: int = 0, max_reconnect_attempts: int = 3,
+                 reconnect_delay: float = 2.0, max_reconnect_delay: float = 30.0):
+        """Initialize camera manager (delays in seconds)"""
         self.camera_id = camera_id
         self.cap = None
         self.is_opened = False
         self.reconnect_attempts = 0
-        self.max_reconnect_attempts = 3
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        # time.monotonic() of the next reconnect attempt, None when connected
+        self.next_attempt_at: Optional[float] = None
     
     def open(self) -> Tuple[bool, Optional[str]]:
         """Open camera with error handling"""
@@ -133,7 +143,9 @@ class CameraManager:
             self.cap = cv2.VideoCapture(self.camera_id)
             
             if not self.cap.isOpened():
-                error_handler.log_error(f"Failed to open camera {self.camera_id}")
+                error_handler.log_rate_limited(f"Failed to open camera {self.camera_id}",
+                                               source=f"camera_{self.camera_id}",
+                                               level=logging.ERROR)
                 return False, error_handler.handle_camera_error()
             
             # Set camera properties for better performance
@@ -142,6 +154,7 @@ class CameraManager:
             
             self.is_opened = True
             self.reconnect_attempts = 0
+            self.next_attempt_at = None
             error_handler.log_info(f"Camera {self.camera_id} opened successfully")
             return True, None
             
@@ -150,7 +163,14 @@ class CameraManager:
             return False, error_handler.handle_camera_error()
     
     def read(self) -> Tuple[bool, Optional[np.ndarray], Optional[str]]:
-        """Read frame with error handling and auto-reconnect"""
+        """Read frame with error handling and auto-reconnect
+
+        Never sleeps: a failed read schedules a reconnect with exponential
+        backoff, and later calls return a failure right away until it is
+        due, so the caller's frame loop keeps running.
+        """
+        if self.next_attempt_at is not None:
+            return self._retry()
         if not self.is_opened or self.cap is None:
             return False, None, "Kamera açık değil"
         
@@ -158,23 +178,56 @@ class CameraManager:
             ret, frame = self.cap.read()
             
             if not ret or frame is None:
-                error_handler.log_warning("Failed to read frame, attempting reconnect")
-                
-                if self.reconnect_attempts < self.max_reconnect_attempts:
-                    self.reconnect_attempts += 1
-                    self.release()
-                    success, error_msg = self.open()
-                    if success:
-                        return self.read()
-                
+                error_handler.log_rate_limited("Failed to read frame, attempting reconnect",
+                                               source=f"camera_{self.camera_id}")
+                self.release()
+                self._schedule_reconnect()
                 return False, None, error_handler.handle_camera_error()
             
+            self.reconnect_attempts = 0
             return True, frame, None
             
         except Exception as e:
             error_handler.log_error(f"Frame read error: {str(e)}", e)
             return False, None, error_handler.handle_processing_error()
     
+    def _schedule_reconnect(self) -> bool:
+        """Schedule the next reconnect; False once the attempts are used up"""
+        if self.reconnect_attempts >= self.max_reconnect_attempts:
+            self.next_attempt_at = None
+            return False
+        delay = backoff_delay(self.reconnect_attempts, self.reconnect_delay,
+                              self.max_reconnect_delay)
+        self.reconnect_attempts += 1
+        self.next_attempt_at = time.monotonic() + delay
+        return True
+    
+    def _retry(self) -> Tuple[bool, Optional[np.ndarray], Optional[str]]:
+        """One reconnect attempt if it is due"""
+        if time.monotonic() < self.next_attempt_at:
+            return False, None, "Kamera yeniden bağlanıyor"
+        self.next_attempt_at = None
+        if self._reopen():
+            try:
+                ret, frame = self.cap.read()
+            except Exception as e:
+                error_handler.log_error(f"Frame read error: {str(e)}", e)
+                ret, frame = False, None
+            if ret and frame is not None:
+                self.reconnect_attempts = 0
+                return True, frame, None
+            self.release()
+        if self._schedule_reconnect():
+            return False, None, "Kamera yeniden bağlanıyor"
+        return False, None, error_handler.handle_camera_error()
+    
+    def _reopen(self) -> bool:
+        """Open again without resetting the reconnect counter"""
+        attempts = self.reconnect_attempts
+        success, _ = self.open()
+        self.reconnect_attempts = attempts
+        return success
+    
     def release(self):
         """Release camera resources"""
         try:
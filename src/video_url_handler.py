@@ -4,17 +4,38 @@ Video URL Handler Module
 
 import yt_dlp
 import cv2
-import tempfile
 import os
-from typing import Optional, Tuple
+import re
+from typing import Dict, Optional, Tuple
+
+from src.utils.camera_sessions import open_capture
+from src.utils.media_cache import MediaCache
+
+
+YOUTUBE_ID_PATTERN = re.compile(r'(?:v=|youtu\.be/|/embed/|/shorts/|/live/)([A-Za-z0-9_-]{11})')
 
 
 class VideoURLHandler:
     """Video URL Handler"""
     
-    def __init__(self):
-        """Initialize handler"""
+    def __init__(self, cache: Optional[MediaCache] = None, streaming: bool = True):
+        """Initialize handler
+
+        With ``streaming`` a YouTube video is decoded while a background
+        download fills ``cache``: the decoder reads the download through
+        the cache's local stream server, so the video is fetched once, with
+        yt-dlp's HTTP headers. A video already in the cache is played from
+        disk.
+        """
         self.temp_file = None
+        self.cache = cache or MediaCache()
+        self.streaming = streaming
+    
+    @staticmethod
+    def extract_video_id(url: str) -> Optional[str]:
+        """YouTube video id from the URL, without a network request"""
+        match = YOUTUBE_ID_PATTERN.search(url)
+        return match.group(1) if match else None
         
     def is_youtube_url(self, url: str) -> bool:
         """Check if URL is from YouTube"""
@@ -27,29 +48,58 @@ class VideoURLHandler:
         return any(url.lower().startswith(protocol) for protocol in ip_camera_protocols) \
                and not self.is_youtube_url(url)
     
+    def _ydl_options(self, max_resolution: int) -> Dict:
+        return {
+            # Progressive (audio+video in one file) HTTP formats stream without muxing
+            'format': (f'best[height<={max_resolution}][ext=mp4][protocol^=http]'
+                       f'/best[height<={max_resolution}][protocol^=http]/best[ext=mp4]/best'),
+            'outtmpl': str(self.cache.directory / f'{self.cache.prefix}%(id)s.%(ext)s'),
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': False,
+            'ignoreerrors': False,
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        }
+    
+    def resolve_youtube_stream(self, url: str, max_resolution: int = 720) -> Optional[Dict]:
+        """Direct media URL of a YouTube video (id, url, ext, http_headers)"""
+        try:
+            with yt_dlp.YoutubeDL(self._ydl_options(max_resolution)) as ydl:
+                info = ydl.extract_info(url, download=False)
+            media_url = info.get('url')
+            if not media_url:
+                print(f"Dogrudan medya adresi bulunamadi: {url}")
+                return None
+            return {
+                'id': info.get('id') or self.extract_video_id(url),
+                'url': media_url,
+                'ext': info.get('ext') or 'mp4',
+                'http_headers': info.get('http_headers') or {},
+            }
+        except Exception as e:
+            print(f"YouTube akis cozumleme hatasi: {e}")
+            return None
+    
+    def stream_youtube_video(self, url: str, max_resolution: int = 720) -> Optional[str]:
+        """Local URL for progressive decoding of the video's background download"""
+        stream = self.resolve_youtube_stream(url, max_resolution)
+        if stream is None:
+            return None
+        print(f"Video akis olarak aciliyor: {stream['id']}")
+        return self.cache.stream_url(stream['url'], stream['id'], stream['ext'],
+                                     stream['http_headers'])
+    
     def download_youtube_video(self, url: str, max_resolution: int = 720) -> Optional[str]:
         """Download YouTube video"""
         try:
-            temp_dir = tempfile.gettempdir()
-            output_template = os.path.join(temp_dir, 'fall_detection_%(id)s.%(ext)s')
-            
-            ydl_opts = {
-                'format': f'best[height<={max_resolution}][ext=mp4]/best[ext=mp4]/best',
-                'outtmpl': output_template,
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-                'ignoreerrors': False,
-                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with yt_dlp.YoutubeDL(self._ydl_options(max_resolution)) as ydl:
                 print(f"Video indiriliyor: {url}")
                 info = ydl.extract_info(url, download=True)
                 filename = ydl.prepare_filename(info)
                 
                 if os.path.exists(filename):
                     self.temp_file = filename
+                    self.cache.evict(keep=(filename,))
                     print(f"Basariyla indirildi: {filename}")
                     return filename
                 else:
@@ -61,22 +111,15 @@ class VideoURLHandler:
             import traceback
             traceback.print_exc()
             return None
-                
-        except Exception as e:
-            print(f"YouTube video indirme hatasi: {e}")
-            return None
     
-    def get_ip_camera_stream(self, url: str) -> Optional[cv2.VideoCapture]:
-        """Open IP camera stream"""
+    def get_ip_camera_stream(self, url: str, open_timeout: float = 10.0,
+                             read_timeout: float = 5.0) -> Optional[cv2.VideoCapture]:
+        """Open IP camera stream with open/read timeouts (seconds)"""
         try:
-            cap = cv2.VideoCapture(url)
-            
-            if cap.isOpened():
-                return cap
-            else:
-                print(f"Kamera akisi acilamadi: {url}")
-                return None
-                
+            return open_capture(url, open_timeout, read_timeout)
+        except IOError:
+            print(f"Kamera akisi acilamadi: {url}")
+            return None
         except Exception as e:
             print(f"Kamera akisi acma hatasi: {e}")
             return None
@@ -86,6 +129,15 @@ class VideoURLHandler:
         url = url.strip()
         
         if self.is_youtube_url(url):
+            video_id = self.extract_video_id(url)
+            cached = self.cache.lookup(video_id) if video_id else None
+            if cached:
+                print(f"Onbellekten aciliyor: {cached}")
+                return cached, 'youtube_cached'
+            if self.streaming:
+                stream_url = self.stream_youtube_video(url)
+                if stream_url:
+                    return stream_url, 'youtube_stream'
             print("YouTube videosu indiriliyor...")
             video_path = self.download_youtube_video(url)
             if video_path:
@@ -102,13 +154,10 @@ class VideoURLHandler:
             return None, 'unknown'
     
     def cleanup(self):
-        """Cleanup temporary files"""
-        if self.temp_file and os.path.exists(self.temp_file):
-            try:
-                os.remove(self.temp_file)
-                print(f"Gecici dosya silindi: {self.temp_file}")
-            except Exception as e:
-                print(f"Gecici dosya silme hatasi: {e}")
-            finally:
-                self.temp_file = None
+        """Apply the cache size bound to downloaded videos
 
+        Downloads are kept for replays; the least recently used
+        ``fall_detection_*`` files are removed once the cache is full.
+        """
+        self.temp_file = None
+        return self.cache.evict()
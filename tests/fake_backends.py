@@ -0,0 +1,72 @@
+"""
+Fake Pose Backends
+==================
+
+Drop-in stand-ins for MultiPersonDetector and PoseEstimator that return
+scripted keypoints in constant time, so the pipeline can be measured
+without model downloads or a GPU.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from tests.synthetic import KEYPOINT_NAMES, fall_sequence
+from src.core.pose_types import Person, Pose
+
+
+class ScriptedMultiPersonDetector:
+    """MultiPersonDetector interface replaying a keypoint script per person"""
+
+    KEYPOINT_NAMES = KEYPOINT_NAMES
+
+    def __init__(self, people: int = 1,
+                 script: Optional[List[Dict[str, Tuple[int, int]]]] = None,
+                 spacing: int = 200):
+        """``people`` copies of ``script`` are emitted side by side"""
+        self.script = script or fall_sequence(90)
+        self.people = people
+        self.spacing = spacing
+        self.calls = 0
+        # Pre-build every frame so detect_people() does no per-call work
+        self._frames = [self._build(keypoints) for keypoints in self.script]
+
+    def _build(self, keypoints: Dict[str, Tuple[int, int]]) -> List[Person]:
+        people = []
+        for i in range(self.people):
+            shifted = {name: (x + i * self.spacing, y) for name, (x, y) in keypoints.items()}
+            xs = [p[0] for p in shifted.values()]
+            ys = [p[1] for p in shifted.values()]
+            people.append(Person(Pose.from_dict(shifted), 0.9,
+                                 (min(xs), min(ys), max(xs), max(ys))))
+        return people
+
+    def detect_people(self, frame) -> List[Person]:
+        people = self._frames[self.calls % len(self._frames)]
+        self.calls += 1
+        return people
+
+
+class ScriptedPoseEstimator:
+    """PoseEstimator interface replaying a single-person keypoint script"""
+
+    def __init__(self, script: Optional[List[Dict[str, Tuple[int, int]]]] = None):
+        self.script = script or fall_sequence(90)
+        self.calls = 0
+        self._poses = [Pose.from_dict(keypoints) for keypoints in self.script]
+        self._current = Pose.empty()
+
+    def process_frame(self, frame: np.ndarray) -> bool:
+        self._current = self._poses[self.calls % len(self._poses)]
+        self.calls += 1
+        return bool(self._current)
+
+    def get_all_keypoints(self, frame_width: int,
+                          frame_height: int) -> Pose:
+        return self._current
+
+    def draw_skeleton(self, frame: np.ndarray) -> np.ndarray:
+        for x, y in self._current.values():
+            cv2.circle(frame, (x, y), 3, (255, 255, 255), -1)
+        return frame
@@ -0,0 +1,133 @@
+"""
+Local Media Server
+==================
+
+Stand-in for a video host in tests and ingestion measurements: serves
+in-memory files over HTTP with Range support, and can drop a response
+part way through to exercise resumed downloads.
+"""
+
+import os
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def encode_video(frames: int = 30, width: int = 320, height: int = 240,
+                 fps: float = 30.0) -> bytes:
+    """Bytes of a small MP4 with a moving bar"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'video.mp4')
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+        for i in range(frames):
+            frame = np.zeros((height, width, 3), dtype=np.uint8)
+            x = int(i * (width - 20) / max(frames - 1, 1))
+            frame[:, x:x + 20] = 255
+            writer.write(frame)
+        writer.release()
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+class LocalMediaServer:
+    """HTTP server for ``files`` on a free local port"""
+
+    def __init__(self, files: Optional[Dict[str, bytes]] = None, host: str = '127.0.0.1'):
+        self.files: Dict[str, bytes] = dict(files or {})
+        self.host = host
+        self.port = 0
+        # name -> bytes to send before dropping the next response for it
+        self.drop_after: Dict[str, int] = {}
+        # (path, Range header) of every GET
+        self.requests: List[Tuple[str, Optional[str]]] = []
+        # Headers a request must carry (403 otherwise), like signed media URLs
+        self.required_headers: Dict[str, str] = {}
+        self._httpd = None
+        self._thread = None
+
+    def url(self, name: str) -> str:
+        return f"http://{self.host}:{self.port}/{name}"
+
+    def start(self) -> 'LocalMediaServer':
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_HEAD(self):
+                self._serve(body=False)
+
+            def do_GET(self):
+                self._serve(body=True)
+
+            def _serve(self, body: bool):
+                name = self.path.lstrip('/').split('?')[0]
+                data = server.files.get(name)
+                if body:
+                    server.requests.append((name, self.headers.get('Range')))
+                if any(self.headers.get(k) != v for k, v in server.required_headers.items()):
+                    self.send_error(403)
+                    return
+                if data is None:
+                    self.send_error(404)
+                    return
+                start, end = 0, len(data) - 1
+                match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range') or '')
+                if match:
+                    start = int(match.group(1))
+                    if match.group(2):
+                        end = min(int(match.group(2)), end)
+                    if start >= len(data):
+                        self.send_response(416)
+                        self.send_header('Content-Range', f"bytes */{len(data)}")
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range', f"bytes {start}-{end}/{len(data)}")
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(end - start + 1))
+                self.end_headers()
+                if not body:
+                    return
+                payload = data[start:end + 1]
+                drop = server.drop_after.pop(name, None)
+                if drop is not None:
+                    self.wfile.write(payload[:drop])
+                    self.close_connection = True
+                    return
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, 0), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,),
+                                        name="LocalMediaServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
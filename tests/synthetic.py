@@ -0,0 +1,94 @@
+"""
+Synthetic Keypoint Generators
+=============================
+
+Deterministic COCO-17 keypoints for tests, benchmarks and fake pose backends.
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+KEYPOINT_NAMES = [
+    'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
+    'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
+    'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
+    'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
+]
+
+# Upright pose in body-height units: (dx from center, dy from top)
+_UPRIGHT = np.array([
+    (0.00, 0.06), (-0.02, 0.04), (0.02, 0.04), (-0.05, 0.05), (0.05, 0.05),
+    (-0.12, 0.20), (0.12, 0.20), (-0.16, 0.36), (0.16, 0.36),
+    (-0.18, 0.50), (0.18, 0.50), (-0.08, 0.53), (0.08, 0.53),
+    (-0.08, 0.75), (0.08, 0.75), (-0.08, 0.97), (0.08, 0.97),
+], dtype=np.float64)
+
+
+def pose_array(center_x: float, top_y: float, height: float,
+               tilt: float = 0.0) -> np.ndarray:
+    """(17, 2) keypoints of a person rotated by ``tilt`` (0 = standing, 1 = lying)"""
+    angle = tilt * np.pi / 2
+    dx = _UPRIGHT[:, 0] * height
+    dy = (_UPRIGHT[:, 1] - 0.53) * height
+    x = center_x + dx * np.cos(angle) - dy * np.sin(angle)
+    y = top_y + 0.53 * height + dx * np.sin(angle) + dy * np.cos(angle)
+    if tilt > 0:
+        # Lying people end up near the floor: shift down by the lost height
+        y += 0.47 * height * tilt
+    return np.stack([x, y], axis=1)
+
+
+def to_keypoint_dict(points: np.ndarray) -> Dict[str, Tuple[int, int]]:
+    """Named keypoint dict in the format produced by the pose backends"""
+    return {name: (int(x), int(y)) for name, (x, y) in zip(KEYPOINT_NAMES, points)}
+
+
+def standing_keypoints(center_x: float = 320, top_y: float = 60,
+                       height: float = 360) -> Dict[str, Tuple[int, int]]:
+    """Keypoints of a standing person"""
+    return to_keypoint_dict(pose_array(center_x, top_y, height, 0.0))
+
+
+def fallen_keypoints(center_x: float = 320, top_y: float = 60,
+                     height: float = 360) -> Dict[str, Tuple[int, int]]:
+    """Keypoints of a person lying on the floor"""
+    return to_keypoint_dict(pose_array(center_x, top_y, height, 1.0))
+
+
+def fall_sequence(frames: int = 60, standing_frames: int = 20,
+                  falling_frames: int = 10, center_x: float = 320,
+                  top_y: float = 60, height: float = 360) -> List[Dict[str, Tuple[int, int]]]:
+    """Standing, then falling over ``falling_frames``, then lying"""
+    sequence = []
+    for i in range(frames):
+        tilt = min(max((i - standing_frames) / max(falling_frames, 1), 0.0), 1.0)
+        sequence.append(to_keypoint_dict(pose_array(center_x, top_y, height, tilt)))
+    return sequence
+
+
+def random_people(count: int, frame_width: int = 1280, frame_height: int = 720,
+                  seed: int = 0) -> List[Dict[str, Tuple[int, int]]]:
+    """``count`` people with random position, size and tilt"""
+    rng = np.random.default_rng(seed)
+    people = []
+    for _ in range(count):
+        height = rng.uniform(0.3, 0.8) * frame_height
+        center_x = rng.uniform(0.1, 0.9) * frame_width
+        top_y = rng.uniform(0.0, 0.2) * frame_height
+        tilt = rng.choice([0.0, 0.0, 0.3, 1.0])
+        points = pose_array(center_x, top_y, height, tilt)
+        points += rng.normal(0, 2.0, points.shape)
+        people.append(to_keypoint_dict(np.clip(points, 1, None)))
+    return people
+
+
+def keypoint_arrays(count: int, seed: int = 0) -> np.ndarray:
+    """(count, 17, 2) float32 arrays as returned by YOLOv8-Pose"""
+    rng = np.random.default_rng(seed)
+    arrays = np.stack([pose_array(rng.uniform(100, 1100), rng.uniform(0, 100),
+                                  rng.uniform(200, 500), rng.choice([0.0, 1.0]))
+                       for _ in range(count)])
+    # Some joints undetected, reported by YOLO as (0, 0)
+    arrays[rng.random(arrays.shape[:2]) < 0.1] = 0
+    return arrays.astype(np.float32)
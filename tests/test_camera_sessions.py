@@ -0,0 +1,384 @@
+"""Ağ kamerası oturum yöneticisi testleri.
+
+- Yerel HTTP sunucusundan gerçek akış; akış bitince yeniden bağlanma
+- Ulaşılamayan kamerada üstel geri çekilme ve `down` sağlık durumu
+- Takılan açma işlemi zaman aşımına uğrar, diğer kamera akmaya devam eder
+- Kare gelmeyen (takılan) akışın tespiti
+- Okuma iş parçacıkları havuzu doldurmaz; havuzdan fazla kamera da akar
+- Kısa süre akıp kopan kamerada geri çekilme sıfırlanmaz
+- SessionCapture yeniden bağlanma boyunca okur; interrupt bekleyen okumayı bitirir
+- CameraManager: özyinelemesiz, okumayı bekletmeyen, geri çekilmeli yeniden bağlanma
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from tests.media_server import LocalMediaServer, encode_video
+from src.utils import camera_sessions
+from src.utils.error_handler import error_handler
+from src.utils.camera_sessions import (
+    BACKOFF, CONNECTING, DOWN, FAILED, HEALTHY, STALLED, STREAMING,
+    CameraSessionManager, backoff_delay, is_live_source,
+)
+from src.utils.video_processor import CameraManager
+
+
+class SlowCapture:
+    """Capture returning a frame every ``interval`` seconds; ``block`` freezes reads"""
+
+    def __init__(self, interval=0.01, frames=None):
+        self.interval = interval
+        self.frames = frames
+        self.block = threading.Event()
+        self.unblock = threading.Event()
+        self.blocked = threading.Event()
+        self.released = threading.Event()
+        self.reads = 0
+
+    def read(self):
+        if self.block.is_set():
+            self.blocked.set()
+            self.unblock.wait(10)
+            return False, None
+        if self.interval:
+            time.sleep(self.interval)
+        self.reads += 1
+        if self.frames is not None and self.reads > self.frames:
+            return False, None
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released.set()
+
+
+class TrackingCapture(SlowCapture):
+    """SlowCapture that records whether release() came during a read"""
+
+    def __init__(self, interval=0.01, frames=None):
+        super().__init__(interval, frames)
+        self.in_read = False
+        self.released_during_read = False
+
+    def read(self):
+        self.in_read = True
+        try:
+            return super().read()
+        finally:
+            self.in_read = False
+
+    def release(self):
+        self.released_during_read = self.released_during_read or self.in_read
+        super().release()
+
+
+def poll_until(manager, predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        manager.poll()
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestBackoffDelay(unittest.TestCase):
+    """Üstel gecikme ve üst sınır."""
+
+    def test_doubles_and_caps(self):
+        self.assertEqual([backoff_delay(i, 2.0, 20.0) for i in range(6)],
+                         [2.0, 4.0, 8.0, 16.0, 20.0, 20.0])
+
+    def test_jitter_bounds(self):
+        for _ in range(50):
+            self.assertTrue(9.0 <= backoff_delay(2, 2.5, 60.0, jitter=0.1) <= 11.0)
+
+
+class TestCameraSessionManager(unittest.TestCase):
+    """Durum makinesi, zaman aşımları ve kameraların birbirinden yalıtımı."""
+
+    def test_streams_from_http_camera(self):
+        with LocalMediaServer({'cam.mp4': encode_video(frames=30)}) as server, \
+                CameraSessionManager(reconnect_delay=0.05, jitter=0) as manager:
+            manager.add('cam', server.url('cam.mp4'))
+
+            self.assertTrue(poll_until(manager, lambda: manager.latest('cam')[0] > 0))
+            _, frame = manager.latest('cam')
+            self.assertEqual(frame.shape, (240, 320, 3))
+            # The clip ends: the session reconnects and keeps streaming
+            self.assertTrue(poll_until(manager, lambda: manager.status()['cam']['reconnects'] >= 1))
+
+    def test_unreachable_camera_backs_off(self):
+        manager = CameraSessionManager(reconnect_delay=1.0, max_delay=3.0, jitter=0)
+        self.addCleanup(error_handler.flush_rate_limited, force=True)
+        self.addCleanup(manager.stop)
+        session = manager.add('dead', 'http://127.0.0.1:1/stream.mp4', open_timeout=2.0)
+
+        now, delays = 0.0, []
+        for _ in range(4):
+            manager.poll(now)
+            self.assertEqual(session.state, CONNECTING)
+            session._open_future.exception(timeout=10)
+            manager.poll(now)
+            self.assertEqual(session.state, BACKOFF)
+            delays.append(session.next_attempt_at - now)
+            # Nothing happens before the delay has passed
+            manager.poll(session.next_attempt_at - 0.01)
+            self.assertEqual(session.state, BACKOFF)
+            now = session.next_attempt_at
+
+        self.assertEqual(delays, [1.0, 2.0, 3.0, 3.0])
+        self.assertEqual(session.health, DOWN)
+        self.assertIn('Cannot open', manager.status()['dead']['last_error'])
+
+    def test_max_attempts(self):
+        manager = CameraSessionManager(opener=mock.Mock(side_effect=IOError('refused')),
+                                       reconnect_delay=0.0, jitter=0, max_attempts=2)
+        self.addCleanup(manager.stop)
+        session = manager.add(1, 'rtsp://camera')
+
+        self.assertTrue(poll_until(manager, lambda: session.state == FAILED))
+        self.assertEqual(session.failures, 2)
+        self.assertEqual(manager.status()['1']['health'], DOWN)
+
+    def test_hung_open_does_not_block_others(self):
+        hang = threading.Event()
+        late = SlowCapture()
+
+        def opener(source, timeout):
+            if source == 'hung':
+                hang.wait(10)
+                return late
+            return SlowCapture()
+
+        manager = CameraSessionManager(opener=opener, reconnect_delay=10.0, jitter=0)
+        self.addCleanup(manager.stop)
+        self.addCleanup(hang.set)
+        manager.add('hung', 'hung', open_timeout=0.2)
+        manager.add('ok', 'ok')
+
+        self.assertTrue(poll_until(manager, lambda: manager.sessions['hung'].state == BACKOFF))
+        self.assertEqual(manager.status()['ok']['state'], STREAMING)
+        self.assertEqual(manager.status()['ok']['health'], HEALTHY)
+        self.assertGreater(manager.latest('ok')[0], 0)
+        self.assertIn('timed out', manager.status()['hung']['last_error'])
+        # The abandoned open is released once it returns
+        hang.set()
+        self.assertTrue(late.released.wait(5))
+
+    def test_stall_detected(self):
+        capture = SlowCapture()
+        manager = CameraSessionManager(opener=lambda source, timeout: capture,
+                                       reconnect_delay=10.0, stall_timeout=0.2, jitter=0)
+        self.addCleanup(manager.stop)
+        self.addCleanup(capture.unblock.set)
+        session = manager.add('cam', 'rtsp://camera')
+
+        self.assertTrue(poll_until(manager, lambda: session.frames > 0))
+        capture.block.set()
+        self.assertTrue(poll_until(manager, lambda: session.state == STALLED))
+        self.assertTrue(poll_until(manager, lambda: session.state == BACKOFF))
+        self.assertIn('No frame', session.last_error)
+        # Released once the hung read returns (the FFmpeg read timeout), never during it
+        self.assertFalse(capture.released.wait(0.1))
+        capture.unblock.set()
+        self.assertTrue(capture.released.wait(5))
+
+    def test_old_read_loop_keeps_new_capture_marker(self):
+        old, new = TrackingCapture(), TrackingCapture()
+        captures = iter([old, new])
+        manager = CameraSessionManager(opener=lambda source, timeout: next(captures),
+                                       reconnect_delay=0.05, stall_timeout=0.2, jitter=0)
+        self.addCleanup(manager.stop)
+        self.addCleanup(old.unblock.set)
+        self.addCleanup(new.unblock.set)
+        session = manager.add('cam', 'rtsp://camera')
+
+        self.assertTrue(poll_until(manager, lambda: session.frames > 0))
+        old.block.set()
+        self.assertTrue(poll_until(manager, lambda: session.capture is new and new.reads > 0))
+        new.block.set()
+        self.assertTrue(new.blocked.wait(5))
+        # The stalled read returns after the reconnect
+        old.unblock.set()
+        self.assertTrue(old.released.wait(5))
+
+        manager.remove('cam')
+        self.assertFalse(new.released.wait(0.1))
+        new.unblock.set()
+        self.assertTrue(new.released.wait(5))
+        self.assertFalse(new.released_during_read)
+        self.assertFalse(old.released_during_read)
+
+    def test_more_cameras_than_workers(self):
+        manager = CameraSessionManager(max_workers=2, opener=lambda source, timeout: SlowCapture(),
+                                       open_timeout=1.0, reconnect_delay=10.0, jitter=0)
+        self.addCleanup(manager.stop)
+        for i in range(6):
+            manager.add(i, f'rtsp://camera-{i}')
+
+        self.assertTrue(poll_until(manager, lambda: all(
+            manager.latest(i)[0] > 0 for i in range(6)), timeout=5.0))
+        self.assertEqual({s['state'] for s in manager.status().values()}, {STREAMING})
+
+    def test_flapping_stream_keeps_backing_off(self):
+        manager = CameraSessionManager(opener=lambda source, timeout: SlowCapture(frames=1),
+                                       reconnect_delay=0.01, jitter=0, healthy_after=10.0)
+        self.addCleanup(manager.stop)
+        self.addCleanup(error_handler.flush_rate_limited, force=True)
+        session = manager.add('cam', 'rtsp://camera')
+
+        with mock.patch.object(camera_sessions, 'backoff_delay', wraps=backoff_delay) as delay:
+            self.assertTrue(poll_until(manager, lambda: delay.call_count >= 3))
+
+        # Each break after a frame or two is one more failure, not a fresh start
+        self.assertEqual([c.args[0] for c in delay.call_args_list[:3]], [0, 1, 2])
+        self.assertGreaterEqual(session.failures, 3)
+
+    def test_healthy_stream_resets_backoff(self):
+        manager = CameraSessionManager(opener=lambda source, timeout: SlowCapture(frames=5),
+                                       reconnect_delay=0.01, jitter=0, healthy_after=0.0)
+        self.addCleanup(manager.stop)
+        self.addCleanup(error_handler.flush_rate_limited, force=True)
+        manager.add('cam', 'rtsp://camera')
+
+        with mock.patch.object(camera_sessions, 'backoff_delay', wraps=backoff_delay) as delay:
+            self.assertTrue(poll_until(manager, lambda: delay.call_count >= 3))
+
+        self.assertEqual([c.args[0] for c in delay.call_args_list[:3]], [0, 0, 0])
+
+    def test_from_config(self):
+        config = {'camera': {'reconnect_attempts': 5, 'reconnect_delay': 3000,
+                             'max_reconnect_delay': 120000, 'open_timeout': 10000,
+                             'read_timeout': 5000, 'stall_timeout': 10000,
+                             'healthy_after': 60000, 'max_workers': 4}}
+        manager = CameraSessionManager.from_config(config)
+        self.addCleanup(manager.stop)
+        session = manager.add('cam', 'rtsp://camera')
+
+        self.assertEqual(manager.executor._max_workers, 4)
+        self.assertEqual((session.reconnect_delay, session.max_delay, session.open_timeout,
+                          session.stall_timeout, session.healthy_after, session.max_attempts),
+                         (3.0, 120.0, 10.0, 10.0, 60.0, 5))
+
+    def test_session_capture_reads_across_reconnect(self):
+        manager = CameraSessionManager(opener=lambda source, timeout: SlowCapture(frames=3),
+                                       reconnect_delay=0.01, jitter=0)
+        self.addCleanup(error_handler.flush_rate_limited, force=True)
+        manager.start(poll_interval=0.01)
+        self.addCleanup(manager.stop)
+        capture = manager.open('cam', 'rtsp://camera')
+
+        frames = [capture.read() for _ in range(8)]
+
+        self.assertTrue(all(ok and frame is not None for ok, frame in frames))
+        self.assertEqual(capture.get(camera_sessions.cv2.CAP_PROP_FRAME_COUNT), 0.0)
+        self.assertGreaterEqual(manager.status()['cam']['reconnects'], 1)
+        capture.release()
+        self.assertNotIn('cam', manager.sessions)
+        self.assertEqual(capture.read(), (False, None))
+
+    def test_session_capture_interrupt(self):
+        manager = CameraSessionManager(opener=mock.Mock(side_effect=IOError('refused')),
+                                       reconnect_delay=10.0, jitter=0)
+        self.addCleanup(error_handler.flush_rate_limited, force=True)
+        manager.start(poll_interval=0.01)
+        self.addCleanup(manager.stop)
+        capture = manager.open('cam', 'rtsp://camera')
+        result = []
+        reader = threading.Thread(target=lambda: result.append(capture.read()))
+        reader.start()
+
+        time.sleep(0.1)
+        self.assertTrue(reader.is_alive())
+        capture.interrupt()
+        reader.join(5)
+
+        self.assertEqual(result, [(False, None)])
+        self.assertFalse(capture.isOpened())
+
+    def test_live_sources(self):
+        self.assertTrue(is_live_source(0))
+        self.assertTrue(is_live_source('1'))
+        self.assertTrue(is_live_source('rtsp://10.0.0.5/stream'))
+        self.assertFalse(is_live_source('/videos/room.mp4'))
+        self.assertFalse(is_live_source('https://example.com/video.mp4'))
+
+    def test_background_thread(self):
+        manager = CameraSessionManager(opener=lambda source, timeout: SlowCapture())
+        manager.add('a', 'a')
+        manager.add('b', 'b')
+        manager.start(poll_interval=0.01)
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and min(manager.latest(c)[0] for c in 'ab') == 0:
+            time.sleep(0.01)
+        manager.stop()
+
+        self.assertGreater(min(manager.latest(c)[0] for c in 'ab'), 0)
+        self.assertEqual({s['state'] for s in manager.status().values()}, {'stopped'})
+
+
+class TestCameraManagerReconnect(unittest.TestCase):
+    """CameraManager yeniden bağlanmayı sınırlı ve gecikmeli yapar."""
+
+    def test_backoff_without_recursion(self):
+        captures = [SlowCapture(interval=0, frames=0) for _ in range(4)]
+        for capture in captures:
+            capture.isOpened = lambda: True
+            capture.set = lambda *args: True
+        with mock.patch('src.utils.video_processor.cv2.VideoCapture', side_effect=captures) as opener, \
+                mock.patch('src.utils.video_processor.time.monotonic', return_value=0.0) as clock, \
+                mock.patch('src.utils.video_processor.time.sleep') as sleep:
+            manager = CameraManager('rtsp://camera', max_reconnect_attempts=3,
+                                    reconnect_delay=0.5)
+            self.assertTrue(manager.open()[0])
+            delays = []
+            while True:
+                ok, frame, message = manager.read()
+                if manager.next_attempt_at is None:
+                    break
+                delays.append(manager.next_attempt_at - clock.return_value)
+                # Not due yet: fails right away without reopening
+                self.assertFalse(manager.read()[0])
+                clock.return_value = manager.next_attempt_at
+
+        self.assertFalse(ok)
+        self.assertIsNotNone(message)
+        self.assertEqual(delays, [0.5, 1.0, 2.0])
+        self.assertEqual(opener.call_count, 4)
+        sleep.assert_not_called()
+
+    def test_recovers_after_reconnect(self):
+        broken = SlowCapture(interval=0, frames=0)
+        working = SlowCapture(interval=0)
+        for capture in (broken, working):
+            capture.isOpened = lambda: True
+            capture.set = lambda *args: True
+        with mock.patch('src.utils.video_processor.cv2.VideoCapture', side_effect=[broken, working]), \
+                mock.patch('src.utils.video_processor.time.monotonic', return_value=0.0) as clock:
+            manager = CameraManager(0)
+            manager.open()
+            self.assertFalse(manager.read()[0])
+            clock.return_value = manager.next_attempt_at
+            ok, frame, _ = manager.read()
+
+        self.assertTrue(ok)
+        self.assertEqual(manager.reconnect_attempts, 0)
+        self.assertIsNone(manager.next_attempt_at)
+        self.assertTrue(broken.released.is_set())
+
+
+class TestOpenCapture(unittest.TestCase):
+    """Zaman aşımlı açma yardımcısı."""
+
+    def test_unreachable_raises(self):
+        with self.assertRaises(IOError):
+            camera_sessions.open_capture('http://127.0.0.1:1/stream.mp4', open_timeout=2.0)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,330 @@
+"""Küme modu testleri.
+
+- Tutarlı karma halkası: düğüm ekleme/çıkarmada yalnızca ilgili kameralar taşınır
+- FallDetector ve StreamPipeline durumu JSON ile aktarılır, tespit aynen sürer
+- Koordinatör, işçiler ve toplayıcı süreç içi taşıyıcıyla: katılma, ayrılma
+  (durum devri) ve kalp atışı kesilen işçinin kameralarının yeniden dağıtılması
+- Aynı senaryo, her rol kendi TCP bağlantısıyla mesaj aracısı üzerinden
+- SocketTransport aracı yeniden başlayınca bağlanıp aboneliklerini yeniler
+- 'cluster' yapılandırma bölümü ve ayrı süreçte çalışan aracı giriş noktası
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from tests.fake_backends import ScriptedMultiPersonDetector
+from tests.synthetic import fall_sequence
+from src.core.fall_detector import FallDetector
+from src.core.pipeline import StreamPipeline
+from src.service.cluster import (ClusterWorker, Coordinator, HashRing, InProcessTransport,
+                                 MessageBroker, ResultAggregator, SocketTransport)
+from src.utils.error_handler import error_handler
+from tests.test_service import FakeCapture
+
+CAMERAS = [f'cam-{i}' for i in range(6)]
+
+
+def roundtrip(state):
+    return json.loads(json.dumps(state))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def receive(subscription, timeout=5.0):
+    return await asyncio.wait_for(subscription.get(), timeout)
+
+
+class TestHashRing(unittest.TestCase):
+    """Tutarlı karma ile paylaştırma."""
+
+    def test_minimal_movement(self):
+        keys = [f'camera-{i}' for i in range(1000)]
+        ring = HashRing(['a', 'b', 'c'])
+        before = ring.assign(keys)
+        self.assertGreater(min(list(before.values()).count(n) for n in 'abc'), 200)
+
+        ring.add('d')
+        after = ring.assign(keys)
+        moved = [k for k in keys if before[k] != after[k]]
+        self.assertTrue(all(after[k] == 'd' for k in moved))
+        self.assertLess(len(moved), 400)
+
+        ring.remove('a')
+        removed = ring.assign(keys)
+        self.assertTrue(all(removed[k] == after[k] for k in keys if after[k] != 'a'))
+        self.assertNotIn('a', removed.values())
+
+    def test_empty_ring(self):
+        self.assertIsNone(HashRing().node_for('camera'))
+
+
+class TestStateHandoff(unittest.TestCase):
+    """Durumun başka bir sürece aktarılması."""
+
+    def test_fall_detector_state(self):
+        script = fall_sequence(60)
+        original = FallDetector(scale_reference='torso')
+        for i, keypoints in enumerate(script[:25]):
+            original.detect_fall(keypoints, i / 30.0)
+
+        copy = FallDetector(scale_reference='torso')
+        copy.set_state(roundtrip(original.get_state()))
+
+        for i, keypoints in enumerate(script[25:], start=25):
+            self.assertEqual(original.detect_fall(keypoints, i / 30.0),
+                             copy.detect_fall(keypoints, i / 30.0))
+            self.assertAlmostEqual(original.get_confidence_score(), copy.get_confidence_score())
+        self.assertTrue(copy.is_fallen)
+
+    def test_pipeline_state_without_motion(self):
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+        original = StreamPipeline(ScriptedMultiPersonDetector(people=2), resize_width=None)
+        for i in range(45):
+            original.process(frame, i / 30.0)
+        state = roundtrip(original.get_state(motion=False))
+
+        copy = StreamPipeline(ScriptedMultiPersonDetector(people=2), resize_width=None)
+        copy.set_state(state)
+
+        self.assertEqual(copy.frame_index, 45)
+        self.assertEqual(sorted(copy.fall_detectors), [0, 1])
+        self.assertTrue(all(d.is_fallen for d in copy.fall_detectors.values()))
+        self.assertIsNone(copy.fall_detectors[0].last_timestamp)
+
+
+class TestCluster(unittest.IsolatedAsyncioTestCase):
+    """Koordinatör, işçiler ve toplayıcı tek olay döngüsünde."""
+
+    async def asyncSetUp(self):
+        self.transports = []
+        self.coordinator = Coordinator(await self.transport(), heartbeat_timeout=0.3,
+                                       check_interval=0.05)
+        self.aggregator = ResultAggregator(await self.transport())
+        await self.coordinator.start()
+        await self.aggregator.start()
+        self.captures = {}
+        self.workers = {}
+        for camera_id in CAMERAS:
+            self.coordinator.add_camera(camera_id, camera_id)
+
+    async def asyncTearDown(self):
+        for worker in self.workers.values():
+            await worker.stop()
+        await self.aggregator.stop()
+        await self.coordinator.stop()
+        for transport in self.transports:
+            transport.close()
+
+    async def transport(self):
+        # Every role shares one in-process bus
+        if not self.transports:
+            self.transports.append(InProcessTransport())
+        return self.transports[0]
+
+    def capture(self, source):
+        # One long camera stream per source, shared across owners
+        if source not in self.captures:
+            self.captures[source] = FakeCapture(frames=100_000)
+        return self.captures[source]
+
+    async def add_worker(self, node_id):
+        worker = ClusterWorker(node_id, await self.transport(),
+                               lambda camera_id: ScriptedMultiPersonDetector(),
+                               capture_factory=self.capture, heartbeat_interval=0.05,
+                               handoff_timeout=2.0, realtime=True, resize_width=None)
+        self.workers[node_id] = worker
+        await worker.start()
+        return worker
+
+    async def wait_for(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("Timed out waiting for the cluster")
+            await asyncio.sleep(0.02)
+
+    def owners(self):
+        return {camera_id: status['node_id'] for camera_id, status in self.aggregator.status().items()}
+
+    def running(self, worker):
+        return {c for c, camera in worker.service.cameras.items() if camera.running}
+
+    async def test_join_leave_and_failover(self):
+        events = self.aggregator.event_feed.subscribe(maxsize=1000)
+        a = await self.add_worker('worker-a')
+        b = await self.add_worker('worker-b')
+        await self.wait_for(lambda: self.running(a) | self.running(b) == set(CAMERAS)
+                            and set(self.owners()) == set(CAMERAS))
+        self.assertTrue(self.running(a) and self.running(b))
+        self.assertFalse(self.running(a) & self.running(b))
+
+        # Join: only cameras that land on the new worker move, with their state
+        before = dict(self.coordinator.assignments)
+        c = await self.add_worker('worker-c')
+        await self.wait_for(lambda: self.running(c) and
+                            self.running(c) == {k for k, n in self.coordinator.assignments.items()
+                                                if n == 'worker-c'})
+        moved = {k for k in CAMERAS if before[k] != self.coordinator.assignments[k]}
+        self.assertEqual(moved, self.running(c))
+        self.assertEqual(c.handoffs_received, len(moved))
+        camera_id = next(iter(moved))
+        self.assertGreater(c.service.cameras[camera_id].pipeline.frame_index, 1)
+
+        # Graceful leave: every camera of worker-a is handed over
+        owned_by_a = set(self.running(a))
+        sent = a.handoffs_sent
+        await a.leave()
+        del self.workers['worker-a']
+        await self.wait_for(lambda: self.running(b) | self.running(c) == set(CAMERAS))
+        self.assertEqual(a.handoffs_sent - sent, len(owned_by_a))
+
+        # Failure: worker-b stops heart-beating, its cameras restart on worker-c
+        b_cameras = set(self.running(b))
+        await b.stop()
+        del self.workers['worker-b']
+        await self.wait_for(lambda: self.running(c) == set(CAMERAS))
+        self.assertEqual(self.coordinator.status()['nodes'], ['worker-c'])
+        await self.wait_for(lambda: set(self.owners().values()) == {'worker-c'})
+
+        stopped = []
+        while events.pending:
+            event = await events.get()
+            if event['type'] == 'camera_stopped':
+                stopped.append(event['camera_id'])
+        # Handoffs are not outages; the failed worker's cameras are
+        self.assertEqual(set(stopped), b_cameras)
+
+
+
+class TestClusterOverSockets(TestCluster):
+    """Aynı senaryo; her rol aracıya kendi TCP bağlantısıyla bağlanır."""
+
+    async def asyncSetUp(self):
+        self.broker = MessageBroker(port=0)
+        await self.broker.start()
+        await super().asyncSetUp()
+
+    async def asyncTearDown(self):
+        await super().asyncTearDown()
+        await self.broker.stop()
+
+    async def transport(self):
+        transport = SocketTransport(port=self.broker.port, reconnect_delay=0.05)
+        await transport.connect()
+        self.transports.append(transport)
+        return transport
+
+
+class TestSocketTransport(unittest.IsolatedAsyncioTestCase):
+    """Aracı üzerinden yayın/abonelik ve yeniden bağlanma."""
+
+    async def test_reconnect_and_resubscribe(self):
+        port = free_port()
+        broker = MessageBroker(port=port)
+        await broker.start()
+        publisher = SocketTransport(port=port, reconnect_delay=0.05)
+        subscriber = SocketTransport(port=port, reconnect_delay=0.05)
+        self.addCleanup(publisher.close)
+        self.addCleanup(subscriber.close)
+        await publisher.connect()
+        await subscriber.connect()
+        heartbeats = subscriber.subscribe('heartbeat')
+        own = publisher.subscribe('heartbeat')
+        await asyncio.sleep(0.05)
+
+        publisher.publish('heartbeat', {'node_id': 'a', 'values': [1, 2]})
+        self.assertEqual(await receive(heartbeats), {'node_id': 'a', 'values': [1, 2]})
+        # The sender's own subscriptions get its messages too
+        self.assertEqual((await receive(own))['node_id'], 'a')
+
+        await broker.stop()
+        await asyncio.sleep(0.1)
+        publisher.publish('heartbeat', {'node_id': 'lost'})
+        self.assertFalse(publisher.connected)
+        self.assertEqual(publisher.dropped, 1)
+
+        broker = MessageBroker(port=port)
+        await broker.start()
+        self.addAsyncCleanup(broker.stop)
+        await publisher.connect()
+        await subscriber.connect()
+        await asyncio.sleep(0.05)
+        publisher.publish('heartbeat', {'node_id': 'b'})
+        self.assertEqual((await receive(heartbeats))['node_id'], 'b')
+
+    async def test_connect_without_broker(self):
+        transport = SocketTransport(port=free_port(), reconnect_delay=0.05)
+        self.addCleanup(transport.close)
+        with self.assertRaises(ConnectionError):
+            await transport.connect(timeout=0.2)
+        error_handler.flush_rate_limited(force=True)
+
+
+class TestClusterConfig(unittest.IsolatedAsyncioTestCase):
+    """'cluster' bölümü ve komut satırı giriş noktası."""
+
+    CONFIG = {'cluster': {'broker_host': '127.0.0.1', 'broker_port': 9999, 'reconnect_delay': 0.5,
+                          'node_id': 'worker-7', 'heartbeat_interval': 0.2,
+                          'heartbeat_timeout': 3.0, 'handoff_timeout': 1.5, 'replicas': 10,
+                          'publish_results': False, 'cameras': {'hall': 'rtsp://cam/hall'}},
+              'detection': {'min_fall_frames': 4}}
+
+    async def test_from_config(self):
+        transport = InProcessTransport()
+        assignments = transport.subscribe('assignment')
+        coordinator = Coordinator.from_config(transport, self.CONFIG)
+        worker = ClusterWorker.from_config(transport, self.CONFIG,
+                                           lambda camera_id: ScriptedMultiPersonDetector())
+        socket_transport = SocketTransport.from_config(self.CONFIG)
+
+        self.assertEqual((coordinator.heartbeat_timeout, coordinator.ring.replicas), (3.0, 10))
+        self.assertEqual(coordinator.cameras, {'hall': 'rtsp://cam/hall'})
+        self.assertEqual((await receive(assignments))['epoch'], 1)
+        self.assertEqual(worker.node_id, 'worker-7')
+        self.assertEqual((worker.heartbeat_interval, worker.handoff_timeout), (0.2, 1.5))
+        self.assertFalse(worker.publish_results)
+        self.assertIs(worker.service.config, self.CONFIG)
+        self.assertEqual((socket_transport.port, socket_transport.reconnect_delay), (9999, 0.5))
+        transport.close()
+
+    async def test_broker_process(self):
+        port = free_port()
+        with tempfile.TemporaryDirectory() as tmp:
+            config = Path(tmp) / 'cluster.yaml'
+            config.write_text(f"cluster:\n  broker_port: {port}\n", encoding='utf-8')
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'src.service.cluster', 'broker', '--config', str(config)],
+                cwd=Path(__file__).resolve().parents[1],
+                env={**os.environ, 'PYTHONPATH': str(Path(__file__).resolve().parents[1])},
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.addCleanup(process.kill)
+
+            transport = SocketTransport(port=port, reconnect_delay=0.1)
+            self.addCleanup(transport.close)
+            await transport.connect(timeout=20.0)
+            events = transport.subscribe('events')
+            await asyncio.sleep(0.05)
+            transport.publish('events', {'type': 'fall_started', 'camera_id': 'hall'})
+            self.assertEqual((await receive(events))['camera_id'], 'hall')
+
+            process.terminate()
+            self.assertEqual(await asyncio.to_thread(process.wait, 10), 0)
+        error_handler.flush_rate_limited(force=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,136 @@
+"""Ekran/tespit ayrıştırma testleri.
+
+- Ekran kare hızı sınırı ve değişmeyen karenin yeniden gönderilmemesi
+- Ekran için küçültme ve tek seferlik JPEG kodlama
+- Arka plan tespit iş parçacığı: son sonuç ve düşme/kalkma kuyruğu
+- Kuyruk derinliği göstergesi; taşan kuyrukta gerçek kayıplar ayrı sayılır
+"""
+
+import unittest
+
+import cv2
+import numpy as np
+
+from tests.fake_backends import ScriptedMultiPersonDetector
+from tests.synthetic import fall_sequence
+from src.core.pipeline import StreamPipeline
+from src.ui.display import DetectionThread, DisplayThrottler
+from src.utils.metrics import MetricsRegistry
+from tests.test_service import FakeCapture
+
+
+def frame(width=1280, height=720):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+class TestDisplayThrottler(unittest.TestCase):
+    """UI kare hızı ve değişiklik kontrolü."""
+
+    def test_rate_limited(self):
+        display = DisplayThrottler(fps=10)
+        rendered = [display.render(frame(), version, now=i * 0.02) is not None
+                    for i, version in enumerate(range(50))]
+
+        # 1 s of 50 fps input at 10 fps display
+        self.assertEqual(sum(rendered), 10)
+
+        display = DisplayThrottler(fps=10)
+        display.render(frame(), 1, now=0.0)
+        self.assertFalse(display.due(now=0.05))
+        self.assertAlmostEqual(display.wait_time(now=0.05), 0.05)
+
+    def test_unchanged_frame_not_pushed(self):
+        display = DisplayThrottler(fps=10)
+        self.assertIsNotNone(display.render(frame(), 1, now=0.0))
+        self.assertIsNone(display.render(frame(), 1, now=1.0))
+        self.assertEqual(display.unchanged, 1)
+        self.assertIsNotNone(display.render(frame(), 2, now=1.0))
+
+    def test_downscaled_jpeg(self):
+        source = frame()
+        jpeg = DisplayThrottler(width=640).render(source, 1, text="FPS: 30", now=0.0)
+
+        decoded = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(decoded.shape, (360, 640, 3))
+        self.assertFalse(source.any())
+
+        small = frame(320, 180)
+        DisplayThrottler(width=640).render(small, 1, text="FPS: 30", now=0.0)
+        self.assertFalse(small.any())
+
+
+class TestDetectionThread(unittest.TestCase):
+    """Arka planda tespit."""
+
+    def test_runs_to_end(self):
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector(script=fall_sequence(60)))
+        worker = DetectionThread(FakeCapture(60), pipeline)
+        worker.start()
+        worker.join(timeout=30)
+
+        self.assertFalse(worker.is_alive())
+        self.assertIsNone(worker.error)
+        version, latest = worker.snapshot()
+        self.assertEqual(version, 60)
+        self.assertEqual(latest['frame_index'], 60)
+        self.assertTrue(latest['fall_detected'])
+
+        falls = worker.drain()
+        self.assertTrue(falls)
+        self.assertTrue(all(r['fall_detected'] for r in falls))
+        self.assertEqual(falls[-1]['frame_index'], 60)
+        self.assertEqual(worker.drain(), [])
+
+    def test_video_clock_from_first_frame(self):
+        """İlk karesi 0 ms olan dosyada tüm kareler video zamanını kullanmalı."""
+
+        capture = FakeCapture(60)
+        capture.read()
+        self.assertEqual(capture.get(cv2.CAP_PROP_POS_MSEC), 0.0)
+        capture.index = 0
+
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector(script=fall_sequence(60)))
+        DetectionThread(capture, pipeline).run()
+
+        detector = pipeline.fall_detectors[0]
+        self.assertAlmostEqual(detector.last_timestamp, 59 / 30)
+        # Hız/ivme ölçütleri çalıştı
+        self.assertIsNotNone(detector.last_descent_time)
+
+    def test_recovery_queued(self):
+        script = fall_sequence(40)
+        script = script + script[::-1] + script[:1] * 40
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector(script=script))
+        worker = DetectionThread(FakeCapture(len(script)), pipeline, max_pending=200)
+        worker.run()
+
+        results = worker.drain()
+        self.assertFalse(results[-1]['fall_detected'])
+        self.assertTrue(results[-2]['fall_detected'])
+
+    def test_pending_depth_and_drops(self):
+        registry = MetricsRegistry()
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector(script=fall_sequence(60)),
+                                  stream_id='cam1')
+        worker = DetectionThread(FakeCapture(60), pipeline, metrics=registry, max_pending=4)
+        worker.run()
+
+        self.assertEqual(registry.get_gauge('queue_depth', stream='cam1', queue='pending_falls'), 4)
+        dropped = registry.get_counter('frames_dropped_total', stream='cam1', queue='pending_falls')
+        self.assertGreater(dropped, 0)
+        self.assertEqual(len(worker.drain()), 4)
+        self.assertEqual(registry.get_gauge('queue_depth', stream='cam1', queue='pending_falls'), 0)
+
+    def test_stop(self):
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector())
+        worker = DetectionThread(FakeCapture(100000), pipeline)
+        worker.start()
+        worker.stop()
+        worker.join(timeout=30)
+
+        self.assertFalse(worker.is_alive())
+        self.assertLess(worker.frames, 100000)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,170 @@
+"""ErrorHandler loglama testleri.
+
+- Kayıtlar kuyruk üzerinden arka planda dosyaya yazılır
+- Dosya boyutu max_file_size'ı aşınca döndürülür, en fazla max_files yedek tutulur
+- json_format=True ile her satır bir JSON nesnesidir
+- Kare başına tekrarlanan uyarılar kaynak bazında özetlenir
+"""
+
+import json
+import logging
+import queue
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.utils.error_handler import ErrorHandler, DroppingQueueHandler, LogRateLimiter
+
+
+class TestErrorHandlerLogging(unittest.TestCase):
+    """Kuyruk tabanlı loglama ve döndürme davranışı."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_dir = Path(self.tmp.name)
+
+    def _make(self, **kwargs):
+        kwargs.setdefault("log_dir", self.tmp.name)
+        kwargs.setdefault("console_output", False)
+        return ErrorHandler(logger_name=f"test.{self.id()}", **kwargs)
+
+    def tearDown(self):
+        self.handler.shutdown()
+        self.tmp.cleanup()
+
+    def test_records_written_after_shutdown(self):
+        self.handler = self._make()
+        self.handler.log_warning("Low light detected")
+        self.handler.shutdown()
+
+        content = (self.log_dir / "fall_detection.log").read_text(encoding="utf-8")
+        self.assertIn("Low light detected", content)
+        self.assertIn("WARNING", content)
+
+    def test_size_based_rotation_bounded(self):
+        self.handler = self._make(max_file_size=2000, max_files=2)
+        for i in range(500):
+            self.handler.log_info(f"frame {i} processed")
+        self.handler.shutdown()
+
+        files = sorted(p.name for p in self.log_dir.iterdir())
+        self.assertEqual(files, ["fall_detection.log",
+                                 "fall_detection.log.1",
+                                 "fall_detection.log.2"])
+        for name in files:
+            self.assertLessEqual((self.log_dir / name).stat().st_size, 2000)
+
+    def test_json_lines_output(self):
+        self.handler = self._make(json_format=True)
+        self.handler.log_error("Camera 0 not accessible")
+        self.handler.shutdown()
+
+        lines = (self.log_dir / "fall_detection.log").read_text(encoding="utf-8").splitlines()
+        entry = json.loads(lines[0])
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["message"], "Camera 0 not accessible")
+        self.assertEqual(entry["function"], "test_json_lines_output")
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        self.handler = self._make()
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "msg", None, None)
+        for _ in range(5):
+            queue_handler.handle(record)
+
+        self.assertEqual(queue_handler.dropped_records, 4)
+
+    def test_from_config(self):
+        config = {
+            "logging": {
+                "level": "WARNING",
+                "directory": self.tmp.name,
+                "max_file_size": 1024,
+                "max_files": 3,
+                "console_output": False,
+                "json_format": True,
+            }
+        }
+        self.handler = ErrorHandler.from_config(config, logger_name="test.from_config")
+        self.handler.log_info("filtered")
+        self.handler.log_warning("kept")
+        self.handler.shutdown()
+
+        lines = (self.log_dir / "fall_detection.log").read_text(encoding="utf-8").splitlines()
+        self.assertEqual([json.loads(l)["message"] for l in lines], ["kept"])
+
+    def test_apply_config(self):
+        self.handler = self._make()
+        self.handler.apply_config({"logging": {"directory": str(self.log_dir / "app"),
+                                               "console_output": False,
+                                               "rate_limit_interval": 5}})
+        self.handler.log_warning("moved")
+        self.handler.shutdown()
+
+        self.assertEqual(self.handler.rate_limiter.interval, 5)
+        self.assertIn("moved", (self.log_dir / "app" / "fall_detection.log").read_text(encoding="utf-8"))
+
+    def test_rate_limited_warning_collapsed(self):
+        self.handler = self._make(rate_limit_interval=60)
+        for _ in range(300):
+            self.handler.log_rate_limited("Low light detected", source="camera_1")
+        self.handler.log_rate_limited("Low light detected", source="camera_2")
+        self.handler.shutdown()
+
+        lines = (self.log_dir / "fall_detection.log").read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("[camera_1] Low light detected", lines[0])
+        self.assertIn("[camera_2] Low light detected", lines[1])
+        self.assertIn("[camera_1] Low light detected (repeated 299 more times", lines[2])
+
+
+    def test_rate_limited_records_name_the_caller(self):
+        self.handler = self._make(rate_limit_interval=0.05, json_format=True)
+        self.handler.log_rate_limited("direct", source="a")
+        self.handler.log_rate_limited("swept", source="b")
+        self.handler.log_rate_limited("swept", source="b")
+        time.sleep(0.06)
+        # Sweeps the "swept" summary from inside log_rate_limited
+        self.handler.log_rate_limited("other", source="c")
+        self.handler.log_rate_limited("other", source="c")
+        self.handler.flush_rate_limited(force=True)
+        self.handler.shutdown()
+
+        lines = (self.log_dir / "fall_detection.log").read_text(encoding="utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 5)
+        self.assertEqual({r["function"] for r in records},
+                         {"test_rate_limited_records_name_the_caller"})
+
+class TestLogRateLimiter(unittest.TestCase):
+    """Özetleme penceresi mantığı (saat dışarıdan verilir)."""
+
+    def setUp(self):
+        self.limiter = LogRateLimiter(interval=10.0)
+
+    def test_first_occurrence_emitted_repeats_suppressed(self):
+        self.assertEqual(self.limiter.hit("cam", "msg", logging.WARNING, now=0.0), 0)
+        for t in range(1, 10):
+            self.assertIsNone(self.limiter.hit("cam", "msg", logging.WARNING, now=float(t)))
+
+        self.assertEqual(self.limiter.hit("cam", "msg", logging.WARNING, now=10.0), 9)
+
+    def test_sources_are_independent(self):
+        self.assertEqual(self.limiter.hit("cam_a", "msg", logging.WARNING, now=0.0), 0)
+        self.assertEqual(self.limiter.hit("cam_b", "msg", logging.WARNING, now=0.5), 0)
+
+    def test_stale_windows_flushed_with_counts(self):
+        self.limiter.hit("cam", "msg", logging.WARNING, now=0.0)
+        self.limiter.hit("cam", "msg", logging.WARNING, now=1.0)
+        self.limiter.hit("cam", "quiet", logging.WARNING, now=1.0)
+
+        self.assertEqual(self.limiter.collect_stale(now=5.0), [])
+        self.assertEqual(self.limiter.collect_stale(now=12.0), [])
+        self.assertEqual(self.limiter.collect_stale(now=15.0),
+                         [("cam", "msg", logging.WARNING, 1)])
+        self.assertEqual(self.limiter.hit("cam", "msg", logging.WARNING, now=15.5), 0)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
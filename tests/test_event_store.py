@@ -0,0 +1,98 @@
+"""FallEventStore testleri.
+
+- Aynı düşme olayı (kamera, kişi, başlangıç zamanı) yalnızca bir kez kaydedilir
+- Kayıtlar arka plan yazıcısı tarafından toplu yazılır ve yeniden açılışta korunur
+- Sorgular kamera, kişi ve zaman aralığına göre filtrelenir
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.utils.event_store import FallEventStore
+
+
+class TestFallEventStore(unittest.TestCase):
+    """Olay deposu temel davranışı."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "events.db"
+        self.store = FallEventStore(str(self.db_path), flush_interval=0.05)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_same_episode_recorded_once(self):
+        self.assertTrue(self.store.add_event("cam1", 0, 80.0, episode_start=100.0))
+        for _ in range(30):
+            self.assertFalse(self.store.add_event("cam1", 0, 85.0, episode_start=100.0))
+
+        self.assertTrue(self.store.add_event("cam1", 0, 70.0, episode_start=200.0))
+        self.assertTrue(self.store.add_event("cam1", 1, 70.0, episode_start=100.0))
+        self.assertTrue(self.store.add_event("cam2", 0, 70.0, episode_start=100.0))
+
+        self.store.flush()
+        self.assertEqual(self.store.count_events(), 4)
+
+    def test_recent_keys_bounded(self):
+        store = FallEventStore(str(Path(self.tmp.name) / "lru.db"), flush_interval=0.05,
+                               max_recent_keys=2)
+        self.addCleanup(store.close)
+        store.add_event("cam1", 0, 80.0, episode_start=1.0)
+        store.add_event("cam1", 1, 80.0, episode_start=1.0)
+        # Ongoing episode of person 0 stays recent
+        self.assertFalse(store.add_event("cam1", 0, 80.0, episode_start=1.0))
+        store.add_event("cam1", 2, 80.0, episode_start=1.0)
+
+        self.assertEqual(len(store._seen), 2)
+        self.assertFalse(store.add_event("cam1", 0, 80.0, episode_start=1.0))
+        # An evicted episode is still stored only once
+        store.add_event("cam1", 1, 80.0, episode_start=1.0)
+        store.flush()
+        self.assertEqual(store.count_events(), 3)
+
+    def test_query_filters_and_order(self):
+        self.store.add_event("cam1", 0, 60.0, episode_start=10.0)
+        self.store.add_event("cam1", 1, 70.0, episode_start=20.0)
+        self.store.add_event("cam2", 0, 90.0, episode_start=30.0)
+        self.store.flush()
+
+        cam1 = self.store.query_events(camera_id="cam1")
+        self.assertEqual([e["timestamp"] for e in cam1], [20.0, 10.0])
+
+        track = self.store.query_events(camera_id="cam1", track_id=1)
+        self.assertEqual(len(track), 1)
+        self.assertEqual(track[0]["confidence"], 70.0)
+
+        recent = self.store.query_events(since=15.0, until=30.0)
+        self.assertEqual([e["camera_id"] for e in recent], ["cam1"])
+
+        self.assertEqual(self.store.query_events(limit=1)[0]["camera_id"], "cam2")
+        self.assertEqual(self.store.counts_by_camera(), {"cam1": 2, "cam2": 1})
+
+    def test_history_survives_reopen(self):
+        self.store.add_event("cam1", 0, 75.0, episode_start=5.0,
+                             screenshot_path="fall_screenshots/a.jpg")
+        self.store.close()
+
+        self.store = FallEventStore(str(self.db_path))
+        events = self.store.query_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["screenshot_path"], "fall_screenshots/a.jpg")
+
+
+    def test_from_config(self):
+        config = {"events": {"database": str(Path(self.tmp.name) / "db" / "cfg.db"),
+                             "batch_size": 5, "flush_interval": 0.05}}
+        store = FallEventStore.from_config(config)
+        self.addCleanup(store.close)
+
+        self.assertEqual(store.db_path, Path(self.tmp.name) / "db" / "cfg.db")
+        self.assertEqual(store.batch_size, 5)
+        self.assertTrue(store.db_path.exists())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -2,12 +2,17 @@
 
 Bu testler src/core/fall_detector.py dosyasındaki mevcut API'ye göre yazıldı:
 - Girdi: isimlendirilmiş eklem noktaları (dict)
-- detect_fall(keypoints: Dict) -> bool döner
+- detect_fall(keypoints: Dict, timestamp=None) -> bool döner
 """
 
 import unittest
 
+import numpy as np
+
+from tests.synthetic import fall_sequence, pose_array
 from src.core.fall_detector import FallDetector
+from src.core.pose_schema import COCO_SCHEMA
+from src.core.pose_types import Keypoint
 
 
 def make_standing_keypoints() -> dict:
@@ -134,5 +139,173 @@ class TestFallDetectorLogic(unittest.TestCase):
         self.assertEqual(self.detector.get_confidence_score(), 0.0)
 
 
+class TestFallDetectorMotion(unittest.TestCase):
+    """Zaman damgalı gövde hızı/ivmesi ile hızlı onay."""
+
+    def first_fall_frame(self, sequence, fps=30.0, step=1, timestamps=True):
+        detector = FallDetector()
+        for i in range(0, len(sequence), step):
+            timestamp = i / fps if timestamps else None
+            if detector.detect_fall(sequence[i], timestamp):
+                return i
+        return None
+
+    def test_velocity_confirms_fall_earlier(self):
+        """Hızlı düşüş, yalnızca duruşa göre daha erken onaylanmalı."""
+
+        sequence = fall_sequence(60)
+        without_motion = self.first_fall_frame(sequence, timestamps=False)
+        with_motion = self.first_fall_frame(sequence)
+
+        self.assertIsNotNone(without_motion)
+        self.assertLess(with_motion, without_motion)
+
+    def test_robust_to_skipped_frames(self):
+        """Atlanan karelerde de hız gerçek zaman farkıyla hesaplanmalı."""
+
+        sequence = fall_sequence(60)
+        for step in (2, 3):
+            self.assertLess(self.first_fall_frame(sequence, step=step),
+                            self.first_fall_frame(sequence, step=step, timestamps=False))
+
+    def test_velocity_units_and_slow_lie_down(self):
+        """Hız gövde boyu/saniye cinsinden; yavaş uzanmada hızlı düşüş işareti olmamalı."""
+
+        detector = FallDetector()
+        standing = make_standing_keypoints()
+        shifted = {k: (x, y + 50) for k, (x, y) in standing.items()}
+        detector.detect_fall(standing, 0.0)
+        for i in range(1, 30):
+            detector.detect_fall(shifted, i / 30)
+        # Gövde boyu 100 px; 50 px tek karede (1/30 s) = 15 gövde boyu/s'lik anlık hız
+        self.assertTrue(detector.get_motion_info()["rapid_descent"])
+
+        slow = FallDetector()
+        for i, keypoints in enumerate(fall_sequence(200, standing_frames=20, falling_frames=150)):
+            slow.detect_fall(keypoints, i / 30)
+            self.assertFalse(slow.get_motion_info()["rapid_descent"])
+
+    def test_clock_going_backwards_restarts_motion(self):
+        """Zaman geri giderse (ör. başa sarma) hız hesabı takılı kalmamalı."""
+
+        detector = FallDetector()
+        standing = make_standing_keypoints()
+        detector.detect_fall(standing, 1000.0)
+        for i, keypoints in enumerate(fall_sequence(60)):
+            detector.detect_fall(keypoints, i / 30)
+
+        self.assertAlmostEqual(detector.last_timestamp, 59 / 30)
+        self.assertIsNotNone(detector.last_descent_time)
+
+    def test_reset_clears_motion_state(self):
+        detector = FallDetector()
+        for i, keypoints in enumerate(fall_sequence(40)):
+            detector.detect_fall(keypoints, i / 30)
+        detector.reset()
+
+        self.assertFalse(detector.is_fallen)
+        self.assertIsNone(detector.last_timestamp)
+        self.assertEqual(detector.vertical_velocity, 0.0)
+        self.assertEqual(len(detector.angle_history), 0)
+
+
+class TestFallDetectorScale(unittest.TestCase):
+    """Gövde boyuna göre normalize eşiklerle çözünürlükten bağımsız karar."""
+
+    WIDTHS = (320, 480, 640, 960, 1280)
+
+    def run_at_width(self, width, **kwargs):
+        scale = width / 640
+        sequence = fall_sequence(80, center_x=320 * scale, top_y=60 * scale, height=360 * scale)
+        detector = FallDetector(**kwargs)
+        return [(detector.detect_fall(k, i / 30), detector.get_confidence_score())
+                for i, k in enumerate(sequence)]
+
+    def test_identical_verdicts_across_resolutions(self):
+        """Aynı sahne farklı çözünürlüklerde aynı kararları vermeli."""
+
+        for scale_reference in ("torso", "bbox"):
+            results = [self.run_at_width(w, scale_reference=scale_reference) for w in self.WIDTHS]
+            for width, result in zip(self.WIDTHS, results):
+                with self.subTest(scale_reference=scale_reference, width=width):
+                    self.assertEqual(result, results[2])
+            self.assertTrue(any(fall for fall, _ in results[0]))
+
+    def test_pixel_thresholds_depend_on_resolution(self):
+        """Piksel eşikleri (varsayılan) çözünürlükle değişir."""
+
+        results = [self.run_at_width(w) for w in self.WIDTHS]
+        self.assertNotEqual(results[0], results[2])
+
+    def test_invalid_scale_reference(self):
+        with self.assertRaises(ValueError):
+            FallDetector(scale_reference="meters")
+
+    def test_from_config(self):
+        """'detection' bölümündeki eşikler dedektöre geçmeli."""
+
+        config = {"detection": {"angle_threshold": 58.0, "velocity_threshold": 1.3,
+                                "acceleration_threshold": 7.0, "scale_reference": "bbox",
+                                "head_ankle_thresholds": [0.4, 0.7], "full_weight_confidence": 0.6,
+                                "min_fall_frames": 5, "fast_confirm_frames": 3,
+                                "sitting_threshold": 65.0}}
+        detector = FallDetector.from_config(config, min_fall_frames=4)
+
+        self.assertEqual(detector.angle_threshold, 58.0)
+        self.assertEqual(detector.velocity_threshold, 1.3)
+        self.assertEqual(detector.acceleration_threshold, 7.0)
+        self.assertEqual(detector.scale_reference, "bbox")
+        self.assertEqual(detector.head_ankle_thresholds, (0.4, 0.7))
+        self.assertEqual(detector.full_weight_confidence, 0.6)
+        self.assertEqual(detector.min_fall_frames, 4)
+        self.assertEqual(detector.fast_confirm_frames, 3)
+
+
+def occluded_pose(tilt, use_confidence, trunk_confidence=0.95):
+    """Ayak bilekleri ve bilek görünmez (düşük güven, rastgele koordinat)."""
+
+    points = pose_array(320, 60, 360, tilt)
+    confidence = np.full(17, 0.95)
+    garbage = [Keypoint.LEFT_ANKLE, Keypoint.RIGHT_ANKLE, Keypoint.LEFT_WRIST]
+    points[garbage] = [(20, 70), (30, 75), (610, 90)]
+    confidence[garbage] = 0.2
+    confidence[[Keypoint.LEFT_SHOULDER, Keypoint.RIGHT_SHOULDER,
+                Keypoint.LEFT_HIP, Keypoint.RIGHT_HIP]] = trunk_confidence
+    return COCO_SCHEMA.to_pose(points, confidence if use_confidence else None, 0.5)
+
+
+class TestFallDetectorConfidence(unittest.TestCase):
+    """Eklem güvenine göre maskeleme ve kriter ağırlıkları."""
+
+    def run_sequence(self, tilt, **kwargs):
+        detector = FallDetector()
+        standing = COCO_SCHEMA.to_pose(pose_array(320, 60, 360), np.full(17, 0.95))
+        results = [detector.detect_fall(standing) for _ in range(20)]
+        results += [detector.detect_fall(occluded_pose(tilt, **kwargs)) for _ in range(20)]
+        return any(results), detector.get_confidence_score()
+
+    def test_occluded_joints_no_false_positive(self):
+        self.assertEqual(self.run_sequence(0.4, use_confidence=False), (True, 65.0))
+        self.assertEqual(self.run_sequence(0.4, use_confidence=True), (False, 25.0))
+
+    def test_low_confidence_trunk_weighs_less(self):
+        _, full = self.run_sequence(0.4, use_confidence=True)
+        _, weak = self.run_sequence(0.4, use_confidence=True, trunk_confidence=0.55)
+        self.assertAlmostEqual(weak, full * 0.55 / 0.8, places=4)
+
+    def test_confident_fall_still_detected(self):
+        detector = FallDetector()
+        for keypoints in fall_sequence(60):
+            points = np.array(list(keypoints.values()), dtype=np.float64)
+            detector.detect_fall(COCO_SCHEMA.to_pose(points, np.full(17, 0.9)))
+        self.assertTrue(detector.is_fallen)
+
+    def test_weights_without_confidence(self):
+        detector = FallDetector()
+        self.assertEqual(detector.criterion_weights(make_standing_keypoints()), (1.0,) * 4)
+        self.assertEqual(FallDetector(full_weight_confidence=None)
+                         .criterion_weights(occluded_pose(0.4, True, 0.3)), (1.0,) * 4)
+
+
 if __name__ == "__main__":  # pragma: no cover
     unittest.main(verbosity=2)
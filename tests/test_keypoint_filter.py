@@ -0,0 +1,108 @@
+"""KeypointFilter (One-Euro) testleri.
+
+- Titreşimi azaltır, hızlı hareketi az gecikmeyle geçirir
+- Atlanan kareler için keypoint tahmini yapar
+- Düşme sayacının salınımını azaltır
+"""
+
+import unittest
+
+import numpy as np
+
+from tests.synthetic import pose_array, standing_keypoints, to_keypoint_dict
+from src.core.fall_detector import FallDetector
+from src.core.keypoint_filter import KeypointFilter
+from src.core.pose_schema import COCO_SCHEMA
+
+
+def jittered(sequence, sigma=10, seed=1):
+    rng = np.random.default_rng(seed)
+    return [{k: (int(x + rng.normal(0, sigma)), int(y + rng.normal(0, sigma)))
+             for k, (x, y) in frame.items()} for frame in sequence]
+
+
+class TestKeypointFilter(unittest.TestCase):
+    """Yumuşatma, tahmin ve eksik nokta davranışı."""
+
+    def test_reduces_jitter(self):
+        clean = standing_keypoints()
+        noisy = jittered([clean] * 60)
+        keypoint_filter = KeypointFilter()
+        filtered = [keypoint_filter.update(k, i / 30) for i, k in enumerate(noisy)]
+
+        def error(frames):
+            return np.mean([abs(f[n][1] - clean[n][1]) for f in frames[10:] for n in clean])
+
+        self.assertLess(error(filtered), error(noisy) * 0.7)
+
+    def test_fast_motion_low_lag(self):
+        keypoint_filter = KeypointFilter()
+        for i in range(30):
+            # Whole body moves down 20 px per frame (600 px/s)
+            frame = {k: (x, y + 20 * i) for k, (x, y) in standing_keypoints().items()}
+            out = keypoint_filter.update(frame, i / 30)
+        self.assertLess(abs(out['nose'][1] - frame['nose'][1]), 20)
+
+    def test_predict_extrapolates(self):
+        keypoint_filter = KeypointFilter()
+        for i in range(20):
+            frame = {k: (x + 5 * i, y) for k, (x, y) in standing_keypoints().items()}
+            keypoint_filter.update(frame, i / 30)
+
+        predicted = keypoint_filter.predict(21 / 30)
+        self.assertAlmostEqual(predicted['nose'][0], frame['nose'][0] + 10, delta=3)
+        self.assertEqual(keypoint_filter.predict(5.0), {})
+
+    def test_missing_points_and_empty_frames(self):
+        keypoint_filter = KeypointFilter()
+        frame = standing_keypoints()
+        keypoint_filter.update(frame, 0.0)
+        partial = {k: v for k, v in frame.items() if k != 'nose'}
+
+        self.assertNotIn('nose', keypoint_filter.update(partial, 1 / 30))
+        self.assertEqual(keypoint_filter.update({}, 2 / 30), {})
+
+    def test_pose_keeps_confidence(self):
+        keypoint_filter = KeypointFilter()
+        confidence = np.linspace(0.6, 1.0, 17)
+        pose = COCO_SCHEMA.to_pose(pose_array(320, 60, 360), confidence)
+
+        filtered = keypoint_filter.update(pose, 0.0)
+        predicted = keypoint_filter.predict(1 / 30)
+
+        self.assertEqual(dict(filtered), dict(pose))
+        np.testing.assert_array_equal(filtered.confidence, pose.confidence)
+        np.testing.assert_array_equal(predicted.confidence, pose.confidence)
+
+    def test_resolution_independent(self):
+        scaled = []
+        for scale in (1, 2):
+            keypoint_filter = KeypointFilter()
+            frames = [to_keypoint_dict(pose_array(320 * scale, 60 * scale, 360 * scale, t / 30))
+                      for t in range(30)]
+            out = [keypoint_filter.filter_array(keypoint_filter.to_array(f), i / 30)
+                   for i, f in enumerate(frames)]
+            scaled.append(np.array(out) / scale)
+        np.testing.assert_allclose(scaled[0], scaled[1], atol=1.0)
+
+    def test_stabilizes_fall_counter(self):
+        """Sınırdaki duruşta karar salınımı filtreyle belirgin azalmalı."""
+
+        for tilt in (0.45, 0.6):
+            sequence = jittered([standing_keypoints()] * 20
+                                + [to_keypoint_dict(pose_array(320, 60, 360, tilt))] * 100)
+            flips = []
+            for smooth in (False, True):
+                detector, keypoint_filter, decisions = FallDetector(), KeypointFilter(), []
+                for i, keypoints in enumerate(sequence):
+                    if smooth:
+                        keypoints = keypoint_filter.update(keypoints, i / 30)
+                    detector.detect_fall(keypoints)
+                    decisions.append(detector.get_confidence_score() >= 60)
+                flips.append(sum(a != b for a, b in zip(decisions[20:], decisions[21:])))
+            with self.subTest(tilt=tilt):
+                self.assertLess(flips[1], flips[0] / 3)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
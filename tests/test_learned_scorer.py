@@ -0,0 +1,160 @@
+"""Öğrenilmiş pencere skorlayıcısı testleri.
+
+- Sentetik düşme pencereleriyle eğitim, kaydet/yükle
+- FallDetector'a takılabilir skorlayıcı; puan sistemi o zaman çalışmaz
+- Birçok izin penceresi tek toplu çağrıda skorlanır
+- Eğitim komutunun keypoint önbelleği
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from tests.synthetic import fall_sequence, standing_keypoints
+from src.core.fall_detector import FallDetector
+from src.core.learned_scorer import (LogisticWindowModel, WindowScorer,
+                                     keypoints_to_points, score_tracks, window_features)
+from src.models.train_scorer import (build_dataset, cached_keypoints, make_windows,
+                                     person_area, range_labels, split_videos)
+
+WINDOW = 8
+
+
+def sequence_points(sequence):
+    return np.stack([keypoints_to_points(k) for k in sequence])
+
+
+def synthetic_dataset():
+    rng = np.random.default_rng(0)
+    sequences = []
+    for i in range(6):
+        fall = fall_sequence(60, standing_frames=15 + i, falling_frames=8 + i,
+                             center_x=200 + 40 * i, height=250 + 30 * i)
+        sequences.append((f"fall_{i}", sequence_points(fall), True))
+        standing = [standing_keypoints(center_x=200 + 40 * i, height=250 + 30 * i)] * 60
+        points = sequence_points(standing) + rng.normal(0, 3, (60, 7, 2))
+        sequences.append((f"walk_{i}", points, False))
+    return build_dataset(sequences, WINDOW, label_angle=45.0)
+
+
+class TestLearnedScorer(unittest.TestCase):
+    """Eğitim, toplu skorlama ve FallDetector entegrasyonu."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.features, cls.labels = synthetic_dataset()
+        cls.model = LogisticWindowModel.fit(cls.features, cls.labels, WINDOW)
+
+    def test_training_separates_classes(self):
+        predicted = self.model.predict_proba(self.features) >= 0.6
+        self.assertGreater(np.mean(predicted == (self.labels > 0)), 0.95)
+
+    def test_save_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "scorer.npz")
+            self.model.save(path)
+            loaded = LogisticWindowModel.load(path)
+
+        np.testing.assert_allclose(loaded.predict_proba(self.features),
+                                   self.model.predict_proba(self.features))
+        self.assertEqual(loaded.window, WINDOW)
+
+    def test_batch_matches_single_window(self):
+        windows = make_windows(sequence_points(fall_sequence(40)), WINDOW)
+        batch = self.model.score_windows(windows)
+        single = [self.model.score_windows(w[None])[0] for w in windows[:5]]
+        np.testing.assert_allclose(batch[:5], single, rtol=1e-5)
+        self.assertEqual(window_features(windows).shape, (len(windows), 5 * WINDOW))
+
+    def test_fall_detector_with_scorer(self):
+        detector = FallDetector(scorer=WindowScorer(self.model))
+        results = [detector.detect_fall(k) for k in fall_sequence(60)]
+        self.assertFalse(any(results[:20]))
+        self.assertTrue(results[-1])
+
+        detector.reset()
+        self.assertEqual(len(detector.scorer.frames), 0)
+
+    def test_scorer_skips_point_system(self):
+        detector = FallDetector(scorer=WindowScorer(self.model))
+        with mock.patch.object(detector, 'point_score') as point_score:
+            for keypoints in fall_sequence(20):
+                detector.detect_fall(keypoints)
+        point_score.assert_not_called()
+
+    def test_score_tracks_matches_single_updates(self):
+        sequence = fall_sequence(40)
+        single = [WindowScorer(self.model) for _ in range(3)]
+        batched = [WindowScorer(self.model) for _ in range(3)]
+        for frame in range(12):
+            keypoints = [sequence[frame + 5 * i] for i in range(3)]
+            expected = [s.update(k) for s, k in zip(single, keypoints)]
+            with mock.patch.object(self.model, 'score_windows',
+                                   wraps=self.model.score_windows) as score_windows:
+                scores = score_tracks(batched, keypoints)
+            self.assertEqual(score_windows.call_count, 1)
+            np.testing.assert_allclose(scores, expected, rtol=1e-5)
+        self.assertEqual(score_tracks([], []), [])
+
+    def test_precomputed_confidence(self):
+        detector = FallDetector(scorer=WindowScorer(self.model))
+        for keypoints in fall_sequence(60)[:20]:
+            detector.detect_fall(keypoints, confidence=90.0)
+
+        self.assertEqual(detector.get_confidence_score(), 90.0)
+        self.assertEqual(len(detector.scorer.frames), 0)
+
+
+class TestTrainingHelpers(unittest.TestCase):
+    """Pencereleme, etiketler ve keypoint önbelleği."""
+
+    def test_range_labels(self):
+        labels = range_labels(20, 5, [(10, 12)])
+        self.assertEqual(len(labels), 16)
+        self.assertEqual(np.flatnonzero(labels).tolist(), [6, 7, 8])
+
+    def test_split_holds_out_whole_videos(self):
+        sequences = [(f"fall_{i}", None, True) for i in range(5)]
+        sequences += [(f"walk_{i}", None, False) for i in range(5)]
+        train, held_out = split_videos(sequences, 0.2)
+
+        names = [s[0] for s in held_out]
+        self.assertEqual(len(names), 2)
+        self.assertEqual({s[2] for s in held_out}, {True, False})
+        self.assertFalse(set(names) & {s[0] for s in train})
+        self.assertEqual(len(train) + len(held_out), 10)
+        self.assertEqual(split_videos(sequences, 0.0)[1], [])
+
+    def test_person_area_without_bbox(self):
+        keypoints = {'nose': (10, 20), 'left_ankle': (30, 80)}
+        self.assertEqual(person_area({'bbox': (0, 0, 10, 10), 'keypoints': keypoints}), 100)
+        self.assertEqual(person_area({'bbox': None, 'keypoints': keypoints}), 20 * 60)
+
+    def test_keypoint_cache(self):
+        calls = []
+
+        def extract(frame):
+            calls.append(1)
+            return standing_keypoints()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            video = Path(tmp) / "clip.avi"
+            writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+            for _ in range(5):
+                writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+            writer.release()
+
+            first = cached_keypoints(video, Path(tmp) / "cache", "fake", 64, extract)
+            second = cached_keypoints(video, Path(tmp) / "cache", "fake", 64, extract)
+
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(first.shape, (5, 7, 2))
+        np.testing.assert_array_equal(first, second)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,212 @@
+"""Video önbelleği ve akışlı URL alımı testleri.
+
+- Yerel HTTP sunucusundan indirme; kopan bağlantıda Range ile devam
+- Boyut sınırında en eski fall_detection_* dosyalarının silinmesi
+- Akıştan (HTTP) kademeli kod çözme: indirme bitmeden işlem başlar
+- Yerel akış sunucusu: kod çözücü indirilmekte olan dosyayı okur, video
+  kaynaktan yalnızca bir kez çekilir
+- VideoURLHandler: önbellek isabeti, akış modu ve yt-dlp HTTP başlıkları (yt_dlp varsa)
+"""
+
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+
+from tests.media_server import LocalMediaServer, encode_video
+from src.utils.media_cache import MediaCache
+
+VIDEO = encode_video(frames=30)
+
+
+def decoded_frames(url):
+    capture = cv2.VideoCapture(url)
+    frames = 0
+    while capture.isOpened() and capture.read()[0]:
+        frames += 1
+    capture.release()
+    return frames
+
+
+class TestMediaCache(unittest.TestCase):
+    """İndirme, devam ve tahliye."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = MediaCache(self.tmp.name, max_bytes=10 * len(VIDEO), chunk_size=4096)
+        self.server = LocalMediaServer({'video.mp4': VIDEO}).start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_download_and_lookup(self):
+        self.assertIsNone(self.cache.lookup('abc'))
+
+        path = self.cache.download(self.server.url('video.mp4'), 'abc')
+
+        self.assertEqual(Path(path).name, 'fall_detection_abc.mp4')
+        self.assertEqual(Path(path).read_bytes(), VIDEO)
+        self.assertEqual(self.cache.lookup('abc'), path)
+        # Cached: no second request
+        self.cache.download(self.server.url('video.mp4'), 'abc')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_resume_after_dropped_connection(self):
+        self.server.drop_after['video.mp4'] = len(VIDEO) // 3
+
+        path = self.cache.download(self.server.url('video.mp4'), 'abc')
+
+        self.assertEqual(Path(path).read_bytes(), VIDEO)
+        self.assertEqual([r[1] for r in self.server.requests],
+                         [None, f"bytes={len(VIDEO) // 3}-"])
+        self.assertFalse(any(p.endswith('.part') for p in os.listdir(self.tmp.name)))
+
+    def test_complete_partial_file(self):
+        part = Path(self.tmp.name) / 'fall_detection_abc.mp4.part'
+        part.write_bytes(VIDEO)
+
+        path = self.cache.download(self.server.url('video.mp4'), 'abc')
+
+        self.assertEqual(Path(path).read_bytes(), VIDEO)
+
+    def test_missing_video(self):
+        with self.assertRaises(IOError):
+            self.cache.download(self.server.url('missing.mp4'), 'abc', max_attempts=2)
+
+    def test_size_bounded_eviction(self):
+        root = Path(self.tmp.name)
+        other = root / 'unrelated.mp4'
+        other.write_bytes(b'x' * 20 * len(VIDEO))
+        for i in range(12):
+            path = root / f'fall_detection_old{i}.mp4'
+            path.write_bytes(VIDEO)
+            os.utime(path, (1000 + i, 1000 + i))
+        # Recently used files survive
+        self.cache.lookup('old0')
+
+        removed = self.cache.evict()
+
+        self.assertEqual(sorted(Path(p).name for p in removed),
+                         ['fall_detection_old1.mp4', 'fall_detection_old2.mp4'])
+        self.assertLessEqual(self.cache.total_bytes(), self.cache.max_bytes)
+        self.assertTrue(other.exists())
+
+    def test_download_evicts(self):
+        cache = MediaCache(self.tmp.name, max_bytes=len(VIDEO))
+        first = cache.download(self.server.url('video.mp4'), 'first')
+        time.sleep(0.01)
+        second = cache.download(self.server.url('video.mp4'), 'second')
+
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+
+    def test_background_download(self):
+        thread = self.cache.download_async(self.server.url('video.mp4'), 'abc')
+        self.assertIs(self.cache.download_async(self.server.url('video.mp4'), 'abc'), thread)
+        thread.join(timeout=30)
+
+        self.assertIsNotNone(self.cache.lookup('abc'))
+        self.assertFalse(self.cache.is_downloading('abc'))
+
+    def test_stream_while_downloading(self):
+        self.addCleanup(self.cache.close)
+        self.server.drop_after['video.mp4'] = len(VIDEO) // 2
+
+        url = self.cache.stream_url(self.server.url('video.mp4'), 'abc')
+
+        # The decoder waits for the resumed download instead of ending early
+        self.assertEqual(decoded_frames(url), 30)
+        self.cache._downloads[self.cache.safe_id('abc')].join(timeout=30)
+        self.assertEqual(Path(self.cache.lookup('abc')).read_bytes(), VIDEO)
+        # The source only sees the download and its resume
+        self.assertEqual([r[1] for r in self.server.requests],
+                         [None, f"bytes={len(VIDEO) // 2}-"])
+
+    def test_stream_with_source_headers(self):
+        self.addCleanup(self.cache.close)
+        self.server.required_headers = {'X-Token': 'abc'}
+
+        url = self.cache.stream_url(self.server.url('video.mp4'), 'abc', headers={'X-Token': 'abc'})
+
+        # The decoder needs no headers; the download carries them
+        self.assertEqual(decoded_frames(url), 30)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_stream_unknown_file(self):
+        self.addCleanup(self.cache.close)
+        url = self.cache.stream_url(self.server.url('video.mp4'), 'abc')
+        self.cache._downloads[self.cache.safe_id('abc')].join(timeout=30)
+
+        self.assertEqual(decoded_frames(url.replace('abc', 'other')), 0)
+
+
+class TestProgressiveDecode(unittest.TestCase):
+    """Akış modunda kod çözücü doğrudan HTTP adresinden okur."""
+
+    def test_decode_from_url(self):
+        with LocalMediaServer({'video.mp4': VIDEO}) as server:
+            capture = cv2.VideoCapture(server.url('video.mp4'))
+            self.assertTrue(capture.isOpened())
+            frames = 0
+            while capture.read()[0]:
+                frames += 1
+            capture.release()
+
+        self.assertEqual(frames, 30)
+
+
+@unittest.skipUnless(importlib.util.find_spec('yt_dlp'), "yt_dlp yüklü değil")
+class TestVideoURLHandler(unittest.TestCase):
+    """YouTube adresleri için önbellek ve akış modu."""
+
+    def setUp(self):
+        from src.video_url_handler import VideoURLHandler
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = LocalMediaServer({'video.mp4': VIDEO}).start()
+        # Signed media URLs only answer with yt-dlp's headers
+        self.server.required_headers = {'User-Agent': 'test-agent', 'X-Token': 'abc'}
+        self.handler = VideoURLHandler(MediaCache(self.tmp.name))
+        self.addCleanup(self.handler.cache.close)
+        self.url = 'https://www.youtube.com/watch?v=abcdefghijk'
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def fake_ydl(self):
+        ydl = mock.MagicMock()
+        ydl.__enter__.return_value.extract_info.return_value = {
+            'id': 'abcdefghijk', 'url': self.server.url('video.mp4'), 'ext': 'mp4',
+            'http_headers': dict(self.server.required_headers)}
+        return mock.patch('src.video_url_handler.yt_dlp.YoutubeDL', return_value=ydl)
+
+    def test_stream_then_cache_hit(self):
+        with self.fake_ydl():
+            source, kind = self.handler.process_url(self.url)
+        self.assertEqual(kind, 'youtube_stream')
+        self.assertTrue(source.startswith('http://127.0.0.1:'))
+        self.assertEqual(decoded_frames(source), 30)
+        # Decoding and caching share one request to the source
+        self.assertEqual(len(self.server.requests), 1)
+
+        deadline = time.monotonic() + 30
+        while self.handler.cache.is_downloading('abcdefghijk') and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        source, kind = self.handler.process_url(self.url)
+        self.assertEqual(kind, 'youtube_cached')
+        self.assertEqual(Path(source).read_bytes(), VIDEO)
+
+    def test_video_id(self):
+        self.assertEqual(self.handler.extract_video_id('https://youtu.be/abcdefghijk?t=3'), 'abcdefghijk')
+        self.assertIsNone(self.handler.extract_video_id('https://youtube.com/'))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
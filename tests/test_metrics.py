@@ -0,0 +1,72 @@
+"""Metrik alt sistemi testleri.
+
+- Aşama gecikmeleri histogramlara yazılır
+- /metrics uç noktası Prometheus metin formatında döner
+"""
+
+import time
+import unittest
+import urllib.request
+
+from src.utils.metrics import Histogram, MetricsRegistry, MetricsServer
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Histogram, sayaç ve gösterge davranışı."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry(buckets=(0.01, 0.1, 1.0))
+
+    def test_timer_records_stage_latency(self):
+        with self.registry.timer("stage_seconds", stream="cam1", stage="decode"):
+            time.sleep(0.02)
+
+        histogram = self.registry.get_histogram("stage_seconds", stream="cam1", stage="decode")
+        self.assertEqual(histogram.count, 1)
+        self.assertGreaterEqual(histogram.sum, 0.02)
+        self.assertEqual(histogram.counts, [0, 1, 0, 0])
+
+    def test_quantile_estimate(self):
+        histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+        for _ in range(99):
+            histogram.observe(0.005)
+        histogram.observe(0.5)
+
+        self.assertLessEqual(histogram.quantile(0.5), 0.01)
+        self.assertGreater(histogram.quantile(0.999), 0.1)
+
+    def test_render_prometheus(self):
+        self.registry.describe("stage_seconds", "Stage latency")
+        self.registry.observe("stage_seconds", 0.05, stream="cam1", stage="inference")
+        self.registry.inc("frames_dropped_total", 2, stream="cam1")
+        self.registry.set_gauge("queue_depth", 1, stream="cam1", queue="frame_buffer")
+
+        text = self.registry.render_prometheus()
+
+        self.assertIn("# TYPE fall_detection_stage_seconds histogram", text)
+        self.assertIn('fall_detection_stage_seconds_bucket{stage="inference",stream="cam1",le="0.01"} 0', text)
+        self.assertIn('fall_detection_stage_seconds_bucket{stage="inference",stream="cam1",le="0.1"} 1', text)
+        self.assertIn('fall_detection_stage_seconds_bucket{stage="inference",stream="cam1",le="+Inf"} 1', text)
+        self.assertIn('fall_detection_stage_seconds_count{stage="inference",stream="cam1"} 1', text)
+        self.assertIn('fall_detection_frames_dropped_total{stream="cam1"} 2', text)
+        self.assertIn('fall_detection_queue_depth{queue="frame_buffer",stream="cam1"} 1', text)
+
+    def test_label_values_escaped(self):
+        self.registry.inc("frames_total", stream='C:\\video "a".mp4')
+        self.assertIn('stream="C:\\\\video \\"a\\".mp4"', self.registry.render_prometheus())
+
+    def test_http_endpoint(self):
+        self.registry.inc("frames_total", stream="cam1")
+        server = MetricsServer(self.registry, port=0)
+        port = server.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                body = response.read().decode("utf-8")
+        finally:
+            server.stop()
+
+        self.assertIn('fall_detection_frames_total{stream="cam1"} 1', body)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
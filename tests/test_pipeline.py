@@ -0,0 +1,215 @@
+"""StreamPipeline testleri.
+
+- Sahte poz arka uçlarıyla uçtan uca kare işleme
+- Kare atlama ve aşama metrikleri
+- Öğrenilmiş skorlayıcı: karedeki tüm kişiler tek toplu çağrıda skorlanır
+- Kişi takibi: sıra değişse de kimlik kutu eşleşmesiyle korunur, kaybolan iz
+  süresi dolunca unutulur
+- Tahmin edilen (atlanan) kareler düşme onayına sayılmaz
+- Yapılandırmadan 'smoothing' ayarları anahtar nokta filtresine geçer
+- Verim (throughput) ölçüm aracının kısa bir çalıştırması
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from benchmarks.e2e_throughput import run_benchmark, synthetic_frames
+from tests.fake_backends import ScriptedMultiPersonDetector, ScriptedPoseEstimator
+from tests.synthetic import fall_sequence
+from src.core.learned_scorer import LogisticWindowModel
+from src.core.pipeline import StreamPipeline
+from src.utils.metrics import MetricsRegistry
+
+
+def blank_frame(width=1280, height=720):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+class ReorderingDetector(ScriptedMultiPersonDetector):
+    """Reports people in reverse order on every other call, as YOLO may"""
+
+    def detect_people(self, frame):
+        people = super().detect_people(frame)
+        return people[::-1] if self.calls % 2 else people
+
+
+class TestStreamPipeline(unittest.TestCase):
+    """Çoklu ve tekli kişi arka uçlarıyla işlem hattı."""
+
+    def test_multi_person_fall_confirmed(self):
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector(people=2, script=fall_sequence(60)))
+
+        results = [pipeline.process(pipeline.resize(blank_frame())) for _ in range(60)]
+
+        self.assertTrue(all(r['processed'] for r in results))
+        self.assertEqual(len(results[0]['people']), 2)
+        self.assertFalse(results[0]['fall_detected'])
+        self.assertTrue(results[-1]['fall_detected'])
+        self.assertEqual(set(pipeline.fall_detectors), {0, 1})
+        self.assertEqual(results[-1]['frame'].shape, (360, 640, 3))
+
+    def test_single_person_backend(self):
+        pipeline = StreamPipeline(ScriptedPoseEstimator(script=fall_sequence(60)))
+
+        results = [pipeline.process(pipeline.resize(blank_frame())) for _ in range(60)]
+
+        self.assertFalse(pipeline.multi_person)
+        self.assertIsNone(results[0]['people'][0]['bbox'])
+        self.assertTrue(results[-1]['fall_detected'])
+        self.assertGreaterEqual(results[-1]['max_confidence'], 60)
+
+    def test_scorer_batched_per_frame(self):
+        rng = np.random.default_rng(0)
+        features = rng.normal(size=(64, 5 * 4))
+        model = LogisticWindowModel.fit(features, (features[:, 0] > 0).astype(float), 4, epochs=10)
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector(people=5, script=fall_sequence(10)),
+                                  scorer_model=model)
+
+        with mock.patch.object(model, 'score_windows', wraps=model.score_windows) as score_windows:
+            results = [pipeline.process(pipeline.resize(blank_frame())) for _ in range(10)]
+
+        self.assertEqual(score_windows.call_count, 10)
+        self.assertEqual({len(call.args[0]) for call in score_windows.call_args_list}, {5})
+        self.assertEqual(len(results[-1]['people']), 5)
+        self.assertTrue(all(len(d.scorer.frames) == 4 for d in pipeline.fall_detectors.values()))
+
+    def test_from_config(self):
+        config = {'detection': {'angle_threshold': 58.0, 'scale_reference': 'bbox',
+                                'velocity_threshold': 1.3, 'min_fall_frames': 5,
+                                'head_ankle_thresholds': [0.4, 0.7]}}
+        pipeline = StreamPipeline.from_config(ScriptedMultiPersonDetector(), config,
+                                              stream_id='cam1', angle_threshold=50.0)
+        pipeline.process(pipeline.resize(blank_frame()))
+
+        detector = pipeline.fall_detectors[0]
+        self.assertEqual(pipeline.stream_id, 'cam1')
+        self.assertEqual(detector.angle_threshold, 50.0)
+        self.assertEqual(detector.scale_reference, 'bbox')
+        self.assertEqual(detector.velocity_threshold, 1.3)
+        self.assertEqual(detector.min_fall_frames, 5)
+        self.assertEqual(detector.head_ankle_thresholds, (0.4, 0.7))
+
+    def test_from_config_smoothing(self):
+        config = {'smoothing': {'enabled': True, 'min_cutoff': 0.8, 'beta': 4.0,
+                                'd_cutoff': 2.0, 'interpolate_skipped': False}}
+        pipeline = StreamPipeline.from_config(ScriptedMultiPersonDetector(), config)
+        pipeline.process(pipeline.resize(blank_frame()), 0.0)
+
+        keypoint_filter = pipeline.keypoint_filters[0]
+        self.assertTrue(pipeline.smooth_keypoints)
+        self.assertFalse(pipeline.interpolate_skipped)
+        self.assertEqual((keypoint_filter.min_cutoff, keypoint_filter.beta, keypoint_filter.d_cutoff),
+                         (0.8, 4.0, 2.0))
+
+    def test_track_ids_follow_boxes(self):
+        detector = ReorderingDetector(people=2, script=fall_sequence(60))
+        pipeline = StreamPipeline(detector, resize_width=None, smooth_keypoints=True)
+
+        results = [pipeline.process(blank_frame(640, 360), i / 30) for i in range(60)]
+
+        self.assertEqual(set(pipeline.fall_detectors), {0, 1})
+        # The left person keeps one id although the detector swaps the order
+        left = {min(r['people'], key=lambda p: p['bbox'][0])['person_id'] for r in results}
+        self.assertEqual(len(left), 1)
+        self.assertTrue(results[-1]['fall_detected'])
+
+    def test_lost_track_forgotten(self):
+        detector = ScriptedMultiPersonDetector(people=2, script=fall_sequence(10))
+        pipeline = StreamPipeline(detector, resize_width=None, max_track_age=5)
+        for _ in range(3):
+            pipeline.process(blank_frame(640, 360))
+
+        detector._frames = [people[:1] for people in detector._frames]
+        for _ in range(5):
+            pipeline.process(blank_frame(640, 360))
+        self.assertEqual(set(pipeline.fall_detectors), {0, 1})
+        pipeline.process(blank_frame(640, 360))
+
+        self.assertEqual(set(pipeline.fall_detectors), {0})
+        self.assertEqual(set(pipeline.tracks), {0})
+
+    def test_skip_frames_and_metrics(self):
+        registry = MetricsRegistry()
+        detector = ScriptedMultiPersonDetector()
+        pipeline = StreamPipeline(detector, stream_id='cam1', skip_frames=3, metrics=registry)
+
+        results = [pipeline.process(pipeline.resize(blank_frame())) for _ in range(9)]
+
+        self.assertEqual([r['processed'] for r in results].count(True), 3)
+        self.assertEqual(detector.calls, 3)
+        self.assertEqual(registry.get_counter('frames_skipped_total', stream='cam1',
+                                              reason='skip_frames'), 6)
+        self.assertEqual(registry.get_counter('frames_dropped_total', stream='cam1'), 0)
+        self.assertEqual(registry.get_histogram('stage_seconds', stream='cam1', stage='inference').count, 3)
+        self.assertEqual(registry.get_histogram('stage_seconds', stream='cam1', stage='resize').count, 9)
+
+    def test_smoothed_keypoints(self):
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector(script=fall_sequence(60)),
+                                  smooth_keypoints=True)
+
+        results = [pipeline.process(pipeline.resize(blank_frame()), i / 30) for i in range(60)]
+
+        self.assertEqual(set(pipeline.keypoint_filters), {0})
+        self.assertTrue(results[-1]['fall_detected'])
+
+    def test_interpolated_skipped_frames(self):
+        full = fall_sequence(90)
+        # Inference only sees every third frame of the sequence
+        detector = ScriptedMultiPersonDetector(script=full[2::3])
+        pipeline = StreamPipeline(detector, skip_frames=3, resize_width=None,
+                                  interpolate_skipped=True)
+
+        predicted_error, stale_error, first_fall = [], [], None
+        last, predicted_frames = None, 0
+        for i in range(90):
+            result = pipeline.process(blank_frame(640, 360), i / 30)
+            if result['processed']:
+                last = result['people'][0]
+            elif result['predicted']:
+                predicted_frames += 1
+                person = result['people'][0]
+                keypoints = person['keypoints']
+                predicted_error += [abs(keypoints[n][1] - full[i][n][1]) for n in keypoints]
+                stale_error += [abs(last['keypoints'][n][1] - full[i][n][1]) for n in keypoints]
+                # Predicted frames keep the last inferred verdict
+                self.assertEqual(person['is_fallen'], last['is_fallen'])
+                self.assertEqual(person['confidence'], last['confidence'])
+            if result['fall_detected'] and first_fall is None:
+                first_fall = i
+
+        self.assertEqual(detector.calls, 30)
+        # Every skipped frame after the first inference is predicted
+        self.assertEqual(predicted_frames, 58)
+        self.assertLess(np.mean(predicted_error), np.mean(stale_error))
+        # Only inferred frames count toward confirmation: the same frame as
+        # plain skipping, never earlier from extrapolated motion
+        self.assertEqual(first_fall, 29)
+
+    def test_reset(self):
+        pipeline = StreamPipeline(ScriptedMultiPersonDetector(), smooth_keypoints=True)
+        pipeline.process(blank_frame(640, 360))
+        pipeline.reset()
+
+        self.assertEqual(pipeline.fall_detectors, {})
+        self.assertEqual(pipeline.keypoint_filters, {})
+        self.assertEqual(pipeline.frame_index, 0)
+
+
+class TestThroughputHarness(unittest.TestCase):
+    """Uçtan uca verim ölçüm aracı."""
+
+    def test_run_benchmark_report(self):
+        report = run_benchmark(synthetic_frames(320, 240, variants=2),
+                               frame_count=50, warmup=5, resize_width=None)
+
+        self.assertEqual(report['frames'], 50)
+        self.assertGreater(report['fps'], 0)
+        self.assertLessEqual(report['latency_ms']['p50'], report['latency_ms']['p99'])
+        self.assertIn('detect_fall', report['stages_mean_ms'])
+        self.assertIn('heap_growth_bytes', report['memory'])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -3,9 +3,13 @@
 Mevcut implementasyonlara göre sadeleştirilmiş smoke testler:
 - PoseEstimator.process_frame -> bool döner
 - MultiPersonDetector.detect_people -> list döner
+- Her iki arka uç da ayarlarını `models:` yapılandırmasından okur
 """
 
 import unittest
+from collections.abc import Mapping
+from unittest import mock
+
 import numpy as np
 
 from src.models.pose_estimator import PoseEstimator
@@ -31,12 +35,23 @@ class TestPoseEstimator(unittest.TestCase):
         _ = self.estimator.process_frame(frame)
 
         keypoints = self.estimator.get_all_keypoints(frame_width=640, frame_height=480)
-        self.assertIsInstance(keypoints, dict)
+        self.assertIsInstance(keypoints, Mapping)
         for name, coords in keypoints.items():
             self.assertIsInstance(name, str)
             self.assertIsInstance(coords, tuple)
             self.assertEqual(len(coords), 2)
 
+    def test_from_config(self):
+        config = {"models": {"mediapipe": {"min_detection_confidence": 0.6,
+                                           "min_tracking_confidence": 0.6,
+                                           "model_complexity": 0, "min_visibility": 0.3}}}
+        with mock.patch("src.models.pose_estimator.mp.solutions.pose.Pose") as pose:
+            estimator = PoseEstimator.from_config(config)
+
+        self.assertEqual(estimator.min_visibility, 0.3)
+        pose.assert_called_once_with(min_detection_confidence=0.6, min_tracking_confidence=0.6,
+                                     model_complexity=0)
+
 
 class TestMultiPersonDetector(unittest.TestCase):
     """MultiPersonDetector (YOLOv8) için hafif testler.
@@ -66,6 +81,19 @@ class TestMultiPersonDetector(unittest.TestCase):
         people = self.detector.detect_people(frame)
         self.assertIsInstance(people, list)
 
+    def test_from_config(self):
+        config = {"models": {"yolov8": {"model_name": "custom-pose.pt", "confidence": 0.6,
+                                        "keypoint_confidence": 0.4, "iou_threshold": 0.45,
+                                        "max_det": 20}}}
+        with mock.patch("ultralytics.YOLO") as yolo:
+            detector = MultiPersonDetector.from_config(config)
+            detector.detect_people(np.zeros((240, 320, 3), dtype=np.uint8))
+
+        yolo.assert_called_once_with("custom-pose.pt")
+        self.assertEqual(detector.keypoint_confidence, 0.4)
+        yolo.return_value.assert_called_once_with(mock.ANY, conf=0.6, iou=0.45,
+                                                  max_det=20, verbose=False)
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main(verbosity=2)
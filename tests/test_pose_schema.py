@@ -0,0 +1,142 @@
+"""Keypoint şema adaptörü testleri.
+
+- MediaPipe 33 nokta -> COCO 17 nokta toplama (görünürlük maskesiyle)
+- İki arka uç aynı pozdan aynı keypoint'leri ve aynı kararları üretir
+- Çoklu kişi toplu dönüşümü
+"""
+
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from tests.synthetic import fall_sequence, pose_array, to_keypoint_dict
+from src.core.fall_detector import FallDetector
+from src.core.pose_schema import COCO_SCHEMA, MEDIAPIPE_SCHEMA, KeypointSchema
+from src.core.pose_types import Keypoint
+from src.models.multi_person_detector import MultiPersonDetector
+from src.models.pose_estimator import PoseEstimator
+
+# Powers of two keep normalized coordinates exact
+WIDTH = HEIGHT = 512
+
+
+def mediapipe_landmarks(points, visibility=1.0):
+    """(33, 3) normalized MediaPipe landmarks holding COCO ``points``"""
+    landmarks = np.zeros((33, 3))
+    landmarks[:, 2] = 0.1
+    landmarks[MEDIAPIPE_SCHEMA.source_index, :2] = np.asarray(points) / (WIDTH, HEIGHT)
+    landmarks[MEDIAPIPE_SCHEMA.source_index, 2] = visibility
+    return landmarks
+
+
+def mediapipe_pose(points, visibility=1.0):
+    landmarks = mediapipe_landmarks(points, visibility)
+    return MEDIAPIPE_SCHEMA.to_pose(landmarks[:, :2], landmarks[:, 2], scale=(WIDTH, HEIGHT))
+
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+def yolo_results(people):
+    """Ultralytics-like result list for ``(P, 17, 2)`` keypoints"""
+    boxes = [(*p.min(axis=0), *p.max(axis=0)) for p in people]
+    return [SimpleNamespace(
+        keypoints=SimpleNamespace(xy=FakeTensor(people)),
+        boxes=SimpleNamespace(xyxy=FakeTensor(boxes), conf=FakeTensor([0.9] * len(people))),
+    )]
+
+
+class TestKeypointSchema(unittest.TestCase):
+    """Dizin haritaları ve vektörel toplama."""
+
+    def test_mediapipe_gather(self):
+        points = np.rint(pose_array(256, 40, 400, 0.2))
+        visibility = np.ones(17)
+        visibility[Keypoint.LEFT_WRIST] = 0.2
+
+        pose = mediapipe_pose(points, visibility)
+
+        self.assertNotIn('left_wrist', pose)
+        self.assertEqual(len(pose), 16)
+        self.assertEqual(pose['left_ankle'], tuple(int(v) for v in points[Keypoint.LEFT_ANKLE]))
+
+    def test_backends_agree(self):
+        for keypoints in fall_sequence(40)[::5]:
+            points = np.array(list(keypoints.values()), dtype=np.float64)
+            from_mediapipe = mediapipe_pose(points)
+            from_yolo = COCO_SCHEMA.to_pose(points)
+            self.assertEqual(dict(from_mediapipe), dict(from_yolo))
+            self.assertEqual(dict(from_yolo), keypoints)
+
+    def test_batch_matches_single(self):
+        people = np.stack([pose_array(100 + 150 * i, 50, 300, 0.1 * i) for i in range(4)])
+        people[2, Keypoint.NOSE] = 0
+
+        batch = COCO_SCHEMA.to_poses(people)
+
+        self.assertEqual([dict(p) for p in batch],
+                         [dict(COCO_SCHEMA.to_pose(p)) for p in people])
+        self.assertNotIn('nose', batch[2])
+
+    def test_invalid_map(self):
+        with self.assertRaises(ValueError):
+            KeypointSchema('broken', 33, [0, 1, 2])
+
+
+class TestBackendAdapters(unittest.TestCase):
+    """Arka uçlar şema üzerinden aynı Pose düzenini döndürür."""
+
+    def test_pose_estimator_uses_visibility(self):
+        points = np.rint(pose_array(256, 40, 400))
+        visibility = np.ones(17)
+        visibility[Keypoint.LEFT_ANKLE] = 0.3
+        landmarks = mediapipe_landmarks(points, visibility)
+        estimator = PoseEstimator(min_visibility=0.5)
+        estimator.results = SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=[
+            SimpleNamespace(x=x, y=y, visibility=v) for x, y, v in landmarks]))
+
+        keypoints = estimator.get_all_keypoints(WIDTH, HEIGHT)
+
+        self.assertEqual(len(keypoints), 16)
+        self.assertNotIn('left_ankle', keypoints)
+        self.assertIn('left_wrist', keypoints)
+
+    def test_multi_person_detector_batch(self):
+        people = np.stack([pose_array(150 + 300 * i, 50, 300) for i in range(2)]).astype(np.float32)
+        detector = MultiPersonDetector.__new__(MultiPersonDetector)
+        detector.confidence = 0.5
+        detector.keypoint_confidence = 0.5
+        detector.iou_threshold = 0.7
+        detector.max_det = 300
+        detector.model = lambda frame, **kwargs: yolo_results(people)
+
+        detected = detector.detect_people(np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8))
+
+        self.assertEqual(len(detected), 2)
+        self.assertEqual(dict(detected[1]['keypoints']), to_keypoint_dict(people[1]))
+        self.assertEqual(detected[0].bbox, tuple(int(v) for v in (*people[0].min(axis=0),
+                                                                    *people[0].max(axis=0))))
+        self.assertAlmostEqual(detected[0].confidence, 0.9, places=5)
+
+    def test_same_verdicts_across_backends(self):
+        verdicts = []
+        for convert in (mediapipe_pose, COCO_SCHEMA.to_pose):
+            detector = FallDetector()
+            for keypoints in fall_sequence(60):
+                detector.detect_fall(convert(np.array(list(keypoints.values()), dtype=np.float64)))
+            verdicts.append((detector.is_fallen, detector.get_confidence_score()))
+        self.assertEqual(verdicts[0], verdicts[1])
+        self.assertTrue(verdicts[0][0])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
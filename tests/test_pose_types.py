@@ -0,0 +1,87 @@
+"""Pose ve Person sonuç tipleri testleri.
+
+- Pose, keypoint sözlüğüyle aynı arayüzü sunar
+- Eksik (x/y <= 0) noktalar eşlemede yer almaz
+- FallDetector sözlük ve Pose ile aynı kararları verir
+"""
+
+import unittest
+
+import numpy as np
+
+from tests.synthetic import KEYPOINT_NAMES, fall_sequence, pose_array, to_keypoint_dict
+from src.core.fall_detector import FallDetector
+from src.core.keypoint_filter import KeypointFilter
+from src.core.learned_scorer import keypoints_to_points
+from src.core.pose_types import KEYPOINT_NAMES as POSE_NAMES
+from src.core.pose_types import Keypoint, Person, Pose
+
+
+class TestPose(unittest.TestCase):
+    """Sözlük uyumluluğu ve dizi dönüşümleri."""
+
+    def test_matches_keypoint_dict(self):
+        points = pose_array(320, 60, 360, 0.3)
+        pose = Pose.from_array(points)
+        expected = to_keypoint_dict(points)
+
+        self.assertEqual(dict(pose), expected)
+        self.assertEqual(pose['left_hip'], expected['left_hip'])
+        self.assertEqual(pose.xy[Keypoint.LEFT_HIP].tolist(), list(expected['left_hip']))
+        self.assertEqual(len(pose), 17)
+        self.assertEqual(list(POSE_NAMES), KEYPOINT_NAMES)
+
+    def test_missing_points(self):
+        points = pose_array(320, 60, 360)
+        points[Keypoint.NOSE] = (0, 0)
+        pose = Pose.from_array(points)
+
+        self.assertNotIn('nose', pose)
+        self.assertIsNone(pose.get('nose'))
+        self.assertNotIn('not_a_keypoint', pose)
+        with self.assertRaises(KeyError):
+            pose['nose']
+        self.assertEqual(len(pose), 16)
+        self.assertTrue(np.isnan(pose.to_array()[Keypoint.NOSE]).all())
+        self.assertFalse(Pose.empty())
+
+    def test_from_dict_roundtrip(self):
+        keypoints = {'nose': (10, 20), 'left_ankle': (30, 40), 'unknown': (1, 1)}
+        self.assertEqual(dict(Pose.from_dict(keypoints)),
+                         {'nose': (10, 20), 'left_ankle': (30, 40)})
+
+    def test_consumers_accept_pose(self):
+        keypoints = to_keypoint_dict(pose_array(320, 60, 360, 0.5))
+        pose = Pose.from_dict(keypoints)
+
+        np.testing.assert_array_equal(keypoints_to_points(pose), keypoints_to_points(keypoints))
+        np.testing.assert_array_equal(KeypointFilter().to_array(pose),
+                                      KeypointFilter().to_array(keypoints))
+
+    def test_fall_detector_same_verdicts(self):
+        sequence = fall_sequence(60)
+        with_dicts, with_poses = FallDetector(), FallDetector()
+        for keypoints in sequence:
+            self.assertEqual(with_dicts.detect_fall(keypoints),
+                             with_poses.detect_fall(Pose.from_dict(keypoints)))
+            self.assertEqual(with_dicts.get_confidence_score(), with_poses.get_confidence_score())
+        self.assertTrue(with_poses.is_fallen)
+
+
+class TestPerson(unittest.TestCase):
+    """Slotlu kişi kaydı ve sözlük erişimi."""
+
+    def test_dict_access(self):
+        person = Person(Pose.empty(), 0.8, (1, 2, 3, 4))
+
+        self.assertEqual(person['bbox'], (1, 2, 3, 4))
+        self.assertEqual(person.get('confidence'), 0.8)
+        self.assertIsNone(person.get('track_id'))
+        with self.assertRaises(KeyError):
+            person['track_id']
+        with self.assertRaises(AttributeError):
+            person.track_id = 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,249 @@
+"""PreviewServer testleri.
+
+- JSON durum, bilinmeyen yol/kamera yanıtları
+- Kare bir kez kodlanır ve tüm izleyicilerle paylaşılır
+- İzleyici başına kare hızı sınırlaması
+- WebSocket olay kanalı (el sıkışma ve düşme olayı)
+- Komut satırı: ayarlar 'preview_server', 'scheduler' ve 'performance'
+  bölümlerinden okunur, seçenekler bunları ezer
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from src.service import DetectionService
+from src.service import preview_server
+from src.service.preview_server import CameraFeed, PreviewServer, websocket_accept
+from tests.test_service import FakeCapture, fall_detector
+
+
+async def http_get(port, path, headers=''):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode())
+    await writer.drain()
+    return reader, writer
+
+
+async def read_response(reader):
+    """Status, headers and body of a ``Connection: close`` response"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+    body = await reader.read()
+    return int(lines[0].split()[1]), headers, body
+
+
+async def fetch(port, path):
+    reader, writer = await http_get(port, path)
+    try:
+        return await read_response(reader)
+    finally:
+        writer.close()
+
+
+async def read_websocket_message(reader):
+    """(first byte, payload) of an unmasked server frame"""
+    first, length = await reader.readexactly(2)
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), 'big')
+    return first, await reader.readexactly(length)
+
+
+async def read_mjpeg_part(reader):
+    await reader.readuntil(b'--frame\r\n')
+    head = await reader.readuntil(b'\r\n\r\n')
+    length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+    return await reader.readexactly(length)
+
+
+class TestPreviewServer(unittest.IsolatedAsyncioTestCase):
+    """HTTP uç noktaları."""
+
+    async def asyncSetUp(self):
+        self.service = DetectionService(max_workers=2)
+        self.server = PreviewServer(self.service, port=0, max_fps=30.0, viewer_fps=5.0)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.service.stop()
+        await self.server.stop()
+
+    async def test_status_and_not_found(self):
+        self.service.add_camera('room-1', FakeCapture(10), fall_detector(10))
+
+        status, headers, body = await fetch(self.server.port, '/status')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(body)['cameras']['room-1']['viewers'], 0)
+
+        for path in ('/missing', '/cameras/room-9/mjpeg', '/cameras/room-1/other'):
+            status, _, _ = await fetch(self.server.port, path)
+            self.assertEqual(status, 404, path)
+
+        status, _, body = await fetch(self.server.port, '/')
+        self.assertEqual(status, 200)
+        self.assertIn(b'/cameras/room-1/mjpeg', body)
+
+    async def test_mjpeg_viewer_throttled(self):
+        self.service.add_camera('cam', FakeCapture(300), fall_detector(300), realtime=True)
+        reader, writer = await http_get(self.server.port, '/cameras/cam/mjpeg?fps=5')
+        await self.service.start()
+
+        await reader.readuntil(b'\r\n\r\n')
+        start = time.monotonic()
+        frames = [await read_mjpeg_part(reader)]
+        while time.monotonic() - start < 0.7:
+            frames.append(await asyncio.wait_for(read_mjpeg_part(reader), 1.0))
+        writer.close()
+
+        self.assertTrue(all(f.startswith(b'\xff\xd8') for f in frames))
+        # 30 fps inference, 5 fps viewer: one frame per 200 ms
+        self.assertLessEqual(len(frames), 5)
+        self.assertGreaterEqual(self.service.status()['cam']['frames'], 15)
+
+    async def test_snapshot(self):
+        self.service.add_camera('cam', FakeCapture(5), fall_detector(5))
+        status, _, _ = await fetch(self.server.port, '/cameras/cam/snapshot.jpg')
+        self.assertEqual(status, 503)
+
+        await self.service.start()
+        await self.service.join()
+
+        status, headers, body = await fetch(self.server.port, '/cameras/cam/snapshot.jpg')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Type'], 'image/jpeg')
+        self.assertTrue(body.startswith(b'\xff\xd8'))
+
+    async def test_websocket_events(self):
+        self.service.add_camera('room-1', FakeCapture(60), fall_detector(60))
+        key = base64.b64encode(os.urandom(16)).decode()
+        reader, writer = await http_get(
+            self.server.port, '/events?camera=room-1',
+            f"Upgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n")
+        head = (await reader.readuntil(b'\r\n\r\n')).decode()
+        self.assertTrue(head.startswith('HTTP/1.1 101'))
+        self.assertIn(f"Sec-WebSocket-Accept: {websocket_accept(key)}", head)
+
+        while self.service.event_feed.subscriber_count == 0:
+            await asyncio.sleep(0.01)
+        await self.service.start()
+
+        first, payload = await read_websocket_message(reader)
+        self.assertEqual(first, 0x81)
+        event = json.loads(payload)
+        self.assertEqual(event['type'], 'fall_started')
+        self.assertEqual(event['camera_id'], 'room-1')
+
+        # Masked client close frame
+        writer.write(bytes((0x88, 0x82)) + b'\x00\x00\x00\x00' + (1000).to_bytes(2, 'big'))
+        await writer.drain()
+        writer.close()
+
+    async def test_websocket_requires_upgrade(self):
+        status, _, _ = await fetch(self.server.port, '/events')
+        self.assertEqual(status, 400)
+
+
+class TestCameraFeed(unittest.IsolatedAsyncioTestCase):
+    """Paylaşılan JPEG akışı."""
+
+    async def test_encoded_once_for_all_viewers(self):
+        service = DetectionService()
+        service.add_camera('cam', FakeCapture(30), fall_detector(30))
+        feed = CameraFeed(service, 'cam', max_fps=1000.0)
+        feed.viewers = 3
+        feed.start()
+        waiters = [asyncio.ensure_future(feed.wait_frame(0)) for _ in range(3)]
+
+        async with service:
+            frames = await asyncio.gather(*waiters)
+            await service.join()
+
+        self.assertTrue(all(f[1] is frames[0][1] for f in frames))
+        while not feed.closed:
+            await asyncio.sleep(0.01)
+        self.assertLessEqual(feed.sequence, 30)
+        self.assertIsNone(await feed.wait_frame(feed.sequence))
+
+    async def test_idle_without_viewers(self):
+        service = DetectionService()
+        service.add_camera('cam', FakeCapture(10), fall_detector(10))
+        feed = CameraFeed(service, 'cam')
+        feed.start()
+        await asyncio.sleep(0)
+
+        async with service:
+            await service.join()
+
+        self.assertEqual(feed.sequence, 0)
+
+
+
+class TestServeFromConfig(unittest.IsolatedAsyncioTestCase):
+    """Yapılandırmadan çalıştırılan önizleme sunucusu."""
+
+    def test_from_config(self):
+        service = DetectionService()
+        config = {'preview_server': {'host': '0.0.0.0', 'port': 9000, 'jpeg_quality': 60,
+                                     'max_fps': 10, 'viewer_fps': 2, 'enabled': True}}
+        server = PreviewServer.from_config(service, config, port=0)
+
+        self.assertEqual((server.host, server.port, server.jpeg_quality), ('0.0.0.0', 0, 60))
+        self.assertEqual((server.max_fps, server.viewer_fps), (10, 2))
+
+    async def test_serve_reads_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            video = str(Path(tmp) / 'room.avi')
+            writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+            for _ in range(8):
+                writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+            writer.release()
+
+            args = argparse.Namespace(camera=[f'room={video}'], backend='yolo', host=None, port=0,
+                                      jpeg_quality=None, max_fps=None, viewer_fps=None,
+                                      skip_frames=None)
+            config = {'preview_server': {'jpeg_quality': 55, 'max_fps': 4, 'port': 9000},
+                      'performance': {'frame_skip': 2},
+                      'scheduler': {'enabled': True, 'max_fps': 50.0},
+                      'detection': {'min_fall_frames': 5}}
+            servers, services = [], []
+            from_config = PreviewServer.from_config.__func__
+            service_from_config = DetectionService.from_config.__func__
+
+            def make_server(cls, *a, **kw):
+                servers.append(from_config(cls, *a, **kw))
+                return servers[-1]
+
+            def make_service(cls, *a, **kw):
+                services.append(service_from_config(cls, *a, **kw))
+                return services[-1]
+
+            with mock.patch.object(preview_server, 'make_detector',
+                                   lambda backend, config: fall_detector()), \
+                    mock.patch.object(PreviewServer, 'from_config', classmethod(make_server)), \
+                    mock.patch.object(DetectionService, 'from_config', classmethod(make_service)):
+                await asyncio.wait_for(preview_server.serve(args, config), 10)
+
+        server, service = servers[0], services[0]
+        pipeline = service.cameras['room'].pipeline
+        self.assertEqual((server.jpeg_quality, server.max_fps), (55, 4))
+        self.assertNotEqual(server.port, 9000)
+        self.assertEqual(service.scheduler.max_fps, 50.0)
+        self.assertEqual(pipeline.skip_frames, 2)
+        self.assertEqual(pipeline.detector_options['min_fall_frames'], 5)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,90 @@
+"""FrameProfiler testleri.
+
+- Profil yalnızca etkinleştirilince ve belirtilen kare penceresi boyunca çalışır
+- Pencere sonunda .prof, .folded ve .txt dosyaları yazılır
+"""
+
+import pstats
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.core.fall_detector import FallDetector
+from src.utils.profiler import FrameProfiler
+
+
+KEYPOINTS = {
+    "nose": (140, 60),
+    "left_shoulder": (120, 100),
+    "right_shoulder": (160, 100),
+    "left_hip": (130, 200),
+    "right_hip": (150, 200),
+    "left_ankle": (135, 300),
+    "right_ankle": (145, 300),
+}
+
+
+def busy_stage():
+    end = time.perf_counter() + 0.003
+    while time.perf_counter() < end:
+        pass
+
+
+class TestFrameProfiler(unittest.TestCase):
+    """Kare döngüsü profilleme penceresi."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profiler = FrameProfiler(output_dir=self.tmp.name, window_frames=10,
+                                      sample_interval=0.001)
+        self.detector = FallDetector()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run_loop(self, frames: int):
+        for _ in range(frames):
+            self.profiler.tick()
+            self.detector.detect_fall(KEYPOINTS)
+            busy_stage()
+
+    def test_disarmed_profiler_does_nothing(self):
+        self._run_loop(15)
+        self.assertFalse(self.profiler.active)
+        self.assertIsNone(self.profiler.last_report)
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
+
+    def test_window_writes_reports(self):
+        self.profiler.arm()
+        self._run_loop(15)
+
+        self.assertFalse(self.profiler.active)
+        report = self.profiler.last_report
+        self.assertIsNotNone(report)
+        self.assertEqual(self.profiler.frames_profiled, 10)
+
+        stats = pstats.Stats(report["pstats"])
+        self.assertTrue(any(key[2] == "detect_fall" for key in stats.stats))
+
+        folded = Path(report["folded"]).read_text(encoding="utf-8").splitlines()
+        self.assertTrue(folded)
+        stack, count = folded[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertTrue(any("busy_stage" in line for line in folded))
+
+        summary = Path(report["summary"]).read_text(encoding="utf-8")
+        self.assertIn("fall_detector.py:detect_fall", summary)
+
+    def test_stop_early(self):
+        self.profiler.arm(1000)
+        self._run_loop(5)
+        report = self.profiler.stop()
+
+        self.assertIsNotNone(report)
+        self.assertTrue(Path(report["pstats"]).exists())
+        self.assertIsNone(self.profiler.stop())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+"""Çıkarım zamanlayıcısı testleri.
+
+- Her kameraya asgari hız garantisi; kalan bütçe önceliğe göre paylaştırılır
+- Dolu odalar ve yüksek düşme güveni olan odalar öne alınır; şüphe zamanla söner
+- Bütçe sabit ya da ölçülen çıkarım süresinden (CPU payı) hesaplanır
+- DetectionService: payı dolan kameranın kareleri çıkarımdan önce atılır
+- Ayarlar yapılandırmanın 'scheduler' bölümünden okunur
+"""
+
+import unittest
+
+from tests.fake_backends import ScriptedMultiPersonDetector
+from src.service import DetectionService, InferenceScheduler
+from src.utils.metrics import MetricsRegistry
+from tests.test_service import FakeCapture, fall_detector
+
+
+def result(people=0, confidence=0.0, fall=False):
+    return {'processed': True, 'people': [{}] * people,
+            'max_confidence': confidence, 'fall_detected': fall}
+
+
+class TestAllocation(unittest.TestCase):
+    """Bütçe paylaşımı."""
+
+    def setUp(self):
+        self.scheduler = InferenceScheduler(budget_fps=20.0, min_fps=1.0, max_fps=10.0)
+        for camera_id in ('empty', 'occupied', 'suspicious'):
+            self.scheduler.add(camera_id)
+        self.scheduler.observe('occupied', result(people=1), now=0.0)
+        self.scheduler.observe('suspicious', result(people=1, confidence=60.0), now=0.0)
+
+    def test_priorities_and_minimum(self):
+        rates = self.scheduler.allocate(now=0.0)
+
+        self.assertAlmostEqual(sum(rates.values()), 20.0)
+        self.assertGreaterEqual(rates['empty'], 1.0)
+        self.assertLess(rates['empty'], rates['occupied'])
+        self.assertEqual(rates['suspicious'], 10.0)
+        self.assertFalse(self.scheduler.overcommitted)
+
+    def test_capped_share_is_redistributed(self):
+        self.scheduler.budget_fps = 100.0
+
+        rates = self.scheduler.allocate(now=0.0)
+
+        self.assertEqual(rates, {'empty': 10.0, 'occupied': 10.0, 'suspicious': 10.0})
+
+    def test_minimum_guaranteed_when_overcommitted(self):
+        self.scheduler.budget_fps = 1.0
+
+        rates = self.scheduler.allocate(now=0.0)
+
+        self.assertEqual(set(rates.values()), {1.0})
+        self.assertTrue(self.scheduler.overcommitted)
+
+    def test_camera_limits_and_weight(self):
+        scheduler = InferenceScheduler(budget_fps=12.0, min_fps=1.0, max_fps=10.0)
+        scheduler.add('icu', weight=3.0, min_fps=2.0)
+        scheduler.add('hall', max_fps=2.0)
+
+        rates = scheduler.allocate(now=0.0)
+
+        self.assertEqual(rates['hall'], 2.0)
+        self.assertEqual(rates['icu'], 10.0)
+
+    def test_suspicion_decays(self):
+        schedule = self.scheduler.cameras['suspicious']
+        self.assertAlmostEqual(self.scheduler.suspicion(schedule, 0.0), 0.6)
+        self.assertAlmostEqual(self.scheduler.suspicion(schedule, 10.0), 0.3)
+
+        rates = self.scheduler.allocate(now=120.0)
+        self.assertAlmostEqual(rates['suspicious'], rates['occupied'], places=1)
+
+    def test_fall_reallocates_immediately(self):
+        self.scheduler.acquire('empty', now=0.0)
+        self.assertLess(self.scheduler.cameras['empty'].rate, 10.0)
+
+        self.scheduler.observe('empty', result(people=1, fall=True), now=0.1)
+        self.scheduler.acquire('empty', now=0.2)
+
+        self.assertEqual(self.scheduler.cameras['empty'].rate, 10.0)
+
+
+class TestBudget(unittest.TestCase):
+    """CPU payından bütçe ve jeton kovası."""
+
+    def test_budget_from_inference_time(self):
+        scheduler = InferenceScheduler(cpu_budget=0.5, cpu_cores=2)
+        self.assertIsNone(scheduler.budget())
+
+        scheduler.observe('cam', result(), inference_seconds=0.1, now=0.0)
+        self.assertAlmostEqual(scheduler.budget(), 10.0)
+        scheduler.observe('cam', result(), inference_seconds=0.2, now=0.0)
+        self.assertGreater(scheduler.budget(), 5.0)
+        self.assertLess(scheduler.budget(), 10.0)
+
+    def test_unknown_budget_runs_at_max(self):
+        scheduler = InferenceScheduler(max_fps=7.0)
+        scheduler.add('cam')
+
+        self.assertEqual(scheduler.allocate(now=0.0), {'cam': 7.0})
+
+    def test_token_bucket_rate(self):
+        scheduler = InferenceScheduler(budget_fps=2.0, min_fps=2.0, max_fps=2.0)
+        # 10 s of a 30 fps camera
+        granted = sum(scheduler.acquire('cam', now=i / 30.0) for i in range(300))
+
+        self.assertIn(granted, (20, 21))
+        self.assertEqual(scheduler.status()['cam']['skipped'], 300 - granted)
+
+    def test_from_config(self):
+        config = {'scheduler': {'enabled': True, 'budget_fps': 12.0, 'min_fps': 0.5,
+                                'max_fps': 6.0, 'suspicion_half_life': 4.0}}
+        scheduler = InferenceScheduler.from_config(config, max_fps=8.0)
+
+        self.assertEqual((scheduler.budget_fps, scheduler.min_fps, scheduler.max_fps),
+                         (12.0, 0.5, 8.0))
+        self.assertEqual(scheduler.suspicion_half_life, 4.0)
+
+        service = DetectionService.from_config(config)
+        self.addCleanup(service.camera_sessions.stop)
+        self.assertEqual(service.scheduler.budget_fps, 12.0)
+        disabled = DetectionService.from_config({'scheduler': {'enabled': False}})
+        self.addCleanup(disabled.camera_sessions.stop)
+        self.assertIsNone(disabled.scheduler)
+
+
+class TestServiceScheduling(unittest.IsolatedAsyncioTestCase):
+    """Zamanlayıcı ile DetectionService."""
+
+    async def test_frames_over_rate_are_dropped(self):
+        metrics = MetricsRegistry()
+        scheduler = InferenceScheduler(budget_fps=0.0, min_fps=0.0)
+        detectors = {'room': fall_detector(), 'hall': ScriptedMultiPersonDetector(people=0)}
+        captures = {camera_id: FakeCapture(60) for camera_id in detectors}
+
+        async with DetectionService(scheduler=scheduler, metrics=metrics) as service:
+            for camera_id, detector in detectors.items():
+                service.add_camera(camera_id, captures[camera_id], detector)
+            await service.join()
+            status = service.status()
+
+        for camera_id in detectors:
+            # Only the initial token is spent; the stream is still read to the end
+            self.assertEqual(status[camera_id]['frames'], 1)
+            self.assertEqual(status[camera_id]['inference_fps'], 0.0)
+            self.assertEqual(captures[camera_id].index, 60)
+            self.assertEqual(metrics.get_counter('frames_skipped_total', stream=camera_id,
+                                                 reason='scheduler'), 59)
+        self.assertEqual(scheduler.cameras['room'].people, 1)
+        self.assertIsNotNone(scheduler.inference_seconds)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
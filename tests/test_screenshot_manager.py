@@ -0,0 +1,164 @@
+"""ScreenshotManager testleri.
+
+- Ekran görüntüleri kamera/gün klasörlerine yazılır, küçük resimleri üretilir
+- Sayım ve boyut indeksten okunur (klasör taranmaz)
+- Saklama kuralları eski gün klasörlerini siler (başlangıçta ve zamanlayıcıyla da)
+- Uzun kamera kimlikleri kısa bir özetle ayrışır
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.screenshot_manager import ScreenshotManager
+
+
+def make_frame() -> np.ndarray:
+    return np.random.randint(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+class TestScreenshotManager(unittest.TestCase):
+    """Dizin indeksi, parçalama ve saklama davranışı."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.manager = ScreenshotManager(self.tmp.name, thumbnail_width=40)
+
+    def tearDown(self):
+        self.manager.close()
+        self.tmp.cleanup()
+
+    def test_from_config(self):
+        config = {"screenshots": {"directory": str(self.root / "cfg"), "max_age_days": 7,
+                                  "max_total_bytes": None, "thumbnail_width": 0}}
+        manager = ScreenshotManager.from_config(config)
+        self.addCleanup(manager.close)
+
+        self.assertEqual(manager.root_dir, self.root / "cfg")
+        self.assertEqual(manager.max_age_days, 7)
+        self.assertEqual(manager.thumbnail_width, 0)
+
+    def test_save_sharded_with_thumbnail(self):
+        path = Path(self.manager.save(make_frame(), "rtsp://10.0.0.5/stream", person_id=2))
+        self.manager.flush()
+
+        self.assertTrue(path.exists())
+        self.assertEqual(path.parent.parent.name, "rtsp_10_0_0_5_stream")
+        self.assertTrue(path.name.startswith("fall_person2_"))
+        self.assertTrue(self.manager.thumbnail_path(path).exists())
+
+    def test_long_camera_ids_do_not_collide(self):
+        tail = "/" + "a" * 60 + "/stream"
+        first = ScreenshotManager.camera_slug("rtsp://10.0.0.5" + tail)
+        second = ScreenshotManager.camera_slug("rtsp://10.0.0.6" + tail)
+
+        self.assertNotEqual(first, second)
+        self.assertLessEqual(len(first), 48)
+        self.assertEqual(ScreenshotManager.camera_slug("rtsp://10.0.0.5" + tail), first)
+
+    def test_index_counts_without_scanning(self):
+        for _ in range(3):
+            self.manager.save(make_frame(), 0)
+        self.manager.save(make_frame(), 1)
+        self.manager.flush()
+
+        self.assertEqual(self.manager.get_count(), 4)
+        self.assertEqual(self.manager.get_count(camera_id=0), 3)
+        # Küçük resimler de boyuta dahildir
+        expected = sum(p.stat().st_size for p in self.root.glob("*/*/*.jpg"))
+        expected += sum(p.stat().st_size for p in self.root.glob("*/*/thumbs/*.jpg"))
+        self.assertEqual(self.manager.get_total_bytes(), expected)
+
+        # Yeni bir yönetici aynı indeksi diskten kurmalı
+        self.manager.close()
+        self.manager = ScreenshotManager(self.tmp.name)
+        self.assertEqual(self.manager.get_count(), 4)
+
+    def _add_old_files(self):
+        old_dir = self.root / "0" / "20200101"
+        old_dir.mkdir(parents=True)
+        (old_dir / "fall_000000_000.jpg").write_bytes(b"x" * 10)
+        legacy = self.root / "fall_20200101_000000.jpg"
+        legacy.write_bytes(b"y" * 10)
+        os.utime(legacy, (0, 0))
+        return old_dir, legacy
+
+    def test_prune_removes_old_days(self):
+        old_dir, legacy = self._add_old_files()
+        self.manager.close()
+        self.manager = ScreenshotManager(self.tmp.name, max_age_days=None)
+        self.manager.flush()
+        self.assertEqual(self.manager.get_count(), 2)
+
+        self.manager.max_age_days = 30
+        removed = self.manager.prune(now=time.time())
+
+        self.assertEqual(removed, 2)
+        self.assertFalse(old_dir.exists())
+        self.assertFalse(legacy.exists())
+        self.assertEqual(self.manager.get_count(), 0)
+
+    def test_prune_at_startup_without_saves(self):
+        old_dir, legacy = self._add_old_files()
+        self.manager.close()
+        self.manager = ScreenshotManager(self.tmp.name, max_age_days=30)
+        self.manager.flush()
+
+        self.assertFalse(old_dir.exists())
+        self.assertFalse(legacy.exists())
+        self.assertEqual(self.manager.get_count(), 0)
+
+    def test_prune_on_timer_while_idle(self):
+        self.manager.close()
+        self.manager = ScreenshotManager(self.tmp.name, max_age_days=30,
+                                         prune_interval=0.05)
+        self.manager.flush()
+        old_dir, legacy = self._add_old_files()
+        with self.manager._lock:
+            self.manager._shards[("0", "20200101")] = [1, 10]
+
+        deadline = time.monotonic() + 5
+        while old_dir.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertFalse(old_dir.exists())
+
+    def test_total_size_removes_only_oldest_legacy_files(self):
+        for i in range(3):
+            legacy = self.root / f"fall_2024010{i}_000000.jpg"
+            legacy.write_bytes(b"y" * 1000)
+            os.utime(legacy, (i + 1, i + 1))
+        self.manager.close()
+        self.manager = ScreenshotManager(self.tmp.name, max_age_days=None,
+                                         max_total_bytes=2500)
+        self.manager.flush()
+
+        self.assertFalse((self.root / "fall_20240100_000000.jpg").exists())
+        self.assertTrue((self.root / "fall_20240101_000000.jpg").exists())
+        self.assertTrue((self.root / "fall_20240102_000000.jpg").exists())
+        self.assertEqual(self.manager.get_total_bytes(), 2000)
+
+    def test_prune_by_total_size_keeps_today(self):
+        for day in ("20240101", "20240102"):
+            shard = self.root / "0" / day
+            shard.mkdir(parents=True)
+            (shard / "fall_000000_000.jpg").write_bytes(b"x" * 1000)
+        self.manager.close()
+        self.manager = ScreenshotManager(self.tmp.name, max_age_days=None,
+                                         max_total_bytes=1500)
+        self.manager.save(make_frame(), 0)
+        self.manager.flush()
+
+        self.manager.prune()
+
+        self.assertFalse((self.root / "0" / "20240101").exists())
+        self.assertEqual(self.manager.get_stats()["shards"], 1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,309 @@
+"""DetectionService ve yayın (fan-out) testleri.
+
+- Yavaş tüketici politikaları: en eskiyi at, en yeniyi at, bağlantıyı kes
+- Tek olay döngüsünden birden çok kamera, kamera filtreli abonelikler
+- Düşme olayları ayrı akışta ve olay deposuna kaydedilir
+- Yavaş bir tüketici üreticiyi ve diğer aboneleri bekletmez
+- Canlı kameralar CameraSessionManager ile açılır ve durdurulabilir
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from tests.fake_backends import ScriptedMultiPersonDetector
+from tests.synthetic import fall_sequence
+from src.service import (DISCONNECT, DROP_NEWEST, DROP_OLDEST, Broadcaster,
+                         DetectionService, SlowConsumerError, result_to_json)
+from src.utils.camera_sessions import CameraSessionManager
+from src.utils.error_handler import error_handler
+from src.utils.event_store import FallEventStore
+from src.utils.metrics import MetricsRegistry
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in returning ``frames`` blank 30 fps frames
+
+    Like a video file, the first frame is at position 0 ms; ``live``
+    captures report no frame count, like cameras and network streams.
+    """
+
+    def __init__(self, frames=60, width=640, height=360, live=False):
+        self.frames = frames
+        self.live = live
+        self.index = 0
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.released = False
+
+    def read(self):
+        if self.index >= self.frames:
+            return False, None
+        self.index += 1
+        return True, self.frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return max(self.index - 1, 0) * 1000.0 / 30.0
+        if prop == cv2.CAP_PROP_FRAME_COUNT and not self.live:
+            return float(self.frames)
+        return 0.0
+
+    def release(self):
+        self.released = True
+
+
+class PacedCapture(FakeCapture):
+    """FakeCapture delivering frames in real time, like a camera"""
+
+    def read(self):
+        time.sleep(0.005)
+        return super().read()
+
+
+def fall_detector(frames=60):
+    return ScriptedMultiPersonDetector(script=fall_sequence(frames))
+
+
+class TestBroadcaster(unittest.IsolatedAsyncioTestCase):
+    """Abonelik kuyrukları ve taşma politikaları."""
+
+    async def test_drop_oldest_keeps_latest(self):
+        broadcaster = Broadcaster()
+        subscription = broadcaster.subscribe(maxsize=3, policy=DROP_OLDEST)
+        for i in range(10):
+            broadcaster.publish(i)
+        broadcaster.close()
+
+        items = [item async for item in subscription]
+
+        self.assertEqual(items, [7, 8, 9])
+        self.assertEqual(subscription.dropped, 7)
+
+    async def test_on_drop_receives_lost_items(self):
+        lost = []
+        broadcaster = Broadcaster(on_drop=lost.append)
+        oldest = broadcaster.subscribe(maxsize=3, policy=DROP_OLDEST)
+        broadcaster.subscribe(maxsize=2, policy=DISCONNECT)
+        for i in range(5):
+            broadcaster.publish(i)
+
+        # drop_oldest loses 0 and 1; disconnect loses 2 plus its backlog 0 and 1
+        self.assertEqual(sorted(lost), [0, 0, 1, 1, 2])
+        self.assertEqual(broadcaster.pending, oldest.pending)
+
+    async def test_drop_newest_keeps_backlog(self):
+        broadcaster = Broadcaster()
+        subscription = broadcaster.subscribe(maxsize=3, policy=DROP_NEWEST)
+        for i in range(10):
+            broadcaster.publish(i)
+        broadcaster.close()
+
+        self.assertEqual([item async for item in subscription], [0, 1, 2])
+
+    async def test_disconnect_slow_consumer(self):
+        broadcaster = Broadcaster()
+        slow = broadcaster.subscribe(maxsize=3, policy=DISCONNECT)
+        fast = broadcaster.subscribe(maxsize=100, policy=DISCONNECT)
+        for i in range(5):
+            broadcaster.publish(i)
+
+        with self.assertRaises(SlowConsumerError):
+            await slow.get()
+        self.assertTrue(slow.closed)
+        self.assertEqual(broadcaster.subscriber_count, 1)
+        self.assertEqual([await fast.get() for _ in range(5)], [0, 1, 2, 3, 4])
+
+    async def test_predicate_and_close(self):
+        broadcaster = Broadcaster()
+        async with broadcaster.subscribe(predicate=lambda item: item % 2 == 0) as even:
+            for i in range(6):
+                broadcaster.publish(i)
+            self.assertEqual([await even.get() for _ in range(3)], [0, 2, 4])
+        self.assertEqual(broadcaster.subscriber_count, 0)
+        self.assertEqual(broadcaster.publish(8), 0)
+
+    async def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            Broadcaster().subscribe(policy='block')
+
+
+class TestDetectionService(unittest.IsolatedAsyncioTestCase):
+    """Kamera işlem hatlarının asyncio API'si."""
+
+    async def test_results_and_fall_events(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = FallEventStore(str(Path(tmp.name) / "events.db"), flush_interval=0.05)
+        self.addCleanup(store.close)
+        service = DetectionService(max_workers=2, event_store=store)
+        captures = {'room-1': FakeCapture(60), 'room-2': FakeCapture(60)}
+        for camera_id, capture in captures.items():
+            service.add_camera(camera_id, capture, fall_detector(60))
+
+        room_1 = service.subscribe_results('room-1', maxsize=100)
+        events = service.subscribe_events()
+        async with service:
+            await service.join()
+
+        results = [r async for r in room_1]
+        received = [e async for e in events]
+
+        self.assertEqual(len(results), 60)
+        self.assertEqual({r['camera_id'] for r in results}, {'room-1'})
+        self.assertEqual([r['frame_index'] for r in results], list(range(1, 61)))
+        self.assertTrue(results[-1]['fall_detected'])
+
+        falls = [e for e in received if e['type'] == 'fall_started']
+        self.assertEqual(sorted(e['camera_id'] for e in falls), ['room-1', 'room-2'])
+        stopped = [e for e in received if e['type'] == 'camera_stopped']
+        self.assertEqual(len(stopped), 2)
+        self.assertIsNone(stopped[0]['error'])
+        self.assertTrue(all(c.released for c in captures.values()))
+
+        store.flush()
+        self.assertEqual(store.count_events(), 2)
+
+    async def test_slow_consumer_does_not_block(self):
+        registry = MetricsRegistry()
+        service = DetectionService(max_workers=1, metrics=registry)
+        service.add_camera('cam', FakeCapture(60), fall_detector(60))
+        slow = service.subscribe_results(maxsize=2, policy=DROP_OLDEST)
+        events = service.subscribe_events()
+
+        async with service:
+            await service.join()
+            depth = registry.get_gauge('queue_depth', queue='results')
+
+        self.assertEqual(service.status()['cam']['frames'], 60)
+        self.assertEqual(slow.pending, 2)
+        self.assertEqual(slow.dropped, 58)
+        # Lost results are drops; nothing was skipped on purpose
+        self.assertEqual(registry.get_counter('frames_dropped_total', stream='cam', queue='results'), 58)
+        self.assertEqual(registry.get_counter('frames_skipped_total', stream='cam', reason='scheduler'), 0)
+        self.assertEqual(depth, 2)
+        self.assertEqual([r['frame_index'] async for r in slow], [59, 60])
+        self.assertIn('fall_started', [e['type'] async for e in events])
+
+    async def test_async_generators(self):
+        service = DetectionService()
+        service.add_camera('cam', FakeCapture(20), fall_detector(20))
+        indexes = []
+
+        async def consume():
+            async for result in service.results(maxsize=100):
+                indexes.append(result['frame_index'])
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        async with service:
+            await service.join()
+        await consumer
+
+        self.assertEqual(indexes, list(range(1, 21)))
+
+    async def test_realtime_file_paced(self):
+        service = DetectionService()
+        service.add_camera('cam', FakeCapture(31), fall_detector(31), realtime=True)
+        results = service.subscribe_results(maxsize=100)
+
+        start = time.monotonic()
+        async with service:
+            await service.join()
+        elapsed = time.monotonic() - start
+
+        # 31 frames at 30 fps: the last one is 1 s after the first
+        self.assertGreaterEqual(elapsed, 0.95)
+        self.assertLess(elapsed, 3.0)
+        timestamps = [r['timestamp'] async for r in results]
+        self.assertEqual(timestamps[0], 0.0)
+        self.assertAlmostEqual(timestamps[-1], 1.0)
+
+    async def test_live_source_uses_monotonic_clock(self):
+        service = DetectionService()
+        camera = service.add_camera('cam', FakeCapture(10, live=True), fall_detector(10))
+        results = service.subscribe_results(maxsize=100)
+
+        before = time.monotonic()
+        async with service:
+            await service.join()
+
+        self.assertTrue(camera.clock.live)
+        timestamps = [r['timestamp'] async for r in results]
+        self.assertTrue(all(t >= before for t in timestamps))
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    async def test_live_camera_through_sessions(self):
+        captures = []
+
+        def opener(source, timeout):
+            captures.append(PacedCapture(10, live=True))
+            return captures[-1]
+
+        service = DetectionService.from_config(
+            {'camera': {'reconnect_delay': 10000}},
+            camera_sessions=CameraSessionManager(opener=opener, reconnect_delay=0.01, jitter=0,
+                                                 healthy_after=0.0))
+        self.addCleanup(error_handler.flush_rate_limited, force=True)
+        service.add_camera('cam', 'rtsp://10.0.0.5/stream', fall_detector(100))
+        results = service.subscribe_results(maxsize=100)
+
+        async with service:
+            # The stream breaks after 10 frames; reads continue after the reconnect
+            deadline = time.monotonic() + 10
+            while service.status()['cam']['frames'] < 15 and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            self.assertIsNotNone(service.status()['cam']['connection'])
+
+        self.assertGreaterEqual(len(captures), 2)
+        self.assertFalse(service.status()['cam']['running'])
+        self.assertGreaterEqual(len([r async for r in results]), 15)
+
+    def test_from_config_builds_camera_sessions(self):
+        service = DetectionService.from_config({'camera': {'max_workers': 3}})
+        self.addCleanup(service.camera_sessions.stop)
+        self.assertEqual(service.camera_sessions.executor._max_workers, 3)
+
+    async def test_camera_error_reported(self):
+        service = DetectionService()
+        service.add_camera('missing', '/nonexistent/video.mp4', fall_detector())
+        events = service.subscribe_events()
+
+        async with service:
+            await service.join()
+
+        received = [e async for e in events]
+        self.assertEqual(received[0]['type'], 'camera_stopped')
+        self.assertIsNotNone(received[0]['error'])
+        self.assertFalse(service.status()['missing']['running'])
+
+    async def test_duplicate_camera(self):
+        service = DetectionService()
+        service.add_camera('cam', FakeCapture(), fall_detector())
+        with self.assertRaises(ValueError):
+            service.add_camera('cam', FakeCapture(), fall_detector())
+        with self.assertRaises(ValueError):
+            service.add_camera('other', FakeCapture())
+
+    async def test_result_json(self):
+        service = DetectionService()
+        service.add_camera('cam', FakeCapture(5), fall_detector(5))
+        results = service.subscribe_results(maxsize=10)
+        async with service:
+            await service.join()
+
+        encoded = json.loads(json.dumps(result_to_json(await results.get())))
+
+        self.assertNotIn('frame', encoded)
+        self.assertEqual(encoded['camera_id'], 'cam')
+        self.assertEqual(encoded['type'], 'frame')
+        self.assertEqual(len(encoded['people'][0]['keypoints']), 17)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
@@ -0,0 +1,142 @@
+"""StreamingFallDetector testleri.
+
+- Vektörel çekirdek, FallDetector ile kare kare aynı sonucu üretir
+- Durum, parçalar (chunk) arasında taşınır
+- min_fall_frames ve eklem güvenine göre kriter ağırlıkları FallDetector ile aynıdır
+- Ayarlar yapılandırmanın 'detection' bölümünden okunur
+"""
+
+import unittest
+
+import numpy as np
+
+from tests.synthetic import fall_sequence, fallen_keypoints, standing_keypoints
+from src.core.fall_detector import FallDetector
+from src.core.pose_types import Pose
+from src.core.streaming import (StreamingFallDetector, confidences_to_array, fall_onsets,
+                                keypoints_to_array)
+
+
+def random_sequence(frames: int, seed: int):
+    """Ayakta/düşmüş pozlar arasında gezinen, eksik noktalı ve boş kareli dizi"""
+    rng = np.random.default_rng(seed)
+    sequence = []
+    tilt = 0.0
+    for _ in range(frames):
+        if rng.random() < 0.05:
+            sequence.append({})
+            continue
+        tilt = float(np.clip(tilt + rng.normal(0, 0.15), 0, 1))
+        base = standing_keypoints() if tilt < 0.5 else fallen_keypoints()
+        keypoints = {}
+        for name, (x, y) in base.items():
+            if rng.random() < 0.08:
+                continue
+            keypoints[name] = (int(x + rng.integers(-40, 41)), int(y + rng.integers(-40, 41)))
+        sequence.append(keypoints)
+    return sequence
+
+
+def with_confidences(sequence, seed: int):
+    """Diziyi rastgele eklem güvenleri taşıyan Pose nesnelerine çevirir"""
+    rng = np.random.default_rng(seed)
+    poses = []
+    for keypoints in sequence:
+        pose = Pose.from_dict(keypoints)
+        pose.confidence = rng.uniform(0.2, 1.0, len(pose.present)).astype(np.float32)
+        poses.append(pose)
+    return poses
+
+
+def reference(sequence, **kwargs):
+    detector = FallDetector(**kwargs)
+    rows = []
+    for keypoints in sequence:
+        fall = detector.detect_fall(keypoints)
+        rows.append((fall, detector.is_fallen, detector.get_confidence_score(),
+                     detector.fall_frames_count))
+    return rows
+
+
+class TestStreamingFallDetector(unittest.TestCase):
+    """FallDetector ile eşdeğerlik ve parça sınırları."""
+
+    def assert_equivalent(self, sequence, chunk_sizes, **kwargs):
+        expected = reference(sequence, **kwargs)
+        array = keypoints_to_array(sequence)
+        confidence = confidences_to_array(sequence)
+        kernel = StreamingFallDetector(**kwargs)
+
+        results, start, i = [], 0, 0
+        while start < len(sequence):
+            size = chunk_sizes[i % len(chunk_sizes)]
+            results.append(kernel.process(array[start:start + size],
+                                          confidence[start:start + size]))
+            start += size
+            i += 1
+
+        fall = np.concatenate([r['fall'] for r in results])
+        is_fallen = np.concatenate([r['is_fallen'] for r in results])
+        confidence = np.concatenate([r['confidence'] for r in results])
+        count = np.concatenate([r['fall_frames_count'] for r in results])
+
+        self.assertEqual(fall.tolist(), [row[0] for row in expected])
+        self.assertEqual(is_fallen.tolist(), [row[1] for row in expected])
+        np.testing.assert_array_equal(confidence, [row[2] for row in expected])
+        self.assertEqual(count.tolist(), [row[3] for row in expected])
+        return results
+
+    def test_fall_sequence_single_chunk(self):
+        results = self.assert_equivalent(fall_sequence(60), [60])
+        self.assertEqual(len(fall_onsets(results)), 1)
+
+    def test_random_sequences_across_chunks(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                self.assert_equivalent(random_sequence(400, seed), [1, 7, 64, 3, 128])
+
+    def test_scale_references(self):
+        for scale_reference in ('torso', 'bbox'):
+            with self.subTest(scale_reference=scale_reference):
+                self.assert_equivalent(random_sequence(300, 7), [5, 50],
+                                       scale_reference=scale_reference)
+
+    def test_min_fall_frames(self):
+        for min_fall_frames in (1, 5):
+            with self.subTest(min_fall_frames=min_fall_frames):
+                self.assert_equivalent(random_sequence(300, 3), [9, 40],
+                                       min_fall_frames=min_fall_frames)
+
+    def test_confidence_weighting(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                sequence = with_confidences(random_sequence(300, seed), seed)
+                self.assert_equivalent(sequence, [11, 64], scale_reference='torso')
+        # Ağırlıklandırma kapalıyken güvenler yok sayılır
+        self.assert_equivalent(with_confidences(random_sequence(200, 9), 9), [50],
+                               full_weight_confidence=None)
+
+    def test_from_config(self):
+        config = {'detection': {'angle_threshold': 55.0, 'min_fall_frames': 4,
+                                'full_weight_confidence': 0.6, 'velocity_threshold': 2.0}}
+        kernel = StreamingFallDetector.from_config(config, min_fall_frames=6)
+
+        self.assertEqual(kernel.angle_threshold, 55.0)
+        self.assertEqual(kernel.min_fall_frames, 6)
+        self.assertEqual(kernel.full_weight_confidence, 0.6)
+
+    def test_never_upright_person_is_gated(self):
+        sequence = [fallen_keypoints()] * 40
+        results = self.assert_equivalent(sequence, [16])
+        self.assertFalse(np.concatenate([r['fall'] for r in results]).any())
+
+    def test_empty_chunk_and_shape_check(self):
+        kernel = StreamingFallDetector()
+        result = kernel.process(np.empty((0, 17, 2)))
+        self.assertEqual(result['fall'].shape, (0,))
+        with self.assertRaises(ValueError):
+            kernel.process(np.zeros((5, 17)))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)
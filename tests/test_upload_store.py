@@ -0,0 +1,115 @@
+"""Yüklenen video deposu testleri.
+
+- Parça parça yazma; bellek içi yüklemelerde kopyasız tampon kullanımı
+- İçerik özetiyle tekrar eden yüklemelerin yeniden kullanılması
+- Temizlikçi: yarım kalan dosyalar, süresi dolan ve boyut sınırını aşan yüklemeler
+"""
+
+import io
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from src.utils.upload_store import UploadStore
+
+DATA = os.urandom(100_000)
+
+
+class StreamOnly:
+    """File object without getbuffer(), counting read() calls"""
+
+    def __init__(self, data):
+        self._io = io.BytesIO(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return self._io.read(size)
+
+
+class TestUploadStore(unittest.TestCase):
+    """İçerik adresli yükleme deposu."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = UploadStore(self.tmp.name, chunk_size=16_384, clean_interval=3600)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_from_config(self):
+        config = {"uploads": {"directory": self.tmp.name, "max_age_hours": 1,
+                              "max_total_bytes": 1000, "clean_interval": 60}}
+        store = UploadStore.from_config(config)
+
+        self.assertEqual(store.directory, Path(self.tmp.name))
+        self.assertEqual(store.max_age_hours, 1)
+        self.assertEqual(store.max_total_bytes, 1000)
+        self.assertEqual(store.clean_interval, 60)
+
+    def test_save_and_dedup(self):
+        path, reused = self.store.save(io.BytesIO(DATA), 'video.MP4')
+
+        self.assertFalse(reused)
+        self.assertEqual(Path(path).suffix, '.mp4')
+        self.assertEqual(Path(path).read_bytes(), DATA)
+        mtime = os.stat(path).st_mtime_ns
+
+        again, reused = self.store.save(io.BytesIO(DATA), 'copy.mp4')
+        self.assertTrue(reused)
+        self.assertEqual(again, path)
+        # Same identity for caches keyed by (path, size, mtime)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+        self.assertEqual(len(self.store.entries()), 1)
+
+    def test_streamed_in_chunks(self):
+        upload = StreamOnly(DATA)
+        path, reused = self.store.save(upload, 'video.avi')
+
+        self.assertFalse(reused)
+        self.assertGreater(upload.reads, 5)
+        self.assertEqual(Path(path).read_bytes(), DATA)
+
+        path_2, reused = self.store.save(StreamOnly(DATA), 'video.avi')
+        self.assertTrue(reused)
+        self.assertEqual(path_2, path)
+        self.assertFalse(list(Path(self.tmp.name).glob('*.part')))
+
+    def test_different_content(self):
+        first, _ = self.store.save(io.BytesIO(DATA), 'a.mp4')
+        second, reused = self.store.save(io.BytesIO(DATA[::-1]), 'a.mp4')
+
+        self.assertFalse(reused)
+        self.assertNotEqual(first, second)
+
+    def test_janitor(self):
+        store = UploadStore(self.tmp.name, max_age_hours=1, max_total_bytes=2 * len(DATA) + 100)
+        now = time.time()
+        paths = []
+        for i in range(4):
+            path, _ = store.save(io.BytesIO(DATA + bytes([i])), 'v.mp4')
+            store.release(path)
+            os.utime(path, (now - 60 * (4 - i), now - 60 * (4 - i)))
+            paths.append(path)
+        expired, _ = store.save(io.BytesIO(b'old'), 'v.mp4')
+        store.release(expired)
+        os.utime(expired, (now - 7200, now - 7200))
+        partial = Path(self.tmp.name) / 'abandoned.part'
+        partial.write_bytes(b'x')
+        os.utime(partial, (now - 7200, now - 7200))
+        in_use, _ = store.save(io.BytesIO(b'in use'), 'v.mp4')
+        os.utime(in_use, (now - 7200, now - 7200))
+
+        removed = store.clean(now=now)
+
+        self.assertEqual(removed, 4)
+        self.assertFalse(os.path.exists(expired))
+        self.assertFalse(partial.exists())
+        self.assertEqual([os.path.exists(p) for p in paths], [False, False, True, True])
+        self.assertTrue(os.path.exists(in_use))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main(verbosity=2)